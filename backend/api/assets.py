@@ -0,0 +1,114 @@
+"""
+Fichiers statiques empreintés et précompressés
+`asset('css/style.css')` donne l'URL `/static/css/style.<empreinte>.css` (10 caractères
+hexadécimaux du SHA-256 du contenu): une URL empreintée ne change jamais de contenu et
+peut être mise en cache un an (`immutable`). Les variantes `.br` / `.gz` produites par
+scripts/precompresser_assets.py sont servies telles quelles; à défaut, les fichiers
+textuels sont compressés une fois au premier accès et gardés en mémoire.
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import threading
+
+from api.compression import brotli
+
+LONGUEUR_EMPREINTE = 10
+EXTENSIONS_COMPRESSIBLES = {'.css', '.js', '.svg', '.json', '.txt', '.map', '.html'}
+SUFFIXES = {'br': '.br', 'gzip': '.gz'}
+
+_EMPREINTE = re.compile(r'^(?P<base>.+)\.(?P<empreinte>[0-9a-f]{%d})(?P<ext>\.[A-Za-z0-9]+)$' % LONGUEUR_EMPREINTE)
+
+
+def nom_empreinte(chemin, empreinte):
+    base, ext = os.path.splitext(chemin)
+    return f'{base}.{empreinte}{ext}'
+
+
+def compresser_fichier(donnees, encodage):
+    """Compression maximale (une seule fois par version du fichier)."""
+    if encodage == 'br':
+        return brotli.compress(donnees, quality=11)
+    return gzip.compress(donnees, compresslevel=9, mtime=0)
+
+
+class _Fichier:
+    __slots__ = ('signature', 'empreinte', 'variantes')
+
+    def __init__(self, signature, empreinte):
+        self.signature = signature
+        self.empreinte = empreinte
+        self.variantes = {}
+
+
+class Assets:
+    """Empreintes (et variantes compressées) des fichiers d'un dossier statique, recalculées si le fichier change."""
+
+    def __init__(self, dossier, prefixe='/static/'):
+        self.dossier = os.path.abspath(dossier)
+        self.prefixe = prefixe
+        self._fichiers = {}
+        self._verrou = threading.Lock()
+
+    def chemin_absolu(self, chemin):
+        absolu = os.path.abspath(os.path.join(self.dossier, chemin))
+        if not absolu.startswith(self.dossier + os.sep) or not os.path.isfile(absolu):
+            return None
+        return absolu
+
+    def _fichier(self, chemin):
+        absolu = self.chemin_absolu(chemin)
+        if absolu is None:
+            return None
+        st = os.stat(absolu)
+        signature = (st.st_mtime_ns, st.st_size)
+        fichier = self._fichiers.get(chemin)
+        if fichier is None or fichier.signature != signature:
+            with open(absolu, 'rb') as fh:
+                empreinte = hashlib.sha256(fh.read()).hexdigest()[:LONGUEUR_EMPREINTE]
+            fichier = _Fichier(signature, empreinte)
+            with self._verrou:
+                self._fichiers[chemin] = fichier
+        return fichier
+
+    def empreinte(self, chemin):
+        fichier = self._fichier(chemin)
+        return fichier.empreinte if fichier else None
+
+    def url(self, chemin):
+        """URL empreintée de `chemin` (relatif au dossier statique); URL simple si le fichier n'existe pas."""
+        chemin = chemin.lstrip('/')
+        empreinte = self.empreinte(chemin)
+        return self.prefixe + (nom_empreinte(chemin, empreinte) if empreinte else chemin)
+
+    def resoudre(self, nom):
+        """(chemin réel, empreinte de l'URL ou None) pour un nom demandé sous /static/."""
+        if self.chemin_absolu(nom) is None:
+            m = _EMPREINTE.match(nom)
+            if m:
+                return m.group('base') + m.group('ext'), m.group('empreinte')
+        return nom, None
+
+    def variante(self, chemin, encodage):
+        """Contenu compressé (`br` ou `gzip`) de `chemin`: fichier précompressé à jour, sinon calculé et mis en cache."""
+        if encodage == 'br' and brotli is None:
+            return None
+        if os.path.splitext(chemin)[1].lower() not in EXTENSIONS_COMPRESSIBLES:
+            return None
+        fichier = self._fichier(chemin)
+        if fichier is None:
+            return None
+        donnees = fichier.variantes.get(encodage)
+        if donnees is None:
+            absolu = self.chemin_absolu(chemin)
+            precompresse = absolu + SUFFIXES[encodage]
+            if os.path.isfile(precompresse) and os.path.getmtime(precompresse) >= os.path.getmtime(absolu):
+                with open(precompresse, 'rb') as fh:
+                    donnees = fh.read()
+            else:
+                with open(absolu, 'rb') as fh:
+                    donnees = compresser_fichier(fh.read(), encodage)
+            fichier.variantes[encodage] = donnees
+        return donnees
@@ -8,10 +8,10 @@ from functools import wraps
 import logging
 from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
 from werkzeug.security import check_password_hash, generate_password_hash
-from datetime import datetime, timedelta
 
 from database.models import Utilisateur, db
 from api.middleware import require_admin
+from api.limiteur import verifier_limite
 
 auth_bp = Blueprint('auth', __name__)
 
@@ -24,33 +24,6 @@ def reauth():
     })
 logger = logging.getLogger(__name__)
 
-_LOGIN_ATTEMPTS = {}
-
-
-def _client_ip():
-    # Best-effort: if behind a proxy, X-Forwarded-For may exist.
-    xff = (request.headers.get('X-Forwarded-For') or '').split(',')[0].strip()
-    return xff or (request.remote_addr or 'unknown')
-
-
-def _rate_limit_login():
-    max_attempts = int(current_app.config.get('LOGIN_RATE_LIMIT_MAX', 10))
-    window_seconds = int(current_app.config.get('LOGIN_RATE_LIMIT_WINDOW_SECONDS', 600))
-    ip = _client_ip()
-    now = datetime.utcnow()
-    window_start = now - timedelta(seconds=window_seconds)
-
-    attempts = _LOGIN_ATTEMPTS.get(ip, [])
-    attempts = [t for t in attempts if t >= window_start]
-    _LOGIN_ATTEMPTS[ip] = attempts
-
-    if len(attempts) >= max_attempts:
-        return False
-
-    attempts.append(now)
-    _LOGIN_ATTEMPTS[ip] = attempts
-    return True
-
 def _get_serializer():
     secret = current_app.config.get('SECRET_KEY')
     return URLSafeTimedSerializer(secret)
@@ -58,8 +31,10 @@ def _get_serializer():
 @auth_bp.route('/login', methods=['POST'])
 def login():
     """Connexion: vérifie email/mot de passe et retourne un token signé"""
-    if not _rate_limit_login():
-        return {'erreur': 'Trop de tentatives, réessayez plus tard'}, 429
+    refus = verifier_limite('login', 'LOGIN_RATE_LIMIT_MAX', 'LOGIN_RATE_LIMIT_WINDOW_SECONDS',
+                            message='Trop de tentatives, réessayez plus tard')
+    if refus is not None:
+        return refus
 
     data = request.get_json()
     if not data or not data.get('email') or not data.get('password'):
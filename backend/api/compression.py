@@ -0,0 +1,89 @@
+"""
+Compression HTTP des réponses (gzip, brotli)
+L'encodage est négocié sur Accept-Encoding (valeurs q comprises); brotli est préféré
+quand le paquet `brotli` (optionnel) est installé. Seules les réponses textuelles
+au-delà de COMPRESSION_MIN_OCTETS sont compressées; les réponses en flux et les
+fichiers envoyés tels quels (send_file) ne sont pas touchés.
+"""
+
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # dépendance optionnelle
+    brotli = None
+
+ENCODAGES = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+TYPES_COMPRESSIBLES = {
+    'application/json', 'application/javascript', 'application/x-ndjson', 'application/xml',
+    'application/rss+xml', 'application/atom+xml', 'image/svg+xml',
+}
+
+
+def est_compressible(mimetype):
+    return bool(mimetype) and (mimetype.startswith('text/') or mimetype in TYPES_COMPRESSIBLES)
+
+
+def choisir_encodage(accept_encoding, disponibles=ENCODAGES):
+    """Encodage de `disponibles` préféré par le client (q le plus élevé, ordre de `disponibles` à égalité), ou None."""
+    poids = {}
+    for partie in (accept_encoding or '').split(','):
+        nom, _, params = partie.strip().partition(';')
+        nom = nom.strip().lower()
+        if not nom:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        poids[nom] = q
+    meilleur, meilleur_q = None, 0.0
+    for encodage in disponibles:
+        q = poids.get(encodage, poids.get('*', 0.0))
+        if q > meilleur_q:
+            meilleur, meilleur_q = encodage, q
+    return meilleur
+
+
+def compresser(donnees, encodage, niveau_gzip=6, niveau_brotli=4):
+    if encodage == 'br':
+        return brotli.compress(donnees, quality=niveau_brotli)
+    return gzip.compress(donnees, compresslevel=niveau_gzip, mtime=0)
+
+
+def installer_compression(app):
+    """Compresser les réponses éligibles (à installer avant les autres after_request: exécuté en dernier)."""
+
+    @app.after_request
+    def _compresser_reponse(resp):
+        config = app.config
+        if not config.get('COMPRESSION_ENABLED', True):
+            return resp
+        if (resp.direct_passthrough or resp.is_streamed or request.method == 'HEAD'
+                or not 200 <= resp.status_code < 300 or resp.status_code in (204, 206)
+                or 'Content-Encoding' in resp.headers or not est_compressible(resp.mimetype)):
+            return resp
+        donnees = resp.get_data()
+        if len(donnees) < int(config.get('COMPRESSION_MIN_OCTETS', 500)):
+            return resp
+
+        resp.vary.add('Accept-Encoding')
+        encodage = choisir_encodage(request.headers.get('Accept-Encoding'))
+        if encodage is None:
+            return resp
+        resp.set_data(compresser(
+            donnees, encodage,
+            niveau_gzip=int(config.get('COMPRESSION_NIVEAU_GZIP', 6)),
+            niveau_brotli=int(config.get('COMPRESSION_NIVEAU_BROTLI', 4)),
+        ))
+        resp.headers['Content-Encoding'] = encodage
+        etag, faible = resp.get_etag()
+        if etag:
+            resp.set_etag(f'{etag}-{encodage}', weak=faible)
+        return resp
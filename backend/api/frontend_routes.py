@@ -3,18 +3,72 @@ Routes pour servir l'interface web (frontend)
 À ajouter à app.py comme blueprint supplémentaire
 """
 
-from flask import Blueprint, render_template, send_from_directory, current_app, redirect
+from flask import Blueprint, render_template, send_from_directory, current_app, redirect, request
+from datetime import datetime
+import logging
+import mimetypes
 import os
 
+from api.assets import EXTENSIONS_COMPRESSIBLES, Assets
+from api.compression import choisir_encodage
+from api.routes import page_offres
+
+logger = logging.getLogger(__name__)
+
 # Chemins absolus vers le dossier frontend pour éviter les chemins relatifs cassés
 frontend_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'frontend'))
 static_folder = os.path.join(frontend_root, 'static')
 template_folder = os.path.join(frontend_root, 'templates')
 
-frontend_bp = Blueprint('frontend', __name__, 
-                       static_folder=static_folder,
+frontend_bp = Blueprint('frontend', __name__,
                        template_folder=template_folder)
 
+assets = Assets(static_folder)
+
+
+@frontend_bp.app_template_global('asset')
+def asset(chemin):
+    """URL empreintée d'un fichier statique (ex: asset('css/style.css'))"""
+    return assets.url(chemin)
+
+
+_MOIS = ('janvier', 'février', 'mars', 'avril', 'mai', 'juin', 'juillet',
+         'août', 'septembre', 'octobre', 'novembre', 'décembre')
+
+# Même liste et même ordre que detectLieuExecution (app.js)
+_VILLES = (
+    'abidjan', 'cocody', 'yopougon', 'plateau', 'treichville', 'marcory',
+    'yamoussoukro', 'bouaké', 'bouake', 'san pedro', 'san-pedro', 'korhogo',
+    'daloa', 'man', 'gagnoa', 'abengourou', 'odienné', 'odienne', 'bondoukou',
+    'dimbokro', 'agnoibilékrou', 'agnoibilekrou', 'agboville', 'grand-bassam', 'grand bassam',
+    'bouaflé', 'bouafle', 'divo', 'sassandra', 'anyama', 'bingerville', 'assinie',
+)
+
+
+@frontend_bp.app_template_filter('date_fr')
+def date_fr(valeur):
+    """Date ISO en toutes lettres, comme formatDate (app.js): '5 mars 2026' ou '5 mars 2026 à 14:30'"""
+    if not valeur:
+        return '-'
+    try:
+        date = datetime.fromisoformat(valeur) if isinstance(valeur, str) else valeur
+    except ValueError:
+        return '-'
+    texte = f'{date.day} {_MOIS[date.month - 1]} {date.year}'
+    if date.hour or date.minute:
+        texte += f' à {date:%H:%M}'
+    return texte
+
+
+@frontend_bp.app_template_filter('lieu_execution')
+def lieu_execution(offre):
+    """Lieu d'exécution déduit du titre et de la description, comme detectLieuExecution (app.js)"""
+    texte = ' '.join(t for t in (offre.get('titre'), offre.get('description')) if t).lower()
+    for ville in _VILLES:
+        if ville in texte:
+            return ' '.join(m[:1].upper() + m[1:] for m in ville.split(' ')) + ", Côte d'Ivoire"
+    return "Côte d'Ivoire"
+
 
 @frontend_bp.app_context_processor
 def inject_branding():
@@ -35,8 +89,14 @@ def accueil():
 
 @frontend_bp.route('/offres')
 def offres():
-    """Page de liste des offres"""
-    return render_template('offres.html')
+    """Page de liste des offres: première page rendue côté serveur, les suivantes chargées par le JS"""
+    try:
+        premiere_page = page_offres(1, 20)
+    except Exception as e:
+        # La page reste utilisable: le JS charge alors la première page via l'API
+        logger.warning(f"Rendu serveur de /offres impossible: {e}")
+        premiere_page = None
+    return render_template('offres.html', premiere_page=premiere_page)
 
 @frontend_bp.route('/offres/<int:offre_id>')
 def detail_offre(offre_id):
@@ -77,5 +137,32 @@ def debug_templates():
     templates = list(env.list_templates())
     return {'templates': templates}
 
-# Les fichiers statiques sont servis automatiquement par le blueprint via `static_folder`
-# (route '/static/<path:filename>' fournie par Flask/Blueprint)
+@frontend_bp.route('/static/<path:filename>')
+def static(filename):
+    """Fichiers statiques: URL empreintée (asset()) mise en cache un an, variante .br/.gz selon Accept-Encoding"""
+    chemin, empreinte = assets.resoudre(filename)
+    if assets.chemin_absolu(chemin) is None:
+        return {'erreur': 'Ressource non trouvée'}, 404
+    # Empreinte périmée (page en cache d'une version précédente): contenu actuel, sans cache long
+    immuable = empreinte is not None and empreinte == assets.empreinte(chemin)
+    max_age = int(current_app.config.get('STATIC_MAX_AGE', 31536000)) if immuable else 0
+
+    encodage = choisir_encodage(request.headers.get('Accept-Encoding'))
+    donnees = assets.variante(chemin, encodage) if encodage else None
+    if donnees is None:
+        resp = send_from_directory(static_folder, chemin, max_age=max_age)
+    else:
+        resp = current_app.response_class(donnees, mimetype=mimetypes.guess_type(chemin)[0] or 'application/octet-stream')
+        resp.headers['Content-Encoding'] = encodage
+        resp.set_etag(f'{assets.empreinte(chemin)}-{encodage}')
+        resp.cache_control.public = True
+        resp.cache_control.max_age = max_age
+        resp.make_conditional(request)
+    if os.path.splitext(chemin)[1].lower() in EXTENSIONS_COMPRESSIBLES:
+        resp.vary.add('Accept-Encoding')
+    if immuable:
+        resp.cache_control.public = True
+        resp.cache_control.immutable = True
+    else:
+        resp.cache_control.no_cache = True
+    return resp
@@ -0,0 +1,34 @@
+"""
+Sérialisation JSON des réponses
+Remplace le fournisseur JSON de Flask: clés non triées, UTF-8 sans échappement, et
+orjson (optionnel, nettement plus rapide sur les grandes listes d'offres) quand il
+est installé; à défaut, le module json standard avec les mêmes réglages.
+Les dates restent au format de Flask (RFC 822), orjson les passe à `default`.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+
+class FournisseurJSON(DefaultJSONProvider):
+    ensure_ascii = False
+    sort_keys = False
+
+    if orjson is not None:
+        _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+        def dumps(self, obj, **kwargs):
+            if kwargs.get('indent') or kwargs.get('sort_keys', self.sort_keys) or kwargs.get('cls'):
+                return super().dumps(obj, **kwargs)
+            return orjson.dumps(obj, default=kwargs.get('default', self.default), option=self._OPTIONS).decode('utf-8')
+
+        def response(self, *args, **kwargs):
+            if (self.compact is None and self._app.debug) or self.compact is False:
+                return super().response(*args, **kwargs)
+            obj = self._prepare_response_obj(args, kwargs)
+            contenu = orjson.dumps(obj, default=self.default, option=self._OPTIONS | orjson.OPT_APPEND_NEWLINE)
+            return self._app.response_class(contenu, mimetype=self.mimetype)
@@ -0,0 +1,219 @@
+"""
+Limitation de débit par client (compteurs à fenêtre glissante)
+Chaque clé (ex. 'login:<ip>') garde deux entiers: le compte de la fenêtre fixe courante
+et celui de la précédente, pondéré par la part de la fenêtre glissante qu'elle couvre
+encore. La mémoire par clé est constante, quel que soit le nombre de requêtes.
+
+Deux stockages interchangeables (méthode `autoriser`):
+- LimiteurSQLite: fichier SQLite partagé entre les workers gunicorn (défaut);
+- LimiteurMemoire: par process, LRU borné à RATE_LIMIT_MAX_CLES clés.
+Tout objet offrant `autoriser(cle, limite, fenetre)` peut être placé dans
+app.extensions['limiteur'].
+"""
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import wraps
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+
+from flask import current_app, request
+
+logger = logging.getLogger(__name__)
+
+
+def _decision(courant, precedent, limite, fenetre, ecoule):
+    """(autorisé, secondes d'attente) d'après les comptes des deux fenêtres fixes et le temps écoulé dans la courante."""
+    estime = precedent * (1 - ecoule / fenetre) + courant
+    if estime < limite:
+        return True, 0
+    if courant >= limite or precedent <= 0:
+        # La fenêtre courante suffit à dépasser la limite: attendre qu'elle devienne la précédente
+        return False, max(1, math.ceil(fenetre - ecoule))
+    # Instant où la part pondérée de la fenêtre précédente repasse sous la limite
+    fin = fenetre * (1 - (limite - courant) / precedent)
+    return False, max(1, math.ceil(fin - ecoule))
+
+
+def _decaler(index_stocke, courant, precedent, index):
+    """Comptes (courant, précédent) ramenés à la fenêtre fixe `index`."""
+    if index_stocke == index:
+        return courant, precedent
+    if index_stocke == index - 1:
+        return 0, courant
+    return 0, 0
+
+
+class LimiteurMemoire:
+    """Compteurs en mémoire du process, LRU borné à `max_cles` clés."""
+
+    def __init__(self, max_cles=10000):
+        self.max_cles = max_cles
+        self._cles = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def __len__(self):
+        return len(self._cles)
+
+    def autoriser(self, cle, limite, fenetre, maintenant=None):
+        maintenant = time.time() if maintenant is None else maintenant
+        index = int(maintenant // fenetre)
+        with self._verrou:
+            entree = self._cles.get(cle)
+            courant, precedent = _decaler(*entree, index) if entree else (0, 0)
+            autorise, attente = _decision(courant, precedent, limite, fenetre, maintenant - index * fenetre)
+            if autorise:
+                courant += 1
+            self._cles[cle] = (index, courant, precedent)
+            self._cles.move_to_end(cle)
+            while len(self._cles) > self.max_cles:
+                self._cles.popitem(last=False)
+        return autorise, attente
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS limites (
+    cle TEXT PRIMARY KEY,
+    fenetre INTEGER NOT NULL,
+    courant INTEGER NOT NULL,
+    precedent INTEGER NOT NULL,
+    expire REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_limites_expire ON limites (expire);
+"""
+
+
+class LimiteurSQLite:
+    """Compteurs dans un fichier SQLite partagé entre process (une ligne par clé, purgée à expiration)."""
+
+    def __init__(self, chemin, max_cles=10000, purge_toutes=500):
+        self.chemin = chemin
+        self.max_cles = max_cles
+        self.purge_toutes = purge_toutes
+        self._appels = 0
+        self._local = threading.local()
+        dossier = os.path.dirname(chemin)
+        if dossier:
+            os.makedirs(dossier, exist_ok=True)
+        with self._connexion() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connexion(self):
+        # Une connexion gardée par thread: fermer la dernière connexion d'une base WAL
+        # déclenche un checkpoint (≈ 2 ms), ce qui coûterait plus que la requête elle-même
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.chemin, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA busy_timeout=5000')
+            # Compteurs jetables: pas de fsync à chaque écriture (WAL reste cohérent)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        yield conn
+
+    def __len__(self):
+        with self._connexion() as conn:
+            return conn.execute('SELECT COUNT(*) FROM limites').fetchone()[0]
+
+    def autoriser(self, cle, limite, fenetre, maintenant=None):
+        maintenant = time.time() if maintenant is None else maintenant
+        index = int(maintenant // fenetre)
+        with self._connexion() as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                ligne = conn.execute(
+                    'SELECT fenetre, courant, precedent FROM limites WHERE cle = ?', (cle,)
+                ).fetchone()
+                courant, precedent = _decaler(*ligne, index) if ligne else (0, 0)
+                autorise, attente = _decision(courant, precedent, limite, fenetre, maintenant - index * fenetre)
+                if autorise:
+                    courant += 1
+                # Au-delà de deux fenêtres sans requête, la clé ne compte plus
+                conn.execute(
+                    'INSERT OR REPLACE INTO limites (cle, fenetre, courant, precedent, expire) VALUES (?, ?, ?, ?, ?)',
+                    (cle, index, courant, precedent, (index + 2) * fenetre),
+                )
+                self._appels += 1
+                if self._appels % self.purge_toutes == 0:
+                    self._purger(conn, maintenant)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        return autorise, attente
+
+    def _purger(self, conn, maintenant):
+        """Supprimer les clés expirées, puis les plus anciennes au-delà de max_cles."""
+        conn.execute('DELETE FROM limites WHERE expire < ?', (maintenant,))
+        surplus = conn.execute('SELECT COUNT(*) FROM limites').fetchone()[0] - self.max_cles
+        if surplus > 0:
+            conn.execute(
+                'DELETE FROM limites WHERE cle IN (SELECT cle FROM limites ORDER BY expire LIMIT ?)', (surplus,)
+            )
+
+
+def creer_limiteur(config):
+    """Limiteur décrit par la configuration (RATE_LIMIT_BACKEND: 'sqlite' ou 'memoire')."""
+    max_cles = int(config.get('RATE_LIMIT_MAX_CLES', 10000))
+    if (config.get('RATE_LIMIT_BACKEND') or 'sqlite').lower() == 'memoire':
+        return LimiteurMemoire(max_cles=max_cles)
+    return LimiteurSQLite(config['RATE_LIMIT_SQLITE_PATH'], max_cles=max_cles)
+
+
+_verrou_creation = threading.Lock()
+
+
+def obtenir_limiteur(app=None):
+    """Limiteur de l'application (créé au premier usage, partagé par les routes)."""
+    app = app or current_app._get_current_object()
+    limiteur = app.extensions.get('limiteur')
+    if limiteur is None:
+        with _verrou_creation:
+            limiteur = app.extensions.get('limiteur')
+            if limiteur is None:
+                limiteur = app.extensions['limiteur'] = creer_limiteur(app.config)
+    return limiteur
+
+
+def ip_client():
+    # Adresse de la connexion; derrière un reverse proxy, ProxyFix (PROXY_FIX_HOPS dans create_app)
+    # la remplace par celle ajoutée par le proxy. X-Forwarded-For, choisi par le client, n'est pas lu ici.
+    return request.remote_addr or 'unknown'
+
+
+def verifier_limite(nom, cle_max, cle_fenetre, message='Trop de requêtes, réessayez plus tard'):
+    """Réponse 429 si le client a dépassé la limite `nom` (paramètres lus dans la config), sinon None.
+
+    Une limite à 0 désactive le contrôle. Si le stockage est indisponible, la requête passe.
+    """
+    limite = int(current_app.config.get(cle_max, 0) or 0)
+    fenetre = int(current_app.config.get(cle_fenetre, 60) or 60)
+    if limite <= 0:
+        return None
+    try:
+        autorise, attente = obtenir_limiteur().autoriser(f'{nom}:{ip_client()}', limite, fenetre)
+    except Exception as e:
+        logger.warning(f"Limiteur indisponible ({nom}): {e}")
+        return None
+    if autorise:
+        return None
+    logger.warning(f"Limite '{nom}' atteinte pour {ip_client()}")
+    return {'erreur': message}, 429, {'Retry-After': str(attente)}
+
+
+def limiter(nom, cle_max, cle_fenetre):
+    """Décorateur: limiter par IP le débit d'une route coûteuse (ex: @limiter('recherche', 'SEARCH_RATE_LIMIT_MAX', ...))"""
+    def decorateur(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            refus = verifier_limite(nom, cle_max, cle_fenetre)
+            if refus is not None:
+                return refus
+            return f(*args, **kwargs)
+        return wrapper
+    return decorateur
@@ -65,6 +65,13 @@ def _basic_auth_payload():
         'auth': 'basic',
     }
 
+def payload_authentification():
+    """Payload de l'utilisateur authentifié (Bearer ou Basic), ou None"""
+    auth_header = request.headers.get('Authorization', '')
+    if auth_header.startswith('Bearer '):
+        return _load_token(auth_header.replace('Bearer ', ''))
+    return _basic_auth_payload()
+
 def require_auth(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -86,13 +93,7 @@ def require_auth(f):
 def require_admin(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        auth_header = request.headers.get('Authorization', '')
-        payload = None
-        if auth_header.startswith('Bearer '):
-            token = auth_header.replace('Bearer ', '')
-            payload = _load_token(token)
-        else:
-            payload = _basic_auth_payload()
+        payload = payload_authentification()
 
         if not payload:
             logger.warning(f"ADMIN_DENY unauthenticated {request.method} {request.path}")
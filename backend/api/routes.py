@@ -3,20 +3,27 @@ Routes API principales
 Endpoints pour accéder aux offres, mots-clés, et gérer le scraping
 """
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, Response, request, jsonify, current_app, send_from_directory, stream_with_context
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 import threading
-from urllib.parse import urlparse
-import hashlib
-
-from database.models import db, Offre, MotsCles, Source, LogScraping
-from database.database import get_default_sources_data
+import time
+
+from database.models import (
+    db, Offre, OffreArchive, MotsCles, Source, LogScraping, LogScrapingJournalier,
+    RechercheSauvegardee, CorrespondanceRecherche, AbonnementNotification, NotificationSortante,
+)
+from database.bulk import upsert_en_masse
+from database.retention_logs import agreger_periode
+from database.export_offres import FORMATS, conditions_liste, exporter, filtres_offres, nom_fichier
+from database.maintenance import condition_motifs, desactiver_ids, desactiver_offres, flux_offres
+from database.database import get_default_sources_data, get_sources_liens_data, synchroniser_sources_liens
 from scraping.keyword_manager import KeywordManager
 from scraping.scheduler import scheduler
-from scraping.scrapers.structure_links_scraper import StructuresLinksScraper
-from scraping.ai_filter_local import LocalAIFilter
+import notifications
+from scraping.sampling_profiler import lister_profils
 from api.middleware import require_auth, require_admin, log_request
+from api.limiteur import limiter
 
 api_bp = Blueprint('api', __name__)
 logger = logging.getLogger(__name__)
@@ -69,7 +76,15 @@ def lister_offres():
     - partenaire: filtrer par partenaire
     - type_offre: filtrer par type
     - mot_cle: filtrer par mot-clé
+    - include_archived: inclure les offres archivées (offres_archive, champ 'archivee')
+    - grouper: une ligne par groupe de quasi-doublons (défaut: 1; champ 'doublons' = autres offres du groupe)
+    - fields: champs à renvoyer (ex. titre,source,date_cloturation, ou 'liste'); seules ces colonnes sont lues
+    - format: 'colonnes' pour une représentation compacte (noms des champs une fois, offres en tableaux)
     """
+    try:
+        champs = _champs_demandes()
+    except ValueError as e:
+        return {'erreur': str(e)}, 400
     page = request.args.get('page', 1, type=int)
     par_page = request.args.get('par_page', 20, type=int)
     source = request.args.get('source')
@@ -77,39 +92,151 @@ def lister_offres():
     type_offre = request.args.get('type_offre')
     mot_cle = request.args.get('mot_cle')
     include_expired = request.args.get('include_expired', '0') in ('1', 'true', 'True')
-    
-    # Construire la requête
-    query = Offre.query.filter_by(actif=True)
-
-    if not include_expired:
-        now = datetime.utcnow()
-        query = query.filter(
-            (Offre.date_cloturation >= now)
-        )
-    
-    if source:
-        query = query.filter_by(source=source)
-    if partenaire:
-        query = query.filter_by(partenaire=partenaire)
-    if type_offre:
-        query = query.filter_by(type_offre=type_offre)
-    if mot_cle:
-        query = query.filter(Offre.mots_cles.contains(mot_cle))
-    
-    # Paginer
-    paginate = query.order_by(Offre.date_scrape.desc()).paginate(
-        page=page,
-        per_page=par_page,
-        error_out=False
-    )
-    
-    return jsonify({
+    include_archived = request.args.get('include_archived', '0') in ('1', 'true', 'True')
+    grouper = request.args.get('grouper', '1') not in ('0', 'false', 'False')
+
+    if include_archived:
+        query = Offre.query.filter(*conditions_liste(
+            source, partenaire, type_offre, mot_cle, include_expired=include_expired, grouper=grouper
+        ))
+        return _lister_offres_avec_archive(query, page, par_page, source, partenaire, type_offre, mot_cle, champs)
+
+    return jsonify(_format_liste(page_offres(
+        page, par_page, source, partenaire, type_offre, mot_cle,
+        include_expired=include_expired, grouper=grouper, champs=champs
+    ))), 200
+
+
+def page_offres(page=1, par_page=20, source=None, partenaire=None, type_offre=None, mot_cle=None,
+                include_expired=False, grouper=True, champs=None):
+    """Une page de la liste des offres (corps de GET /api/offres), aussi rendue côté serveur par /offres"""
+    query = Offre.query.filter(*conditions_liste(
+        source, partenaire, type_offre, mot_cle, include_expired=include_expired, grouper=grouper
+    ))
+    paginate, offres = _paginer_offres(query.order_by(Offre.date_scrape.desc()), page, par_page, champs)
+    return {
         'page': page,
         'par_page': par_page,
         'total': paginate.total,
         'pages': paginate.pages,
-        'offres': [o.to_dict() for o in paginate.items]
-    }), 200
+        'offres': _avec_doublons(offres)
+    }
+
+# Champs de `?fields=`: ceux de Offre.to_dict, plus 'resume' (début de la description, tronqué en SQL)
+_CHAMPS_OFFRE = (
+    'id', 'titre', 'description', 'resume', 'source', 'url', 'date_publication', 'date_cloturation',
+    'type_offre', 'partenaire', 'mots_cles', 'date_scrape', 'groupe_id',
+)
+_VUES_OFFRE = {
+    'liste': ('id', 'titre', 'source', 'partenaire', 'type_offre', 'date_publication', 'date_cloturation', 'url', 'groupe_id'),
+}
+_LONGUEUR_RESUME = 240
+
+def _champs_demandes():
+    """Champs de `?fields=` (noms séparés par des virgules, ou une vue de _VUES_OFFRE); None = tous.
+
+    'id' est toujours inclus. ValueError si un champ est inconnu.
+    """
+    brut = (request.args.get('fields') or '').strip()
+    if not brut:
+        return None
+    if brut in _VUES_OFFRE:
+        return _VUES_OFFRE[brut]
+    champs = [c.strip() for c in brut.split(',') if c.strip()]
+    inconnus = [c for c in champs if c not in _CHAMPS_OFFRE]
+    if inconnus:
+        raise ValueError(f"Champs inconnus: {', '.join(inconnus)} (disponibles: {', '.join(_CHAMPS_OFFRE)})")
+    return ('id',) + tuple(c for c in dict.fromkeys(champs) if c != 'id')
+
+def _colonne_offre(modele, champ):
+    if champ == 'resume':
+        return db.func.substr(modele.description, 1, _LONGUEUR_RESUME).label('resume')
+    return getattr(modele, champ)
+
+def _dict_projete(champs, ligne):
+    return {c: (v.isoformat() if isinstance(v, datetime) else v) for c, v in zip(champs, ligne)}
+
+def _paginer_offres(query, page, par_page, champs):
+    """(pagination, offres en dicts); avec `champs`, seules ces colonnes sont lues (lignes, pas d'objets ORM)"""
+    if champs is None:
+        paginate = query.paginate(page=page, per_page=par_page, error_out=False)
+        return paginate, [o.to_dict() for o in paginate.items]
+    paginate = query.with_entities(*[_colonne_offre(Offre, c) for c in champs]).paginate(
+        page=page, per_page=par_page, error_out=False
+    )
+    return paginate, [_dict_projete(champs, ligne) for ligne in paginate.items]
+
+def _format_liste(corps):
+    """`?format=colonnes`: 'colonnes' (noms des champs) et 'offres' en tableaux de valeurs"""
+    if request.args.get('format') != 'colonnes':
+        return corps
+    colonnes = list(dict.fromkeys(k for o in corps['offres'] for k in o))
+    corps['colonnes'] = colonnes
+    corps['offres'] = [[o.get(c) for c in colonnes] for o in corps['offres']]
+    return corps
+
+def _avec_doublons(offres):
+    """Ajouter à chaque offre (non archivée) le nombre d'autres offres actives de son groupe de quasi-doublons"""
+    ids = [o['id'] for o in offres if not o.get('archivee')]
+    comptes = {}
+    if ids:
+        comptes = dict(db.session.execute(
+            db.select(Offre.groupe_id, db.func.count())
+            .where(Offre.groupe_id.in_(ids), Offre.actif == True)
+            .group_by(Offre.groupe_id)
+        ).all())
+    for o in offres:
+        if not o.get('archivee'):
+            o['doublons'] = comptes.get(o['id'], 0)
+    return offres
+
+def _lister_offres_avec_archive(query, page, par_page, source, partenaire, type_offre, mot_cle, champs=None):
+    """Pagination sur l'union des offres visibles et des offres archivées (date_scrape décroissante).
+
+    L'union ne porte que sur (id, date_scrape, archivee); les lignes de la page sont
+    ensuite chargées par id dans chaque table (`champs` appliqués après chargement).
+    """
+    page = max(page, 1)
+    actives = query.with_entities(
+        Offre.id.label('id'), Offre.date_scrape.label('date_scrape'), db.literal(False).label('archivee')
+    ).statement
+    archivees = db.select(
+        OffreArchive.id, OffreArchive.date_scrape, db.literal(True)
+    ).where(*filtres_offres(OffreArchive, source, partenaire, type_offre, mot_cle))
+    union = db.union_all(actives, archivees).subquery()
+
+    total = db.session.scalar(db.select(db.func.count()).select_from(union))
+    lignes = db.session.execute(
+        db.select(union.c.id, union.c.archivee)
+        .order_by(union.c.date_scrape.desc(), union.c.archivee, union.c.id.desc())
+        .limit(par_page).offset((page - 1) * par_page)
+    ).all()
+
+    ids = {False: [i for i, a in lignes if not a], True: [i for i, a in lignes if a]}
+    objets = {}
+    for archivee, modele in ((False, Offre), (True, OffreArchive)):
+        if ids[archivee]:
+            for o in modele.query.filter(modele.id.in_(ids[archivee])):
+                objets[(archivee, o.id)] = o
+    offres = []
+    for i, a in lignes:
+        o = objets.get((bool(a), i))
+        if o is None:
+            continue
+        d = o.to_dict()
+        if champs is not None:
+            d['resume'] = (d.get('description') or '')[:_LONGUEUR_RESUME] or None
+            d = {c: d.get(c) for c in champs + ('archivee',) if c in d}
+        d.setdefault('archivee', False)
+        offres.append(d)
+
+    return jsonify(_format_liste({
+        'page': page,
+        'par_page': par_page,
+        'total': total,
+        'pages': -(-total // par_page) if par_page > 0 else 0,
+        'offres': _avec_doublons(offres)
+    })), 200
 
 @api_bp.route('/offres/<int:offre_id>', methods=['GET'])
 def obtenir_offre(offre_id):
@@ -118,6 +245,7 @@ def obtenir_offre(offre_id):
     return jsonify({'offre': offre.to_dict()}), 200
 
 @api_bp.route('/offres/rechercher', methods=['GET'])
+@limiter('recherche', 'SEARCH_RATE_LIMIT_MAX', 'SEARCH_RATE_LIMIT_WINDOW_SECONDS')
 def rechercher_offres():
     """
     Recherche avancée avec texte complet
@@ -125,7 +253,12 @@ def rechercher_offres():
     Paramètres:
     - q: texte à rechercher
     - page: numéro de page
+    - fields, format: comme /offres
     """
+    try:
+        champs = _champs_demandes()
+    except ValueError as e:
+        return {'erreur': str(e)}, 400
     q = request.args.get('q', '')
     page = request.args.get('page', 1, type=int)
     par_page = request.args.get('par_page', 20, type=int)
@@ -142,20 +275,55 @@ def rechercher_offres():
             (Offre.date_cloturation >= now)
         )
 
-    resultats = query.filter(
+    resultats, offres = _paginer_offres(query.filter(
         (Offre.titre.ilike(query_text)) |
         (Offre.description.ilike(query_text)) |
         (Offre.mots_cles.ilike(query_text))
-    ).order_by(Offre.date_scrape.desc()).paginate(page=page, per_page=par_page, error_out=False)
+    ).order_by(Offre.date_scrape.desc()), page, par_page, champs)
     
-    return jsonify({
+    return jsonify(_format_liste({
         'query': q,
         'page': page,
         'par_page': par_page,
         'total': resultats.total,
         'pages': resultats.pages,
-        'offres': [o.to_dict() for o in resultats.items]
-    }), 200
+        'offres': offres
+    })), 200
+
+@api_bp.route('/offres/export', methods=['GET'])
+@require_auth
+def exporter_offres():
+    """
+    Exporter en flux les offres filtrées (mêmes filtres que /offres, sans pagination)
+
+    Paramètres query:
+    - format: csv (défaut), ndjson ou parquet (pyarrow requis)
+    - gzip: compresser à la volée (défaut: 0)
+    - source, partenaire, type_offre, mot_cle, include_expired, grouper: comme /offres
+    """
+    format_export = (request.args.get('format') or 'csv').lower()
+    compresser = request.args.get('gzip', '0') in ('1', 'true', 'True')
+    conditions = conditions_liste(
+        request.args.get('source'),
+        request.args.get('partenaire'),
+        request.args.get('type_offre'),
+        request.args.get('mot_cle'),
+        include_expired=request.args.get('include_expired', '0') in ('1', 'true', 'True'),
+        grouper=request.args.get('grouper', '1') not in ('0', 'false', 'False'),
+    )
+    try:
+        morceaux = exporter(format_export, conditions, compresser=compresser)
+    except (ValueError, RuntimeError) as e:
+        return {'erreur': str(e)}, 400
+
+    return Response(
+        stream_with_context(morceaux),
+        mimetype='application/gzip' if compresser else FORMATS[format_export]['mimetype'],
+        headers={
+            'Content-Disposition': f'attachment; filename="{nom_fichier(format_export, compresser)}"',
+            'X-Accel-Buffering': 'no',
+        },
+    )
 
 @api_bp.route('/offres/<int:offre_id>', methods=['DELETE'])
 @require_admin
@@ -166,6 +334,217 @@ def supprimer_offre(offre_id):
     db.session.commit()
     return {'message': 'Offre supprimée'}, 200
 
+# ==================== RECHERCHES SAUVEGARDÉES ====================
+
+_CHAMPS_RECHERCHE = ('texte', 'source', 'partenaire', 'type_offre', 'mot_cle')
+
+def _recherche_utilisateur(recherche_id):
+    return RechercheSauvegardee.query.filter_by(
+        id=recherche_id, utilisateur_email=request.user_email, actif=True
+    ).first()
+
+@api_bp.route('/recherches', methods=['GET'])
+@require_auth
+def lister_recherches():
+    """Recherches sauvegardées de l'utilisateur, avec le nombre de nouveautés depuis la dernière visite"""
+    recherches = RechercheSauvegardee.query.filter_by(
+        utilisateur_email=request.user_email, actif=True
+    ).order_by(RechercheSauvegardee.id).all()
+    nouvelles = dict(db.session.execute(
+        db.select(CorrespondanceRecherche.recherche_id, db.func.count())
+        .join(RechercheSauvegardee, RechercheSauvegardee.id == CorrespondanceRecherche.recherche_id)
+        .where(
+            RechercheSauvegardee.utilisateur_email == request.user_email,
+            RechercheSauvegardee.actif == True,
+            CorrespondanceRecherche.date_correspondance > RechercheSauvegardee.derniere_visite,
+        )
+        .group_by(CorrespondanceRecherche.recherche_id)
+    ).all())
+    return jsonify({
+        'recherches': [dict(r.to_dict(), nouvelles=nouvelles.get(r.id, 0)) for r in recherches]
+    }), 200
+
+@api_bp.route('/recherches', methods=['POST'])
+@require_auth
+def creer_recherche():
+    """Sauvegarder une recherche.
+
+    Body JSON: nom, texte (comme `q` de /offres/rechercher), source, partenaire, type_offre, mot_cle.
+    Les offres insérées ou mises à jour ensuite par le scraping alimentent ses nouveautés.
+    """
+    data = request.get_json(silent=True) or {}
+    valeurs = {c: (str(data.get(c) or '').strip() or None) for c in _CHAMPS_RECHERCHE}
+    if not any(valeurs.values()):
+        return {'erreur': 'Texte ou filtre requis (texte, source, partenaire, type_offre, mot_cle)'}, 400
+    if valeurs['texte'] and len(valeurs['texte']) < 2:
+        return {'erreur': 'Minimum 2 caractères requis'}, 400
+
+    recherche = RechercheSauvegardee(
+        utilisateur_email=request.user_email,
+        nom=(str(data.get('nom') or '').strip() or valeurs['texte'] or None),
+        **valeurs,
+    )
+    db.session.add(recherche)
+    db.session.commit()
+    return jsonify({'message': 'Recherche sauvegardée', 'recherche': recherche.to_dict()}), 201
+
+@api_bp.route('/recherches/<int:recherche_id>', methods=['DELETE'])
+@require_auth
+def supprimer_recherche(recherche_id):
+    """Supprimer une recherche sauvegardée (et ses correspondances)"""
+    recherche = _recherche_utilisateur(recherche_id)
+    if not recherche:
+        return {'erreur': 'Recherche non trouvée'}, 404
+    CorrespondanceRecherche.query.filter_by(recherche_id=recherche.id).delete(synchronize_session=False)
+    db.session.delete(recherche)
+    db.session.commit()
+    return {'message': 'Recherche supprimée'}, 200
+
+@api_bp.route('/recherches/nouveautes', methods=['GET'])
+@require_auth
+def nouveautes_recherches():
+    """Fil des offres ayant correspondu aux recherches de l'utilisateur depuis sa dernière visite
+
+    Paramètres query:
+    - recherche_id: limiter à une recherche
+    - limite: nombre maximal d'offres (défaut: 200, max: 1000)
+    - marquer_vu: enregistrer la visite (défaut: 1)
+    """
+    recherche_id = request.args.get('recherche_id', type=int)
+    limite = min(max(request.args.get('limite', 200, type=int) or 200, 1), 1000)
+    marquer_vu = request.args.get('marquer_vu', '1') not in ('0', 'false', 'False')
+
+    recherches = RechercheSauvegardee.query.filter_by(utilisateur_email=request.user_email, actif=True)
+    if recherche_id is not None:
+        recherches = recherches.filter_by(id=recherche_id)
+    recherches = recherches.all()
+    if recherche_id is not None and not recherches:
+        return {'erreur': 'Recherche non trouvée'}, 404
+
+    lignes = []
+    if recherches:
+        # Correspondances postérieures à la dernière visite de chaque recherche (index recherche_id, date)
+        lignes = db.session.execute(
+            db.select(CorrespondanceRecherche.offre_id, CorrespondanceRecherche.recherche_id,
+                      CorrespondanceRecherche.date_correspondance)
+            .where(db.or_(*[
+                db.and_(CorrespondanceRecherche.recherche_id == r.id,
+                        CorrespondanceRecherche.date_correspondance > r.derniere_visite)
+                for r in recherches
+            ]))
+            .order_by(CorrespondanceRecherche.date_correspondance.desc(), CorrespondanceRecherche.offre_id.desc())
+        ).all()
+
+    par_offre = {}
+    for offre_id, rid, date in lignes:
+        par_offre.setdefault(offre_id, {'recherches': [], 'date': date})['recherches'].append(rid)
+    ids = list(par_offre)[:limite]
+    offres = {o.id: o for o in Offre.query.filter(Offre.id.in_(ids), Offre.actif == True)} if ids else {}
+    resultat = []
+    for offre_id in ids:
+        o = offres.get(offre_id)
+        if o is None:
+            continue
+        d = o.to_dict()
+        d['recherches'] = sorted(par_offre[offre_id]['recherches'])
+        d['date_correspondance'] = par_offre[offre_id]['date'].isoformat()
+        resultat.append(d)
+
+    if marquer_vu and recherches:
+        # date_modification inchangée: l'index de percolation n'a pas à être reconstruit
+        db.session.execute(
+            db.update(RechercheSauvegardee)
+            .where(RechercheSauvegardee.id.in_([r.id for r in recherches]))
+            .values(derniere_visite=datetime.utcnow(), date_modification=RechercheSauvegardee.date_modification)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+    return jsonify({
+        'total': len(par_offre),
+        'offres': resultat,
+    }), 200
+
+# ==================== NOTIFICATIONS ====================
+
+@api_bp.route('/notifications/abonnements', methods=['GET'])
+@require_auth
+def lister_abonnements():
+    """Canaux de notification de l'utilisateur"""
+    abonnements = AbonnementNotification.query.filter_by(
+        utilisateur_email=request.user_email, actif=True
+    ).order_by(AbonnementNotification.id).all()
+    return jsonify({'abonnements': [a.to_dict() for a in abonnements]}), 200
+
+@api_bp.route('/notifications/abonnements', methods=['POST'])
+@require_auth
+def creer_abonnement():
+    """S'abonner aux résumés des nouvelles correspondances de ses recherches.
+
+    Body JSON: canal ('email' ou 'webhook'), adresse (e-mail, ou URL http(s) du webhook,
+    hôte public ou listé dans WEBHOOK_HOTES_AUTORISES; défaut pour 'email': l'e-mail de l'utilisateur).
+    """
+    data = request.get_json(silent=True) or {}
+    canal = (data.get('canal') or 'email').strip().lower()
+    adresse = (data.get('adresse') or '').strip()
+    if canal not in notifications.CANAUX:
+        return {'erreur': f"Canal invalide (valeurs: {', '.join(notifications.CANAUX)})"}, 400
+    if canal == 'email':
+        adresse = adresse or request.user_email or ''
+        if '@' not in adresse:
+            return {'erreur': 'Adresse e-mail invalide'}, 400
+    else:
+        erreur = notifications.verifier_webhook(adresse, current_app.config.get('WEBHOOK_HOTES_AUTORISES'))
+        if erreur:
+            return {'erreur': erreur}, 400
+
+    abonnement = AbonnementNotification(
+        utilisateur_email=request.user_email, canal=canal, adresse=adresse[:500]
+    )
+    db.session.add(abonnement)
+    db.session.commit()
+    return jsonify({'message': 'Abonnement créé', 'abonnement': abonnement.to_dict()}), 201
+
+@api_bp.route('/notifications/abonnements/<int:abonnement_id>', methods=['DELETE'])
+@require_auth
+def supprimer_abonnement(abonnement_id):
+    """Supprimer un abonnement"""
+    abonnement = AbonnementNotification.query.filter_by(
+        id=abonnement_id, utilisateur_email=request.user_email, actif=True
+    ).first()
+    if not abonnement:
+        return {'erreur': 'Abonnement non trouvé'}, 404
+    abonnement.actif = False
+    db.session.commit()
+    return {'message': 'Abonnement supprimé'}, 200
+
+@api_bp.route('/admin/notifications', methods=['GET'])
+@require_admin
+def lister_notifications_sortantes():
+    """Boîte d'envoi: nombre de notifications par statut et dernières notifications (filtre `statut`)"""
+    statut = request.args.get('statut')
+    query = NotificationSortante.query
+    if statut:
+        query = query.filter_by(statut=statut)
+    par_statut = dict(db.session.execute(
+        db.select(NotificationSortante.statut, db.func.count()).group_by(NotificationSortante.statut)
+    ).all())
+    return jsonify({
+        'par_statut': par_statut,
+        'notifications': [n.to_dict() for n in query.order_by(NotificationSortante.id.desc()).limit(100)],
+    }), 200
+
+@api_bp.route('/admin/notifications/traiter', methods=['POST'])
+@require_admin
+def traiter_notifications():
+    """Générer et livrer les notifications maintenant"""
+    res = scheduler.traiter_notifications()
+    if res.get('error'):
+        return {'erreur': res['error']}, 500
+    if res.get('deja_en_cours'):
+        return {'erreur': 'Traitement des notifications déjà en cours'}, 409
+    return jsonify(res), 200
+
 # ==================== MOTS-CLÉS ====================
 
 @api_bp.route('/mots-cles', methods=['GET'])
@@ -236,33 +615,19 @@ def importer_mots_cles():
     if not items:
         return {'erreur': 'Aucun mot-clé fourni (texte ou mots)'}, 400
 
-    created = 0
-    reactivated = 0
-    skipped = 0
-
+    lignes = []
+    vides = 0
     for raw in items:
         mot_n = KeywordManager.normaliser_mot(raw)
         if not mot_n:
-            skipped += 1
+            vides += 1
             continue
+        lignes.append({'mot': mot_n, 'categorie': categorie, 'actif': True})
 
-        existing = MotsCles.query.filter_by(mot=mot_n).first()
-        if existing:
-            changed = False
-            if existing.actif is not True:
-                existing.actif = True
-                reactivated += 1
-                changed = True
-            if categorie and (existing.categorie or '') != categorie:
-                existing.categorie = categorie
-                changed = True
-            if changed:
-                continue
-            skipped += 1
-            continue
-
-        db.session.add(MotsCles(mot=mot_n, categorie=categorie, actif=True))
-        created += 1
+    compteurs = upsert_en_masse(MotsCles, 'mot', lignes)
+    created = compteurs['created']
+    reactivated = compteurs['activated']
+    skipped = vides + compteurs['unchanged'] + compteurs['duplicates']
 
     db.session.commit()
     return jsonify({
@@ -301,33 +666,13 @@ def lister_sources():
 @require_admin
 def sync_sources_default():
     """Synchroniser/ajouter les sources par défaut dans une base déjà initialisée."""
-    created = 0
-    updated = 0
-    activated = 0
-
-    for nom, url_base, type_scraper in (get_default_sources_data() or []):
-        s = Source.query.filter_by(nom=nom).first()
-        if not s:
-            s = Source(nom=nom, url_base=url_base, type_scraper=type_scraper, actif=True)
-            db.session.add(s)
-            created += 1
-            continue
-
-        # upsert champs
-        changed = False
-        if (s.url_base or '') != (url_base or ''):
-            s.url_base = url_base
-            changed = True
-        if (s.type_scraper or '') != (type_scraper or ''):
-            s.type_scraper = type_scraper
-            changed = True
-        if s.actif is not True:
-            s.actif = True
-            activated += 1
-            changed = True
-
-        if changed:
-            updated += 1
+    compteurs = upsert_en_masse(Source, 'nom', [
+        {'nom': nom, 'url_base': url_base, 'type_scraper': type_scraper, 'actif': True}
+        for nom, url_base, type_scraper in (get_default_sources_data() or [])
+    ])
+    created = compteurs['created']
+    updated = compteurs['updated']
+    activated = compteurs['activated']
 
     db.session.commit()
     return jsonify({
@@ -346,82 +691,12 @@ def sync_sources_links():
 
     Objectif: que chaque lien à scraper apparaisse dans la table `sources` et soit actif.
     """
-    created = 0
-    updated = 0
-    activated = 0
-    ignored = 0
-
-    def _is_http_url(u: str) -> bool:
-        if not u:
-            return False
-        try:
-            p = urlparse(u)
-            return p.scheme in ('http', 'https') and bool(p.netloc)
-        except Exception:
-            return False
-
-    def _make_source_name(structure: str, url: str) -> str:
-        structure = (structure or '').strip() or 'Source'
-        url = (url or '').strip()
-        try:
-            host = (urlparse(url).netloc or '').lower()
-        except Exception:
-            host = ''
-        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]
-        base = f"{structure} | {host} | {digest}" if host else f"{structure} | {digest}"
-        return base[:100]
-
-    urls = []
-    acteurs = current_app.config.get('TABLEAU_VEILLE_ACTEURS', []) or []
-    for a in acteurs:
-        structure = (a or {}).get('structure')
-        lien = (a or {}).get('lien')
-        if structure and lien:
-            urls.append((structure, lien))
-
-    targets = current_app.config.get('STRUCTURES_SCRAPING_TARGETS', []) or []
-    for t in targets:
-        structure = (t or {}).get('structure') or (t or {}).get('nom')
-        for u in ((t or {}).get('urls_a_scraper') or []):
-            if structure and u:
-                urls.append((structure, u))
-
-    # dédoublonner
-    seen = set()
-    dedup = []
-    for structure, u in urls:
-        key = (structure or '', (u or '').strip())
-        if key in seen:
-            continue
-        seen.add(key)
-        dedup.append((structure, (u or '').strip()))
-
-    for structure, u in dedup:
-        if not _is_http_url(u):
-            ignored += 1
-            continue
-
-        nom = _make_source_name(structure, u)
-        s = Source.query.filter_by(nom=nom).first()
-        if not s:
-            s = Source(nom=nom, url_base=u, type_scraper='structures', actif=True)
-            db.session.add(s)
-            created += 1
-            continue
-
-        changed = False
-        if (s.url_base or '') != (u or ''):
-            s.url_base = u
-            changed = True
-        if (s.type_scraper or '') != 'structures':
-            s.type_scraper = 'structures'
-            changed = True
-        if s.actif is not True:
-            s.actif = True
-            activated += 1
-            changed = True
-        if changed:
-            updated += 1
+    dedup = get_sources_liens_data(current_app.config)
+    compteurs = synchroniser_sources_liens(dedup)
+    created = compteurs['created']
+    updated = compteurs['updated']
+    activated = compteurs['activated']
+    ignored = compteurs['ignored']
 
     db.session.commit()
     return jsonify({
@@ -540,21 +815,67 @@ def executer_tous_scrapers_status():
     return {'job': _SCRAPE_ALL_JOB}, 200
 
 
-@api_bp.route('/ai/status', methods=['GET'])
-def ai_status():
-    """Statut IA locale (Ollama) pour l'interface (sans auth)."""
-    ai = LocalAIFilter()
-    available = ai.is_available()
+@api_bp.route('/admin/profilage', methods=['GET'])
+@require_admin
+def obtenir_profilage():
+    """Cibles du profileur par échantillonnage et profils disponibles."""
+    return {
+        'jobs': sorted(scheduler.profilage['jobs']),
+        'sources': sorted(scheduler.profilage['sources']),
+        'profils': lister_profils(current_app.config.get('PROFILER_DIR')),
+    }, 200
+
+
+@api_bp.route('/admin/profilage', methods=['POST'])
+@require_admin
+def configurer_profilage():
+    """Activer/désactiver le profilage d'un job ou d'une source.
+
+    Corps: {"cible": "job" | "source", "nom": "...", "actif": true}
+    """
+    data = request.get_json(silent=True) or {}
+    cible = (data.get('cible') or '').strip().lower()
+    nom = str(data.get('nom') or '').strip()
+    if cible not in ('job', 'source') or not nom:
+        return {'erreur': "Paramètres 'cible' (job|source) et 'nom' requis"}, 400
+
+    cibles = scheduler.profilage['jobs' if cible == 'job' else 'sources']
+    if data.get('actif', True):
+        cibles.add(nom)
+    else:
+        cibles.discard(nom)
     return {
-        'enabled': bool(ai.enabled),
-        'available': bool(available),
-        'model': ai.model,
-        'ollama_url': ai.ollama_url,
+        'message': 'Profilage mis à jour',
+        'jobs': sorted(scheduler.profilage['jobs']),
+        'sources': sorted(scheduler.profilage['sources']),
     }, 200
 
 
+@api_bp.route('/admin/profilage/<path:fichier>', methods=['GET'])
+@require_admin
+def telecharger_profil(fichier):
+    """Télécharger un profil (format collapsed, une pile par ligne)."""
+    dossier = current_app.config.get('PROFILER_DIR')
+    noms = {p['fichier'] for p in lister_profils(dossier)}
+    if fichier not in noms:
+        return {'erreur': 'Profil introuvable'}, 404
+    return send_from_directory(dossier, fichier, mimetype='text/plain')
+
+
+@api_bp.route('/ai/status', methods=['GET'])
+def ai_status():
+    """Statut IA locale (Ollama) pour l'interface (sans auth), mis en cache AI_STATUS_CACHE_SECONDES."""
+    from scraping.ai_filter_local import statut_ia
+    return statut_ia(ttl=current_app.config.get('AI_STATUS_CACHE_SECONDES', 60)), 200
+
+
+def _compter_offres_actives(condition):
+    return db.session.scalar(db.select(db.func.count(Offre.id)).where(Offre.actif == True, condition))
+
+
 @api_bp.route('/admin/nettoyer-offres-bruit', methods=['POST'])
 @require_admin
+@limiter('admin-nettoyage', 'ADMIN_RATE_LIMIT_MAX', 'ADMIN_RATE_LIMIT_WINDOW_SECONDS')
 def nettoyer_offres_bruit():
     """Désactiver (soft delete) des offres de bruit déjà enregistrées."""
     data = request.get_json(silent=True) or {}
@@ -572,43 +893,38 @@ def nettoyer_offres_bruit():
             '/jobs', '/media', '/events'
         ]
 
-    q = Offre.query.filter(Offre.actif == True, Offre.source.in_(sources))
-    candidates = q.all()
-
-    ids_to_disable = []
-    for o in candidates:
-        url = (o.url or '').lower()
-        title = (o.titre or '').lower()
-        desc = (o.description or '').lower()
-        hay = f"{url} {title} {desc}"
-        if any(p in hay for p in patterns):
-            ids_to_disable.append(o.id)
+    # Prédicat évalué par la base: aucune description chargée en Python
+    perimetre = Offre.source.in_(sources)
+    bruit = db.and_(perimetre, condition_motifs(patterns, Offre.url, Offre.titre, Offre.description))
+    candidates = _compter_offres_actives(perimetre)
 
     if dry_run:
+        ids_to_disable = db.session.scalars(
+            db.select(Offre.id).where(Offre.actif == True, bruit).order_by(Offre.id).limit(200)
+        ).all()
         return {
             'dry_run': True,
             'sources': sources,
             'patterns': patterns,
-            'candidates': len(candidates),
-            'to_disable': len(ids_to_disable),
-            'ids': ids_to_disable[:200]
+            'candidates': candidates,
+            'to_disable': _compter_offres_actives(bruit),
+            'ids': ids_to_disable
         }, 200
 
-    if ids_to_disable:
-        Offre.query.filter(Offre.id.in_(ids_to_disable)).update({'actif': False}, synchronize_session=False)
-        db.session.commit()
+    disabled = desactiver_offres(bruit, taille_lot=current_app.config.get('PURGE_BATCH_SIZE', 5000))
 
     return {
         'message': 'Nettoyage terminé',
         'sources': sources,
         'patterns': patterns,
-        'candidates': len(candidates),
-        'disabled': len(ids_to_disable)
+        'candidates': candidates,
+        'disabled': disabled
     }, 200
 
 
 @api_bp.route('/admin/purger-offres-expirees', methods=['POST'])
 @require_admin
+@limiter('admin-nettoyage', 'ADMIN_RATE_LIMIT_MAX', 'ADMIN_RATE_LIMIT_WINDOW_SECONDS')
 def purger_offres_expirees_maintenant():
     """Exécuter immédiatement la purge des offres expirées (date_cloturation passée)."""
     try:
@@ -619,8 +935,22 @@ def purger_offres_expirees_maintenant():
         return {'erreur': str(e)}, 500
 
 
+@api_bp.route('/admin/archiver-offres', methods=['POST'])
+@require_admin
+@limiter('admin-nettoyage', 'ADMIN_RATE_LIMIT_MAX', 'ADMIN_RATE_LIMIT_WINDOW_SECONDS')
+def archiver_offres_maintenant():
+    """Exécuter immédiatement l'archivage des offres inactives/expirées (OFFRES_ARCHIVAGE_JOURS)."""
+    try:
+        res = scheduler.archiver_offres_inactives()
+        return {'message': 'Archivage exécuté', 'result': res}, 200
+    except Exception as e:
+        logger.error(f"Erreur archiver_offres_inactives (admin): {str(e)}", exc_info=True)
+        return {'erreur': str(e)}, 500
+
+
 @api_bp.route('/admin/nettoyer-offres-non-ci', methods=['POST'])
 @require_admin
+@limiter('admin-nettoyage', 'ADMIN_RATE_LIMIT_MAX', 'ADMIN_RATE_LIMIT_WINDOW_SECONDS')
 def nettoyer_offres_non_ci():
     """Désactiver (soft delete) les offres dont le lieu d'exécution ne correspond pas à la Côte d'Ivoire."""
     data = request.get_json(silent=True) or {}
@@ -630,19 +960,16 @@ def nettoyer_offres_non_ci():
     if sources is not None and (not isinstance(sources, list) or any(not isinstance(s, str) for s in sources)):
         return {'erreur': 'Paramètre sources invalide (doit être une liste de strings)'}, 400
 
-    q = Offre.query.filter(Offre.actif == True)
-    if sources:
-        q = q.filter(Offre.source.in_(sources))
-
-    candidates = q.all()
-    ci_checker = StructuresLinksScraper()
+    perimetre = Offre.source.in_(sources) if sources else db.true()
+    ci_checker = scheduler.scrapers.creer('structures')
 
+    # Classifieur Python: lecture en flux des seules colonnes utiles
+    candidates = 0
     ids_to_disable = []
-    for o in candidates:
-        url = (o.url or '').strip()
-        title = (o.titre or '').strip()
-        desc = (o.description or '').strip()
-        hay = f"{title} {desc} {url}".strip()
+    for oid, url, title, desc in flux_offres(perimetre, Offre.url, Offre.titre, Offre.description):
+        candidates += 1
+        url = (url or '').strip()
+        hay = f"{(title or '').strip()} {(desc or '').strip()} {url}".strip()
 
         is_ci = False
         try:
@@ -651,25 +978,23 @@ def nettoyer_offres_non_ci():
             is_ci = False
 
         if not is_ci:
-            ids_to_disable.append(o.id)
+            ids_to_disable.append(oid)
 
     if dry_run:
         return {
             'dry_run': True,
             'sources': sources or 'ALL',
-            'candidates': len(candidates),
+            'candidates': candidates,
             'to_disable': len(ids_to_disable),
             'ids': ids_to_disable[:200]
         }, 200
 
-    if ids_to_disable:
-        Offre.query.filter(Offre.id.in_(ids_to_disable)).update({'actif': False}, synchronize_session=False)
-        db.session.commit()
+    desactiver_ids(ids_to_disable)
 
     return {
         'message': 'Nettoyage terminé',
         'sources': sources or 'ALL',
-        'candidates': len(candidates),
+        'candidates': candidates,
         'disabled': len(ids_to_disable)
     }, 200
 
@@ -694,11 +1019,47 @@ def lister_logs():
         'logs': [l.to_dict() for l in logs.items]
     }), 200
 
+@api_bp.route('/logs-scraping/agregats', methods=['GET'])
+def agregats_logs():
+    """Agrégats journaliers par source (exécutions, succès, offres, durées p50/p95)
+
+    Paramètres query:
+    - jours: période en jours (défaut: 14, max: 366)
+    - source: filtrer par source
+    La journée en cours est calculée à la volée depuis les logs bruts ('partiel': true).
+    """
+    jours = min(max(request.args.get('jours', 14, type=int) or 14, 1), 366)
+    source = request.args.get('source')
+
+    maintenant = datetime.utcnow()
+    debut = maintenant.date() - timedelta(days=jours - 1)
+    query = LogScrapingJournalier.query.filter(LogScrapingJournalier.jour >= debut)
+    if source:
+        query = query.filter_by(source=source)
+    agregats = [a.to_dict() for a in query.order_by(LogScrapingJournalier.jour, LogScrapingJournalier.source)]
+
+    conditions = [LogScraping.date_execution >= datetime.combine(maintenant.date(), datetime.min.time())]
+    if source:
+        conditions.append(LogScraping.source == source)
+    for a in agreger_periode(*conditions):
+        a['jour'] = a['jour'].isoformat()
+        a['partiel'] = True
+        agregats.append(a)
+
+    return jsonify({
+        'jours': jours,
+        'depuis': debut.isoformat(),
+        'agregats': agregats
+    }), 200
+
 # ==================== STATISTIQUES ====================
 
 @api_bp.route('/stats', methods=['GET'])
 def obtenir_stats():
     """Obtenir les statistiques globales"""
+    return jsonify(_statistiques_globales()), 200
+
+def _statistiques_globales():
     now = datetime.utcnow()
     base_query = Offre.query.filter(
         Offre.actif == True,
@@ -730,7 +1091,7 @@ def obtenir_stats():
 
     sources_actives = Source.query.filter(Source.actif == True).count()
     
-    return jsonify({
+    return {
         'total_offres': total_offres,
         'sources_actives': sources_actives,
         'offres_par_source': [
@@ -741,4 +1102,31 @@ def obtenir_stats():
         ],
         'derniers_scraping': [l.to_dict() for l in derniers_logs],
         'date_generation': datetime.utcnow().isoformat()
+    }
+
+_instantane_verrou = threading.Lock()
+
+def _statistiques_en_cache(ttl):
+    """Instantané de _statistiques_globales, recalculé au plus une fois par `ttl` secondes (par processus)"""
+    instantane = current_app.extensions.setdefault('instantane_stats', {'valeur': None, 'expire': 0.0})
+    with _instantane_verrou:
+        if instantane['valeur'] is None or time.monotonic() >= instantane['expire']:
+            instantane['valeur'] = _statistiques_globales()
+            instantane['expire'] = time.monotonic() + ttl
+        return instantane['valeur']
+
+@api_bp.route('/dashboard', methods=['GET'])
+def tableau_de_bord():
+    """Page d'accueil en une requête: statistiques, scheduler, IA locale et acteurs de veille
+
+    Statistiques et statut IA viennent de caches (DASHBOARD_CACHE_SECONDES, AI_STATUS_CACHE_SECONDES).
+    """
+    from scraping.ai_filter_local import statut_ia
+
+    acteurs = current_app.config.get('TABLEAU_VEILLE_ACTEURS', [])
+    return jsonify({
+        'stats': _statistiques_en_cache(current_app.config.get('DASHBOARD_CACHE_SECONDES', 30)),
+        'scheduler': scheduler.obtenir_status(),
+        'ia': statut_ia(ttl=current_app.config.get('AI_STATUS_CACHE_SECONDES', 60)),
+        'acteurs': {'total': len(acteurs), 'acteurs': acteurs},
     }), 200
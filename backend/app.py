@@ -8,8 +8,9 @@ import sys
 import logging
 import base64
 import hmac
+import time
 from werkzeug.security import check_password_hash
-from flask import Flask, request, Response
+from flask import Flask, request, Response, g
 from flask_cors import CORS
 
 # Guard for Python versions incompatible with installed SQLAlchemy
@@ -28,6 +29,9 @@ from database.models import db
 # Scheduler
 from scraping.scheduler import scheduler
 
+# Métriques
+import metrics
+
 # Logging
 logging.basicConfig(
     level=logging.INFO,
@@ -50,6 +54,13 @@ def create_app(config=None):
         config = get_config()
     app.config.from_object(config)
 
+    # Derrière PROXY_FIX_HOPS reverse proxies: l'adresse client (limitation de débit) est celle
+    # ajoutée par le dernier proxy de confiance, pas une valeur X-Forwarded-For fournie par le client
+    hops = int(app.config.get('PROXY_FIX_HOPS', 0) or 0)
+    if hops > 0:
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
+
     # S'assurer que le dossier de la base SQLite existe (ex: instance/)
     try:
         uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
@@ -61,9 +72,17 @@ def create_app(config=None):
     except Exception:
         pass
     
+    # Sérialisation JSON des réponses (orjson si installé)
+    from api.json_rapide import FournisseurJSON
+    app.json = FournisseurJSON(app)
+
     # Initialiser les extensions
     db.init_app(app)
 
+    # Compression des réponses: installée avant les autres after_request pour s'exécuter en dernier
+    from api.compression import installer_compression
+    installer_compression(app)
+
     # CORS: limiter aux routes API uniquement (l'UI est servie en same-origin).
     try:
         allowed = app.config.get('CORS_ORIGINS')
@@ -77,6 +96,15 @@ def create_app(config=None):
     CORS(app, resources={r"/api/*": {"origins": allowed}})
     scheduler.init_app(app)
 
+    if app.config.get('METRICS_ENABLED', True):
+        _installer_metriques(app)
+
+    from database.sql_profiler import installer_profiler_sql
+    from database.sqlite_tuning import installer_profil_sqlite
+    with app.app_context():
+        installer_profil_sqlite(db.engine, app.config)
+        installer_profiler_sql(app, db.engine)
+
     # Protection HTTP Basic (mot de passe requis avant toute page)
     @app.before_request
     def basic_auth_gate():
@@ -162,6 +190,11 @@ def create_app(config=None):
     def health():
         return {'status': 'healthy', 'service': 'veille-strategique'}, 200
     
+    if app.config.get('METRICS_ENABLED', True):
+        @app.route('/metrics', methods=['GET'])
+        def exposer_metriques():
+            return Response(metrics.registre.exposer(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+    
     # Infos API (évite le conflit avec la page d'accueil servie par le frontend)
     @app.route('/api-info', methods=['GET'])
     def api_info():
@@ -192,7 +225,7 @@ def create_app(config=None):
     # Avec use_reloader=False (choix actuel), il n'y a pas de double process.
     # On peut donc démarrer le scheduler en développement aussi.
     try:
-        if not scheduler.scheduler.running:
+        if app.config.get('SCHEDULER_AUTOSTART', True) and not scheduler.scheduler.running:
             scheduler.demarrer()
     except Exception as e:
         logger.error(f"Erreur démarrage scheduler: {str(e)}", exc_info=True)
@@ -200,6 +233,36 @@ def create_app(config=None):
     logger.info("✓ Application Flask créée et configurée")
     return app
 
+def _installer_metriques(app):
+    """Mesurer la latence des routes et des requêtes SQL (exposées sur /metrics)"""
+    from sqlalchemy import event
+
+    @app.before_request
+    def _debut_requete():
+        g._metriques_debut = time.perf_counter()
+
+    @app.after_request
+    def _fin_requete(resp):
+        debut = g.pop('_metriques_debut', None)
+        if debut is not None:
+            route = request.url_rule.rule if request.url_rule is not None else 'non_trouvee'
+            metrics.HTTP_DUREE.observer(time.perf_counter() - debut, route=route, methode=request.method)
+            metrics.HTTP_REQUETES.inc(route=route, methode=request.method, statut=resp.status_code)
+        return resp
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _debut_sql(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_metriques_debut', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _fin_sql(conn, cursor, statement, parameters, context, executemany):
+        pile = conn.info.get('_metriques_debut')
+        if pile:
+            metrics.DB_DUREE.observer(time.perf_counter() - pile.pop())
+
 if __name__ == '__main__':
     app = create_app()
     
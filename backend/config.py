@@ -22,6 +22,14 @@ class Config:
             'timeout': int(os.getenv('SQLITE_BUSY_TIMEOUT', 30))
         }
     }
+    # Profil SQLite appliqué à chaque connexion (lecteurs API concurrents du scraping)
+    SQLITE_TUNING_ENABLED = os.getenv('SQLITE_TUNING_ENABLED', '1').lower() in ('1', 'true', 'yes', 'on')
+    SQLITE_BUSY_TIMEOUT = int(os.getenv('SQLITE_BUSY_TIMEOUT', 30))  # secondes
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))  # octets
+    SQLITE_CACHE_SIZE = int(os.getenv('SQLITE_CACHE_SIZE', -64000))  # négatif = Kio (64 Mo)
+    SQLITE_TEMP_STORE = os.getenv('SQLITE_TEMP_STORE', 'MEMORY')
     
     # Clés secrètes
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-key-change-in-production')
@@ -29,10 +37,58 @@ class Config:
     # Scheduler (tâches planifiées)
     SCHEDULER_API_ENABLED = True
     SCHEDULER_TIMEZONE = os.getenv('SCHEDULER_TIMEZONE', 'Africa/Abidjan')
+    # 0 = process web uniquement (aucune tâche planifiée, code de scraping non chargé)
+    SCHEDULER_AUTOSTART = os.getenv('SCHEDULER_AUTOSTART', '1').lower() in ('1', 'true', 'yes', 'on')
     
     # Scraping
     SCRAPING_TIMEOUT = int(os.getenv('SCRAPING_TIMEOUT', 30))  # secondes
     SCRAPING_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+    # Archive brute des pages (WARC compressé + index) pour ré-extraction hors ligne
+    ARCHIVE_PAGES_ENABLED = os.getenv('ARCHIVE_PAGES_ENABLED', '0').lower() in ('1', 'true', 'yes', 'on')
+    ARCHIVE_PAGES_DIR = os.getenv('ARCHIVE_PAGES_DIR', os.path.join(_PROJECT_ROOT, 'instance', 'archive'))
+    ARCHIVE_PAGES_MAX_BYTES = int(os.getenv('ARCHIVE_PAGES_MAX_BYTES', 10 * 1024 * 1024))
+    
+    # Maintenance: taille des tranches d'id des UPDATE ensemblistes (purge, nettoyage)
+    PURGE_BATCH_SIZE = int(os.getenv('PURGE_BATCH_SIZE', 5000))
+    # Offres inactives/expirées depuis plus de N jours déplacées vers offres_archive (0 = désactivé)
+    OFFRES_ARCHIVAGE_JOURS = int(os.getenv('OFFRES_ARCHIVAGE_JOURS', 90))
+    # Logs de scraping bruts conservés N jours (au-delà: agrégats journaliers par source uniquement)
+    LOGS_SCRAPING_RETENTION_JOURS = int(os.getenv('LOGS_SCRAPING_RETENTION_JOURS', 30))
+    # Quasi-doublons (SimHash): offres proches regroupées sous une offre canonique.
+    # Distance de Hamming maximale sur 64 bits (0 à 5); les dates limites doivent coïncider à un jour près.
+    QUASI_DOUBLONS_ENABLED = os.getenv('QUASI_DOUBLONS_ENABLED', '1').lower() in ('1', 'true', 'yes', 'on')
+    QUASI_DOUBLONS_DISTANCE = int(os.getenv('QUASI_DOUBLONS_DISTANCE', 4))
+    
+    # Compression des réponses (brotli si le paquet est installé, sinon gzip) au-delà d'un seuil
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', '1').lower() in ('1', 'true', 'yes', 'on')
+    COMPRESSION_MIN_OCTETS = int(os.getenv('COMPRESSION_MIN_OCTETS', 500))
+    COMPRESSION_NIVEAU_GZIP = int(os.getenv('COMPRESSION_NIVEAU_GZIP', 6))
+    COMPRESSION_NIVEAU_BROTLI = int(os.getenv('COMPRESSION_NIVEAU_BROTLI', 4))
+    # Cache navigateur des fichiers statiques empreintés (asset()), en secondes
+    STATIC_MAX_AGE = int(os.getenv('STATIC_MAX_AGE', 365 * 24 * 3600))
+    
+    # Page d'accueil (/api/dashboard): durée de vie des statistiques et du statut IA en cache (secondes)
+    DASHBOARD_CACHE_SECONDES = int(os.getenv('DASHBOARD_CACHE_SECONDES', 30))
+    AI_STATUS_CACHE_SECONDES = int(os.getenv('AI_STATUS_CACHE_SECONDES', 60))
+    
+    # Métriques internes exposées sur /metrics (format texte Prometheus)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1').lower() in ('1', 'true', 'yes', 'on')
+    
+    # Profilage SQL (comptage par requête/tâche, détection N+1, requêtes lentes avec plan)
+    # Toujours disponible pour un admin via l'en-tête X-Profil-SQL: 1
+    SQL_PROFILER_ENABLED = os.getenv('SQL_PROFILER_ENABLED', '0').lower() in ('1', 'true', 'yes', 'on')
+    SQL_PROFILER_REPEAT_THRESHOLD = int(os.getenv('SQL_PROFILER_REPEAT_THRESHOLD', 10))
+    SQL_PROFILER_SLOW_MS = float(os.getenv('SQL_PROFILER_SLOW_MS', 200))
+    SQL_PROFILER_EXPLAIN = os.getenv('SQL_PROFILER_EXPLAIN', '1').lower() in ('1', 'true', 'yes', 'on')
+    
+    # Profileur par échantillonnage des tâches de scraping (piles « collapsed » pour flamegraph)
+    # PROFILER_JOBS: ids de jobs (ex: scraping_global_1h); PROFILER_SOURCES: noms/ids de sources ou clés de scrapers
+    PROFILER_DIR = os.getenv('PROFILER_DIR', os.path.join(_PROJECT_ROOT, 'instance', 'profils'))
+    PROFILER_MAX_FICHIERS = int(os.getenv('PROFILER_MAX_FICHIERS', 20))
+    PROFILER_INTERVAL_MS = float(os.getenv('PROFILER_INTERVAL_MS', 10))
+    PROFILER_JOBS = [j.strip() for j in os.getenv('PROFILER_JOBS', '').split(',') if j.strip()]
+    PROFILER_SOURCES = [s.strip() for s in os.getenv('PROFILER_SOURCES', '').split(',') if s.strip()]
     
     # API
     API_TITLE = 'Veille Stratégique API'
@@ -41,6 +97,17 @@ class Config:
     # Sécurité
     LOGIN_RATE_LIMIT_MAX = int(os.getenv('LOGIN_RATE_LIMIT_MAX', 10))
     LOGIN_RATE_LIMIT_WINDOW_SECONDS = int(os.getenv('LOGIN_RATE_LIMIT_WINDOW_SECONDS', 600))
+    # Limites par IP des routes coûteuses (0 = pas de limite)
+    SEARCH_RATE_LIMIT_MAX = int(os.getenv('SEARCH_RATE_LIMIT_MAX', 60))
+    SEARCH_RATE_LIMIT_WINDOW_SECONDS = int(os.getenv('SEARCH_RATE_LIMIT_WINDOW_SECONDS', 60))
+    ADMIN_RATE_LIMIT_MAX = int(os.getenv('ADMIN_RATE_LIMIT_MAX', 10))
+    ADMIN_RATE_LIMIT_WINDOW_SECONDS = int(os.getenv('ADMIN_RATE_LIMIT_WINDOW_SECONDS', 300))
+    # Stockage des compteurs: 'sqlite' (partagé entre workers gunicorn) ou 'memoire' (par process)
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'sqlite')
+    RATE_LIMIT_SQLITE_PATH = os.getenv('RATE_LIMIT_SQLITE_PATH', os.path.join(_PROJECT_ROOT, 'instance', 'limites.sqlite'))
+    RATE_LIMIT_MAX_CLES = int(os.getenv('RATE_LIMIT_MAX_CLES', 10000))
+    # Reverse proxies de confiance devant l'application (X-Forwarded-For/-Proto/-Host lus par ProxyFix); 0: aucun
+    PROXY_FIX_HOPS = int(os.getenv('PROXY_FIX_HOPS', 0))
     CORS_ORIGINS = os.getenv('CORS_ORIGINS', '').split(',') if os.getenv('CORS_ORIGINS') else []
     
     # Session
@@ -68,6 +135,22 @@ class Config:
     BRAND_WEBSITE = os.getenv('BRAND_WEBSITE', 'https://sindevstat.com')
     BRAND_LOGO_URL = os.getenv('BRAND_LOGO_URL', '/static/img/sindev-logo.jpeg')
     
+    # Notifications (résumés des nouvelles offres par abonné, e-mail ou webhook)
+    NOTIFICATIONS_ENABLED = os.getenv('NOTIFICATIONS_ENABLED', '1').lower() in ('1', 'true', 'yes', 'on')
+    NOTIFICATIONS_MAX_OFFRES = int(os.getenv('NOTIFICATIONS_MAX_OFFRES', 50))  # offres détaillées par résumé
+    NOTIFICATIONS_MAX_TENTATIVES = int(os.getenv('NOTIFICATIONS_MAX_TENTATIVES', 6))
+    NOTIFICATIONS_DELAI_REPRISE = int(os.getenv('NOTIFICATIONS_DELAI_REPRISE', 60))  # secondes, doublé à chaque échec
+    WEBHOOK_TIMEOUT = int(os.getenv('WEBHOOK_TIMEOUT', 10))
+    # Hôtes de webhook autorisés (liste séparée par des virgules); vide: tout hôte public
+    WEBHOOK_HOTES_AUTORISES = [h.strip().lower() for h in os.getenv('WEBHOOK_HOTES_AUTORISES', '').split(',') if h.strip()]
+    SMTP_HOST = os.getenv('SMTP_HOST', '')
+    SMTP_PORT = int(os.getenv('SMTP_PORT', 587))
+    SMTP_USER = os.getenv('SMTP_USER', '')
+    SMTP_PASSWORD = os.getenv('SMTP_PASSWORD', '')
+    SMTP_STARTTLS = os.getenv('SMTP_STARTTLS', '1').lower() in ('1', 'true', 'yes', 'on')
+    SMTP_FROM = os.getenv('SMTP_FROM', '')  # défaut: CONTACT_EMAIL
+    SMTP_TIMEOUT = int(os.getenv('SMTP_TIMEOUT', 20))
+
     # Contact
     CONTACT_EMAIL = os.getenv('CONTACT_EMAIL', 'sindevstat@sindevstat.com')
     CONTACT_PHONE = os.getenv('CONTACT_PHONE', '+225 07 07 38 72 55')
@@ -131,6 +214,7 @@ class Config:
         {'categorie': "Entreprises/Fonds d’investissement", 'structure': "TONY’S Chocolonely", 'lien': 'https://tonyschocolonely.com'},
     ]
 
+    # Chaque cible peut aussi déclarer 'flux': [URLs RSS/Atom/sitemap] pour éviter le scraping HTML de l'index
     STRUCTURES_SCRAPING_TARGETS = [
         {
             'structure': 'ANADER',
@@ -284,6 +368,11 @@ class Config:
         # If anything goes wrong do not break configuration loading
         pass
 
+    # Mode flux des structures: RSS/Atom, sitemaps (lastmod) et JSON-LD avant le scraping HTML
+    STRUCTURES_FLUX_ENABLED = os.getenv('STRUCTURES_FLUX_ENABLED', '1').lower() not in ('0', 'false', 'no', 'off')
+    STRUCTURES_FLUX_MAX_ENTREES = int(os.getenv('STRUCTURES_FLUX_MAX_ENTREES', 200))
+    STRUCTURES_FLUX_MAX_DOCUMENTS = int(os.getenv('STRUCTURES_FLUX_MAX_DOCUMENTS', 5))
+
     SINDEV_FOCUS_ENABLED = True
     SINDEV_FOCUS_TERMS = [
         'étude', 'etude', 'études', 'etudes',
@@ -394,6 +483,7 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    RATE_LIMIT_BACKEND = 'memoire'
 
 # Sélectionner la configuration en fonction de l'environnement
 config = {
@@ -0,0 +1,71 @@
+"""
+Upsert ensembliste (lecture des clés existantes, insertion groupée, mise à jour groupée)
+Utilisé par l'import de mots-clés et la synchronisation des sources à la place
+d'un `filter_by(...).first()` par élément.
+"""
+
+from .models import db
+
+
+def _differe(ancien, nouveau):
+    if isinstance(nouveau, str) or nouveau is None:
+        return (ancien or '') != (nouveau or '')
+    return ancien != nouveau
+
+
+def upsert_en_masse(modele, cle, lignes):
+    """Insérer ou mettre à jour `lignes` (dicts) identifiées par la colonne unique `cle`.
+
+    Trois requêtes au plus: une lecture des lignes existantes (clé + colonnes fournies),
+    un INSERT groupé des clés absentes, un UPDATE groupé (par clé primaire) des lignes modifiées.
+    Les doublons de clé dans `lignes` sont ignorés (la première occurrence l'emporte).
+    Ne valide pas la transaction.
+
+    Retourne les compteurs {'created', 'updated', 'activated', 'unchanged', 'duplicates'};
+    `activated` compte les lignes existantes dont `actif` passe à True.
+    """
+    compteurs = {'created': 0, 'updated': 0, 'activated': 0, 'unchanged': 0, 'duplicates': 0}
+
+    uniques = {}
+    for ligne in lignes:
+        if ligne[cle] in uniques:
+            compteurs['duplicates'] += 1
+            continue
+        uniques[ligne[cle]] = ligne
+    if not uniques:
+        return compteurs
+
+    colonnes = sorted({c for ligne in uniques.values() for c in ligne} - {cle})
+    pk = modele.__mapper__.primary_key[0].key
+    select_cols = [getattr(modele, pk), getattr(modele, cle)] + [getattr(modele, c) for c in colonnes]
+    existantes = {row[1]: row for row in db.session.execute(db.select(*select_cols))}
+
+    a_inserer = []
+    a_modifier = []
+    for valeur_cle, ligne in uniques.items():
+        row = existantes.get(valeur_cle)
+        if row is None:
+            a_inserer.append(ligne)
+            continue
+        anciens = dict(zip(colonnes, row[2:]))
+        changements = {c: v for c, v in ligne.items() if c != cle and _differe(anciens[c], v)}
+        if not changements:
+            compteurs['unchanged'] += 1
+            continue
+        if changements.get('actif') is True:
+            compteurs['activated'] += 1
+        changements[pk] = row[0]
+        a_modifier.append(changements)
+
+    if a_inserer:
+        db.session.execute(db.insert(modele), a_inserer)
+    # UPDATE groupé par clé primaire: les dicts doivent partager les mêmes colonnes par lot
+    lots = {}
+    for changements in a_modifier:
+        lots.setdefault(tuple(sorted(changements)), []).append(changements)
+    for lot in lots.values():
+        db.session.execute(db.update(modele), lot)
+
+    compteurs['created'] = len(a_inserer)
+    compteurs['updated'] = len(a_modifier)
+    return compteurs
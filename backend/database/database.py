@@ -3,7 +3,13 @@ Initialisation et gestion de la base de données
 Crée les tables et gère les sessions
 """
 
+import hashlib
+import json
+from urllib.parse import urlparse
+
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
 from .models import db
 
 
@@ -33,6 +39,86 @@ def get_default_sources_data():
         ('STRUCTURES', '', 'structures')
     ]
 
+def _est_url_http(u: str) -> bool:
+    if not u:
+        return False
+    try:
+        p = urlparse(u)
+        return p.scheme in ('http', 'https') and bool(p.netloc)
+    except Exception:
+        return False
+
+def nom_source_lien(structure: str, url: str) -> str:
+    """Nom stable d'une Source créée à partir d'un lien configuré (structure | hôte | empreinte)"""
+    structure = (structure or '').strip() or 'Source'
+    url = (url or '').strip()
+    try:
+        host = (urlparse(url).netloc or '').lower()
+    except Exception:
+        host = ''
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]
+    base = f"{structure} | {host} | {digest}" if host else f"{structure} | {digest}"
+    return base[:100]
+
+def get_sources_liens_data(config):
+    """Liens configurés (acteurs + targets), dédoublonnés, dans l'ordre de la configuration.
+
+    Retourne une liste de (structure, url); les URLs non HTTP(S) sont conservées
+    (l'appelant les compte comme ignorées).
+    """
+    urls = []
+    acteurs = config.get('TABLEAU_VEILLE_ACTEURS', []) or []
+    for a in acteurs:
+        structure = (a or {}).get('structure')
+        lien = (a or {}).get('lien')
+        if structure and lien:
+            urls.append((structure, lien))
+
+    targets = config.get('STRUCTURES_SCRAPING_TARGETS', []) or []
+    for t in targets:
+        structure = (t or {}).get('structure') or (t or {}).get('nom')
+        for u in ((t or {}).get('urls_a_scraper') or []):
+            if structure and u:
+                urls.append((structure, u))
+
+    seen = set()
+    dedup = []
+    for structure, u in urls:
+        key = (structure or '', (u or '').strip())
+        if key in seen:
+            continue
+        seen.add(key)
+        dedup.append((structure, (u or '').strip()))
+    return dedup
+
+def synchroniser_sources_liens(liens):
+    """Upsert ensembliste des Sources 'structures' correspondant aux liens (structure, url).
+
+    Ne valide pas la transaction. Retourne les compteurs de `upsert_en_masse` plus 'ignored'.
+    """
+    from .bulk import upsert_en_masse
+    from .models import Source
+
+    lignes = []
+    ignored = 0
+    for structure, u in liens:
+        if not _est_url_http(u):
+            ignored += 1
+            continue
+        lignes.append({
+            'nom': nom_source_lien(structure, u),
+            'url_base': u,
+            'type_scraper': 'structures',
+            'actif': True,
+        })
+    compteurs = upsert_en_masse(Source, 'nom', lignes)
+    compteurs['ignored'] = ignored
+    return compteurs
+
+def version_sources_liens(liens):
+    """Empreinte de la liste des liens configurés (synchro ignorée si inchangée)"""
+    return hashlib.sha1(json.dumps(liens).encode('utf-8')).hexdigest()[:16]
+
 def init_db(app):
     """Initialiser la base de données avec Flask.
 
@@ -43,15 +129,94 @@ def init_db(app):
     with app.app_context():
         # Créer toutes les tables
         db.create_all()
+        _ajouter_colonnes_manquantes()
+        _creer_index_manquants()
+        _remplir_urls_canoniques()
         print("Base de données initialisée")
         
         # Ajouter les mots-clés par défaut s'ils n'existent pas
-        _initialiser_donnees_par_defaut()
+        from .sql_profiler import profiler_sql
+        with profiler_sql('init_db'):
+            _initialiser_donnees_par_defaut()
 
-def _initialiser_donnees_par_defaut():
-    """Remplir les données de départ dans la base"""
-    from .models import MotsCles, Source
-    
+def _ajouter_colonnes_manquantes():
+    """Ajouter les colonnes des modèles absentes d'une base existante (create_all ne les crée pas)."""
+    inspecteur = inspect(db.engine)
+    tables = set(inspecteur.get_table_names())
+    for table in db.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        existantes = {c['name'] for c in inspecteur.get_columns(table.name)}
+        for colonne in table.columns:
+            if colonne.name in existantes:
+                continue
+            type_sql = colonne.type.compile(dialect=db.engine.dialect)
+            with db.engine.begin() as conn:
+                conn.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {colonne.name} {type_sql}'))
+            for index in table.indexes:
+                if colonne.name in index.columns:
+                    index.create(bind=db.engine, checkfirst=True)
+            print(f"Colonne ajoutée: {table.name}.{colonne.name}")
+
+def _creer_index_manquants():
+    """Créer les index déclarés sur des tables déjà existantes (create_all ne les crée pas)."""
+    inspecteur = inspect(db.engine)
+    tables = set(inspecteur.get_table_names())
+    for table in db.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        existants = {i['name'] for i in inspecteur.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existants:
+                index.create(bind=db.engine, checkfirst=True)
+                print(f"Index ajouté: {index.name}")
+
+def _remplir_urls_canoniques(taille_lot=1000):
+    """Calculer `url_canonique` des lignes qui n'en ont pas (offres et archive), par pages d'id.
+
+    Lors du remplissage, les offres actives partageant une même URL canonique sont
+    dédoublonnées: la plus ancienne (plus petit id) reste active.
+    """
+    from scraping.url_canonique import canonicaliser_url
+    from .models import Offre, OffreArchive
+
+    remplies = 0
+    for modele in (Offre, OffreArchive):
+        dernier = 0
+        while True:
+            lignes = db.session.execute(
+                db.select(modele.id, modele.url)
+                .where(modele.url_canonique.is_(None), modele.id > dernier)
+                .order_by(modele.id).limit(taille_lot)
+            ).all()
+            if not lignes:
+                break
+            db.session.execute(db.update(modele), [
+                {'id': i, 'url_canonique': canonicaliser_url(url)} for i, url in lignes
+            ])
+            db.session.commit()
+            dernier = lignes[-1][0]
+            remplies += len(lignes)
+    if not remplies:
+        return
+
+    premiers = (
+        db.select(db.func.min(Offre.id))
+        .where(Offre.actif == True)
+        .group_by(Offre.url_canonique)
+        .scalar_subquery()
+    )
+    res = db.session.execute(
+        db.update(Offre)
+        .where(Offre.actif == True, Offre.id.not_in(premiers))
+        .values(actif=False)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    print(f"URLs canoniques calculées: {remplies} lignes, {res.rowcount or 0} doublons désactivés")
+
+def get_default_mots_cles_data():
+    """Mots-clés par défaut (mot, catégorie); en cas de doublon la première catégorie l'emporte"""
     # Mots-clés par défaut - Chaînes de valeur agricoles
     chaines_valeur = [
         'Anacarde', 'Cacao', 'Agroforesterie', 'Agriculture', 'Développement rural',
@@ -62,10 +227,6 @@ def _initialiser_donnees_par_defaut():
         'Inclusion financière', 'Économie circulaire', 'Microfinance'
     ]
     
-    for mot in chaines_valeur:
-        if not MotsCles.query.filter_by(mot=mot).first():
-            db.session.add(MotsCles(mot=mot, categorie='Chaîne de valeur'))
-    
     # Types d'offres
     types_offres = [
         'Appel d\'offres', 'Avis de manifestation d\'intérêt', 'Contrat de prestation',
@@ -73,10 +234,6 @@ def _initialiser_donnees_par_defaut():
         'Audit externe', 'Appui institutionnel', 'Sensibilisation', 'Assistance technique',
         'Projet pilote'
     ]
-    
-    for mot in types_offres:
-        if not MotsCles.query.filter_by(mot=mot).first():
-            db.session.add(MotsCles(mot=mot, categorie='Type d\'offre'))
 
     # Thèmes et mots-clés supplémentaires fournis par l'utilisateur
     autres_mots = [
@@ -89,45 +246,93 @@ def _initialiser_donnees_par_defaut():
         'Agroforesterie', 'Développement rural', 'Environnement', 'Biodiversité', 'Changement climatique',
         'Foncier rural', 'Semences améliorées', 'Intrants agricoles', 'Cacao'
     ]
-    for mot in autres_mots:
-        if not MotsCles.query.filter_by(mot=mot).first():
-            db.session.add(MotsCles(mot=mot, categorie='Thème'))
     
     # Partenaires
     partenaires = [
         'GIZ', 'ENABEL', 'ANABEL', 'FIRCA', 'ANADER', 'MINADER', 'PAM', 'FAO', 'UE',
         'AFD', 'PNUD', 'Banque Mondiale', 'BAD', 'EduCarriere', 'DGMP'
     ]
+
+    mots = {}
+    for categorie, liste in (
+        ('Chaîne de valeur', chaines_valeur),
+        ('Type d\'offre', types_offres),
+        ('Thème', autres_mots),
+        ('Partenaire', partenaires),
+    ):
+        for mot in liste:
+            mots.setdefault(mot, categorie)
+    return list(mots.items())
+
+ADMIN_DEMO_EMAIL = 'admin@veille.ci'
+
+def version_donnees_par_defaut():
+    """Empreinte des données de départ: change dès qu'un mot-clé ou une source par défaut change"""
+    contenu = json.dumps([get_default_mots_cles_data(), get_default_sources_data(), ADMIN_DEMO_EMAIL])
+    return hashlib.sha1(contenu.encode('utf-8')).hexdigest()[:16]
+
+def _initialiser_donnees_par_defaut():
+    """Remplir les données de départ dans la base
+
+    Une requête par table pour charger les clés existantes, insertion groupée des manquantes.
+    Ignoré entièrement si le marqueur `seed_version` correspond déjà aux données courantes.
+    """
+    from .models import MotsCles, Source, ParametreSysteme
     
-    for mot in partenaires:
-        if not MotsCles.query.filter_by(mot=mot).first():
-            db.session.add(MotsCles(mot=mot, categorie='Partenaire'))
-    
-    sources_data = get_default_sources_data()
-    
-    for nom, url, type_scraper in sources_data:
-        if not Source.query.filter_by(nom=nom).first():
-            db.session.add(Source(nom=nom, url_base=url, type_scraper=type_scraper))
+    version = version_donnees_par_defaut()
+    marqueur = db.session.get(ParametreSysteme, 'seed_version')
+    if marqueur is not None and marqueur.valeur == version:
+        print("Données par défaut à jour")
+        return
 
-    # Créer un utilisateur admin de démonstration si inexistant (mot de passe hashé)
     try:
-        from werkzeug.security import generate_password_hash
-        from .models import Utilisateur
-        if not Utilisateur.query.filter_by(email='admin@veille.ci').first():
-            admin = Utilisateur(
-                email='admin@veille.ci',
-                nom_complet='Administrateur',
-                mot_de_passe_hash=generate_password_hash('admin123'),
-                role='admin'
-            )
-            db.session.add(admin)
-            print('Utilisateur admin créé (admin@veille.ci / admin123)')
-    except Exception:
-        # Si werkzeug non disponible pour une raison quelconque, ignorer la création
-        pass
-    
-    db.session.commit()
-    print("Données par défaut chargées")
+        mots_existants = set(db.session.scalars(db.select(MotsCles.mot)))
+        nouveaux_mots = [
+            {'mot': mot, 'categorie': categorie}
+            for mot, categorie in get_default_mots_cles_data()
+            if mot not in mots_existants
+        ]
+        if nouveaux_mots:
+            db.session.execute(db.insert(MotsCles), nouveaux_mots)
+
+        sources_existantes = set(db.session.scalars(db.select(Source.nom)))
+        nouvelles_sources = [
+            {'nom': nom, 'url_base': url, 'type_scraper': type_scraper}
+            for nom, url, type_scraper in get_default_sources_data()
+            if nom not in sources_existantes
+        ]
+        if nouvelles_sources:
+            db.session.execute(db.insert(Source), nouvelles_sources)
+
+        # Créer un utilisateur admin de démonstration si inexistant (mot de passe hashé)
+        try:
+            from werkzeug.security import generate_password_hash
+            from .models import Utilisateur
+            if not Utilisateur.query.filter_by(email=ADMIN_DEMO_EMAIL).first():
+                admin = Utilisateur(
+                    email=ADMIN_DEMO_EMAIL,
+                    nom_complet='Administrateur',
+                    mot_de_passe_hash=generate_password_hash('admin123'),
+                    role='admin'
+                )
+                db.session.add(admin)
+                print('Utilisateur admin créé (admin@veille.ci / admin123)')
+        except ImportError:
+            # Si werkzeug non disponible pour une raison quelconque, ignorer la création
+            pass
+
+        if marqueur is None:
+            db.session.add(ParametreSysteme(cle='seed_version', valeur=version))
+        else:
+            marqueur.valeur = version
+        db.session.commit()
+    except IntegrityError:
+        # Un autre worker a initialisé les mêmes données en parallèle
+        db.session.rollback()
+        print("Données par défaut déjà chargées par un autre process")
+        return
+
+    print(f"Données par défaut chargées ({len(nouveaux_mots)} mots-clés, {len(nouvelles_sources)} sources ajoutés)")
 
 def get_db_stats():
     """Obtenir les statistiques de la base"""
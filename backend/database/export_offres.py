@@ -0,0 +1,197 @@
+"""
+Export en flux des offres (CSV, NDJSON, Parquet)
+Le résultat filtré (mêmes filtres que GET /api/offres) est lu par lots avec un curseur
+côté serveur (`yield_per`, `stream_results`) sans objets ORM, et chaque lot est encodé
+puis émis aussitôt: la mémoire reste constante quelle que soit la taille de l'export.
+La compression gzip se fait au fil de l'eau. Parquet nécessite pyarrow (optionnel).
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+
+from database.models import db, Offre
+
+COLONNES = (
+    'id', 'titre', 'description', 'source', 'partenaire', 'type_offre', 'url',
+    'date_publication', 'date_cloturation', 'date_scrape', 'mots_cles', 'groupe_id',
+)
+
+FORMATS = {
+    'csv': {'extension': 'csv', 'mimetype': 'text/csv; charset=utf-8'},
+    'ndjson': {'extension': 'ndjson', 'mimetype': 'application/x-ndjson'},
+    'parquet': {'extension': 'parquet', 'mimetype': 'application/vnd.apache.parquet'},
+}
+TAILLE_LOT = 2000
+
+
+def filtres_offres(modele, source, partenaire, type_offre, mot_cle):
+    """Filtres communs à `offres` et `offres_archive`"""
+    filtres = []
+    if source:
+        filtres.append(modele.source == source)
+    if partenaire:
+        filtres.append(modele.partenaire == partenaire)
+    if type_offre:
+        filtres.append(modele.type_offre == type_offre)
+    if mot_cle:
+        filtres.append(modele.mots_cles.contains(mot_cle))
+    return filtres
+
+
+def conditions_liste(source=None, partenaire=None, type_offre=None, mot_cle=None,
+                     include_expired=False, grouper=True, maintenant=None):
+    """Conditions SQL sur `Offre` des offres listées par GET /api/offres."""
+    maintenant = maintenant or datetime.utcnow()
+
+    def visibles(modele):
+        conditions = [modele.actif == True]
+        if not include_expired:
+            conditions.append(modele.date_cloturation >= maintenant)
+        return conditions + filtres_offres(modele, source, partenaire, type_offre, mot_cle)
+
+    conditions = visibles(Offre)
+    if grouper:
+        # Quasi-doublons: masquer une offre quand l'offre canonique de son groupe est elle-même listée
+        canonique = db.aliased(Offre)
+        conditions.append(db.or_(
+            Offre.groupe_id.is_(None),
+            ~db.select(canonique.id).where(canonique.id == Offre.groupe_id, *visibles(canonique)).exists()
+        ))
+    return conditions
+
+
+def lots_offres(conditions, taille_lot=TAILLE_LOT):
+    """Itérer sur des lots de lignes (tuples dans l'ordre de COLONNES), par id croissant."""
+    stmt = (
+        db.select(*[getattr(Offre, c) for c in COLONNES])
+        .where(*conditions)
+        .order_by(Offre.id)
+        .execution_options(yield_per=taille_lot, stream_results=True)
+    )
+    yield from db.session.execute(stmt).partitions()
+
+
+def _texte(valeur):
+    if valeur is None:
+        return ''
+    if isinstance(valeur, datetime):
+        return valeur.isoformat()
+    return valeur
+
+
+def encoder_csv(lots):
+    tampon = io.StringIO()
+    ecrivain = csv.writer(tampon)
+    ecrivain.writerow(COLONNES)
+    for lot in lots:
+        ecrivain.writerows([[_texte(v) for v in ligne] for ligne in lot])
+        yield tampon.getvalue().encode('utf-8')
+        tampon.seek(0)
+        tampon.truncate()
+    if tampon.tell():
+        yield tampon.getvalue().encode('utf-8')
+
+
+def encoder_ndjson(lots):
+    encodeur = json.JSONEncoder(ensure_ascii=False, default=lambda v: v.isoformat())
+    for lot in lots:
+        yield ''.join(encodeur.encode(dict(zip(COLONNES, ligne))) + '\n' for ligne in lot).encode('utf-8')
+
+
+class _Tampon:
+    """Fichier en écriture seule dont le contenu est récupéré (et vidé) après chaque groupe de lignes."""
+
+    closed = False
+
+    def __init__(self):
+        self.morceaux = []
+        self.position = 0
+
+    def write(self, donnees):
+        self.morceaux.append(bytes(donnees))
+        self.position += len(donnees)
+        return len(donnees)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def vider(self):
+        donnees = b''.join(self.morceaux)
+        self.morceaux = []
+        return donnees
+
+
+def pyarrow_disponible():
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def encoder_parquet(lots):
+    """Un groupe de lignes Parquet par lot (compression snappy, propre au format)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    date = pa.timestamp('us')
+    schema = pa.schema([
+        ('id', pa.int64()), ('titre', pa.string()), ('description', pa.string()),
+        ('source', pa.string()), ('partenaire', pa.string()), ('type_offre', pa.string()),
+        ('url', pa.string()), ('date_publication', date), ('date_cloturation', date),
+        ('date_scrape', date), ('mots_cles', pa.string()), ('groupe_id', pa.int64()),
+    ])
+    tampon = _Tampon()
+    ecrivain = pq.ParquetWriter(tampon, schema)
+    for lot in lots:
+        colonnes = list(zip(*lot))
+        ecrivain.write_table(pa.Table.from_arrays(
+            [pa.array(valeurs, type=champ.type) for valeurs, champ in zip(colonnes, schema)],
+            schema=schema,
+        ))
+        yield tampon.vider()
+    ecrivain.close()
+    yield tampon.vider()
+
+
+def compresser_gzip(morceaux, niveau=6):
+    compresseur = zlib.compressobj(niveau, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for morceau in morceaux:
+        compresse = compresseur.compress(morceau)
+        if compresse:
+            yield compresse
+    yield compresseur.flush()
+
+
+_ENCODEURS = {'csv': encoder_csv, 'ndjson': encoder_ndjson, 'parquet': encoder_parquet}
+
+
+def exporter(format_export, conditions, compresser=False, taille_lot=TAILLE_LOT):
+    """Générateur de morceaux d'octets de l'export (`format_export` parmi FORMATS).
+
+    À consommer dans un contexte d'application; ValueError si le format est inconnu,
+    RuntimeError si Parquet est demandé sans pyarrow.
+    """
+    if format_export not in FORMATS:
+        raise ValueError(f"Format inconnu: {format_export} (attendu: {', '.join(FORMATS)})")
+    if format_export == 'parquet' and not pyarrow_disponible():
+        raise RuntimeError('Export Parquet indisponible: installer pyarrow')
+    morceaux = _ENCODEURS[format_export](lots_offres(conditions, taille_lot))
+    if compresser:
+        morceaux = compresser_gzip(morceaux)
+    return (m for m in morceaux if m)
+
+
+def nom_fichier(format_export, compresser=False, maintenant=None):
+    horodatage = (maintenant or datetime.utcnow()).strftime('%Y%m%d-%H%M%S')
+    return f"offres-{horodatage}.{FORMATS[format_export]['extension']}" + ('.gz' if compresser else '')
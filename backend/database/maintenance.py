@@ -0,0 +1,165 @@
+"""
+Opérations de maintenance ensemblistes sur les offres
+Le prédicat est évalué par la base (UPDATE ... WHERE découpé par tranches d'id),
+et les classifieurs Python lisent les colonnes utiles en flux (yield_per).
+"""
+
+from datetime import datetime
+
+from .models import db, Offre, OffreArchive, EmpreinteOffre
+from .sqlite_tuning import file_ecritures
+
+TAILLE_LOT = 5000
+
+
+def desactiver_offres(condition, taille_lot=TAILLE_LOT):
+    """Désactiver (soft delete) les offres actives vérifiant `condition`.
+
+    Un UPDATE ... WHERE par tranche de `taille_lot` ids (validé à chaque tranche) pour
+    ne pas verrouiller une grande table d'un seul bloc. Retourne le nombre de lignes modifiées.
+    """
+    condition = db.and_(Offre.actif == True, condition)
+    mini, maxi = db.session.execute(
+        db.select(db.func.min(Offre.id), db.func.max(Offre.id)).where(condition)
+    ).one()
+    if mini is None:
+        return 0
+
+    total = 0
+    debut = mini
+    while debut <= maxi:
+        with file_ecritures.ecrire():
+            res = db.session.execute(
+                db.update(Offre)
+                .where(condition, Offre.id >= debut, Offre.id < debut + taille_lot)
+                .values(actif=False)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+        total += res.rowcount or 0
+        debut += taille_lot
+    return total
+
+
+def desactiver_ids(ids, taille_lot=500):
+    """Désactiver une liste d'ids calculée côté Python, par lots de `taille_lot` (IN borné)."""
+    total = 0
+    with file_ecritures.ecrire():
+        for i in range(0, len(ids), taille_lot):
+            res = db.session.execute(
+                db.update(Offre)
+                .where(Offre.id.in_(ids[i:i + taille_lot]))
+                .values(actif=False)
+                .execution_options(synchronize_session=False)
+            )
+            total += res.rowcount or 0
+        db.session.commit()
+    return total
+
+
+COLONNES_ARCHIVE = (
+    'titre', 'description', 'source', 'url', 'url_canonique', 'date_publication', 'date_cloturation',
+    'type_offre', 'partenaire', 'mots_cles', 'date_scrape', 'date_modification', 'actif',
+)
+
+
+def archiver_offres(condition, taille_lot=TAILLE_LOT):
+    """Déplacer les offres vérifiant `condition` vers `offres_archive`.
+
+    Par tranche d'ids, dans une même transaction: INSERT ... SELECT vers l'archive (URLs déjà
+    archivées exclues) puis DELETE dans `offres` (et de leurs empreintes de quasi-doublons).
+    Retourne le nombre d'offres retirées de `offres`.
+    """
+    mini, maxi = db.session.execute(
+        db.select(db.func.min(Offre.id), db.func.max(Offre.id)).where(condition)
+    ).one()
+    if mini is None:
+        return 0
+
+    maintenant = datetime.utcnow()
+    deja_archivee = db.select(OffreArchive.id).where(OffreArchive.url == Offre.url).exists()
+    total = 0
+    debut = mini
+    while debut <= maxi:
+        tranche = db.and_(condition, Offre.id >= debut, Offre.id < debut + taille_lot)
+        source = db.select(
+            Offre.id, *[getattr(Offre, c) for c in COLONNES_ARCHIVE], db.literal(maintenant)
+        ).where(tranche, ~deja_archivee)
+        with file_ecritures.ecrire():
+            db.session.execute(
+                db.insert(OffreArchive).from_select(
+                    ['offre_id', *COLONNES_ARCHIVE, 'date_archivage'], source
+                )
+            )
+            db.session.execute(
+                db.delete(EmpreinteOffre)
+                .where(EmpreinteOffre.offre_id.in_(db.select(Offre.id).where(tranche)))
+                .execution_options(synchronize_session=False)
+            )
+            res = db.session.execute(
+                db.delete(Offre).where(tranche).execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+        total += res.rowcount or 0
+        debut += taille_lot
+    if total:
+        regrouper_orphelins()
+    return total
+
+
+def regrouper_orphelins():
+    """Groupes de quasi-doublons dont l'offre canonique a disparu: le plus petit id restant devient canonique.
+
+    Retourne le nombre de groupes repris.
+    """
+    orphelins = db.session.execute(
+        db.select(Offre.groupe_id, db.func.min(Offre.id))
+        .where(Offre.groupe_id.is_not(None), Offre.groupe_id.not_in(db.select(Offre.id)))
+        .group_by(Offre.groupe_id)
+    ).all()
+    if not orphelins:
+        return 0
+    with file_ecritures.ecrire():
+        for ancien, nouveau in orphelins:
+            db.session.execute(
+                db.update(Offre).where(Offre.groupe_id == ancien)
+                .values(groupe_id=db.case((Offre.id == nouveau, None), else_=nouveau))
+                .execution_options(synchronize_session=False)
+            )
+            db.session.execute(
+                db.update(EmpreinteOffre).where(EmpreinteOffre.groupe_id == ancien)
+                .values(groupe_id=nouveau)
+                .execution_options(synchronize_session=False)
+            )
+        db.session.commit()
+    return len(orphelins)
+
+
+def urls_archivees(urls_canoniques, taille_lot=500):
+    """Sous-ensemble des URLs canoniques présent dans l'archive (pierres tombales), par requêtes IN bornées."""
+    urls = [u for u in dict.fromkeys(urls_canoniques) if u]
+    trouvees = set()
+    for i in range(0, len(urls), taille_lot):
+        trouvees.update(db.session.scalars(
+            db.select(OffreArchive.url_canonique).where(OffreArchive.url_canonique.in_(urls[i:i + taille_lot]))
+        ))
+    return trouvees
+
+
+def flux_offres(condition, *colonnes, taille_lot=1000):
+    """Itérer sur (id, *colonnes) des offres actives vérifiant `condition`, sans charger d'objets ORM."""
+    stmt = (
+        db.select(Offre.id, *colonnes)
+        .where(Offre.actif == True, condition)
+        .order_by(Offre.id)
+        .execution_options(yield_per=taille_lot)
+    )
+    yield from db.session.execute(stmt)
+
+
+def condition_motifs(motifs, *colonnes):
+    """Condition SQL: au moins une des `colonnes` contient un des `motifs` (insensible à la casse)."""
+    return db.or_(*[
+        db.func.lower(col).contains(m.lower(), autoescape=True)
+        for m in motifs for col in colonnes
+    ])
@@ -4,6 +4,7 @@ Définit les tables et relations
 """
 
 from datetime import datetime
+import json
 from flask_sqlalchemy import SQLAlchemy
 
 db = SQLAlchemy()
@@ -17,14 +18,21 @@ class Offre(db.Model):
     description = db.Column(db.Text)
     source = db.Column(db.String(100), nullable=False)  # GIZ, ENABEL, etc.
     url = db.Column(db.String(500), unique=True, nullable=False)
+    url_canonique = db.Column(db.String(500), index=True)  # clé de dédoublonnage (scraping.url_canonique)
     date_publication = db.Column(db.DateTime)
     date_cloturation = db.Column(db.DateTime)
     type_offre = db.Column(db.String(100))  # 'Appel d\'offres', 'Manifestation d\'intérêt', etc.
     partenaire = db.Column(db.String(200))  # GIZ, ENABEL, PAM, FAO, etc.
     mots_cles = db.Column(db.String(500))  # Mots-clés détectés (séparés par virgule)
-    date_scrape = db.Column(db.DateTime, default=datetime.utcnow)
+    date_scrape = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # tri des listes
     date_modification = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     actif = db.Column(db.Boolean, default=True)
+    groupe_id = db.Column(db.Integer, index=True)  # offre canonique si quasi-doublon (scraping.quasi_doublons)
+
+    __table_args__ = (
+        # Couvre le filtre des listes (non expirées, actives, canoniques): le total se compte sans lire les lignes
+        db.Index('ix_offres_visibles', 'date_cloturation', 'actif', 'groupe_id'),
+    )
     
     def to_dict(self):
         """Convertir en dictionnaire pour JSON"""
@@ -40,6 +48,165 @@ class Offre(db.Model):
             'partenaire': self.partenaire,
             'mots_cles': self.mots_cles,
             'date_scrape': self.date_scrape.isoformat(),
+            'groupe_id': self.groupe_id,
+        }
+
+class OffreArchive(db.Model):
+    """Offres inactives ou expirées déplacées hors de la table `offres` (stockage froid)
+
+    L'URL (unique, indexée) sert de pierre tombale: une offre archivée revue au scraping est ignorée.
+    """
+    __tablename__ = 'offres_archive'
+
+    id = db.Column(db.Integer, primary_key=True)
+    offre_id = db.Column(db.Integer)  # id d'origine dans `offres`
+    titre = db.Column(db.String(500), nullable=False)
+    description = db.Column(db.Text)
+    source = db.Column(db.String(100), nullable=False)
+    url = db.Column(db.String(500), unique=True, nullable=False)
+    url_canonique = db.Column(db.String(500), index=True)
+    date_publication = db.Column(db.DateTime)
+    date_cloturation = db.Column(db.DateTime)
+    type_offre = db.Column(db.String(100))
+    partenaire = db.Column(db.String(200))
+    mots_cles = db.Column(db.String(500))
+    date_scrape = db.Column(db.DateTime)
+    date_modification = db.Column(db.DateTime)
+    actif = db.Column(db.Boolean)  # état au moment de l'archivage
+    date_archivage = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'offre_id': self.offre_id,
+            'titre': self.titre,
+            'description': self.description,
+            'source': self.source,
+            'url': self.url,
+            'date_publication': self.date_publication.isoformat() if self.date_publication else None,
+            'date_cloturation': self.date_cloturation.isoformat() if self.date_cloturation else None,
+            'type_offre': self.type_offre,
+            'partenaire': self.partenaire,
+            'mots_cles': self.mots_cles,
+            'date_scrape': self.date_scrape.isoformat() if self.date_scrape else None,
+            'date_archivage': self.date_archivage.isoformat() if self.date_archivage else None,
+            'archivee': True,
+        }
+
+class EmpreinteOffre(db.Model):
+    """Empreinte SimHash d'une offre, découpée en 6 bandes indexées (quasi-doublons)"""
+    __tablename__ = 'empreintes_offres'
+
+    offre_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    simhash = db.Column(db.BigInteger, nullable=False)  # 64 bits signés
+    bande0 = db.Column(db.Integer, nullable=False, index=True)
+    bande1 = db.Column(db.Integer, nullable=False, index=True)
+    bande2 = db.Column(db.Integer, nullable=False, index=True)
+    bande3 = db.Column(db.Integer, nullable=False, index=True)
+    bande4 = db.Column(db.Integer, nullable=False, index=True)
+    bande5 = db.Column(db.Integer, nullable=False, index=True)
+    date_cloturation = db.Column(db.Date)
+    groupe_id = db.Column(db.Integer, nullable=False)  # offre canonique du groupe (elle-même si seule)
+
+class RechercheSauvegardee(db.Model):
+    """Recherche enregistrée par un utilisateur (texte + filtres), percolée sur les nouvelles offres"""
+    __tablename__ = 'recherches_sauvegardees'
+
+    id = db.Column(db.Integer, primary_key=True)
+    utilisateur_email = db.Column(db.String(200), nullable=False, index=True)
+    nom = db.Column(db.String(200))
+    texte = db.Column(db.String(200))  # même sens que `q` de /api/offres/rechercher
+    source = db.Column(db.String(100))
+    partenaire = db.Column(db.String(200))
+    type_offre = db.Column(db.String(100))
+    mot_cle = db.Column(db.String(200))
+    actif = db.Column(db.Boolean, default=True)
+    date_creation = db.Column(db.DateTime, default=datetime.utcnow)
+    date_modification = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    derniere_visite = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'nom': self.nom,
+            'texte': self.texte,
+            'source': self.source,
+            'partenaire': self.partenaire,
+            'type_offre': self.type_offre,
+            'mot_cle': self.mot_cle,
+            'actif': self.actif,
+            'date_creation': self.date_creation.isoformat() if self.date_creation else None,
+            'derniere_visite': self.derniere_visite.isoformat() if self.derniere_visite else None,
+        }
+
+class CorrespondanceRecherche(db.Model):
+    """Offre insérée ou mise à jour correspondant à une recherche sauvegardée (fil des nouveautés)"""
+    __tablename__ = 'correspondances_recherches'
+    __table_args__ = (
+        db.UniqueConstraint('recherche_id', 'offre_id', name='uq_correspondances_recherche_offre'),
+        db.Index('ix_correspondances_recherche_date', 'recherche_id', 'date_correspondance'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    recherche_id = db.Column(db.Integer, nullable=False)
+    offre_id = db.Column(db.Integer, nullable=False, index=True)
+    date_correspondance = db.Column(db.DateTime, default=datetime.utcnow)
+
+class AbonnementNotification(db.Model):
+    """Canal de notification d'un utilisateur: résumé des nouvelles correspondances de ses recherches"""
+    __tablename__ = 'abonnements_notifications'
+
+    id = db.Column(db.Integer, primary_key=True)
+    utilisateur_email = db.Column(db.String(200), nullable=False, index=True)
+    canal = db.Column(db.String(20), nullable=False)  # 'email' ou 'webhook'
+    adresse = db.Column(db.String(500), nullable=False)  # adresse e-mail ou URL du webhook
+    actif = db.Column(db.Boolean, default=True)
+    date_creation = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'canal': self.canal,
+            'adresse': self.adresse,
+            'actif': self.actif,
+            'date_creation': self.date_creation.isoformat() if self.date_creation else None,
+        }
+
+class NotificationSortante(db.Model):
+    """Boîte d'envoi des notifications (livrée avec reprises jusqu'au succès ou à l'abandon)"""
+    __tablename__ = 'notifications_sortantes'
+    __table_args__ = (
+        db.Index('ix_notifications_statut_tentative', 'statut', 'prochaine_tentative'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    abonnement_id = db.Column(db.Integer, index=True)
+    canal = db.Column(db.String(20), nullable=False)
+    adresse = db.Column(db.String(500), nullable=False)
+    sujet = db.Column(db.String(300))
+    corps = db.Column(db.Text)  # texte (e-mail) ou JSON (webhook)
+    nombre_offres = db.Column(db.Integer, default=0)
+    statut = db.Column(db.String(20), default='en_attente')  # 'en_attente', 'en_cours' (réservée), 'envoyee', 'echec'
+    tentatives = db.Column(db.Integer, default=0)
+    prochaine_tentative = db.Column(db.DateTime, default=datetime.utcnow)
+    derniere_erreur = db.Column(db.String(500))
+    date_creation = db.Column(db.DateTime, default=datetime.utcnow)
+    date_envoi = db.Column(db.DateTime)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'abonnement_id': self.abonnement_id,
+            'canal': self.canal,
+            'adresse': self.adresse,
+            'sujet': self.sujet,
+            'nombre_offres': self.nombre_offres,
+            'statut': self.statut,
+            'tentatives': self.tentatives,
+            'prochaine_tentative': self.prochaine_tentative.isoformat() if self.prochaine_tentative else None,
+            'derniere_erreur': self.derniere_erreur,
+            'date_creation': self.date_creation.isoformat() if self.date_creation else None,
+            'date_envoi': self.date_envoi.isoformat() if self.date_envoi else None,
         }
 
 class MotsCles(db.Model):
@@ -107,17 +274,25 @@ class Utilisateur(db.Model):
 class LogScraping(db.Model):
     """Modèle pour tracer l'historique du scraping"""
     __tablename__ = 'logs_scraping'
+    __table_args__ = (
+        db.Index('ix_logs_scraping_source_date', 'source', 'date_execution'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     source = db.Column(db.String(100), nullable=False)
-    date_execution = db.Column(db.DateTime, default=datetime.utcnow)
+    date_execution = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     nombre_offres_trouvees = db.Column(db.Integer, default=0)
     nombre_offres_nouvelles = db.Column(db.Integer, default=0)
     statut = db.Column(db.String(50))  # 'succes', 'erreur', 'partiel'
     message_erreur = db.Column(db.Text)
     temps_execution = db.Column(db.Float)  # en secondes
+    details = db.Column(db.Text)  # JSON: temps par étape, compteurs, rejets par raison
     
     def to_dict(self):
+        try:
+            details = json.loads(self.details) if self.details else None
+        except ValueError:
+            details = None
         return {
             'id': self.id,
             'source': self.source,
@@ -125,5 +300,55 @@ class LogScraping(db.Model):
             'nombre_offres_trouvees': self.nombre_offres_trouvees,
             'nombre_offres_nouvelles': self.nombre_offres_nouvelles,
             'statut': self.statut,
-            'temps_execution': self.temps_execution
+            'temps_execution': self.temps_execution,
+            'details': details
+        }
+
+class LogScrapingJournalier(db.Model):
+    """Agrégat quotidien par source des logs de scraping (conservé après purge des logs bruts)"""
+    __tablename__ = 'logs_scraping_journaliers'
+    __table_args__ = (
+        db.UniqueConstraint('source', 'jour', name='uq_logs_journaliers_source_jour'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    source = db.Column(db.String(100), nullable=False)
+    jour = db.Column(db.Date, nullable=False, index=True)
+    executions = db.Column(db.Integer, default=0)
+    succes = db.Column(db.Integer, default=0)
+    offres_trouvees = db.Column(db.Integer, default=0)
+    offres_nouvelles = db.Column(db.Integer, default=0)
+    duree_totale = db.Column(db.Float, default=0.0)  # en secondes
+    duree_p50 = db.Column(db.Float)
+    duree_p95 = db.Column(db.Float)
+    
+    def to_dict(self):
+        return {
+            'source': self.source,
+            'jour': self.jour.isoformat(),
+            'executions': self.executions,
+            'succes': self.succes,
+            'offres_trouvees': self.offres_trouvees,
+            'offres_nouvelles': self.offres_nouvelles,
+            'duree_totale': self.duree_totale,
+            'duree_p50': self.duree_p50,
+            'duree_p95': self.duree_p95,
         }
+
+class EtatFlux(db.Model):
+    """Dernière modification connue (lastmod/updated) des URLs lues via flux/sitemaps"""
+    __tablename__ = 'etats_flux'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    hote = db.Column(db.String(200), index=True)
+    url = db.Column(db.String(500), unique=True, nullable=False)
+    lastmod = db.Column(db.String(64))
+    date_maj = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ParametreSysteme(db.Model):
+    """Paramètres techniques clé/valeur (ex: version des données de départ)"""
+    __tablename__ = 'parametres_systeme'
+    
+    cle = db.Column(db.String(100), primary_key=True)
+    valeur = db.Column(db.String(500))
+    date_maj = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
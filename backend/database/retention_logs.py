@@ -0,0 +1,107 @@
+"""
+Rétention des logs de scraping
+Les journées complètes sont agrégées par source dans `logs_scraping_journaliers`
+(exécutions, succès, offres trouvées/nouvelles, durées p50/p95); les logs bruts
+plus anciens que la période de rétention sont ensuite supprimés.
+"""
+
+from datetime import datetime, timedelta
+from itertools import groupby
+
+from .models import db, LogScraping, LogScrapingJournalier
+from .sqlite_tuning import file_ecritures
+
+
+def percentile(valeurs_triees, p):
+    """Percentile par rang le plus proche d'une liste triée (None si vide)."""
+    if not valeurs_triees:
+        return None
+    rang = max(1, -(-len(valeurs_triees) * p // 100))
+    return valeurs_triees[int(rang) - 1]
+
+
+def agreger(source, jour, lignes):
+    """Agrégat d'une journée pour une source à partir de (statut, trouvées, nouvelles, temps)."""
+    executions = succes = trouvees = nouvelles = 0
+    durees = []
+    for statut, nb_trouvees, nb_nouvelles, temps in lignes:
+        executions += 1
+        if statut == 'succes':
+            succes += 1
+        trouvees += nb_trouvees or 0
+        nouvelles += nb_nouvelles or 0
+        if temps is not None:
+            durees.append(temps)
+    durees.sort()
+    return {
+        'source': source,
+        'jour': jour,
+        'executions': executions,
+        'succes': succes,
+        'offres_trouvees': trouvees,
+        'offres_nouvelles': nouvelles,
+        'duree_totale': round(sum(durees), 3),
+        'duree_p50': percentile(durees, 50),
+        'duree_p95': percentile(durees, 95),
+    }
+
+
+def _flux_logs(*conditions, taille_lot=2000):
+    stmt = (
+        db.select(
+            LogScraping.source, LogScraping.date_execution, LogScraping.statut,
+            LogScraping.nombre_offres_trouvees, LogScraping.nombre_offres_nouvelles,
+            LogScraping.temps_execution,
+        )
+        .where(LogScraping.date_execution.is_not(None), *conditions)
+        .order_by(LogScraping.source, LogScraping.date_execution)
+        .execution_options(yield_per=taille_lot)
+    )
+    return db.session.execute(stmt)
+
+
+def agreger_periode(*conditions):
+    """Agrégats (dicts) par (source, jour) des logs bruts vérifiant `conditions`, lus en flux."""
+    agregats = []
+    cle = lambda row: (row[0], row[1].date())
+    for (source, jour), lignes in groupby(_flux_logs(*conditions), key=cle):
+        agregats.append(agreger(source, jour, (r[2:] for r in lignes)))
+    return agregats
+
+
+def consolider_logs(retention_jours, maintenant=None, taille_lot=5000):
+    """Agréger les journées complètes non encore agrégées puis purger les logs bruts trop anciens.
+
+    Retourne {'jours_agreges', 'lignes_supprimees'}.
+    """
+    maintenant = maintenant or datetime.utcnow()
+    aujourd_hui = datetime.combine(maintenant.date(), datetime.min.time())
+
+    dernier_jour = db.session.scalar(db.select(db.func.max(LogScrapingJournalier.jour)))
+    conditions = [LogScraping.date_execution < aujourd_hui]
+    if dernier_jour is not None:
+        conditions.append(
+            LogScraping.date_execution >= datetime.combine(dernier_jour, datetime.min.time()) + timedelta(days=1)
+        )
+    agregats = agreger_periode(*conditions)
+    with file_ecritures.ecrire():
+        if agregats:
+            db.session.execute(db.insert(LogScrapingJournalier), agregats)
+        db.session.commit()
+
+    # Purge des logs bruts hors rétention (journées complètes uniquement, déjà agrégées)
+    seuil = aujourd_hui - timedelta(days=max(int(retention_jours), 1))
+    supprimees = 0
+    while True:
+        lot = db.select(LogScraping.id).where(LogScraping.date_execution < seuil).limit(taille_lot)
+        with file_ecritures.ecrire():
+            res = db.session.execute(
+                db.delete(LogScraping).where(LogScraping.id.in_(lot.scalar_subquery()))
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+        if not res.rowcount:
+            break
+        supprimees += res.rowcount
+
+    return {'jours_agreges': len(agregats), 'lignes_supprimees': supprimees}
@@ -0,0 +1,188 @@
+"""
+Profilage SQL optionnel (événements SQLAlchemy)
+Compte les requêtes par requête HTTP ou tâche de scraping, signale les formes de
+requêtes répétées (N+1) et journalise les requêtes lentes avec leur plan d'exécution.
+Activation: SQL_PROFILER_ENABLED=1 (tout), ou en-tête X-Profil-SQL envoyé par un admin.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+import logging
+import re
+import threading
+import time
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+ENTETE_PROFIL = 'X-Profil-SQL'
+
+_RE_CHAINE = re.compile(r"'(?:[^']|'')*'")
+_RE_NOMBRE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_RE_LISTE = re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)')
+_RE_ESPACES = re.compile(r'\s+')
+
+_local = threading.local()
+
+
+def forme_requete(statement):
+    """Forme normalisée d'une requête (littéraux et listes IN remplacés par ?)."""
+    s = _RE_CHAINE.sub('?', statement or '')
+    s = _RE_NOMBRE.sub('?', s)
+    s = re.sub(r'%\(\w+\)s|:\w+|\$\d+|%s', '?', s)
+    s = _RE_LISTE.sub('(?...)', s)
+    return _RE_ESPACES.sub(' ', s).strip()
+
+
+class ProfilSQL:
+    """Statistiques SQL d'une unité de travail (requête HTTP ou tâche)."""
+
+    def __init__(self, nom, seuil_repetitions=10, seuil_lent_ms=200, plan=True):
+        self.nom = nom
+        self.seuil_repetitions = seuil_repetitions
+        self.seuil_lent_ms = seuil_lent_ms
+        self.plan = plan
+        self.requetes = 0
+        self.duree = 0.0
+        self.formes = Counter()
+        self.lentes = []
+
+    def enregistrer(self, statement, duree):
+        self.requetes += 1
+        self.duree += duree
+        self.formes[forme_requete(statement)] += 1
+
+    def repetitions(self):
+        """Formes exécutées au moins `seuil_repetitions` fois (suspicion de N+1)."""
+        return [(f, n) for f, n in self.formes.most_common() if n >= self.seuil_repetitions]
+
+    def resume(self):
+        return {
+            'nom': self.nom,
+            'requetes': self.requetes,
+            'duree_ms': round(self.duree * 1000, 1),
+            'repetitions': [{'forme': f[:300], 'nombre': n} for f, n in self.repetitions()],
+            'lentes': len(self.lentes),
+        }
+
+    def journaliser(self):
+        rep = self.repetitions()
+        niveau = logging.WARNING if rep else logging.INFO
+        logger.log(niveau, f"[SQL] {self.nom}: {self.requetes} requêtes en {self.duree * 1000:.1f}ms")
+        for forme, n in rep:
+            logger.warning(f"[SQL] N+1 suspect dans {self.nom}: {n}× {forme[:300]}")
+
+
+def profil_courant():
+    return getattr(_local, 'profil', None)
+
+
+def _config():
+    try:
+        from flask import current_app
+        return current_app.config
+    except RuntimeError:
+        from config import Config
+        return {k: getattr(Config, k) for k in dir(Config) if k.startswith('SQL_PROFILER_')}
+
+
+@contextmanager
+def profiler_sql(nom, force=False):
+    """Profiler les requêtes SQL du bloc si le profilage est activé (ou `force`).
+
+    Sans effet si un profil est déjà actif sur ce thread (les requêtes lui sont comptées).
+    """
+    cfg = _config()
+    if profil_courant() is not None or not (force or cfg.get('SQL_PROFILER_ENABLED', False)):
+        yield None
+        return
+    profil = ProfilSQL(
+        nom,
+        seuil_repetitions=int(cfg.get('SQL_PROFILER_REPEAT_THRESHOLD', 10)),
+        seuil_lent_ms=float(cfg.get('SQL_PROFILER_SLOW_MS', 200)),
+        plan=bool(cfg.get('SQL_PROFILER_EXPLAIN', True)),
+    )
+    _local.profil = profil
+    try:
+        yield profil
+    finally:
+        _local.profil = None
+        profil.journaliser()
+
+
+def _plan(conn, cursor, statement, parameters):
+    """Plan d'exécution (SQLite: EXPLAIN QUERY PLAN, autres: EXPLAIN) via un curseur DBAPI séparé."""
+    if not statement.lstrip().upper().startswith('SELECT'):
+        return None
+    prefixe = 'EXPLAIN QUERY PLAN ' if conn.dialect.name == 'sqlite' else 'EXPLAIN '
+    try:
+        cur = cursor.connection.cursor()
+        try:
+            cur.execute(prefixe + statement, parameters or ())
+            return ' | '.join(' '.join(str(c) for c in row) for row in cur.fetchall())
+        finally:
+            cur.close()
+    except Exception as e:
+        return f"indisponible ({type(e).__name__})"
+
+
+def installer_profiler_sql(app, engine):
+    """Brancher les événements SQLAlchemy et l'activation par requête HTTP."""
+    from flask import g, request
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _avant(conn, cursor, statement, parameters, context, executemany):
+        if getattr(_local, 'profil', None) is not None:
+            conn.info.setdefault('_profil_sql_debut', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _apres(conn, cursor, statement, parameters, context, executemany):
+        profil = getattr(_local, 'profil', None)
+        pile = conn.info.get('_profil_sql_debut')
+        if profil is None or not pile:
+            return
+        duree = time.perf_counter() - pile.pop()
+        profil.enregistrer(statement, duree)
+        if duree * 1000 >= profil.seuil_lent_ms:
+            plan = _plan(conn, cursor, statement, parameters) if (profil.plan and not executemany) else None
+            profil.lentes.append(statement)
+            logger.warning(
+                f"[SQL] Requête lente {duree * 1000:.0f}ms dans {profil.nom}: {_RE_ESPACES.sub(' ', statement)[:500]}"
+                + (f" | plan: {plan}" if plan else '')
+            )
+
+    @app.before_request
+    def _debut_profil():
+        demande = bool(request.headers.get(ENTETE_PROFIL))
+        if demande:
+            from api.middleware import payload_authentification
+            payload = payload_authentification()
+            demande = bool(payload and payload.get('role') == 'admin')
+        if not (demande or app.config.get('SQL_PROFILER_ENABLED', False)):
+            return None
+        cm = profiler_sql(f"{request.method} {request.path}", force=demande)
+        if cm.__enter__() is not None:
+            g._profil_sql = (cm, demande)
+        return None
+
+    @app.after_request
+    def _fin_profil(resp):
+        actif = g.pop('_profil_sql', None)
+        if actif is None:
+            return resp
+        cm, demande = actif
+        profil = profil_courant()
+        cm.__exit__(None, None, None)
+        if demande and profil is not None:
+            resp.headers['X-SQL-Requetes'] = str(profil.requetes)
+            resp.headers['X-SQL-Duree-Ms'] = f"{profil.duree * 1000:.1f}"
+            resp.headers['X-SQL-Repetitions'] = str(sum(n for _, n in profil.repetitions()))
+        return resp
+
+    @app.teardown_request
+    def _nettoyer_profil(exc):
+        # Requête interrompue par une exception non gérée: ne pas laisser le profil actif sur le thread
+        actif = g.pop('_profil_sql', None)
+        if actif is not None:
+            actif[0].__exit__(None, None, None)
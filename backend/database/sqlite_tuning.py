@@ -0,0 +1,109 @@
+"""
+Profil de connexion SQLite pour la production et sérialisation des écritures
+Les PRAGMA (WAL, synchronous, mmap, cache, temp_store, busy_timeout) sont appliqués
+à chaque nouvelle connexion; côté scraping, les transactions d'écriture passent par
+une file FIFO pour que les tâches concurrentes d'un même process ne se bloquent pas.
+"""
+
+from contextlib import contextmanager
+import logging
+import threading
+import time
+
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+SYNCHRONOUS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+TEMP_STORE = ('DEFAULT', 'FILE', 'MEMORY')
+
+
+def pragmas_sqlite(config):
+    """Liste ordonnée des PRAGMA à appliquer, valeurs validées (elles sont interpolées dans le SQL)."""
+    journal = str(config.get('SQLITE_JOURNAL_MODE', 'WAL')).upper()
+    synchronous = str(config.get('SQLITE_SYNCHRONOUS', 'NORMAL')).upper()
+    temp_store = str(config.get('SQLITE_TEMP_STORE', 'MEMORY')).upper()
+    if journal not in JOURNAL_MODES:
+        raise ValueError(f"SQLITE_JOURNAL_MODE invalide: {journal}")
+    if synchronous not in SYNCHRONOUS:
+        raise ValueError(f"SQLITE_SYNCHRONOUS invalide: {synchronous}")
+    if temp_store not in TEMP_STORE:
+        raise ValueError(f"SQLITE_TEMP_STORE invalide: {temp_store}")
+    return [
+        ('busy_timeout', int(float(config.get('SQLITE_BUSY_TIMEOUT', 30)) * 1000)),
+        ('journal_mode', journal),
+        ('synchronous', synchronous),
+        ('mmap_size', int(config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))),
+        ('cache_size', int(config.get('SQLITE_CACHE_SIZE', -64000))),
+        ('temp_store', temp_store),
+    ]
+
+
+def installer_profil_sqlite(engine, config):
+    """Appliquer les PRAGMA à chaque connexion DBAPI ouverte par `engine` (SQLite uniquement).
+
+    Retourne la liste appliquée (vide si désactivé ou autre SGBD).
+    """
+    if engine.dialect.name != 'sqlite' or not config.get('SQLITE_TUNING_ENABLED', True):
+        return []
+    pragmas = pragmas_sqlite(config)
+    if engine.url.database in (None, '', ':memory:'):
+        # Base en mémoire: WAL et mmap sans objet
+        pragmas = [p for p in pragmas if p[0] not in ('journal_mode', 'mmap_size')]
+
+    @event.listens_for(engine, 'connect')
+    def _appliquer(dbapi_conn, record):
+        cur = dbapi_conn.cursor()
+        try:
+            for nom, valeur in pragmas:
+                cur.execute(f'PRAGMA {nom}={valeur}')
+        finally:
+            cur.close()
+
+    logger.info('Profil SQLite: ' + ', '.join(f'{n}={v}' for n, v in pragmas))
+    return pragmas
+
+
+class FileEcritures:
+    """File FIFO (tickets) sérialisant les transactions d'écriture d'un process."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._prochain = 0
+        self._servi = 0
+        self._local = threading.local()
+        self.attente_totale = 0.0
+        self.ecritures = 0
+
+    @contextmanager
+    def ecrire(self):
+        """Attendre son tour puis exécuter le bloc (écriture + commit). Réentrant par thread."""
+        if getattr(self._local, 'profondeur', 0):
+            self._local.profondeur += 1
+            try:
+                yield
+            finally:
+                self._local.profondeur -= 1
+            return
+
+        t0 = time.perf_counter()
+        with self._cond:
+            ticket = self._prochain
+            self._prochain += 1
+            while ticket != self._servi:
+                self._cond.wait()
+        attente = time.perf_counter() - t0
+        self._local.profondeur = 1
+        try:
+            yield
+        finally:
+            self._local.profondeur = 0
+            with self._cond:
+                self._servi += 1
+                self.attente_totale += attente
+                self.ecritures += 1
+                self._cond.notify_all()
+
+
+file_ecritures = FileEcritures()
@@ -0,0 +1,179 @@
+"""
+Métriques internes au format d'exposition texte Prometheus (sans dépendance externe)
+Compteurs, jauges et histogrammes étiquetés, alimentés par app.py, le scheduler et BaseScraper.
+Chaque process (worker gunicorn) expose ses propres valeurs.
+"""
+
+from bisect import bisect_left
+import threading
+
+BUCKETS_HTTP = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_DB = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+BUCKETS_FETCH = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BUCKETS_SCRAPER = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+BUCKETS_OLLAMA = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 60.0)
+
+
+def _echapper(valeur):
+    return str(valeur).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(noms, valeurs, extra=None):
+    paires = [f'{n}="{_echapper(v)}"' for n, v in zip(noms, valeurs)]
+    if extra:
+        paires.append(extra)
+    return '{' + ','.join(paires) + '}' if paires else ''
+
+
+def _format_nombre(v):
+    if v == float('inf'):
+        return '+Inf'
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return repr(v) if isinstance(v, float) else str(v)
+
+
+class _Metrique:
+    type_metrique = None
+
+    def __init__(self, nom, aide, labels=()):
+        self.nom = nom
+        self.aide = aide
+        self.labels = tuple(labels)
+        self._valeurs = {}
+        self._lock = threading.Lock()
+
+    def _cle(self, labels):
+        return tuple(str(labels.get(n, '')) for n in self.labels)
+
+    def exposer(self):
+        lignes = [f'# HELP {self.nom} {self.aide}', f'# TYPE {self.nom} {self.type_metrique}']
+        with self._lock:
+            items = sorted(self._valeurs.items())
+        lignes.extend(self._lignes(items))
+        return lignes
+
+    def _lignes(self, items):
+        return [f'{self.nom}{_format_labels(self.labels, cle)} {_format_nombre(v)}' for cle, v in items]
+
+    def reinitialiser(self):
+        with self._lock:
+            self._valeurs.clear()
+
+
+class Compteur(_Metrique):
+    type_metrique = 'counter'
+
+    def inc(self, n=1, **labels):
+        cle = self._cle(labels)
+        with self._lock:
+            self._valeurs[cle] = self._valeurs.get(cle, 0) + n
+
+    def valeur(self, **labels):
+        return self._valeurs.get(self._cle(labels), 0)
+
+
+class Jauge(_Metrique):
+    type_metrique = 'gauge'
+
+    def set(self, v, **labels):
+        cle = self._cle(labels)
+        with self._lock:
+            self._valeurs[cle] = v
+
+    def valeur(self, **labels):
+        return self._valeurs.get(self._cle(labels), 0)
+
+
+class Histogramme(_Metrique):
+    type_metrique = 'histogram'
+
+    def __init__(self, nom, aide, labels=(), buckets=BUCKETS_HTTP):
+        super().__init__(nom, aide, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observer(self, v, **labels):
+        cle = self._cle(labels)
+        i = bisect_left(self.buckets, v)
+        with self._lock:
+            etat = self._valeurs.get(cle)
+            if etat is None:
+                # [compte par bucket (non cumulé, +Inf en dernier), somme, total]
+                etat = self._valeurs[cle] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            etat[0][i] += 1
+            etat[1] += v
+            etat[2] += 1
+
+    def total(self, **labels):
+        etat = self._valeurs.get(self._cle(labels))
+        return etat[2] if etat else 0
+
+    def _lignes(self, items):
+        lignes = []
+        for cle, (comptes, somme, total) in items:
+            cumul = 0
+            for borne, n in zip(self.buckets + (float('inf'),), comptes):
+                cumul += n
+                le = f'le="{_format_nombre(float(borne))}"'
+                lignes.append(f'{self.nom}_bucket{_format_labels(self.labels, cle, le)} {cumul}')
+            lignes.append(f'{self.nom}_sum{_format_labels(self.labels, cle)} {_format_nombre(round(somme, 6))}')
+            lignes.append(f'{self.nom}_count{_format_labels(self.labels, cle)} {total}')
+        return lignes
+
+
+class Registre:
+    def __init__(self):
+        self._metriques = {}
+        self._lock = threading.Lock()
+
+    def _enregistrer(self, metrique):
+        with self._lock:
+            return self._metriques.setdefault(metrique.nom, metrique)
+
+    def compteur(self, nom, aide, labels=()):
+        return self._enregistrer(Compteur(nom, aide, labels))
+
+    def jauge(self, nom, aide, labels=()):
+        return self._enregistrer(Jauge(nom, aide, labels))
+
+    def histogramme(self, nom, aide, labels=(), buckets=BUCKETS_HTTP):
+        return self._enregistrer(Histogramme(nom, aide, labels, buckets))
+
+    def exposer(self):
+        with self._lock:
+            metriques = list(self._metriques.values())
+        lignes = []
+        for m in metriques:
+            lignes.extend(m.exposer())
+        return '\n'.join(lignes) + '\n'
+
+
+registre = Registre()
+
+# API
+HTTP_DUREE = registre.histogramme(
+    'veille_http_request_duration_seconds', 'Durée des requêtes HTTP par route', ('route', 'methode'), BUCKETS_HTTP)
+HTTP_REQUETES = registre.compteur(
+    'veille_http_requests_total', 'Requêtes HTTP par route et code de statut', ('route', 'methode', 'statut'))
+
+# Base de données
+DB_DUREE = registre.histogramme(
+    'veille_db_query_duration_seconds', 'Durée des requêtes SQL', (), BUCKETS_DB)
+
+# Scraping
+SCRAPER_DUREE = registre.histogramme(
+    'veille_scraper_run_duration_seconds', "Durée d'exécution par source", ('source',), BUCKETS_SCRAPER)
+SCRAPER_EXECUTIONS = registre.compteur(
+    'veille_scraper_runs_total', 'Exécutions par source et statut', ('source', 'statut'))
+SCRAPER_OFFRES = registre.compteur(
+    'veille_scraper_offres_nouvelles_total', 'Offres nouvelles par source', ('source',))
+SOURCES_EN_ATTENTE = registre.jauge(
+    'veille_scraping_sources_en_attente', 'Sources restant à traiter dans le passage global en cours')
+FETCH_DUREE = registre.histogramme(
+    'veille_fetch_duration_seconds', 'Durée des requêtes HTTP des scrapers par hôte', ('hote',), BUCKETS_FETCH)
+FETCH_ERREURS = registre.compteur(
+    'veille_fetch_errors_total', 'Erreurs réseau ou HTTP >= 400 des scrapers par hôte', ('hote',))
+
+# IA locale
+OLLAMA_DUREE = registre.histogramme(
+    'veille_ollama_duration_seconds', 'Durée des appels Ollama', ('resultat',), BUCKETS_OLLAMA)
@@ -0,0 +1,357 @@
+"""
+Résumés (digests) des nouvelles offres par abonné, livrés par e-mail ou webhook
+Après chaque passage du scraping, les correspondances de recherches sauvegardées apparues
+depuis le passage précédent (curseur `digest_dernier_id`) sont lues en une requête et
+regroupées par utilisateur; les résumés sont rendus en lot et déposés dans la boîte d'envoi
+`notifications_sortantes`. La livraison (une connexion SMTP par lot) reprend les échecs
+avec un délai doublé à chaque tentative, jusqu'à NOTIFICATIONS_MAX_TENTATIVES.
+
+Plusieurs passages peuvent se chevaucher (autre worker, route admin): le curseur n'est avancé
+que s'il n'a pas bougé depuis sa lecture, et chaque notification est réservée ('en_cours')
+avant son envoi, si bien qu'un résumé n'est ni déposé ni envoyé deux fois.
+"""
+
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+import ipaddress
+import json
+import logging
+import smtplib
+import socket
+from urllib.parse import urlsplit
+
+from sqlalchemy.exc import IntegrityError
+
+from database.models import (
+    db, Offre, RechercheSauvegardee, CorrespondanceRecherche,
+    AbonnementNotification, NotificationSortante, ParametreSysteme,
+)
+from database.sqlite_tuning import file_ecritures
+
+logger = logging.getLogger(__name__)
+
+CANAUX = ('email', 'webhook')
+CLE_CURSEUR = 'digest_dernier_id'
+DELAI_REPRISE_MAX = 6 * 3600
+# Une réservation non terminée (process arrêté pendant l'envoi) est reprise après ce délai
+DUREE_RESERVATION = 3600
+
+
+def _offre_resume(offre, recherches):
+    return {
+        'id': offre.id,
+        'titre': offre.titre,
+        'source': offre.source,
+        'partenaire': offre.partenaire,
+        'url': offre.url,
+        'date_cloturation': offre.date_cloturation.isoformat() if offre.date_cloturation else None,
+        'recherches': recherches,
+    }
+
+
+def rendre_email(offres, total):
+    """(sujet, corps texte) d'un résumé e-mail."""
+    s = 's' if total > 1 else ''
+    sujet = f"Veille Stratégique: {total} nouvelle{s} offre{s}"
+    lignes = [
+        'Bonjour,',
+        '',
+        f"{total} nouvelle{s} offre{s} correspond{'ent' if total > 1 else ''} à vos recherches sauvegardées:",
+        '',
+    ]
+    for o in offres:
+        cloture = f" - clôture {o['date_cloturation'][:10]}" if o['date_cloturation'] else ''
+        lignes.append(f"- {o['titre']} ({o['source']}){cloture}")
+        lignes.append(f"  Recherches: {', '.join(o['recherches'])}")
+        lignes.append(f"  {o['url']}")
+    if total > len(offres):
+        lignes.append(f"... et {total - len(offres)} autre(s) sur /offres")
+    return sujet, '\n'.join(lignes) + '\n'
+
+
+def rendre_webhook(email, offres, total):
+    return json.dumps({
+        'utilisateur': email,
+        'total': total,
+        'offres': offres,
+        'date': datetime.utcnow().isoformat(),
+    }, ensure_ascii=False)
+
+
+def generer_digests(max_offres=50, maintenant=None):
+    """Déposer dans la boîte d'envoi un résumé par abonnement ayant de nouvelles correspondances.
+
+    Coût proportionnel au nombre de correspondances nouvelles (curseur sur leur id).
+    Retourne {'correspondances', 'utilisateurs', 'notifications'}.
+    """
+    maintenant = maintenant or datetime.utcnow()
+    marqueur = db.session.get(ParametreSysteme, CLE_CURSEUR)
+    valeur_lue = marqueur.valeur if marqueur else None
+    curseur = int(valeur_lue) if valeur_lue else 0
+    fin = db.session.scalar(db.select(db.func.max(CorrespondanceRecherche.id)))
+    if fin is None or fin <= curseur:
+        return {'correspondances': 0, 'utilisateurs': 0, 'notifications': 0}
+
+    lignes = db.session.execute(
+        db.select(
+            CorrespondanceRecherche.offre_id, RechercheSauvegardee.utilisateur_email,
+            RechercheSauvegardee.nom, RechercheSauvegardee.texte,
+        )
+        .join(RechercheSauvegardee, RechercheSauvegardee.id == CorrespondanceRecherche.recherche_id)
+        .where(
+            CorrespondanceRecherche.id > curseur,
+            CorrespondanceRecherche.id <= fin,
+            RechercheSauvegardee.actif == True,
+        )
+        .order_by(CorrespondanceRecherche.id)
+    ).all()
+
+    # utilisateur -> offre_id -> noms des recherches
+    par_utilisateur = {}
+    for offre_id, email, nom, texte in lignes:
+        noms = par_utilisateur.setdefault(email, {}).setdefault(offre_id, [])
+        nom = nom or texte or '?'
+        if nom not in noms:
+            noms.append(nom)
+
+    abonnements = []
+    if par_utilisateur:
+        abonnements = AbonnementNotification.query.filter(
+            AbonnementNotification.actif == True,
+            AbonnementNotification.utilisateur_email.in_(list(par_utilisateur)),
+        ).all()
+
+    # Offres des utilisateurs abonnés, chargées une seule fois pour tous les résumés
+    ids = list({oid for a in abonnements for oid in par_utilisateur[a.utilisateur_email]})
+    offres = {}
+    for i in range(0, len(ids), 500):
+        for o in Offre.query.filter(Offre.id.in_(ids[i:i + 500]), Offre.actif == True):
+            offres[o.id] = o
+
+    rendus = {}
+    notifications = []
+    for a in abonnements:
+        cle = (a.utilisateur_email, a.canal)
+        if cle not in rendus:
+            selection = [
+                _offre_resume(offres[oid], noms)
+                for oid, noms in par_utilisateur[a.utilisateur_email].items() if oid in offres
+            ]
+            if not selection:
+                rendus[cle] = None
+            else:
+                total = len(selection)
+                selection.sort(key=lambda o: o['id'], reverse=True)
+                selection = selection[:max_offres]
+                if a.canal == 'email':
+                    sujet, corps = rendre_email(selection, total)
+                else:
+                    sujet, corps = f'{total} offre(s)', rendre_webhook(a.utilisateur_email, selection, total)
+                rendus[cle] = (sujet, corps, total)
+        if rendus[cle] is None:
+            continue
+        sujet, corps, total = rendus[cle]
+        notifications.append({
+            'abonnement_id': a.id,
+            'canal': a.canal,
+            'adresse': a.adresse,
+            'sujet': sujet,
+            'corps': corps,
+            'nombre_offres': total,
+            'statut': 'en_attente',
+            'tentatives': 0,
+            'prochaine_tentative': maintenant,
+            'date_creation': maintenant,
+        })
+
+    with file_ecritures.ecrire():
+        # Avancer le curseur seulement s'il vaut encore la valeur lue: sinon un passage concurrent
+        # a déjà déposé les résumés de ces correspondances
+        try:
+            if marqueur is None:
+                db.session.add(ParametreSysteme(cle=CLE_CURSEUR, valeur=str(fin)))
+                db.session.flush()
+                avance = True
+            else:
+                avance = db.session.execute(
+                    db.update(ParametreSysteme)
+                    .where(ParametreSysteme.cle == CLE_CURSEUR, ParametreSysteme.valeur == valeur_lue)
+                    .values(valeur=str(fin))
+                    .execution_options(synchronize_session=False)
+                ).rowcount == 1
+        except IntegrityError:
+            avance = False
+        if not avance:
+            db.session.rollback()
+            logger.info("Curseur des résumés avancé par un autre passage, résumés non déposés")
+            return {'correspondances': 0, 'utilisateurs': 0, 'notifications': 0}
+        if notifications:
+            db.session.execute(db.insert(NotificationSortante), notifications)
+        db.session.commit()
+    return {
+        'correspondances': len(lignes),
+        'utilisateurs': len(par_utilisateur),
+        'notifications': len(notifications),
+    }
+
+
+def _ouvrir_smtp(config):
+    hote = config.get('SMTP_HOST')
+    if not hote:
+        raise RuntimeError('SMTP non configuré (SMTP_HOST)')
+    smtp = smtplib.SMTP(hote, int(config.get('SMTP_PORT', 587)), timeout=int(config.get('SMTP_TIMEOUT', 20)))
+    if config.get('SMTP_STARTTLS', True):
+        smtp.starttls()
+    if config.get('SMTP_USER'):
+        smtp.login(config.get('SMTP_USER'), config.get('SMTP_PASSWORD') or '')
+    return smtp
+
+
+def _envoyer_email(smtp, config, notification):
+    message = EmailMessage()
+    message['From'] = config.get('SMTP_FROM') or config.get('CONTACT_EMAIL')
+    message['To'] = notification.adresse
+    message['Subject'] = notification.sujet
+    message.set_content(notification.corps)
+    smtp.send_message(message)
+
+
+def verifier_webhook(url, hotes_autorises=None):
+    """Message d'erreur si `url` ne peut pas recevoir de webhook, sinon None.
+
+    Avec WEBHOOK_HOTES_AUTORISES (`hotes_autorises`), seuls ces hôtes sont acceptés. Sinon
+    l'hôte doit résoudre uniquement vers des adresses publiques: ni localhost (Ollama),
+    ni réseau privé, ni lien local (métadonnées cloud 169.254.169.254).
+    """
+    try:
+        parts = urlsplit(url or '')
+        hote = (parts.hostname or '').rstrip('.').lower()
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+    except ValueError:
+        return 'URL de webhook invalide'
+    if parts.scheme not in ('http', 'https') or not hote:
+        return 'URL de webhook invalide'
+    if hotes_autorises:
+        return None if hote in {h.lower() for h in hotes_autorises} else 'Hôte de webhook non autorisé'
+    try:
+        adresses = {info[4][0] for info in socket.getaddrinfo(hote, port, proto=socket.IPPROTO_TCP)}
+    except (socket.gaierror, UnicodeError):
+        return 'Hôte de webhook introuvable'
+    for adresse in adresses:
+        ip = ipaddress.ip_address(adresse.split('%')[0])
+        if not ip.is_global or ip.is_multicast:
+            return 'Hôte de webhook non autorisé (adresse privée ou réservée)'
+    return None
+
+
+def _envoyer_webhook(config, notification):
+    import requests
+
+    # Vérifié aussi à l'envoi: abonnements antérieurs au contrôle, DNS modifié depuis l'abonnement
+    erreur = verifier_webhook(notification.adresse, config.get('WEBHOOK_HOTES_AUTORISES'))
+    if erreur:
+        raise ValueError(erreur)
+    r = requests.post(
+        notification.adresse,
+        data=(notification.corps or '').encode('utf-8'),
+        headers={'Content-Type': 'application/json; charset=utf-8'},
+        timeout=int(config.get('WEBHOOK_TIMEOUT', 10)),
+        allow_redirects=False,
+    )
+    if r.is_redirect:
+        raise ValueError(f'Redirection du webhook refusée ({r.status_code})')
+    r.raise_for_status()
+
+
+def _reserver(limite, maintenant):
+    """Réserver (statut 'en_cours') les notifications dues, au plus `limite`; retourne leurs ids.
+
+    Une ligne n'est réservée que si elle est encore due au moment de l'UPDATE (contrôle du
+    nombre de lignes modifiées): un passage concurrent ne peut pas réserver la même.
+    """
+    dues = (
+        NotificationSortante.statut.in_(('en_attente', 'en_cours')),
+        NotificationSortante.prochaine_tentative <= maintenant,
+    )
+    candidates = db.session.scalars(
+        db.select(NotificationSortante.id).where(*dues).order_by(NotificationSortante.id).limit(limite)
+    ).all()
+    reservees = []
+    if not candidates:
+        return reservees
+    with file_ecritures.ecrire():
+        for notification_id in candidates:
+            r = db.session.execute(
+                db.update(NotificationSortante)
+                .where(NotificationSortante.id == notification_id, *dues)
+                .values(statut='en_cours', prochaine_tentative=maintenant + timedelta(seconds=DUREE_RESERVATION))
+                .execution_options(synchronize_session=False)
+            )
+            if r.rowcount == 1:
+                reservees.append(notification_id)
+        db.session.commit()
+    return reservees
+
+
+def livrer_notifications(config, limite=200, maintenant=None):
+    """Livrer les notifications dues de la boîte d'envoi (au plus `limite`).
+
+    Les notifications sont d'abord réservées; les envois ont lieu hors transaction et les
+    statuts sont écrits en un commit à la fin. Retourne {'envoyees', 'reprises', 'abandonnees'}.
+    """
+    maintenant = maintenant or datetime.utcnow()
+    reservees = _reserver(limite, maintenant)
+    dues = []
+    for i in range(0, len(reservees), 500):
+        dues.extend(NotificationSortante.query.filter(NotificationSortante.id.in_(reservees[i:i + 500])))
+    dues.sort(key=lambda n: n.id)
+
+    max_tentatives = int(config.get('NOTIFICATIONS_MAX_TENTATIVES', 6))
+    delai = int(config.get('NOTIFICATIONS_DELAI_REPRISE', 60))
+    compteurs = {'envoyees': 0, 'reprises': 0, 'abandonnees': 0}
+    smtp = None
+    try:
+        for n in dues:
+            try:
+                if n.canal == 'email':
+                    if smtp is None:
+                        smtp = _ouvrir_smtp(config)
+                    _envoyer_email(smtp, config, n)
+                elif n.canal == 'webhook':
+                    _envoyer_webhook(config, n)
+                else:
+                    raise ValueError(f'Canal inconnu: {n.canal}')
+                n.statut = 'envoyee'
+                n.date_envoi = maintenant
+                n.derniere_erreur = None
+                compteurs['envoyees'] += 1
+            except Exception as e:
+                if n.canal == 'email' and smtp is not None:
+                    # Connexion SMTP dans un état inconnu: rouverte pour la notification suivante
+                    try:
+                        smtp.close()
+                    except Exception:
+                        pass
+                    smtp = None
+                n.tentatives = (n.tentatives or 0) + 1
+                n.derniere_erreur = f'{type(e).__name__}: {e}'[:500]
+                if n.tentatives >= max_tentatives:
+                    n.statut = 'echec'
+                    compteurs['abandonnees'] += 1
+                else:
+                    attente = min(delai * 2 ** (n.tentatives - 1), DELAI_REPRISE_MAX)
+                    n.statut = 'en_attente'
+                    n.prochaine_tentative = maintenant + timedelta(seconds=attente)
+                    compteurs['reprises'] += 1
+                logger.warning(f"Notification {n.id} ({n.canal}) non livrée: {n.derniere_erreur}")
+    finally:
+        if smtp is not None:
+            try:
+                smtp.quit()
+            except Exception:
+                pass
+
+    if dues:
+        with file_ecritures.ecrire():
+            db.session.commit()
+    return compteurs
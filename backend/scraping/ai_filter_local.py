@@ -1,7 +1,11 @@
 import json
 import os
+import threading
+import time
 import requests
 
+import metrics
+
 
 class LocalAIFilter:
     def __init__(self):
@@ -89,7 +93,13 @@ class LocalAIFilter:
         }
 
         try:
-            r = requests.post(f"{self.ollama_url}/api/generate", json=payload, timeout=self.timeout)
+            t0 = time.perf_counter()
+            try:
+                r = requests.post(f"{self.ollama_url}/api/generate", json=payload, timeout=self.timeout)
+            except Exception:
+                metrics.OLLAMA_DUREE.observer(time.perf_counter() - t0, resultat='erreur')
+                raise
+            metrics.OLLAMA_DUREE.observer(time.perf_counter() - t0, resultat='ok' if r.ok else 'erreur')
             if not r.ok:
                 return {'keep': True, 'score': None, 'resume': None, 'lieu_execution_ci': None, 'raisons': [], 'used_ai': False}
 
@@ -132,3 +142,47 @@ class LocalAIFilter:
             }
         except Exception:
             return {'keep': True, 'score': None, 'resume': None, 'lieu_execution_ci': None, 'raisons': [], 'used_ai': False}
+
+
+_statut = {'valeur': None, 'expire': 0.0, 'en_cours': False}
+_statut_verrou = threading.Lock()
+
+
+def _sonder_statut():
+    ai = LocalAIFilter()
+    return {
+        'enabled': bool(ai.enabled),
+        'available': bool(ai.is_available()),
+        'model': ai.model,
+        'ollama_url': ai.ollama_url,
+    }
+
+
+def _rafraichir_statut(ttl):
+    try:
+        valeur = _sonder_statut()
+        with _statut_verrou:
+            _statut.update(valeur=valeur, expire=time.monotonic() + ttl)
+    finally:
+        _statut['en_cours'] = False
+
+
+def statut_ia(ttl=60):
+    """Statut de l'IA locale (enabled, available, model, ollama_url) mis en cache `ttl` secondes.
+
+    Seul le premier appel sonde Ollama en direct; ensuite une valeur périmée est renvoyée
+    telle quelle pendant qu'un thread la rafraîchit (aucune requête HTTP n'attend Ollama).
+    """
+    with _statut_verrou:
+        valeur = _statut['valeur']
+        a_rafraichir = valeur is not None and time.monotonic() >= _statut['expire'] and not _statut['en_cours']
+        if a_rafraichir:
+            _statut['en_cours'] = True
+    if valeur is None:
+        valeur = _sonder_statut()
+        with _statut_verrou:
+            _statut.update(valeur=valeur, expire=time.monotonic() + ttl)
+        return dict(valeur)
+    if a_rafraichir:
+        threading.Thread(target=_rafraichir_statut, args=(ttl,), daemon=True, name='statut-ia').start()
+    return dict(valeur)
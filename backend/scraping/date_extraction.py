@@ -0,0 +1,233 @@
+"""
+Extraction et normalisation des dates (date limite, publication)
+Motifs précompilés, table des mois FR/EN, chemin strict avant le parsing flou
+et cache mémoire pour les chaînes déjà vues.
+"""
+
+from collections import namedtuple
+from datetime import datetime, timezone
+from functools import lru_cache
+import re
+import unicodedata
+
+from dateutil import parser as date_parser
+
+# Niveaux de confiance (du plus fiable au moins fiable)
+CONFIANCE_HAUTE = 'haute'      # date lisible machine (ISO, <time datetime>)
+CONFIANCE_MOYENNE = 'moyenne'  # format strict reconnu (15/02/2026, 15 février 2026)
+CONFIANCE_BASSE = 'basse'      # parsing flou (dateutil fuzzy)
+
+DateExtraite = namedtuple('DateExtraite', ['date', 'confiance', 'origine'])
+
+# Table des mois (clés sans accents, en minuscules)
+MOIS = {
+    # Français
+    'janvier': 1, 'janv': 1,
+    'fevrier': 2, 'fevr': 2, 'fev': 2,
+    'mars': 3,
+    'avril': 4, 'avr': 4,
+    'mai': 5,
+    'juin': 6,
+    'juillet': 7, 'juil': 7,
+    'aout': 8,
+    'septembre': 9,
+    'octobre': 10,
+    'novembre': 11,
+    'decembre': 12,
+    # Anglais
+    'january': 1, 'jan': 1,
+    'february': 2, 'feb': 2,
+    'march': 3, 'mar': 3,
+    'april': 4, 'apr': 4,
+    'may': 5,
+    'june': 6, 'jun': 6,
+    'july': 7, 'jul': 7,
+    'august': 8, 'aug': 8,
+    'september': 9, 'sept': 9, 'sep': 9,
+    'october': 10, 'oct': 10,
+    'november': 11, 'nov': 11,
+    'december': 12, 'dec': 12,
+}
+
+_MOIS_EN = {
+    1: 'january', 2: 'february', 3: 'march', 4: 'april', 5: 'may', 6: 'june',
+    7: 'july', 8: 'august', 9: 'september', 10: 'october', 11: 'november', 12: 'december',
+}
+
+_JOURS = (
+    'lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche',
+    'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday',
+    'mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun',
+)
+
+_MOIS_ALT = '|'.join(sorted(MOIS, key=len, reverse=True))
+_JOURS_ALT = '|'.join(sorted(_JOURS, key=len, reverse=True))
+
+# Heure optionnelle: "à 10h", "a 10h30", "at 10:00", "10 h 30 min"
+_HEURE = r"(?:\s*,?\s*(?:a|at)?\s*(\d{1,2})\s*[:h]\s*(\d{2})?(?:\s*(?:min|mn))?)?"
+_PREFIXE_JOUR = rf"(?:(?:{_JOURS_ALT})\.?,?\s+)?"
+
+_RE_DMY = re.compile(rf"^{_PREFIXE_JOUR}(\d{{1,2}})[./\-](\d{{1,2}})[./\-](\d{{4}}|\d{{2}})\b{_HEURE}")
+_RE_YMD = re.compile(rf"^(\d{{4}})[./\-](\d{{1,2}})[./\-](\d{{1,2}})\b{_HEURE}")
+_RE_TEXTE_DMY = re.compile(rf"^{_PREFIXE_JOUR}(\d{{1,2}})(?:er|st|nd|rd|th)?\s+({_MOIS_ALT})\.?,?\s+(\d{{4}})\b{_HEURE}")
+_RE_TEXTE_MDY = re.compile(rf"^{_PREFIXE_JOUR}({_MOIS_ALT})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+(\d{{4}})\b{_HEURE}")
+_RE_MOIS_MOT = re.compile(rf"\b({_MOIS_ALT})\b\.?")
+
+_DECLENCHEURS = (
+    r"(?:date\s+limite(?:\s+de\s+(?:soumission|depot|remise))?|date\s+de\s+cloture|cloture"
+    r"|deadline|closing\s+date|submission\s+deadline|depot\s+des\s+offres|date\s+de\s+depot)"
+)
+_CANDIDAT = (
+    r"(\d{1,2}[./\-]\d{1,2}[./\-]\d{2,4}"
+    r"|\d{4}[./\-]\d{1,2}[./\-]\d{1,2}"
+    rf"|(?:(?:{_JOURS_ALT})\.?,?\s+)?\d{{1,2}}(?:er|st|nd|rd|th)?\s+[a-z]+\.?,?\s+\d{{2,4}}"
+    rf"|(?:{_MOIS_ALT})\.?\s+\d{{1,2}}(?:st|nd|rd|th)?,?\s+\d{{4}})"
+)
+_RE_DATE_LIMITE = re.compile(
+    rf"{_DECLENCHEURS}\s*[:\-–]?\s*(?:le\s+|du\s+|on\s+)?{_CANDIDAT}{_HEURE}",
+    flags=re.IGNORECASE,
+)
+
+
+def normaliser_texte(texte: str) -> str:
+    """Minuscules, sans accents, espaces compactés (utilisé avant les regex)."""
+    t = (texte or '').lower().replace(' ', ' ').replace('’', "'")
+    t = ''.join(ch for ch in unicodedata.normalize('NFKD', t) if not unicodedata.combining(ch))
+    return ' '.join(t.split())
+
+
+def _naive_utc(dt):
+    if dt is not None and dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def _construire(annee, mois, jour, heure=None, minute=None):
+    try:
+        annee = int(annee)
+        if annee < 100:
+            annee += 2000
+        return datetime(annee, int(mois), int(jour), int(heure or 0), int(minute or 0))
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_strict(t: str, dayfirst: bool):
+    """Formats stricts sur texte normalisé. Retourne (datetime, confiance) ou (None, None)."""
+    # 1) ISO 8601 (le plus courant: <time datetime>, JSON, valeurs déjà sérialisées)
+    if t[:4].isdigit() and len(t) >= 10 and t[4] == '-':
+        try:
+            return _naive_utc(datetime.fromisoformat(t.upper().replace(' ', 'T', 1))), CONFIANCE_HAUTE
+        except ValueError:
+            pass
+
+    m = _RE_YMD.match(t)
+    if m:
+        return _construire(m.group(1), m.group(2), m.group(3), m.group(4), m.group(5)), CONFIANCE_MOYENNE
+
+    m = _RE_DMY.match(t)
+    if m:
+        a, b = int(m.group(1)), int(m.group(2))
+        jour, mois = (a, b) if dayfirst else (b, a)
+        if mois > 12 and jour <= 12:
+            jour, mois = mois, jour
+        return _construire(m.group(3), mois, jour, m.group(4), m.group(5)), CONFIANCE_MOYENNE
+
+    m = _RE_TEXTE_DMY.match(t)
+    if m:
+        return _construire(m.group(3), MOIS[m.group(2)], m.group(1), m.group(4), m.group(5)), CONFIANCE_MOYENNE
+
+    m = _RE_TEXTE_MDY.match(t)
+    if m:
+        return _construire(m.group(3), MOIS[m.group(1)], m.group(2), m.group(4), m.group(5)), CONFIANCE_MOYENNE
+
+    return None, None
+
+
+def _parse_flou(t: str, dayfirst: bool):
+    # dateutil ne connaît pas les mois français: les traduire avant le parsing flou
+    t = _RE_MOIS_MOT.sub(lambda m: _MOIS_EN[MOIS[m.group(1)]], t)
+    t = re.sub(r"(\d{1,2})\s*h\s*(\d{2})", r"\1:\2", t)
+    try:
+        return _naive_utc(date_parser.parse(t, dayfirst=dayfirst, fuzzy=True))
+    except (ValueError, OverflowError, TypeError):
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _parse_cache(texte: str, dayfirst: bool, flou: bool):
+    t = normaliser_texte(texte)
+    if not t:
+        return None, None
+    dt, confiance = _parse_strict(t, dayfirst)
+    if dt is not None:
+        return dt, confiance
+    if not flou:
+        return None, None
+    dt = _parse_flou(t, dayfirst)
+    return (dt, CONFIANCE_BASSE) if dt is not None else (None, None)
+
+
+def parse_date_confiance(valeur, dayfirst=True, flou=True):
+    """Parser une date (chemin strict puis flou). Retourne (datetime naïf UTC, confiance)."""
+    if valeur is None or valeur == '':
+        return None, None
+    if isinstance(valeur, datetime):
+        return _naive_utc(valeur), CONFIANCE_HAUTE
+    if not isinstance(valeur, str):
+        return None, None
+    return _parse_cache(valeur.strip(), bool(dayfirst), bool(flou))
+
+
+def parse_date(valeur, dayfirst=True, flou=True):
+    """Parser une date et retourner un datetime naïf (UTC) ou None."""
+    return parse_date_confiance(valeur, dayfirst=dayfirst, flou=flou)[0]
+
+
+def coerce_datetime(valeur):
+    """Normaliser une valeur (datetime ou chaîne de date) en datetime naïf UTC.
+
+    Formats stricts uniquement (mois en premier pour les formats ambigus, comme
+    dateutil par défaut): un texte libre ("Open until 2026", "Lot 3 - 12 mois")
+    donne None plutôt qu'une fausse date limite.
+    """
+    return parse_date(valeur, dayfirst=False, flou=False)
+
+
+def extraire_date_limite_texte(texte: str):
+    """Chercher une date limite introduite par un déclencheur ("date limite", "deadline"...)."""
+    t = normaliser_texte(texte)
+    if not t:
+        return None
+    for m in _RE_DATE_LIMITE.finditer(t):
+        candidat = t[m.start(1):m.end()]
+        dt, confiance = parse_date_confiance(candidat, dayfirst=True)
+        if dt is not None:
+            return DateExtraite(dt, confiance, 'texte')
+    return None
+
+
+def extraire_date_limite(soup):
+    """Extraire la date limite d'une page parsée (BeautifulSoup).
+
+    Ordre: balises <time datetime> (confiance haute), puis texte avec déclencheur.
+    """
+    if not soup:
+        return None
+
+    for t in soup.find_all('time'):
+        if t and t.has_attr('datetime'):
+            dt, confiance = parse_date_confiance(t['datetime'], flou=False)
+            if dt is not None:
+                return DateExtraite(dt, confiance, 'time')
+
+    return extraire_date_limite_texte(soup.get_text(' ', strip=True))
+
+
+def vider_cache():
+    """Vider le cache des dates parsées (tests / benchmarks)."""
+    _parse_cache.cache_clear()
+
+
+def infos_cache():
+    return _parse_cache.cache_info()
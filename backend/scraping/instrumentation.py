@@ -0,0 +1,79 @@
+"""
+Mesures par étape d'une exécution de scraping (temps et compteurs)
+Un collecteur est activé pour le thread courant pendant `executer_source`;
+`BaseScraper` et `_sauvegarder_offres` y ajoutent leurs mesures sans le recevoir en paramètre.
+Hors exécution instrumentée, les appels sont des no-op.
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+import threading
+import time
+
+# Étapes mesurées (secondes). 'fetch' et 'parse_html' sont inclus dans 'scrape'.
+ETAPES = ('scrape', 'fetch', 'parse_html', 'quasi_doublons', 'pdf', 'filtre_strict', 'ia', 'db')
+
+_local = threading.local()
+
+
+class MesuresExecution:
+    """Temps cumulés par étape, compteurs et rejets par raison pour une exécution."""
+
+    def __init__(self):
+        self.etapes = defaultdict(float)
+        self.compteurs = defaultdict(int)
+        self.rejets = defaultdict(int)
+
+    @contextmanager
+    def etape(self, nom):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.etapes[nom] += time.perf_counter() - t0
+
+    def incrementer(self, nom, n=1):
+        self.compteurs[nom] += n
+
+    def rejeter(self, raison):
+        self.rejets[raison] += 1
+
+    def to_dict(self):
+        return {
+            'etapes': {k: round(v, 4) for k, v in self.etapes.items()},
+            'compteurs': dict(self.compteurs),
+            'rejets': dict(self.rejets),
+        }
+
+
+class _MesuresInactives:
+    """Collecteur no-op utilisé hors exécution instrumentée."""
+
+    def etape(self, nom):
+        return nullcontext()
+
+    def incrementer(self, nom, n=1):
+        pass
+
+    def rejeter(self, raison):
+        pass
+
+
+_INACTIVES = _MesuresInactives()
+
+
+def mesures_courantes():
+    """Collecteur actif du thread courant (no-op si aucun)."""
+    return getattr(_local, 'mesures', None) or _INACTIVES
+
+
+@contextmanager
+def collecter(mesures=None):
+    """Activer un collecteur pour le thread courant le temps du bloc."""
+    mesures = mesures if mesures is not None else MesuresExecution()
+    precedent = getattr(_local, 'mesures', None)
+    _local.mesures = mesures
+    try:
+        yield mesures
+    finally:
+        _local.mesures = precedent
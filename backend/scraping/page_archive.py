@@ -0,0 +1,246 @@
+"""
+Archive brute des pages récupérées (format WARC compressé, append-only)
+Chaque réponse HTTP est un membre gzip indépendant dans un segment mensuel;
+un index SQLite (url, date) donne l'offset pour une relecture directe.
+Sert à ré-extraire les offres hors ligne et de corpus de non-régression.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+import gzip
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+logger = logging.getLogger(__name__)
+
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    status INTEGER,
+    content_type TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_records_url_ts ON records (url, ts);
+CREATE INDEX IF NOT EXISTS ix_records_ts ON records (ts);
+"""
+
+
+class ArchivePages:
+    """Archive append-only des réponses HTTP (URL, en-têtes, corps, date)."""
+
+    def __init__(self, dossier, max_body_bytes=10 * 1024 * 1024):
+        self.dossier = dossier
+        self.max_body_bytes = max_body_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.dossier, exist_ok=True)
+        self.index_path = os.path.join(self.dossier, 'index.sqlite')
+        with self._connexion() as conn:
+            conn.executescript(_INDEX_SCHEMA)
+
+    @contextmanager
+    def _connexion(self):
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            conn.execute('PRAGMA busy_timeout=30000')
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _segment(self, date):
+        # Un segment par mois et par process: les offsets restent fiables avec plusieurs workers
+        return f"pages-{date:%Y%m}-{os.getpid()}.warc.gz"
+
+    @staticmethod
+    def _encoder(url, status, headers, body, date):
+        http_lines = [f"HTTP/1.1 {int(status or 200)}"]
+        for k, v in (headers or {}).items():
+            if k.lower() in ('content-encoding', 'transfer-encoding', 'content-length'):
+                continue
+            http_lines.append(f"{k}: {v}")
+        http_block = ('\r\n'.join(http_lines) + '\r\n\r\n').encode('utf-8') + (body or b'')
+        warc_headers = (
+            "WARC/1.0\r\n"
+            "WARC-Type: response\r\n"
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+            f"WARC-Target-URI: {url}\r\n"
+            f"WARC-Date: {date:%Y-%m-%dT%H:%M:%SZ}\r\n"
+            "Content-Type: application/http; msgtype=response\r\n"
+            f"Content-Length: {len(http_block)}\r\n\r\n"
+        ).encode('utf-8')
+        return gzip.compress(warc_headers + http_block + b'\r\n\r\n')
+
+    @staticmethod
+    def _decoder(raw):
+        data = gzip.decompress(raw)
+        warc_head, _, rest = data.partition(b'\r\n\r\n')
+        warc = {}
+        for line in warc_head.decode('utf-8', 'replace').split('\r\n')[1:]:
+            k, _, v = line.partition(':')
+            warc[k.strip().lower()] = v.strip()
+        length = int(warc.get('content-length') or len(rest))
+        http_block = rest[:length]
+        http_head, _, body = http_block.partition(b'\r\n\r\n')
+        lines = http_head.decode('utf-8', 'replace').split('\r\n')
+        try:
+            status = int(lines[0].split(' ')[1])
+        except (IndexError, ValueError):
+            status = 200
+        headers = CaseInsensitiveDict()
+        for line in lines[1:]:
+            k, _, v = line.partition(':')
+            if k:
+                headers[k.strip()] = v.strip()
+        return {
+            'url': warc.get('warc-target-uri'),
+            'date': warc.get('warc-date'),
+            'status': status,
+            'headers': headers,
+            'body': body,
+        }
+
+    def enregistrer(self, url, status, headers, body, date=None):
+        """Ajouter une réponse à l'archive. Retourne False si ignorée (trop volumineuse)."""
+        body = body or b''
+        if len(body) > self.max_body_bytes:
+            return False
+        date = date or datetime.utcnow()
+        record = self._encoder(url, status, headers, body, date)
+        segment = self._segment(date)
+        path = os.path.join(self.dossier, segment)
+        content_type = (headers or {}).get('Content-Type') or (headers or {}).get('content-type')
+
+        with self._lock:
+            with open(path, 'ab') as fh:
+                offset = fh.tell()
+                fh.write(record)
+            with self._connexion() as conn:
+                conn.execute(
+                    "INSERT INTO records (url, ts, segment, offset, length, status, content_type) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (url, date.isoformat(), segment, offset, len(record), int(status or 200), content_type),
+                )
+        return True
+
+    def lire(self, url, jusqua=None):
+        """Dernière réponse archivée pour `url` (antérieure à `jusqua` si fourni), ou None."""
+        with self._connexion() as conn:
+            if jusqua is not None:
+                row = conn.execute(
+                    "SELECT segment, offset, length FROM records WHERE url = ? AND ts <= ? ORDER BY ts DESC LIMIT 1",
+                    (url, jusqua.isoformat()),
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT segment, offset, length FROM records WHERE url = ? ORDER BY ts DESC LIMIT 1",
+                    (url,),
+                ).fetchone()
+        if not row:
+            return None
+        segment, offset, length = row
+        try:
+            with open(os.path.join(self.dossier, segment), 'rb') as fh:
+                fh.seek(offset)
+                return self._decoder(fh.read(length))
+        except (OSError, EOFError, gzip.BadGzipFile) as e:
+            logger.warning(f"Archive illisible pour {url}: {e}")
+            return None
+
+    def stats(self):
+        with self._connexion() as conn:
+            total, urls, debut, fin = conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT url), MIN(ts), MAX(ts) FROM records"
+            ).fetchone()
+        return {'records': total, 'urls': urls, 'debut': debut, 'fin': fin}
+
+
+class ReponseArchivee:
+    """Réponse reconstruite depuis l'archive (sous-ensemble de requests.Response)."""
+
+    depuis_archive = True
+
+    def __init__(self, record, url):
+        self.url = url
+        self.status_code = record['status']
+        self.headers = record['headers']
+        self.content = record['body']
+        self.encoding = 'utf-8'
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or 'utf-8', 'replace')
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} (archive) pour {self.url}", response=self)
+
+    def iter_content(self, chunk_size=64 * 1024):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class SessionArchive:
+    """Remplace `requests.Session` pour rejouer l'archive sans réseau."""
+
+    def __init__(self, archive, jusqua=None):
+        self.archive = archive
+        self.jusqua = jusqua
+        self.headers = {}
+        self.trouvees = 0
+        self.manquantes = 0
+
+    def get(self, url, **kwargs):
+        record = self.archive.lire(url, jusqua=self.jusqua)
+        if record is None:
+            self.manquantes += 1
+            raise requests.exceptions.ConnectionError(f"Absent de l'archive: {url}")
+        self.trouvees += 1
+        return ReponseArchivee(record, url)
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def obtenir_archive():
+    """Archive globale si activée dans la configuration (ARCHIVE_PAGES_ENABLED), sinon None."""
+    global _archive
+    if _archive is not None:
+        return _archive
+    try:
+        from config import Config
+    except ImportError:
+        return None
+    if not getattr(Config, 'ARCHIVE_PAGES_ENABLED', False):
+        return None
+    with _archive_lock:
+        if _archive is None:
+            _archive = ArchivePages(
+                getattr(Config, 'ARCHIVE_PAGES_DIR'),
+                max_body_bytes=int(getattr(Config, 'ARCHIVE_PAGES_MAX_BYTES', 10 * 1024 * 1024)),
+            )
+    return _archive
+
+
+def definir_archive(archive):
+    """Forcer l'archive globale (ex: enregistrement de fixtures de benchmark). None = revenir à la config."""
+    global _archive
+    with _archive_lock:
+        _archive = archive
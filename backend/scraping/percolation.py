@@ -0,0 +1,171 @@
+"""
+Percolation des recherches sauvegardées
+Au lieu de rejouer chaque recherche sur toute la table, les offres d'un lot de
+sauvegarde sont confrontées aux recherches via un index inversé des requêtes:
+chaque recherche est rangée sous une seule clé nécessaire (un trigramme de son texte
+ou de son mot-clé, sinon la valeur exacte d'un filtre), et une offre ne vérifie
+complètement que les recherches dont la clé apparaît chez elle.
+Même sens que /api/offres/rechercher (sous-chaîne du titre, de la description ou des
+mots-clés, insensible à la casse), accents ignorés.
+"""
+
+from datetime import datetime
+import unicodedata
+
+from database.models import db, RechercheSauvegardee, CorrespondanceRecherche
+
+TAILLE_GRAMME = 3
+_SEPARATEUR = '\x00'
+
+
+def normaliser(texte):
+    texte = unicodedata.normalize('NFKD', (texte or '').lower())
+    return ''.join(ch for ch in texte if not unicodedata.combining(ch)).strip()
+
+
+def _gramme(texte):
+    """Trigramme pris au milieu du mot le plus long (texte court: le texte entier)."""
+    mot = max(texte.split() or [texte], key=len)
+    if len(mot) < TAILLE_GRAMME:
+        return texte[:TAILLE_GRAMME]
+    milieu = (len(mot) - TAILLE_GRAMME) // 2
+    return mot[milieu:milieu + TAILLE_GRAMME]
+
+
+class _Recherche:
+    __slots__ = ('id', 'texte', 'mot_cle', 'source', 'partenaire', 'type_offre')
+
+    def __init__(self, r):
+        self.id = r.id
+        self.texte = normaliser(r.texte)
+        self.mot_cle = normaliser(r.mot_cle)
+        self.source = r.source or None
+        self.partenaire = r.partenaire or None
+        self.type_offre = r.type_offre or None
+
+    def correspond(self, texte, mots_cles, offre):
+        if self.source and offre.source != self.source:
+            return False
+        if self.partenaire and offre.partenaire != self.partenaire:
+            return False
+        if self.type_offre and offre.type_offre != self.type_offre:
+            return False
+        if self.mot_cle and self.mot_cle not in mots_cles:
+            return False
+        return not self.texte or self.texte in texte
+
+
+class IndexRecherches:
+    """Index inversé clé -> recherches; les clés de grammes sont cherchées dans le texte de l'offre."""
+
+    def __init__(self, recherches):
+        self.taille = 0
+        self._textes = {}    # gramme -> [recherche] (texte complet de l'offre)
+        self._mots_cles = {}  # gramme -> [recherche] (mots-clés de l'offre)
+        self._filtres = {}   # (champ, valeur) -> [recherche]
+        self._toutes = []
+        for r in recherches:
+            r = _Recherche(r)
+            self.taille += 1
+            if r.texte:
+                self._textes.setdefault(_gramme(r.texte), []).append(r)
+            elif r.mot_cle:
+                self._mots_cles.setdefault(_gramme(r.mot_cle), []).append(r)
+            elif r.source:
+                self._filtres.setdefault(('source', r.source), []).append(r)
+            elif r.partenaire:
+                self._filtres.setdefault(('partenaire', r.partenaire), []).append(r)
+            elif r.type_offre:
+                self._filtres.setdefault(('type_offre', r.type_offre), []).append(r)
+            else:
+                self._toutes.append(r)
+
+    def __len__(self):
+        return self.taille
+
+    @staticmethod
+    def _candidats_grammes(index, texte):
+        if not index:
+            return
+        if len(index) < len(texte):
+            for gramme, recherches in index.items():
+                if gramme in texte:
+                    yield from recherches
+        else:
+            vus = set()
+            for i in range(len(texte) - TAILLE_GRAMME + 1):
+                gramme = texte[i:i + TAILLE_GRAMME]
+                if gramme not in vus:
+                    vus.add(gramme)
+                    yield from index.get(gramme, ())
+            for gramme, recherches in index.items():
+                if len(gramme) < TAILLE_GRAMME and gramme in texte:
+                    yield from recherches
+
+    def correspondances(self, offre):
+        """Ids des recherches auxquelles correspond `offre` (objet ou ligne avec titre, description, ...)."""
+        mots_cles = normaliser(offre.mots_cles)
+        texte = _SEPARATEUR.join((normaliser(offre.titre), normaliser(offre.description), mots_cles))
+        candidats = [
+            *self._candidats_grammes(self._textes, texte),
+            *self._candidats_grammes(self._mots_cles, mots_cles),
+            *self._filtres.get(('source', offre.source), ()),
+            *self._filtres.get(('partenaire', offre.partenaire), ()),
+            *self._filtres.get(('type_offre', offre.type_offre), ()),
+            *self._toutes,
+        ]
+        return {r.id for r in candidats if r.correspond(texte, mots_cles, offre)}
+
+
+_cache = {'version': None, 'index': None}
+
+
+def index_recherches():
+    """Index des recherches actives, reconstruit seulement si elles ont changé (toutes instances confondues)."""
+    version = tuple(db.session.execute(
+        db.select(
+            db.func.count(RechercheSauvegardee.id),
+            db.func.max(RechercheSauvegardee.id),
+            db.func.max(RechercheSauvegardee.date_modification),
+        ).where(RechercheSauvegardee.actif == True)
+    ).one())
+    if _cache['version'] != version:
+        _cache['index'] = IndexRecherches(RechercheSauvegardee.query.filter_by(actif=True).all())
+        _cache['version'] = version
+    return _cache['index']
+
+
+def percoler(offres, maintenant=None):
+    """Enregistrer les correspondances (recherche, offre) des offres visibles de `offres`.
+
+    Les offres doivent avoir un id (flush effectué); les correspondances déjà connues
+    sont ignorées. N'effectue pas de commit. Retourne le nombre de correspondances ajoutées.
+    """
+    maintenant = maintenant or datetime.utcnow()
+    index = index_recherches()
+    if not len(index):
+        return 0
+
+    paires = set()
+    for o in offres:
+        # Offres visibles dans les listes: actives, non expirées, pas quasi-doublon d'une autre
+        if not o.actif or o.groupe_id is not None or o.date_cloturation is None or o.date_cloturation < maintenant:
+            continue
+        paires.update((rid, o.id) for rid in index.correspondances(o))
+    if not paires:
+        return 0
+
+    ids = list({oid for _, oid in paires})
+    connues = set()
+    for i in range(0, len(ids), 500):
+        connues.update(db.session.execute(
+            db.select(CorrespondanceRecherche.recherche_id, CorrespondanceRecherche.offre_id)
+            .where(CorrespondanceRecherche.offre_id.in_(ids[i:i + 500]))
+        ).all())
+    lignes = [
+        {'recherche_id': rid, 'offre_id': oid, 'date_correspondance': maintenant}
+        for rid, oid in sorted(paires - connues)
+    ]
+    if lignes:
+        db.session.execute(db.insert(CorrespondanceRecherche), lignes)
+    return len(lignes)
@@ -0,0 +1,221 @@
+"""
+Détection des quasi-doublons entre sources (SimHash 64 bits + LSH par bandes)
+Une même consultation publiée par le bailleur, le portail national et des agrégateurs
+donne des textes proches: leurs empreintes SimHash diffèrent de quelques bits.
+L'empreinte est découpée en 6 bandes de 10-11 bits indexées (table `empreintes_offres`):
+deux empreintes à distance de Hamming <= 5 partagent au moins une bande, donc une
+recherche = une requête indexée sur les bandes puis une vérification exacte en Python
+(distance et date limite à un jour près).
+"""
+
+from hashlib import blake2b
+import re
+import unicodedata
+
+from database.models import db, Offre, EmpreinteOffre
+from database.sqlite_tuning import file_ecritures
+
+LARGEURS_BANDES = (11, 11, 11, 11, 10, 10)
+NB_BANDES = len(LARGEURS_BANDES)
+DISTANCE_MAX = NB_BANDES - 1  # au-delà, le découpage en bandes ne garantit plus de retrouver le candidat
+DISTANCE_DEFAUT = 4
+MIN_CARACTERISTIQUES = 8
+POIDS_TITRE = 3
+MAX_MOTS_DESCRIPTION = 120
+# Résultat de `chercher` quand seules des offres canoniques désactivées (IA, nettoyage...) correspondent
+GROUPE_INACTIF = -1
+
+MOTS_VIDES = {
+    'de', 'la', 'le', 'les', 'des', 'du', 'et', 'en', 'a', 'au', 'aux', 'd', 'l', 'un', 'une',
+    'pour', 'sur', 'par', 'avec', 'dans', 'ou', 'the', 'of', 'and', 'for', 'to', 'in', 'on', 'n',
+}
+_RE_MOTS = re.compile(r'[a-z0-9]+')
+
+
+def mots_normalises(texte):
+    """Mots en minuscules, sans accents ni ponctuation, hors mots vides."""
+    texte = unicodedata.normalize('NFKD', (texte or '').lower()).encode('ascii', 'ignore').decode('ascii')
+    return [m for m in _RE_MOTS.findall(texte) if m not in MOTS_VIDES]
+
+
+def caracteristiques(titre, description):
+    """Poids par caractéristique (mots et bigrammes; le titre compte triple). None si trop peu de texte."""
+    poids = {}
+    for mots, facteur in ((mots_normalises(titre), POIDS_TITRE),
+                          (mots_normalises(description)[:MAX_MOTS_DESCRIPTION], 1)):
+        for i, mot in enumerate(mots):
+            poids[mot] = poids.get(mot, 0) + facteur
+            if i:
+                bigramme = f'{mots[i - 1]} {mot}'
+                poids[bigramme] = poids.get(bigramme, 0) + facteur
+    return poids if len(poids) >= MIN_CARACTERISTIQUES else None
+
+
+def _hash64(caracteristique):
+    return int.from_bytes(blake2b(caracteristique.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+# Comptage des bits à 1 pondérés, les 64 compteurs étant rangés dans un seul entier
+# (un « couloir » de 32 bits par position): 8 recherches de table par caractéristique
+# au lieu d'une boucle sur les 64 bits. _ETALEMENT[k][octet]: octet k du condensé
+# (gros-boutiste, comme `_hash64`) étalé sur ses 8 couloirs.
+_COULOIR = 32
+_ETALEMENT = [
+    [sum(((octet >> b) & 1) << ((8 * (7 - k) + b) * _COULOIR) for b in range(8)) for octet in range(256)]
+    for k in range(8)
+]
+
+
+def simhash(poids):
+    """SimHash 64 bits (entier non signé) d'un dict caractéristique -> poids."""
+    t0, t1, t2, t3, t4, t5, t6, t7 = _ETALEMENT
+    par_poids = {}
+    for caracteristique, p in poids.items():
+        d = blake2b(caracteristique.encode('utf-8'), digest_size=8).digest()
+        par_poids[p] = par_poids.get(p, 0) + (
+            t0[d[0]] | t1[d[1]] | t2[d[2]] | t3[d[3]] | t4[d[4]] | t5[d[5]] | t6[d[6]] | t7[d[7]]
+        )
+    cumul = sum(p * etale for p, etale in par_poids.items())
+    total = sum(poids.values())
+    masque = (1 << _COULOIR) - 1
+    # Bit à 1 si le poids des caractéristiques l'ayant à 1 dépasse la moitié du poids total
+    return sum(1 << bit for bit in range(64) if 2 * ((cumul >> (_COULOIR * bit)) & masque) > total)
+
+
+def empreinte(titre, description):
+    poids = caracteristiques(titre, description)
+    return simhash(poids) if poids else None
+
+
+def bandes(h):
+    valeurs = []
+    for largeur in LARGEURS_BANDES:
+        valeurs.append(h & ((1 << largeur) - 1))
+        h >>= largeur
+    return valeurs
+
+
+def distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+def vers_signe(h):
+    """Stockage en INTEGER SQLite (64 bits signés)."""
+    return h - (1 << 64) if h >= (1 << 63) else h
+
+
+def depuis_signe(h):
+    return h + (1 << 64) if h < 0 else h
+
+
+def _jour(d):
+    return d.date() if hasattr(d, 'date') else d
+
+
+class IndexQuasiDoublons:
+    """Recherche et enregistrement des empreintes d'offres."""
+
+    def __init__(self, distance_max=DISTANCE_DEFAUT, tolerance_jours=1):
+        self.distance_max = min(int(distance_max), DISTANCE_MAX)
+        self.tolerance_jours = tolerance_jours
+        # Empreintes enregistrées dans le lot courant, pas encore en base: (bande, valeur) -> [(h, jour, cible)]
+        self._lot = {}
+
+    def _dates_compatibles(self, a, b):
+        if a is None or b is None:
+            return True
+        return abs((a - b).days) <= self.tolerance_jours
+
+    def chercher(self, h, date_cloturation=None):
+        """Groupe (id de l'offre canonique, ou objet Offre du lot courant) d'un quasi-doublon, sinon None.
+
+        Seuls les groupes dont l'offre canonique est active comptent; si les seuls quasi-doublons
+        trouvés appartiennent à des groupes désactivés, retourne GROUPE_INACTIF.
+        """
+        jour = _jour(date_cloturation)
+        b = bandes(h)
+        for cle in enumerate(b):
+            for h2, jour2, cible in self._lot.get(cle, ()):
+                if distance(h, h2) <= self.distance_max and self._dates_compatibles(jour, jour2):
+                    return cible
+        candidats = db.session.execute(
+            db.select(EmpreinteOffre.simhash, EmpreinteOffre.date_cloturation, EmpreinteOffre.groupe_id, Offre.actif)
+            .join(Offre, Offre.id == EmpreinteOffre.groupe_id)
+            .where(db.or_(*[getattr(EmpreinteOffre, f'bande{i}') == b[i] for i in range(NB_BANDES)]))
+        )
+        resultat = None
+        for h2, jour2, groupe_id, actif in candidats:
+            if distance(h, depuis_signe(h2)) <= self.distance_max and self._dates_compatibles(jour, jour2):
+                if actif:
+                    return groupe_id
+                resultat = GROUPE_INACTIF
+        return resultat
+
+    def retenir(self, h, date_cloturation, cible):
+        """Rendre une empreinte du lot courant visible aux recherches suivantes du même lot."""
+        entree = (h, _jour(date_cloturation), cible)
+        for cle in enumerate(bandes(h)):
+            self._lot.setdefault(cle, []).append(entree)
+
+    def oublier_lot(self):
+        """Vider les empreintes du lot courant (une fois écrites en base)."""
+        self._lot.clear()
+
+    @staticmethod
+    def ligne(offre_id, h, date_cloturation, groupe_id):
+        """Ligne `empreintes_offres` (dict pour insertion groupée)."""
+        ligne = {
+            'offre_id': offre_id,
+            'simhash': vers_signe(h),
+            'date_cloturation': _jour(date_cloturation),
+            'groupe_id': groupe_id,
+        }
+        for i, valeur in enumerate(bandes(h)):
+            ligne[f'bande{i}'] = valeur
+        return ligne
+
+
+def indexer_offres_manquantes(distance_max=DISTANCE_DEFAUT, taille_lot=1000, limite=None):
+    """Calculer les empreintes des offres qui n'en ont pas (ordre des ids) et les regrouper.
+
+    Une offre proche d'une offre déjà indexée rejoint son groupe (`Offre.groupe_id`).
+    Retourne {'indexees', 'groupees'}.
+    """
+    index = IndexQuasiDoublons(distance_max=distance_max)
+    indexees = groupees = 0
+    dernier = 0
+    while limite is None or indexees < limite:
+        lignes = db.session.execute(
+            db.select(Offre.id, Offre.titre, Offre.description, Offre.date_cloturation, Offre.groupe_id)
+            .outerjoin(EmpreinteOffre, EmpreinteOffre.offre_id == Offre.id)
+            .where(EmpreinteOffre.offre_id.is_(None), Offre.id > dernier)
+            .order_by(Offre.id).limit(taille_lot)
+        ).all()
+        if not lignes:
+            break
+        nouvelles, groupes = [], []
+        for oid, titre, description, date_clot, groupe_id in lignes:
+            dernier = oid
+            indexees += 1
+            h = empreinte(titre, description)
+            if h is None:
+                continue
+            if groupe_id is None:
+                groupe_id = index.chercher(h, date_clot)
+                if groupe_id == GROUPE_INACTIF:
+                    # Groupe désactivé: l'offre devient canonique d'un nouveau groupe
+                    groupe_id = None
+                if groupe_id is not None:
+                    groupes.append({'id': oid, 'groupe_id': groupe_id})
+            cible = groupe_id if groupe_id is not None else oid
+            index.retenir(h, date_clot, cible)
+            nouvelles.append(IndexQuasiDoublons.ligne(oid, h, date_clot, cible))
+        with file_ecritures.ecrire():
+            if nouvelles:
+                db.session.execute(db.insert(EmpreinteOffre), nouvelles)
+            if groupes:
+                db.session.execute(db.update(Offre), groupes)
+            db.session.commit()
+        index.oublier_lot()
+        groupees += len(groupes)
+    return {'indexees': indexees, 'groupees': groupees}
@@ -0,0 +1,102 @@
+"""
+Registre paresseux des scrapers (clé = type_scraper)
+Chaque scraper est déclaré par une chaîne d'import « module:Classe » et n'est
+importé/instancié qu'à la première utilisation: un process web qui ne lance
+aucun scraping ne charge ni les scrapers ni leurs dépendances (bs4, dateutil...).
+"""
+
+import importlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+SCRAPERS_DISPONIBLES = {
+    'giz': 'scraping.giz_scraper:GIZScraper',
+    'un': 'scraping.scrapers.un_scraper:UNScraper',
+    'educarriere': 'scraping.scrapers.educarriere_scraper:EduCarriereScraper',
+    'pam': 'scraping.scrapers.pam_scraper:PAMScraper',
+    'fao': 'scraping.scrapers.fao_scraper:FAOScraper',
+    'ue': 'scraping.scrapers.ue_scraper:UEScraper',
+    'afd': 'scraping.scrapers.afd_scraper:AFDScraper',
+    'pnud': 'scraping.scrapers.pnud_scraper:PNUDScraper',
+    'worldbank': 'scraping.scrapers.worldbank_scraper:WorldBankScraper',
+    'bad': 'scraping.scrapers.bad_scraper:BADScraper',
+    'enabel': 'scraping.scrapers.enabel_scraper:EnabelScraper',
+    'firca': 'scraping.scrapers.firca_scraper:FIRCAScraper',
+    'anader': 'scraping.scrapers.anader_scraper:AnaderScraper',
+    'minader': 'scraping.scrapers.minader_scraper:MinaderScraper',
+    'dgmp': 'scraping.scrapers.dgmp_scraper:DGMPScraper',
+    'structures': 'scraping.scrapers.structure_links_scraper:StructuresLinksScraper',
+}
+
+
+def importer(chemin):
+    """Importer l'objet désigné par « module:attribut »."""
+    module, _, attribut = chemin.partition(':')
+    return getattr(importlib.import_module(module), attribut)
+
+
+class RegistreScrapers:
+    """Dictionnaire clé -> instance de scraper, instanciée à la première demande.
+
+    Une clé dont l'import ou l'instanciation échoue renvoie None (scraper indisponible).
+    """
+
+    def __init__(self, chemins=None):
+        self._chemins = dict(SCRAPERS_DISPONIBLES if chemins is None else chemins)
+        self._instances = {}
+        self._lock = threading.Lock()
+
+    def classe(self, cle):
+        return importer(self._chemins[cle])
+
+    def creer(self, cle):
+        """Nouvelle instance (non partagée) du scraper `cle`."""
+        return self.classe(cle)()
+
+    def get(self, cle, defaut=None):
+        if cle not in self._chemins and cle not in self._instances:
+            return defaut
+        if cle in self._instances:
+            return self._instances[cle]
+        with self._lock:
+            if cle not in self._instances:
+                try:
+                    self._instances[cle] = self.creer(cle)
+                except Exception as e:
+                    logger.warning(f"Import scraper '{cle}' impossible: {e}")
+                    self._instances[cle] = None
+        return self._instances[cle]
+
+    def __getitem__(self, cle):
+        if cle not in self:
+            raise KeyError(cle)
+        return self.get(cle)
+
+    def __setitem__(self, cle, scraper):
+        with self._lock:
+            self._instances[cle] = scraper
+
+    def __contains__(self, cle):
+        return cle in self._chemins or cle in self._instances
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def keys(self):
+        return list(dict.fromkeys(list(self._chemins) + list(self._instances)))
+
+    def items(self):
+        """Toutes les paires (clé, instance) — instancie chaque scraper."""
+        return [(cle, self.get(cle)) for cle in self.keys()]
+
+    def values(self):
+        return [scraper for _, scraper in self.items()]
+
+    def charges(self):
+        """Clés déjà instanciées."""
+        return [cle for cle, s in self._instances.items() if s is not None]
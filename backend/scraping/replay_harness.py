@@ -0,0 +1,162 @@
+"""
+Harnais d'enregistrement/rejeu HTTP pour benchmarks déterministes des scrapers
+Les réponses enregistrées (archive WARC) sont servies par un serveur local;
+les sessions des scrapers y sont redirigées par un adaptateur `requests`.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import logging
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+ENTETE_URL_ORIGINALE = 'X-Original-URL'
+_ENTETES_IGNOREES = ('content-length', 'content-encoding', 'transfer-encoding', 'connection', 'keep-alive')
+
+
+class ServeurRejeu:
+    """Serveur HTTP local qui rejoue les réponses d'une `ArchivePages`."""
+
+    def __init__(self, archive, host='127.0.0.1', port=0):
+        self.archive = archive
+        self.host = host
+        self.port = port
+        self.servies = 0
+        self.absentes = 0
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def _handler(self):
+        serveur = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = self.headers.get(ENTETE_URL_ORIGINALE) or ''
+                record = serveur.archive.lire(url) if url else None
+                if record is None:
+                    serveur.absentes += 1
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                serveur.servies += 1
+                body = record['body'] or b''
+                self.send_response(record['status'] or 200)
+                for k, v in record['headers'].items():
+                    if k.lower() not in _ENTETES_IGNOREES:
+                        self.send_header(k, v)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                return
+
+        return Handler
+
+    def demarrer(self):
+        self._httpd = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self.port = self._httpd.server_address[1]
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def arreter(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.demarrer()
+
+    def __exit__(self, *exc):
+        self.arreter()
+
+
+class AdaptateurRejeu(HTTPAdapter):
+    """Redirige toute requête vers le serveur de rejeu et mesure pages/octets/temps réseau."""
+
+    def __init__(self, base_url, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url.rstrip('/')
+        self.stats = {'pages': 0, 'octets': 0, 'pages_absentes': 0, 'temps_fetch': 0.0}
+
+    def send(self, request, **kwargs):
+        original = request.url
+        request.url = f"{self.base_url}/rejeu"
+        request.headers[ENTETE_URL_ORIGINALE] = original
+        kwargs.pop('verify', None)
+        kwargs['proxies'] = {}
+        t0 = time.perf_counter()
+        response = super().send(request, **kwargs)
+        content = response.content
+        self.stats['temps_fetch'] += time.perf_counter() - t0
+        self.stats['pages'] += 1
+        self.stats['octets'] += len(content or b'')
+        if response.status_code == 404:
+            self.stats['pages_absentes'] += 1
+        response.url = original
+        return response
+
+
+def brancher_rejeu(scraper, base_url):
+    """Monter l'adaptateur de rejeu sur la session du scraper. Retourne l'adaptateur."""
+    adaptateur = AdaptateurRejeu(base_url)
+    scraper.session.mount('http://', adaptateur)
+    scraper.session.mount('https://', adaptateur)
+    return adaptateur
+
+
+def mesurer_scraper(scraper, base_url, mots_cles=None):
+    """Exécuter `scrape()` contre le serveur de rejeu et retourner (métriques, offres)."""
+    adaptateur = brancher_rejeu(scraper, base_url)
+    t0 = time.perf_counter()
+    statut = 'succes'
+    try:
+        offres = scraper.scrape(mots_cles or [])
+    except Exception as e:
+        logger.error(f"[{scraper.source_nom}] Erreur pendant le rejeu: {e}")
+        offres, statut = [], 'erreur'
+    total = time.perf_counter() - t0
+    st = adaptateur.stats
+    return {
+        'statut': statut,
+        'temps_total': round(total, 4),
+        'temps_fetch': round(st['temps_fetch'], 4),
+        'temps_parse': round(max(total - st['temps_fetch'], 0.0), 4),
+        'pages': st['pages'],
+        'pages_absentes': st['pages_absentes'],
+        'octets': st['octets'],
+        'offres': len(offres),
+    }, offres
+
+
+def comparer_rapports(rapport, reference, tolerance=0.25, marge_secondes=0.05):
+    """Lister les régressions de `rapport` par rapport à `reference` (même format)."""
+    regressions = []
+    for key, ref in (reference.get('scrapers') or {}).items():
+        cur = (rapport.get('scrapers') or {}).get(key)
+        if not cur:
+            continue
+        if cur['temps_total'] > ref['temps_total'] * (1 + tolerance) and cur['temps_total'] - ref['temps_total'] > marge_secondes:
+            regressions.append(f"{key}: temps_total {ref['temps_total']}s -> {cur['temps_total']}s")
+        if cur['pages'] > ref['pages']:
+            regressions.append(f"{key}: pages {ref['pages']} -> {cur['pages']}")
+        if cur['offres'] != ref['offres']:
+            regressions.append(f"{key}: offres {ref['offres']} -> {cur['offres']}")
+
+    ref_s = reference.get('sauvegarde') or {}
+    cur_s = rapport.get('sauvegarde') or {}
+    for champ in ('temps_insertion', 'temps_mise_a_jour'):
+        if champ in ref_s and champ in cur_s:
+            if cur_s[champ] > ref_s[champ] * (1 + tolerance) and cur_s[champ] - ref_s[champ] > marge_secondes:
+                regressions.append(f"_sauvegarder_offres: {champ} {ref_s[champ]}s -> {cur_s[champ]}s")
+    return regressions
@@ -0,0 +1,133 @@
+"""
+Profileur par échantillonnage pour les tâches de scraping
+Un thread relève périodiquement la pile du thread profilé (sys._current_frames)
+et agrège les piles au format « collapsed » (flamegraph.pl, speedscope).
+Les derniers profils sont conservés sur disque avec rotation.
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+EXTENSION = '.folded'
+
+
+def _libelle(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(';', ',')
+
+
+class ProfileurEchantillons:
+    """Échantillonne la pile d'un thread à intervalle fixe."""
+
+    def __init__(self, thread_id=None, intervalle=0.01, max_profondeur=128):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.intervalle = intervalle
+        self.max_profondeur = max_profondeur
+        self.piles = Counter()
+        self.echantillons = 0
+        self.debut = None
+        self.duree = 0.0
+        self._arret = threading.Event()
+        self._thread = None
+
+    def _echantillonner(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        pile = []
+        while frame is not None and len(pile) < self.max_profondeur:
+            pile.append(_libelle(frame.f_code))
+            frame = frame.f_back
+        self.piles[';'.join(reversed(pile))] += 1
+        self.echantillons += 1
+
+    def _boucle(self):
+        while not self._arret.wait(self.intervalle):
+            try:
+                self._echantillonner()
+            except Exception:
+                pass
+
+    def demarrer(self):
+        self.debut = time.perf_counter()
+        self._thread = threading.Thread(target=self._boucle, name='profileur-echantillons', daemon=True)
+        self._thread.start()
+        return self
+
+    def arreter(self):
+        self._arret.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self.debut is not None:
+            self.duree = time.perf_counter() - self.debut
+        return self
+
+    def collapsed(self):
+        """Piles agrégées, une ligne « frame1;frame2;... nombre » par pile."""
+        return '\n'.join(f"{pile} {n}" for pile, n in self.piles.most_common()) + '\n'
+
+    def ecrire(self, dossier, nom, max_fichiers=20):
+        """Écrire le profil dans `dossier` et ne garder que les `max_fichiers` plus récents."""
+        os.makedirs(dossier, exist_ok=True)
+        slug = re.sub(r'[^A-Za-z0-9_.-]+', '_', nom).strip('_')[:80] or 'profil'
+        fichier = f"{datetime.utcnow():%Y%m%dT%H%M%S.%f}-{slug}{EXTENSION}"
+        with open(os.path.join(dossier, fichier), 'w', encoding='utf-8') as fh:
+            fh.write(self.collapsed())
+        for ancien in lister_profils(dossier)[max_fichiers:]:
+            try:
+                os.remove(os.path.join(dossier, ancien['fichier']))
+            except OSError:
+                pass
+        return fichier
+
+
+def lister_profils(dossier):
+    """Profils présents sur disque, du plus récent au plus ancien."""
+    if not os.path.isdir(dossier):
+        return []
+    profils = []
+    for nom in os.listdir(dossier):
+        if not nom.endswith(EXTENSION):
+            continue
+        chemin = os.path.join(dossier, nom)
+        try:
+            st = os.stat(chemin)
+        except OSError:
+            continue
+        profils.append({'fichier': nom, 'taille': st.st_size, 'date': st.st_mtime})
+    profils.sort(key=lambda p: (p['date'], p['fichier']), reverse=True)
+    for p in profils:
+        p['date'] = datetime.utcfromtimestamp(p['date']).isoformat()
+    return profils
+
+
+@contextmanager
+def profiler_echantillons(nom, actif, dossier, intervalle=0.01, max_fichiers=20):
+    """Profiler le thread courant pendant le bloc si `actif`.
+
+    Produit un dict {'fichier', 'echantillons', 'duree'} rempli à la sortie du bloc (vide si inactif).
+    """
+    resultat = {}
+    if not actif:
+        yield resultat
+        return
+    profileur = ProfileurEchantillons(intervalle=intervalle).demarrer()
+    try:
+        yield resultat
+    finally:
+        profileur.arreter()
+        try:
+            resultat['fichier'] = profileur.ecrire(dossier, nom, max_fichiers=max_fichiers)
+            resultat['echantillons'] = profileur.echantillons
+            resultat['duree'] = round(profileur.duree, 3)
+            logger.info(f"[PROFIL] {nom}: {profileur.echantillons} échantillons -> {resultat['fichier']}")
+        except OSError as e:
+            logger.warning(f"Écriture du profil impossible ({nom}): {str(e)}")
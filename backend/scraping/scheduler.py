@@ -8,31 +8,34 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED
-from datetime import datetime, timedelta, timezone
-import io
-import hashlib
+from datetime import datetime, timedelta
+import json
 import re
+import threading
 import time
 import unicodedata
-from dateutil import parser as date_parser
 from flask import current_app
-from pypdf import PdfReader
-from requests.exceptions import RequestException
-import requests
-from sqlalchemy import or_
+from sqlalchemy import and_, or_
 from urllib.parse import urlparse
 
-from scraping.ai_filter_local import LocalAIFilter
-
-# GIZScraper est défini dans le module parent scraping.giz_scraper
-# Importer de manière paresseuse dans __init__ pour éviter d'éventuels import-cycles
-from scraping.scrapers import (
-    UNScraper, EduCarriereScraper, PAMScraper, FAOScraper, UEScraper,
-    AFDScraper, PNUDScraper, WorldBankScraper, BADScraper, EnabelScraper,
-    FIRCAScraper, AnaderScraper, MinaderScraper, DGMPScraper, StructuresLinksScraper
-)
+import metrics
+import notifications
+from scraping.instrumentation import MesuresExecution, collecter, mesures_courantes
+from scraping.registry import RegistreScrapers
+from scraping.sampling_profiler import profiler_echantillons
+from scraping.percolation import percoler
+from scraping.quasi_doublons import GROUPE_INACTIF, IndexQuasiDoublons, empreinte, indexer_offres_manquantes
+from scraping.url_canonique import canonicaliser_url
+
+# Les scrapers, le filtre IA, pypdf et dateutil sont importés à la première utilisation:
+# un process web-only (API en lecture) ne charge pas le code de scraping.
 from scraping.keyword_manager import KeywordManager
-from database.models import db, Offre, LogScraping, Source
+from database.models import db, Offre, EmpreinteOffre, LogScraping, Source, EtatFlux, ParametreSysteme
+from database.retention_logs import consolider_logs
+from database.sqlite_tuning import file_ecritures
+from database.maintenance import archiver_offres, desactiver_offres, urls_archivees
+from database.database import get_sources_liens_data, synchroniser_sources_liens, version_sources_liens
+from database.sql_profiler import profiler_sql
 
 logger = logging.getLogger(__name__)
 
@@ -44,34 +47,24 @@ class ScrapingScheduler:
         self.scheduler = BackgroundScheduler(timezone='UTC')
         self._job_last_run = {}
         self._last_links_sync_at = None
-        self.ai_filter = LocalAIFilter()
-        # Enregistrer les scrapers disponibles (clé = type_scraper)
-        # GIZScraper importé paresseusement
-        try:
-            from scraping.giz_scraper import GIZScraper
-            giz_inst = GIZScraper()
-        except Exception as e:
-            logger.warning(f"Import GIZScraper failed: {e}")
-            giz_inst = None
-
-        self.scrapers = {
-            'giz': giz_inst,
-            'un': UNScraper(),
-            'educarriere': EduCarriereScraper(),
-            'pam': PAMScraper(),
-            'fao': FAOScraper(),
-            'ue': UEScraper(),
-            'afd': AFDScraper(),
-            'pnud': PNUDScraper(),
-            'worldbank': WorldBankScraper(),
-            'bad': BADScraper(),
-            'enabel': EnabelScraper(),
-            'firca': FIRCAScraper(),
-            'anader': AnaderScraper(),
-            'minader': MinaderScraper(),
-            'dgmp': DGMPScraper(),
-            'structures': StructuresLinksScraper(),
-        }
+        self._ai_filter = None
+        # Un seul traitement des notifications à la fois (tâche 15 min, fin du scraping global, route admin)
+        self._verrou_notifications = threading.Lock()
+        # Profilage par échantillonnage activé (ids de jobs, noms/ids de sources, clés de scrapers)
+        self.profilage = {'jobs': set(), 'sources': set()}
+        # Scrapers disponibles (clé = type_scraper), instanciés à la première utilisation
+        self.scrapers = RegistreScrapers()
+
+    @property
+    def ai_filter(self):
+        if self._ai_filter is None:
+            from scraping.ai_filter_local import LocalAIFilter
+            self._ai_filter = LocalAIFilter()
+        return self._ai_filter
+
+    @ai_filter.setter
+    def ai_filter(self, value):
+        self._ai_filter = value
     
     def init_app(self, app):
         """Initialiser le planificateur avec une app Flask"""
@@ -83,6 +76,11 @@ class ScrapingScheduler:
             tz = None
         if tz:
             self.scheduler.configure(timezone=tz)
+        try:
+            self.profilage['jobs'].update(app.config.get('PROFILER_JOBS') or [])
+            self.profilage['sources'].update(app.config.get('PROFILER_SOURCES') or [])
+        except Exception:
+            pass
     
     def demarrer(self):
         """Démarrer le planificateur"""
@@ -142,6 +140,58 @@ class ScrapingScheduler:
             next_run_time=datetime.utcnow() + timedelta(minutes=5)
         )
 
+        # Archivage quotidien: offres inactives/expirées depuis longtemps -> offres_archive
+        self.scheduler.add_job(
+            func=self.archiver_offres_inactives,
+            trigger=IntervalTrigger(hours=24),
+            id='archivage_offres_24h',
+            name='Archivage offres inactives (toutes les 24h)',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=60 * 60,
+            next_run_time=datetime.utcnow() + timedelta(minutes=15)
+        )
+
+        # Consolidation quotidienne des logs de scraping (agrégats journaliers + rétention)
+        self.scheduler.add_job(
+            func=self.consolider_logs_scraping,
+            trigger=IntervalTrigger(hours=24),
+            id='consolidation_logs_24h',
+            name='Consolidation logs scraping (toutes les 24h)',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=60 * 60,
+            next_run_time=datetime.utcnow() + timedelta(minutes=20)
+        )
+
+        # Indexation quotidienne des quasi-doublons: offres sans empreinte (base existante, imports)
+        self.scheduler.add_job(
+            func=self.indexer_quasi_doublons,
+            trigger=IntervalTrigger(hours=24),
+            id='indexation_quasi_doublons_24h',
+            name='Indexation quasi-doublons (toutes les 24h)',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=60 * 60,
+            next_run_time=datetime.utcnow() + timedelta(minutes=2)
+        )
+
+        # Notifications: résumés des nouvelles correspondances + reprises de la boîte d'envoi
+        self.scheduler.add_job(
+            func=self.traiter_notifications,
+            trigger=IntervalTrigger(minutes=15),
+            id='notifications_15min',
+            name='Notifications (toutes les 15 min)',
+            replace_existing=True,
+            max_instances=1,
+            coalesce=True,
+            misfire_grace_time=10 * 60,
+            next_run_time=datetime.utcnow() + timedelta(minutes=3)
+        )
+
         logger.info("✓ Tâches de scraping configurées")
 
     def executer_toutes_sources_actives_programme(self):
@@ -153,23 +203,47 @@ class ScrapingScheduler:
             # Auto-sync des liens (acteurs + targets) vers la table `sources`.
             # Objectif: que toutes les sources à scraper soient présentes en DB et actives.
             try:
-                self._auto_sync_sources_links()
+                with profiler_sql('auto_sync_sources_links'):
+                    self._auto_sync_sources_links()
             except Exception:
                 pass
 
             source_ids = [s.id for s in Source.query.filter_by(actif=True).all()]
 
+            job_id = 'scraping_global_1h'
+            start_time = time.time()
             results = []
-            for sid in source_ids:
+            with self._profiler(job_id, job_id in self.profilage['jobs']) as profil:
+                for i, sid in enumerate(source_ids):
+                    metrics.SOURCES_EN_ATTENTE.set(len(source_ids) - i)
+                    try:
+                        r = self.executer_source(sid)
+                        results.append(r)
+                    except Exception as e:
+                        results.append({
+                            'source_id': sid,
+                            'statut': 'erreur',
+                            'message': str(e),
+                        })
+            metrics.SOURCES_EN_ATTENTE.set(0)
+
+            if profil:
+                # Trace du passage global profilé (le profil est rattaché à ce log)
                 try:
-                    r = self.executer_source(sid)
-                    results.append(r)
-                except Exception as e:
-                    results.append({
-                        'source_id': sid,
-                        'statut': 'erreur',
-                        'message': str(e),
-                    })
+                    db.session.add(LogScraping(
+                        source=job_id,
+                        nombre_offres_trouvees=sum(r.get('offres_trouvees') or 0 for r in results),
+                        nombre_offres_nouvelles=sum(r.get('offres_nouvelles') or 0 for r in results),
+                        statut='succes',
+                        temps_execution=time.time() - start_time,
+                        details=json.dumps({'profil': profil, 'sources': len(results)})
+                    ))
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+
+            # Résumés des nouvelles offres du passage, livrés sans attendre la tâche périodique
+            self.traiter_notifications()
 
             return {
                 'message': 'Scraping global (sources actives) planifié exécuté',
@@ -181,6 +255,8 @@ class ScrapingScheduler:
         """Synchroniser automatiquement les liens configurés vers la table `sources`.
 
         Throttle: au plus une synchro toutes les 6h (en mémoire de process).
+        Ignorée si l'empreinte des liens configurés n'a pas changé depuis la dernière synchro
+        (paramètre `links_sync_version`, partagé entre les process).
         """
         now = datetime.utcnow()
         if self._last_links_sync_at is not None:
@@ -191,78 +267,19 @@ class ScrapingScheduler:
                 pass
 
         cfg = getattr(current_app, 'config', {})
+        liens = get_sources_liens_data(cfg)
+        version = version_sources_liens(liens)
+        marqueur = db.session.get(ParametreSysteme, 'links_sync_version')
+        if marqueur is not None and marqueur.valeur == version:
+            self._last_links_sync_at = now
+            return
 
-        def _is_http_url(u: str) -> bool:
-            if not u:
-                return False
-            try:
-                p = urlparse(u)
-                return p.scheme in ('http', 'https') and bool(p.netloc)
-            except Exception:
-                return False
-
-        def _make_source_name(structure: str, url: str) -> str:
-            structure = (structure or '').strip() or 'Source'
-            url = (url or '').strip()
-            try:
-                host = (urlparse(url).netloc or '').lower()
-            except Exception:
-                host = ''
-            digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:8]
-            base = f"{structure} | {host} | {digest}" if host else f"{structure} | {digest}"
-            return base[:100]
-
-        urls = []
-        acteurs = cfg.get('TABLEAU_VEILLE_ACTEURS', []) or []
-        for a in acteurs:
-            structure = (a or {}).get('structure')
-            lien = (a or {}).get('lien')
-            if structure and lien:
-                urls.append((structure, lien))
-
-        targets = cfg.get('STRUCTURES_SCRAPING_TARGETS', []) or []
-        for t in targets:
-            structure = (t or {}).get('structure') or (t or {}).get('nom')
-            for u in ((t or {}).get('urls_a_scraper') or []):
-                if structure and u:
-                    urls.append((structure, u))
-
-        seen = set()
-        dedup = []
-        for structure, u in urls:
-            key = (structure or '', (u or '').strip())
-            if key in seen:
-                continue
-            seen.add(key)
-            dedup.append((structure, (u or '').strip()))
-
-        changed_any = False
-        for structure, u in dedup:
-            if not _is_http_url(u):
-                continue
-            nom = _make_source_name(structure, u)
-            s = Source.query.filter_by(nom=nom).first()
-            if not s:
-                s = Source(nom=nom, url_base=u, type_scraper='structures', actif=True)
-                db.session.add(s)
-                changed_any = True
-                continue
-
-            changed = False
-            if (s.url_base or '') != (u or ''):
-                s.url_base = u
-                changed = True
-            if (s.type_scraper or '') != 'structures':
-                s.type_scraper = 'structures'
-                changed = True
-            if s.actif is not True:
-                s.actif = True
-                changed = True
-            if changed:
-                changed_any = True
-
-        if changed_any:
-            db.session.commit()
+        synchroniser_sources_liens(liens)
+        if marqueur is None:
+            db.session.add(ParametreSysteme(cle='links_sync_version', valeur=version))
+        else:
+            marqueur.valeur = version
+        db.session.commit()
 
         self._last_links_sync_at = now
 
@@ -271,7 +288,7 @@ class ScrapingScheduler:
         if not self.app:
             return {'error': 'app_not_initialized'}
 
-        with self.app.app_context():
+        with self.app.app_context(), profiler_sql(f'executer_source({source_id})'):
             source = Source.query.get(source_id)
             if not source:
                 return {
@@ -291,7 +308,7 @@ class ScrapingScheduler:
             if type_key == 'structures' and url_base:
                 # IMPORTANT: ne pas réutiliser l'instance globale "structures" (qui scrape tous les targets Config).
                 # Ici on veut scraper uniquement l'URL de la source.
-                scraper = StructuresLinksScraper()
+                scraper = self.scrapers.creer('structures')
                 scraper_label = 'structures'
                 scraper.targets = [{'structure': source.nom, 'urls_a_scraper': [url_base]}]
             elif type_key and type_key in self.scrapers:
@@ -299,7 +316,7 @@ class ScrapingScheduler:
                 scraper_label = type_key
             elif url_base:
                 # Fallback: si la source a un lien mais pas de scraper dédié, on tente un scraping générique.
-                scraper = StructuresLinksScraper()
+                scraper = self.scrapers.creer('structures')
                 scraper_label = 'structures'
                 scraper.targets = [{'structure': source.nom, 'urls_a_scraper': [url_base]}]
             else:
@@ -325,9 +342,15 @@ class ScrapingScheduler:
 
             logger.info(f"[{source.nom}] Scraping en cours... (type={source.type_scraper or ''}, mode={scraper_label})")
 
+            mesures = MesuresExecution()
+            profil = {}
             try:
-                offres = scraper.scrape(mots_cles)
-                nombre_nouvelles = self._sauvegarder_offres(offres)
+                with collecter(mesures), self._profiler(f'source-{source.nom}', self._source_profilee(source)) as profil:
+                    self._charger_etats_flux(scraper)
+                    with mesures.etape('scrape'):
+                        offres = scraper.scrape(mots_cles)
+                    nombre_nouvelles = self._sauvegarder_offres(offres)
+                    self._enregistrer_etats_flux(scraper)
 
                 source.derniere_execusion = datetime.utcnow()
                 db.session.commit()
@@ -338,10 +361,12 @@ class ScrapingScheduler:
                     nombre_offres_trouvees=len(offres),
                     nombre_offres_nouvelles=nombre_nouvelles,
                     statut='succes',
-                    temps_execution=temps_execution
+                    temps_execution=temps_execution,
+                    details=self._details(mesures, profil)
                 )
                 db.session.add(log)
                 db.session.commit()
+                self._observer_execution(source.nom, 'succes', temps_execution, nombre_nouvelles)
 
                 logger.info(
                     f"[{source.nom}] ✓ Succès: {len(offres)} offres, {nombre_nouvelles} nouvelles en {temps_execution:.2f}s"
@@ -359,10 +384,13 @@ class ScrapingScheduler:
                 }
             except Exception as e:
                 logger.error(f"[{source.nom}] ✗ Erreur: {str(e)}", exc_info=True)
+                self._observer_execution(source.nom, 'erreur', time.time() - start_time)
                 log = LogScraping(
                     source=source.nom,
                     statut='erreur',
-                    message_erreur=str(e)
+                    message_erreur=str(e),
+                    temps_execution=time.time() - start_time,
+                    details=self._details(mesures, profil)
                 )
                 db.session.add(log)
                 db.session.commit()
@@ -375,32 +403,91 @@ class ScrapingScheduler:
                     'mode': scraper_label,
                 }
 
+    def _source_profilee(self, source):
+        cibles = self.profilage['sources']
+        return bool(cibles) and bool({source.nom, str(source.id), (source.type_scraper or '').lower()} & cibles)
+
+    def _profiler(self, nom, actif):
+        """Profileur par échantillonnage (no-op si inactif), profils écrits dans PROFILER_DIR."""
+        cfg = self.app.config
+        return profiler_echantillons(
+            nom,
+            actif,
+            cfg.get('PROFILER_DIR'),
+            intervalle=float(cfg.get('PROFILER_INTERVAL_MS', 10)) / 1000,
+            max_fichiers=int(cfg.get('PROFILER_MAX_FICHIERS', 20)),
+        )
+
+    @staticmethod
+    def _details(mesures, profil=None):
+        details = mesures.to_dict()
+        if profil:
+            details['profil'] = profil
+        return json.dumps(details)
+
+    def _observer_execution(self, source_nom, statut, temps_execution, nombre_nouvelles=0):
+        """Alimenter les métriques /metrics d'une exécution de source."""
+        metrics.SCRAPER_DUREE.observer(temps_execution, source=source_nom)
+        metrics.SCRAPER_EXECUTIONS.inc(source=source_nom, statut=statut)
+        if nombre_nouvelles:
+            metrics.SCRAPER_OFFRES.inc(nombre_nouvelles, source=source_nom)
+
+    def _charger_etats_flux(self, scraper):
+        """Charger les lastmod connus (mode flux) pour les hôtes ciblés par le scraper."""
+        if not hasattr(scraper, 'lastmod_connus') or not hasattr(scraper, 'hotes_cibles'):
+            return
+        try:
+            hotes = scraper.hotes_cibles()
+            rows = EtatFlux.query.filter(EtatFlux.hote.in_(hotes)).all() if hotes else []
+            scraper.lastmod_connus = {r.url: r.lastmod for r in rows}
+        except Exception as e:
+            logger.warning(f"Chargement état flux impossible: {str(e)}")
+            scraper.lastmod_connus = {}
+
+    def _enregistrer_etats_flux(self, scraper):
+        """Mémoriser les lastmod vus pendant le passage (après sauvegarde des offres)."""
+        vus = getattr(scraper, 'lastmod_vus', None) or {}
+        if not vus:
+            return
+        try:
+            urls = list(vus)
+            existants = {}
+            for i in range(0, len(urls), 500):
+                for e in EtatFlux.query.filter(EtatFlux.url.in_(urls[i:i + 500])).all():
+                    existants[e.url] = e
+            for url, lastmod in vus.items():
+                e = existants.get(url)
+                if e:
+                    e.lastmod = lastmod
+                    continue
+                db.session.add(EtatFlux(
+                    hote=(urlparse(url).netloc or '').lower()[:200],
+                    url=url[:500],
+                    lastmod=(lastmod or '')[:64],
+                ))
+            db.session.commit()
+        except Exception as e:
+            logger.warning(f"Enregistrement état flux impossible: {str(e)}")
+            try:
+                db.session.rollback()
+            except Exception:
+                pass
+
     def purger_offres_expirees(self):
         """Archiver (soft delete) les offres dont la date de clôture est passée."""
         if not self.app:
             return {'error': 'app_not_initialized'}
 
-        with self.app.app_context():
+        with self.app.app_context(), profiler_sql('purger_offres_expirees'):
             try:
-                now = datetime.utcnow()
-                candidates = Offre.query.filter(
-                    Offre.actif == True,
-                    or_(
+                job_id = 'purge_offres_expirees_1h'
+                with self._profiler(job_id, job_id in self.profilage['jobs']) as profil:
+                    now = datetime.utcnow()
+                    disabled = desactiver_offres(or_(
                         Offre.date_cloturation.is_(None),
                         Offre.date_cloturation < now
-                    )
-                ).all()
-
-                ids_to_disable = [o.id for o in candidates]
-
-                if ids_to_disable:
-                    Offre.query.filter(Offre.id.in_(ids_to_disable)).update(
-                        {'actif': False},
-                        synchronize_session=False
-                    )
-                    db.session.commit()
+                    ), taille_lot=self.app.config.get('PURGE_BATCH_SIZE', 5000))
 
-                disabled = len(ids_to_disable)
                 logger.info(f"Purge offres expirées: {disabled} désactivées")
 
                 try:
@@ -409,7 +496,8 @@ class ScrapingScheduler:
                         nombre_offres_trouvees=disabled,
                         nombre_offres_nouvelles=0,
                         statut='succes',
-                        temps_execution=0.0
+                        temps_execution=0.0,
+                        details=json.dumps({'profil': profil}) if profil else None
                     )
                     db.session.add(log)
                     db.session.commit()
@@ -428,6 +516,107 @@ class ScrapingScheduler:
                     pass
                 return {'error': str(e)}
     
+    def archiver_offres_inactives(self):
+        """Déplacer vers `offres_archive` les offres inactives ou expirées depuis plus de
+        OFFRES_ARCHIVAGE_JOURS jours (0 = archivage désactivé)."""
+        if not self.app:
+            return {'error': 'app_not_initialized'}
+
+        jours = int(self.app.config.get('OFFRES_ARCHIVAGE_JOURS', 90) or 0)
+        if jours <= 0:
+            return {'archived': 0, 'disabled': True}
+
+        with self.app.app_context(), profiler_sql('archiver_offres_inactives'):
+            try:
+                start_time = time.time()
+                seuil = datetime.utcnow() - timedelta(days=jours)
+                archived = archiver_offres(or_(
+                    and_(Offre.actif == False, Offre.date_modification < seuil),
+                    Offre.date_cloturation < seuil
+                ), taille_lot=self.app.config.get('PURGE_BATCH_SIZE', 5000))
+                logger.info(f"Archivage offres: {archived} déplacées vers offres_archive")
+
+                try:
+                    db.session.add(LogScraping(
+                        source='archivage_offres',
+                        nombre_offres_trouvees=archived,
+                        nombre_offres_nouvelles=0,
+                        statut='succes',
+                        temps_execution=time.time() - start_time
+                    ))
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+
+                return {'archived': archived}
+            except Exception as e:
+                logger.error(f"Erreur archiver_offres_inactives: {str(e)}", exc_info=True)
+                db.session.rollback()
+                return {'error': str(e)}
+
+    def consolider_logs_scraping(self):
+        """Agréger les logs de scraping par jour et par source, puis supprimer les logs
+        bruts plus anciens que LOGS_SCRAPING_RETENTION_JOURS."""
+        if not self.app:
+            return {'error': 'app_not_initialized'}
+
+        with self.app.app_context(), profiler_sql('consolider_logs_scraping'):
+            try:
+                res = consolider_logs(self.app.config.get('LOGS_SCRAPING_RETENTION_JOURS', 30))
+                logger.info(
+                    f"Consolidation logs: {res['jours_agreges']} agrégats, {res['lignes_supprimees']} logs supprimés"
+                )
+                return res
+            except Exception as e:
+                logger.error(f"Erreur consolider_logs_scraping: {str(e)}", exc_info=True)
+                db.session.rollback()
+                return {'error': str(e)}
+
+    def traiter_notifications(self):
+        """Générer les résumés des nouvelles correspondances puis livrer la boîte d'envoi (reprises incluses)."""
+        if not self.app:
+            return {'error': 'app_not_initialized'}
+        if not self.app.config.get('NOTIFICATIONS_ENABLED', True):
+            return {'disabled': True}
+        if not self._verrou_notifications.acquire(blocking=False):
+            logger.info("traiter_notifications déjà en cours, passage ignoré")
+            return {'deja_en_cours': True}
+
+        try:
+            with self.app.app_context(), profiler_sql('traiter_notifications'):
+                try:
+                    res = notifications.generer_digests(max_offres=self.app.config.get('NOTIFICATIONS_MAX_OFFRES', 50))
+                    res.update(notifications.livrer_notifications(self.app.config))
+                    if res['notifications'] or res['envoyees'] or res['reprises'] or res['abandonnees']:
+                        logger.info(
+                            f"Notifications: {res['notifications']} résumés, {res['envoyees']} envoyées, "
+                            f"{res['reprises']} à reprendre, {res['abandonnees']} abandonnées"
+                        )
+                    return res
+                except Exception as e:
+                    logger.error(f"Erreur traiter_notifications: {str(e)}", exc_info=True)
+                    db.session.rollback()
+                    return {'error': str(e)}
+        finally:
+            self._verrou_notifications.release()
+
+    def indexer_quasi_doublons(self):
+        """Calculer les empreintes SimHash des offres qui n'en ont pas et regrouper leurs quasi-doublons."""
+        if not self.app:
+            return {'error': 'app_not_initialized'}
+        if not self.app.config.get('QUASI_DOUBLONS_ENABLED', True):
+            return {'indexees': 0, 'disabled': True}
+
+        with self.app.app_context(), profiler_sql('indexer_quasi_doublons'):
+            try:
+                res = indexer_offres_manquantes(distance_max=self.app.config.get('QUASI_DOUBLONS_DISTANCE', 4))
+                logger.info(f"Quasi-doublons: {res['indexees']} offres indexées, {res['groupees']} regroupées")
+                return res
+            except Exception as e:
+                logger.error(f"Erreur indexer_quasi_doublons: {str(e)}", exc_info=True)
+                db.session.rollback()
+                return {'error': str(e)}
+
     def _executer_scraper(self, scraper_key):
         """Exécuter un scraper spécifique"""
         with self.app.app_context():
@@ -485,8 +674,62 @@ class ScrapingScheduler:
         """
         Sauvegarder les offres en base de données
         Retourne le nombre d'offres nouvelles
+
+        Sans autoflush: aucune écriture n'est émise pendant l'enrichissement (PDF, IA),
+        la transaction d'écriture se limite au commit final, passé par la file d'écritures.
         """
+        with db.session.no_autoflush:
+            return self._traiter_offres(offres)
+
+    def _traiter_offres(self, offres):
+        from scraping.date_extraction import coerce_datetime
+
         nombre_nouvelles = 0
+        mesures = mesures_courantes()
+        mesures.incrementer('candidats', len(offres))
+
+        # Clé de dédoublonnage: URL canonique (variantes http/www/slash/suivi regroupées)
+        uniques = {}
+        for o in offres:
+            o['url_canonique'] = o.get('url_canonique') or canonicaliser_url(o.get('url'))
+            if o['url_canonique'] in uniques:
+                mesures.rejeter('doublon_url')
+                continue
+            uniques[o['url_canonique']] = o
+        offres = list(uniques.values())
+
+        # Offres créées dans ce lot (non encore flushées), par URL canonique
+        en_attente = {}
+        # Offres insérées ou mises à jour par ce lot (percolées sur les recherches sauvegardées)
+        modifiees = []
+
+        def _offre_par_url(url_canonique):
+            if not url_canonique:
+                return None
+            return en_attente.get(url_canonique) or Offre.query.filter(
+                Offre.url_canonique == url_canonique
+            ).order_by(Offre.actif.desc(), Offre.id).first()
+
+        # Offres déjà archivées (pierres tombales): ignorées avant tout enrichissement PDF/IA
+        with mesures.etape('db'):
+            archivees = urls_archivees([o['url_canonique'] for o in offres])
+        if archivees:
+            conservees = []
+            for o in offres:
+                if o['url_canonique'] in archivees:
+                    mesures.rejeter('archivee')
+                else:
+                    conservees.append(o)
+            offres = conservees
+
+        # Quasi-doublons (SimHash titre + description, date limite): une offre proche d'une offre
+        # connue rejoint son groupe sans enrichissement PDF/IA. Empreintes à indexer au commit:
+        # [(offre, simhash, date_cloturation, cible)], cible = id canonique, Offre du lot ou None.
+        cfg_qd = getattr(current_app, 'config', {})
+        index_qd = None
+        if cfg_qd.get('QUASI_DOUBLONS_ENABLED', True):
+            index_qd = IndexQuasiDoublons(distance_max=cfg_qd.get('QUASI_DOUBLONS_DISTANCE', 4))
+        empreintes = []
 
         def _norm_text(s: str) -> str:
             s = (s or '').lower().replace('\u00a0', ' ').strip()
@@ -533,10 +776,17 @@ class ScrapingScheduler:
                 return ''
 
             cfg = getattr(current_app, 'config', {})
+            if not cfg.get('SINDEV_PDF_ENABLED', True):
+                return ''
             timeout = int(cfg.get('SINDEV_PDF_TIMEOUT', 15))
             max_bytes = int(cfg.get('SINDEV_PDF_MAX_BYTES', 5 * 1024 * 1024))
             max_chars = int(cfg.get('SINDEV_PDF_MAX_CHARS', 4000))
 
+            import io
+            import requests
+            from pypdf import PdfReader
+            from requests.exceptions import RequestException
+
             try:
                 r = requests.get(pdf_url, timeout=timeout, stream=True)
                 r.raise_for_status()
@@ -642,30 +892,63 @@ class ScrapingScheduler:
             keep = len(reasons) == 0
             return keep, reasons + soft_reasons
 
-        def _coerce_datetime(value):
-            if value is None or value == '':
-                return None
-            if isinstance(value, datetime):
-                dt = value
-                if dt.tzinfo is not None:
-                    dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
-                return dt
-            if isinstance(value, str):
-                try:
-                    dt = date_parser.parse(value)
-                    if dt.tzinfo is not None:
-                        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
-                    return dt
-                except Exception:
-                    return None
-            return None
-        
         for offre_data in offres:
+            # Normaliser dates (utilisé aussi pour le filtrage strict)
+            date_publication = coerce_datetime(offre_data.get('date_publication'))
+            date_cloturation = coerce_datetime(offre_data.get('date_cloturation'))
+
+            simhash = None
+            if index_qd is not None:
+                cible = None
+                with mesures.etape('quasi_doublons'):
+                    simhash = empreinte(offre_data.get('titre'), offre_data.get('description'))
+                    if simhash is not None and _offre_par_url(offre_data['url_canonique']) is None:
+                        cible = index_qd.chercher(simhash, date_cloturation)
+                if cible == GROUPE_INACTIF:
+                    # Copie d'une offre désactivée (rejet IA, nettoyage...): même décision que l'original
+                    mesures.rejeter('quasi_doublon_inactif')
+                    try:
+                        logger.info(
+                            f"[FILTER] QUASI_DOUBLON_INACTIF url={offre_data.get('url','')} titre={str(offre_data.get('titre',''))[:120]}"
+                        )
+                    except Exception:
+                        pass
+                    continue
+                if cible is not None:
+                    membre = Offre(
+                        titre=offre_data['titre'],
+                        source=offre_data['source'],
+                        url=offre_data['url'],
+                        url_canonique=offre_data['url_canonique'],
+                        description=offre_data.get('description', ''),
+                        type_offre=offre_data.get('type_offre', ''),
+                        partenaire=offre_data.get('partenaire', ''),
+                        mots_cles=offre_data.get('mots_cles', ''),
+                        date_publication=date_publication,
+                        date_cloturation=date_cloturation,
+                        groupe_id=cible if isinstance(cible, int) else None,
+                        actif=True,
+                    )
+                    db.session.add(membre)
+                    en_attente[offre_data['url_canonique']] = membre
+                    modifiees.append(membre)
+                    index_qd.retenir(simhash, date_cloturation, cible)
+                    empreintes.append((membre, simhash, date_cloturation, cible))
+                    mesures.incrementer('quasi_doublons')
+                    try:
+                        logger.info(
+                            f"[FILTER] QUASI_DOUBLON url={offre_data.get('url','')} titre={str(offre_data.get('titre',''))[:120]}"
+                        )
+                    except Exception:
+                        pass
+                    continue
+
             # Enrichissement automatique via PDF (si disponible) pour améliorer le tri IA/filtrage
             try:
                 pdf_url = _detect_pdf_url(offre_data)
                 if pdf_url:
-                    pdf_text = _extract_pdf_text(pdf_url)
+                    with mesures.etape('pdf'):
+                        pdf_text = _extract_pdf_text(pdf_url)
                     if pdf_text:
                         offre_data['description'] = f"CONTENU PDF (extrait): {pdf_text}\n\n" + (offre_data.get('description') or '')
                         offre_data['pdf_url'] = pdf_url
@@ -677,24 +960,25 @@ class ScrapingScheduler:
             except Exception:
                 pass
 
-            # Normaliser dates (utilisé aussi pour le filtrage strict)
-            date_publication = _coerce_datetime(offre_data.get('date_publication'))
-            date_cloturation = _coerce_datetime(offre_data.get('date_cloturation'))
-
             # Filtrage strict SinDev (avant IA / DB)
             try:
-                keep_strict, reasons = _strict_sindev_filter(offre_data, date_cloturation)
+                with mesures.etape('filtre_strict'):
+                    keep_strict, reasons = _strict_sindev_filter(offre_data, date_cloturation)
             except Exception as e:
                 keep_strict, reasons = True, [f'filter_error:{type(e).__name__}']
 
             accept_tag = 'ACCEPT_SOFT' if ('not_sindev_domain' in (reasons or [])) else 'ACCEPT'
 
             if not keep_strict:
+                for r in reasons:
+                    mesures.rejeter(r)
                 try:
-                    offre_existante = Offre.query.filter_by(url=offre_data.get('url')).first()
+                    with mesures.etape('db'):
+                        offre_existante = _offre_par_url(offre_data.get('url_canonique'))
                     if offre_existante:
                         offre_existante.actif = False
                         offre_existante.date_scrape = datetime.utcnow()
+                        mesures.incrementer('lignes_desactivees')
                 except Exception:
                     pass
                 try:
@@ -707,16 +991,22 @@ class ScrapingScheduler:
 
             # Filtre IA local optionnel (Ollama). Si indisponible, fallback sur le flux normal.
             try:
-                ai_res = self.ai_filter.evaluate(offre_data)
+                with mesures.etape('ia'):
+                    ai_res = self.ai_filter.evaluate(offre_data)
             except Exception:
                 ai_res = {'keep': True, 'resume': None}
+            if ai_res.get('used_ai'):
+                mesures.incrementer('appels_ia')
 
             if not ai_res.get('keep', True):
+                mesures.rejeter('ia')
                 try:
-                    offre_existante = Offre.query.filter_by(url=offre_data.get('url')).first()
+                    with mesures.etape('db'):
+                        offre_existante = _offre_par_url(offre_data.get('url_canonique'))
                     if offre_existante:
                         offre_existante.actif = False
                         offre_existante.date_scrape = datetime.utcnow()
+                        mesures.incrementer('lignes_desactivees')
                 except Exception:
                     pass
             else:
@@ -733,6 +1023,7 @@ class ScrapingScheduler:
                             offre_data['description'] = d
                 except Exception:
                     pass
+                mesures.incrementer('ecartees_apres_ia')
                 try:
                     logger.info(
                         f"[FILTER] REJECT_AI url={offre_data.get('url','')} titre={str(offre_data.get('titre',''))[:120]}"
@@ -746,7 +1037,8 @@ class ScrapingScheduler:
                 offre_data['description'] = ai_resume
 
             # Vérifier si l'offre existe déjà
-            offre_existante = Offre.query.filter_by(url=offre_data['url']).first()
+            with mesures.etape('db'):
+                offre_existante = _offre_par_url(offre_data['url_canonique'])
 
             if not offre_existante:
                 # Créer une nouvelle offre
@@ -754,6 +1046,7 @@ class ScrapingScheduler:
                     titre=offre_data['titre'],
                     source=offre_data['source'],
                     url=offre_data['url'],
+                    url_canonique=offre_data['url_canonique'],
                     description=offre_data.get('description', ''),
                     type_offre=offre_data.get('type_offre', ''),
                     partenaire=offre_data.get('partenaire', ''),
@@ -763,7 +1056,13 @@ class ScrapingScheduler:
                     actif=True,
                 )
                 db.session.add(nouvelle_offre)
+                en_attente[offre_data['url_canonique']] = nouvelle_offre
+                modifiees.append(nouvelle_offre)
+                if simhash is not None:
+                    index_qd.retenir(simhash, date_cloturation, nouvelle_offre)
+                    empreintes.append((nouvelle_offre, simhash, date_cloturation, None))
                 nombre_nouvelles += 1
+                mesures.incrementer('lignes_inserees')
 
                 try:
                     logger.info(
@@ -775,6 +1074,8 @@ class ScrapingScheduler:
                 # Mettre à jour l'offre existante si on récupère des infos plus fraîches
                 offre_existante.actif = True
                 offre_existante.date_scrape = datetime.utcnow()
+                modifiees.append(offre_existante)
+                mesures.incrementer('lignes_mises_a_jour')
 
                 if offre_data.get('titre'):
                     offre_existante.titre = offre_data['titre']
@@ -804,8 +1105,33 @@ class ScrapingScheduler:
                 if date_cloturation is not None:
                     offre_existante.date_cloturation = date_cloturation
         
-        db.session.commit()
+        with mesures.etape('db'), file_ecritures.ecrire():
+            if empreintes or modifiees:
+                db.session.flush()
+            if empreintes:
+                db.session.execute(db.insert(EmpreinteOffre), [
+                    IndexQuasiDoublons.ligne(o.id, h, d, self._groupe_quasi_doublon(o, cible))
+                    for o, h, d, cible in empreintes
+                ])
+            if modifiees:
+                # Point de sauvegarde: un échec de percolation (transaction avortée sous PostgreSQL)
+                # ne perd que les correspondances, pas les offres du lot
+                try:
+                    with db.session.begin_nested():
+                        mesures.incrementer('correspondances_recherches', percoler(modifiees))
+                except Exception as e:
+                    logger.warning(f"Percolation des recherches sauvegardées impossible: {e}")
+            db.session.commit()
         return nombre_nouvelles
+
+    @staticmethod
+    def _groupe_quasi_doublon(offre, cible):
+        """Id canonique du groupe d'une offre créée dans le lot (renseigne `groupe_id` si la cible est du lot)."""
+        if cible is None:
+            return offre.id
+        if isinstance(cible, Offre):
+            offre.groupe_id = cible.groupe_id or cible.id
+        return offre.groupe_id
     
     def executer_maintenant(self, scraper_key):
         """Exécuter un scraper immédiatement (pour tester). Retourne un dict résumé."""
@@ -813,7 +1139,9 @@ class ScrapingScheduler:
 
     def _executer_scraper(self, scraper_key):
         """Exécuter un scraper spécifique"""
-        with self.app.app_context():
+        with self.app.app_context(), profiler_sql(f'executer_scraper({scraper_key})'):
+            mesures = MesuresExecution()
+            profil = {}
             try:
                 start_time = time.time()
                 scraper = self.scrapers.get(scraper_key)
@@ -826,11 +1154,16 @@ class ScrapingScheduler:
                 # Obtenir les mots-clés
                 mots_cles = KeywordManager.obtenir_tous_mots_cles()
 
-                # Exécuter le scraper
-                offres = scraper.scrape(mots_cles)
+                profile = scraper_key in self.profilage['sources']
+                with collecter(mesures), self._profiler(f'scraper-{scraper_key}', profile) as profil:
+                    # Exécuter le scraper
+                    self._charger_etats_flux(scraper)
+                    with mesures.etape('scrape'):
+                        offres = scraper.scrape(mots_cles)
 
-                # Sauvegarder les offres
-                nombre_nouvelles = self._sauvegarder_offres(offres)
+                    # Sauvegarder les offres
+                    nombre_nouvelles = self._sauvegarder_offres(offres)
+                    self._enregistrer_etats_flux(scraper)
 
                 # Mettre à jour la source
                 source = Source.query.filter_by(nom=scraper.source_nom).first()
@@ -845,10 +1178,12 @@ class ScrapingScheduler:
                     nombre_offres_trouvees=len(offres),
                     nombre_offres_nouvelles=nombre_nouvelles,
                     statut='succes',
-                    temps_execution=temps_execution
+                    temps_execution=temps_execution,
+                    details=self._details(mesures, profil)
                 )
                 db.session.add(log)
                 db.session.commit()
+                self._observer_execution(scraper.source_nom, 'succes', temps_execution, nombre_nouvelles)
 
                 logger.info(f"[{scraper.source_nom}] ✓ Succès: {len(offres)} offres, {nombre_nouvelles} nouvelles en {temps_execution:.2f}s")
 
@@ -862,12 +1197,14 @@ class ScrapingScheduler:
 
             except Exception as e:
                 logger.error(f"[{scraper_key}] ✗ Erreur: {str(e)}", exc_info=True)
+                self._observer_execution(scraper_key, 'erreur', time.time() - start_time)
 
                 # Enregistrer l'erreur
                 log = LogScraping(
                     source=scraper_key,
                     statut='erreur',
-                    message_erreur=str(e)
+                    message_erreur=str(e),
+                    details=self._details(mesures, profil)
                 )
                 db.session.add(log)
                 db.session.commit()
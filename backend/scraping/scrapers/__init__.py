@@ -1,24 +1,39 @@
 """
 Init pour le package scrapers
-Exporte les scrapers pour faciliter l'import
+Exporte les scrapers pour faciliter l'import (chargés à la demande: importer
+un scraper ne charge pas les autres modules du package)
 """
 
-from .base_scraper import BaseScraper
-from .un_scraper import UNScraper
-from .educarriere_scraper import EduCarriereScraper
-from .pam_scraper import PAMScraper
-from .fao_scraper import FAOScraper
-from .ue_scraper import UEScraper
-from .afd_scraper import AFDScraper
-from .pnud_scraper import PNUDScraper
-from .worldbank_scraper import WorldBankScraper
-from .bad_scraper import BADScraper
-from .enabel_scraper import EnabelScraper
-from .firca_scraper import FIRCAScraper
-from .anader_scraper import AnaderScraper
-from .minader_scraper import MinaderScraper
-from .dgmp_scraper import DGMPScraper
-from .structure_links_scraper import StructuresLinksScraper
+import importlib
+
+_MODULES = {
+    'BaseScraper': 'base_scraper',
+    'UNScraper': 'un_scraper',
+    'EduCarriereScraper': 'educarriere_scraper',
+    'PAMScraper': 'pam_scraper',
+    'FAOScraper': 'fao_scraper',
+    'UEScraper': 'ue_scraper',
+    'AFDScraper': 'afd_scraper',
+    'PNUDScraper': 'pnud_scraper',
+    'WorldBankScraper': 'worldbank_scraper',
+    'BADScraper': 'bad_scraper',
+    'EnabelScraper': 'enabel_scraper',
+    'FIRCAScraper': 'firca_scraper',
+    'AnaderScraper': 'anader_scraper',
+    'MinaderScraper': 'minader_scraper',
+    'DGMPScraper': 'dgmp_scraper',
+    'StructuresLinksScraper': 'structure_links_scraper',
+}
+
+
+def __getattr__(nom):
+    module = _MODULES.get(nom)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nom!r}")
+    valeur = getattr(importlib.import_module(f'.{module}', __name__), nom)
+    globals()[nom] = valeur
+    return valeur
+
 
 __all__ = [
     'BaseScraper','UNScraper','EduCarriereScraper',
@@ -7,9 +7,17 @@ from abc import ABC, abstractmethod
 import requests
 from bs4 import BeautifulSoup
 import logging
+import time
 from datetime import datetime
+from urllib.parse import urlparse
 from requests.exceptions import RequestException, Timeout
 
+import metrics
+
+from ..instrumentation import mesures_courantes
+from ..page_archive import obtenir_archive
+from ..url_canonique import canonicaliser_url
+
 logger = logging.getLogger(__name__)
 
 class BaseScraper(ABC):
@@ -55,11 +63,12 @@ class BaseScraper(ABC):
             BeautifulSoup: Objet parsé ou None en cas d'erreur
         """
         try:
-            response = self.session.get(url, timeout=self.timeout)
+            response = self._get(url)
             response.raise_for_status()
+            self._archiver(url, response)
             # record effective base for subsequent URL joins
             self._last_effective_base = url
-            return BeautifulSoup(response.content, 'html.parser')
+            return self._parser_html(response.content)
         except Timeout:
             logger.error(f"Timeout lors de l'accès à {url}")
             return None
@@ -73,20 +82,22 @@ class BaseScraper(ABC):
                     # add www
                     parts = url.split("//", 1)
                     alt = parts[0] + "//www." + parts[1]
-                response = self.session.get(alt, timeout=self.timeout)
+                response = self._get(alt)
                 response.raise_for_status()
+                self._archiver(alt, response)
                 logger.info(f"SSL fallback successful with alternate host {alt}")
                 self._last_effective_base = alt
-                return BeautifulSoup(response.content, 'html.parser')
+                return self._parser_html(response.content)
             except Exception as e:
                 logger.warning(f"Alternate host attempt failed for {url}: {e}. Will attempt verify=False as last resort.")
                 try:
                     # Last resort: bypass verification but log clearly
-                    response = self.session.get(url, timeout=self.timeout, verify=False)
+                    response = self._get(url, verify=False)
                     response.raise_for_status()
+                    self._archiver(url, response)
                     logger.warning(f"Insecure SSL fallback used for {url} (verify=False). Ensure this is acceptable.")
                     self._last_effective_base = url
-                    return BeautifulSoup(response.content, 'html.parser')
+                    return self._parser_html(response.content)
                 except Exception as e2:
                     logger.error(f"All SSL fallback attempts failed for {url}: {e2}")
                     return None
@@ -97,6 +108,78 @@ class BaseScraper(ABC):
             logger.error(f"Erreur lors du parsing de {url}: {str(e)}")
             return None
     
+    def _get(self, url, **kwargs):
+        """GET via la session du scraper, avec mesure du temps réseau et des compteurs"""
+        mesures = mesures_courantes()
+        hote = (urlparse(url).netloc or '').lower()
+        t0 = time.perf_counter()
+        try:
+            with mesures.etape('fetch'):
+                response = self.session.get(url, timeout=self.timeout, **kwargs)
+        except Exception:
+            metrics.FETCH_ERREURS.inc(hote=hote)
+            raise
+        finally:
+            metrics.FETCH_DUREE.observer(time.perf_counter() - t0, hote=hote)
+        if response.status_code >= 400:
+            metrics.FETCH_ERREURS.inc(hote=hote)
+        mesures.incrementer('pages')
+        mesures.incrementer('octets', len(response.content or b''))
+        if response.status_code == 304:
+            mesures.incrementer('reponses_304')
+        if getattr(response, 'depuis_archive', False) or getattr(response, 'from_cache', False):
+            mesures.incrementer('cache_hits')
+        return response
+    
+    def _parser_html(self, content):
+        """Parser le HTML (temps mesuré dans l'étape 'parse_html')"""
+        with mesures_courantes().etape('parse_html'):
+            return BeautifulSoup(content, 'html.parser')
+    
+    def _archiver(self, url, response):
+        """Archiver la réponse brute (si l'archive de pages est activée)"""
+        if getattr(response, 'depuis_archive', False):
+            return
+        archive = obtenir_archive()
+        if archive is None:
+            return
+        try:
+            archive.enregistrer(
+                url,
+                getattr(response, 'status_code', 200),
+                dict(getattr(response, 'headers', None) or {}),
+                response.content,
+            )
+        except Exception as e:
+            logger.warning(f"Archivage impossible pour {url}: {str(e)}")
+    
+    def recuperer_contenu(self, url, max_bytes=5 * 1024 * 1024):
+        """
+        Récupérer le contenu brut d'une URL (flux XML, sitemap, JSON)
+        
+        Args:
+            url (str): URL à récupérer
+            max_bytes (int): Taille maximale acceptée
+            
+        Returns:
+            bytes: Contenu brut ou None en cas d'erreur
+        """
+        try:
+            response = self._get(url)
+            response.raise_for_status()
+            self._archiver(url, response)
+            content = response.content or b''
+            if len(content) > max_bytes:
+                logger.warning(f"Contenu trop volumineux ignoré: {url} ({len(content)} octets)")
+                return None
+            return content
+        except RequestException as e:
+            logger.warning(f"Erreur réseau pour {url}: {str(e)}")
+            return None
+        except Exception as e:
+            logger.warning(f"Erreur lors de la récupération de {url}: {str(e)}")
+            return None
+    
     def extraire_texte(self, element):
         """Extraire le texte brut d'un élément"""
         if element is None:
@@ -139,6 +222,7 @@ class BaseScraper(ABC):
             'titre': titre,
             'source': source,
             'url': url,
+            'url_canonique': canonicaliser_url(url),
             'description': description or '',
             'date_publication': date_pub,
             'date_cloturation': date_clot,
@@ -148,13 +232,14 @@ class BaseScraper(ABC):
         }
     
     def nettoyer_offres_doublons(self, offres):
-        """Supprimer les doublons basé sur l'URL"""
+        """Supprimer les doublons basé sur l'URL canonique"""
         urls_vues = set()
         offres_uniques = []
         
         for offre in offres:
-            if offre['url'] not in urls_vues:
-                urls_vues.add(offre['url'])
+            cle = offre.get('url_canonique') or canonicaliser_url(offre['url'])
+            if cle not in urls_vues:
+                urls_vues.add(cle)
                 offres_uniques.append(offre)
         
         return offres_uniques
@@ -2,8 +2,10 @@ from .base_scraper import BaseScraper
 import logging
 from urllib.parse import urljoin, urlparse
 import re
-from dateutil import parser as date_parser
 
+from ..instrumentation import mesures_courantes
+from ..date_extraction import extraire_date_limite, CONFIANCE_HAUTE
+from ..structured_sources import decouvrir_flux, parser_flux, extraire_json_ld, date_limite_json_ld
 from config import Config
 
 logger = logging.getLogger(__name__)
@@ -19,6 +21,44 @@ class StructuresLinksScraper(BaseScraper):
         self.sindev_ci_terms = [t.lower() for t in getattr(Config, 'SINDEV_CI_TERMS', []) if t]
         self.sindev_ci_geo_terms = [t.lower() for t in getattr(Config, 'SINDEV_CI_GEO_TERMS', []) if t]
 
+        # Mode flux (RSS/Atom, sitemaps, JSON-LD): l'état lastmod est chargé/sauvé par le scheduler
+        self.flux_enabled = bool(getattr(Config, 'STRUCTURES_FLUX_ENABLED', True))
+        self.flux_max_entrees = int(getattr(Config, 'STRUCTURES_FLUX_MAX_ENTREES', 200))
+        self.flux_max_documents = int(getattr(Config, 'STRUCTURES_FLUX_MAX_DOCUMENTS', 5))
+        self.lastmod_connus = {}
+        self.lastmod_vus = {}
+        self.stats_flux = {'flux': 0, 'entrees': 0, 'inchangees': 0, 'pages_detail': 0}
+
+        self.common_keywords = [
+            'appel',
+            "appel d'offres",
+            'offre',
+            'marché',
+            'marches',
+            'avis',
+            'manifestation',
+            'tender',
+            'tenders',
+            'procurement',
+            'rfq',
+            'rfp',
+            'eoi',
+            'expression of interest',
+            'invitation',
+        ]
+
+        # Exclure des chemins typiquement "contenu" (actualités, stories, etc.)
+        self.exclude_url_parts = [
+            '/blog', '/news', '/press', '/story', '/stories', '/article', '/photo', '/video',
+            '/climate', '/report', '/publications', '/about', '/contact', '/careers',
+            '/jobs', '/media', '/events'
+        ]
+
+        self.include_url_parts = [
+            'procurement', 'tender', 'tenders', 'bid', 'bids', 'rfq', 'rfp', 'eoi',
+            'expression-of-interest', 'invitation', 'appel', 'offre', 'march', 'avis'
+        ]
+
     def _is_http_url(self, url: str) -> bool:
         if not url:
             return False
@@ -76,51 +116,14 @@ class StructuresLinksScraper(BaseScraper):
             return True
 
     def _parse_deadline_from_soup(self, soup):
-        if not soup:
-            return None
-
-        for t in soup.find_all('time'):
-            if t and t.has_attr('datetime'):
-                try:
-                    dt = date_parser.parse(t['datetime'])
-                    if dt.tzinfo is not None:
-                        dt = dt.astimezone(tz=None).replace(tzinfo=None)
-                    return dt
-                except Exception:
-                    pass
-
-        text = soup.get_text(' ', strip=True)
-        if not text:
-            return None
-
-        triggers = r"(?:date\s+limite|date\s+de\s+cl[oô]ture|cl[oô]ture|deadline|closing\s+date|submission\s+deadline|date\s+limite\s+de\s+soumission|d[eé]p[oô]t\s+des\s+offres|date\s+de\s+d[eé]p[oô]t)"
-
-        patterns = [
-            # 15/02/2026, 15-02-2026, 15.02.2026 (+ heure optionnelle)
-            rf"{triggers}\s*[:\-–]?\s*([0-9]{{1,2}}[\./\-][0-9]{{1,2}}[\./\-][0-9]{{2,4}}(?:\s*(?:[àa]|a)?\s*[0-9]{{1,2}}(?:[:h][0-9]{{0,2}})?(?:\s*(?:min|mn)?)?)?)",
-            # 2026-02-15, 2026/02/15 (+ heure optionnelle)
-            rf"{triggers}\s*[:\-–]?\s*([0-9]{{4}}[\./\-][0-9]{{1,2}}[\./\-][0-9]{{1,2}}(?:\s*(?:[àa]|a)?\s*[0-9]{{1,2}}(?:[:h][0-9]{{0,2}})?(?:\s*(?:min|mn)?)?)?)",
-            # 15 février 2026 (+ heure optionnelle)
-            rf"{triggers}\s*[:\-–]?\s*([0-9]{{1,2}}\s+[A-Za-zÀ-ÿ]+\s+[0-9]{{2,4}}(?:\s*(?:[àa]|a)?\s*[0-9]{{1,2}}(?:[:h][0-9]{{0,2}})?(?:\s*(?:min|mn)?)?)?)",
-        ]
-
-        for pat in patterns:
-            m = re.search(pat, text, flags=re.IGNORECASE)
-            if m:
-                try:
-                    dt = date_parser.parse(m.group(1), dayfirst=True, fuzzy=True)
-                    if dt.tzinfo is not None:
-                        dt = dt.astimezone(tz=None).replace(tzinfo=None)
-                    return dt
-                except Exception:
-                    continue
-
-        return None
+        res = extraire_date_limite(soup)
+        return res.date if res else None
 
     def _parse_offer_page(self, url):
         page = self.recuperer_page(url)
         if not page:
             return None
+        self.stats_flux['pages_detail'] += 1
 
         titre = self.extraire_texte(page.find('h1')) or (page.title.string.strip() if page.title and page.title.string else url)
 
@@ -133,50 +136,154 @@ class StructuresLinksScraper(BaseScraper):
             p = main.find('p') if main else None
             description = self.extraire_texte(p)
 
-        date_clot = self._parse_deadline_from_soup(page)
+        # Une date limite déclarée en JSON-LD (validThrough/endDate) prime sur le texte libre
+        date_clot = date_limite_json_ld(page) if self.flux_enabled else None
+        if date_clot is not None:
+            confiance = CONFIANCE_HAUTE
+        else:
+            deadline = extraire_date_limite(page)
+            date_clot = deadline.date if deadline else None
+            confiance = deadline.confiance if deadline else None
 
         return {
             'titre': titre,
             'description': description or '',
             'date_cloturation': date_clot,
+            'date_cloturation_confiance': confiance,
             'url': url,
         }
 
+    def hotes_cibles(self):
+        """Hôtes des URLs cibles (sert à charger l'état lastmod correspondant)."""
+        hotes = set()
+        for target in self.targets or []:
+            for u in ((target or {}).get('urls_a_scraper') or []) + ((target or {}).get('flux') or []):
+                try:
+                    h = (urlparse(u).netloc or '').lower()
+                except Exception:
+                    h = ''
+                if h:
+                    hotes.add(h)
+        return sorted(hotes)
+
+    def _lire_flux(self, flux_urls, page_url):
+        """Lire des flux/sitemaps et retourner les entrées (sitemapindex suivi sur un niveau)."""
+        entrees = []
+        a_lire = list(flux_urls)
+        lus = set()
+        while a_lire and len(lus) < self.flux_max_documents:
+            u = a_lire.pop(0)
+            if u in lus or not self._is_http_url(u) or not self._is_same_domain(page_url, u):
+                continue
+            lus.add(u)
+            contenu = self.recuperer_contenu(u)
+            if not contenu:
+                continue
+            self.stats_flux['flux'] += 1
+            items, sous_sitemaps = parser_flux(contenu, base_url=u, max_entrees=self.flux_max_entrees)
+            entrees.extend(items)
+            a_lire.extend(sous_sitemaps)
+        return entrees
+
+    def _entrees_structurees(self, target, soup, page_url, base_for_join):
+        """Entrées issues de sources structurées (flux déclarés, <link> découverts, JSON-LD)."""
+        flux_urls = list((target or {}).get('flux') or [])
+        if soup is not None:
+            for u in decouvrir_flux(soup, base_for_join):
+                if u not in flux_urls:
+                    flux_urls.append(u)
+
+        entrees = self._lire_flux(flux_urls, page_url) if flux_urls else []
+        if soup is not None:
+            entrees.extend(extraire_json_ld(soup, base_for_join))
+        return entrees
+
+    def _evaluer_candidat(self, structure, page_url, text, full_url, mots, entree=None):
+        """Appliquer les filtres (URL, mots-clés, CI, focus SinDev) et construire l'offre."""
+        if full_url.startswith('mailto:') or full_url.startswith('javascript:'):
+            return None
+        if not self._is_http_url(full_url):
+            return None
+        if not self._is_same_domain(page_url, full_url):
+            return None
+
+        url_lower = full_url.lower()
+        if any(p in url_lower for p in self.exclude_url_parts):
+            return None
+
+        hay = f"{text} {full_url}".strip().lower()
+        matches_common = any(k in hay for k in self.common_keywords)
+        matches_mots = bool(mots) and any(k in hay for k in mots)
+        matches_url = any(k in url_lower for k in self.include_url_parts)
+
+        if not (matches_url and (matches_common or matches_mots)):
+            return None
+
+        # Mode flux: ne pas re-télécharger une page détail inchangée depuis le dernier passage
+        lastmod = (entree or {}).get('lastmod')
+        if lastmod:
+            if self.lastmod_connus.get(full_url) == lastmod:
+                self.stats_flux['inchangees'] += 1
+                mesures_courantes().incrementer('cache_hits')
+                return None
+            self.lastmod_vus[full_url] = lastmod
+
+        details = None
+        if entree and entree.get('date_cloturation') and entree.get('description'):
+            details = entree
+        else:
+            try:
+                details = self._parse_offer_page(full_url)
+            except Exception:
+                details = None
+            if details and entree:
+                details = {
+                    **details,
+                    'titre': details.get('titre') or entree.get('titre'),
+                    'description': details.get('description') or entree.get('description') or '',
+                }
+
+        details_text = ''
+        if details:
+            details_text = f"{details.get('titre','')} {details.get('description','')}".lower()
+
+        matches_focus = False
+        if self.sindev_focus_enabled and self.sindev_focus_terms:
+            matches_focus = any(t in hay or t in details_text for t in self.sindev_focus_terms)
+
+        if self.sindev_ci_only and self.sindev_ci_terms:
+            matches_ci = (
+                self._matches_ci_terms(hay)
+                or self._matches_ci_terms(details_text)
+                or self._is_ci_domain(full_url)
+            )
+            if not matches_ci:
+                return None
+
+        # Filtre SinDev: garder si mots-clés ou focus SinDev
+        if self.sindev_focus_enabled and not (matches_mots or matches_focus):
+            return None
+
+        mots_trouves = [k for k in mots if k in hay]
+        return self.creer_offre(
+            titre=(details.get('titre') if details else None) or (text or full_url),
+            source=self.source_nom,
+            url=full_url,
+            description=(details.get('description') if details else '') or '',
+            date_pub=(entree or {}).get('date_publication'),
+            date_clot=(details.get('date_cloturation') if details else None),
+            type_offre='Offre',
+            partenaire=structure,
+            mots_cles_trouves=mots_trouves,
+        )
+
     def scrape(self, mots_cles=None):
         logger.info(f"[{self.source_nom}] Démarrage scraping (structures)")
 
         mots = [m.lower() for m in (mots_cles or []) if m]
         offres = []
-
-        common_keywords = [
-            'appel',
-            "appel d'offres",
-            'offre',
-            'marché',
-            'marches',
-            'avis',
-            'manifestation',
-            'tender',
-            'tenders',
-            'procurement',
-            'rfq',
-            'rfp',
-            'eoi',
-            'expression of interest',
-            'invitation',
-        ]
-
-        # Exclure des chemins typiquement "contenu" (actualités, stories, etc.)
-        exclude_url_parts = [
-            '/blog', '/news', '/press', '/story', '/stories', '/article', '/photo', '/video',
-            '/climate', '/report', '/publications', '/about', '/contact', '/careers',
-            '/jobs', '/media', '/events'
-        ]
-
-        include_url_parts = [
-            'procurement', 'tender', 'tenders', 'bid', 'bids', 'rfq', 'rfp', 'eoi',
-            'expression-of-interest', 'invitation', 'appel', 'offre', 'march', 'avis'
-        ]
+        self.lastmod_vus = {}
+        self.stats_flux = {'flux': 0, 'entrees': 0, 'inchangees': 0, 'pages_detail': 0}
 
         for target in self.targets:
             structure = (target or {}).get('structure') or (target or {}).get('nom')
@@ -185,80 +292,60 @@ class StructuresLinksScraper(BaseScraper):
             if not structure or not urls:
                 continue
 
+            # Flux déclarés dans la config: pas besoin de récupérer les pages d'index HTML
+            if self.flux_enabled and (target or {}).get('flux'):
+                entrees = self._entrees_structurees(target, None, urls[0], urls[0])
+                if entrees:
+                    self.stats_flux['entrees'] += len(entrees)
+                    for e in entrees:
+                        offre = self._evaluer_candidat(structure, urls[0], e.get('titre') or '', e['url'], mots, e)
+                        if offre:
+                            offres.append(offre)
+                    continue
+
             for page_url in urls:
                 soup = self.recuperer_page(page_url)
                 if not soup:
                     continue
 
-                candidats = soup.find_all('a', href=True)
-                for a in candidats:
-                    text = self.extraire_texte(a)
+                base_for_join = getattr(self, '_last_effective_base', None) or page_url
+
+                # Mode flux: entrées des flux/sitemaps annoncés et du JSON-LD, en plus des liens <a>
+                # (une entrée structurée apporte lastmod et date limite, mais ne masque pas les autres liens)
+                candidats = []
+                vus = set()
+                if self.flux_enabled:
+                    index = {page_url.rstrip('/'), base_for_join.rstrip('/')}
+                    for e in self._entrees_structurees({}, soup, page_url, base_for_join):
+                        url = e['url']
+                        # Ex: bloc WebPage/ItemList d'un plugin SEO décrivant la page d'index elle-même
+                        if url.rstrip('/') in index or url in vus:
+                            continue
+                        if any(k in url.lower() for k in self.include_url_parts):
+                            vus.add(url)
+                            candidats.append((e.get('titre') or '', url, e))
+                    self.stats_flux['entrees'] += len(candidats)
+
+                for a in soup.find_all('a', href=True):
                     href = a.get('href')
                     if not href:
                         continue
-
-                    base_for_join = getattr(self, '_last_effective_base', None) or page_url
                     full_url = urljoin(base_for_join, href)
-
-                    if full_url.startswith('mailto:') or full_url.startswith('javascript:'):
-                        continue
-                    if not self._is_http_url(full_url):
-                        continue
-                    if not self._is_same_domain(page_url, full_url):
-                        continue
-
-                    url_lower = full_url.lower()
-                    if any(p in url_lower for p in exclude_url_parts):
-                        continue
-
-                    hay = f"{text} {full_url}".strip().lower()
-                    matches_common = any(k in hay for k in common_keywords)
-                    matches_mots = bool(mots) and any(k in hay for k in mots)
-                    matches_url = any(k in url_lower for k in include_url_parts)
-
-                    if not (matches_url and (matches_common or matches_mots)):
-                        continue
-
-                    details = None
-                    try:
-                        details = self._parse_offer_page(full_url)
-                    except Exception:
-                        details = None
-
-                    details_text = ''
-                    if details:
-                        details_text = f"{details.get('titre','')} {details.get('description','')}".lower()
-
-                    matches_focus = False
-                    if self.sindev_focus_enabled and self.sindev_focus_terms:
-                        matches_focus = any(t in hay or t in details_text for t in self.sindev_focus_terms)
-
-                    if self.sindev_ci_only and self.sindev_ci_terms:
-                        matches_ci = (
-                            self._matches_ci_terms(hay)
-                            or self._matches_ci_terms(details_text)
-                            or self._is_ci_domain(full_url)
-                        )
-                        if not matches_ci:
-                            continue
-
-                    # Filtre SinDev: garder si mots-clés ou focus SinDev
-                    if self.sindev_focus_enabled and not (matches_mots or matches_focus):
+                    if full_url in vus:
                         continue
+                    vus.add(full_url)
+                    candidats.append((self.extraire_texte(a), full_url, None))
 
-                    mots_trouves = [k for k in mots if k in hay]
-                    offre = self.creer_offre(
-                        titre=(details.get('titre') if details else None) or (text or full_url),
-                        source=self.source_nom,
-                        url=full_url,
-                        description=(details.get('description') if details else '') or '',
-                        date_clot=(details.get('date_cloturation') if details else None),
-                        type_offre='Offre',
-                        partenaire=structure,
-                        mots_cles_trouves=mots_trouves,
-                    )
-                    offres.append(offre)
+                for text, full_url, entree in candidats:
+                    offre = self._evaluer_candidat(structure, page_url, text, full_url, mots, entree)
+                    if offre:
+                        offres.append(offre)
 
         offres = self.nettoyer_offres_doublons(offres)
+        if self.stats_flux['flux'] or self.stats_flux['entrees']:
+            logger.info(
+                f"[{self.source_nom}] Flux: {self.stats_flux['flux']} documents, {self.stats_flux['entrees']} entrées, "
+                f"{self.stats_flux['inchangees']} inchangées, {self.stats_flux['pages_detail']} pages détail"
+            )
         logger.info(f"[{self.source_nom}] {len(offres)} offres candidates trouvées")
         return offres
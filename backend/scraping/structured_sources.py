@@ -0,0 +1,242 @@
+"""
+Sources structurées: flux RSS/Atom, sitemaps et blocs JSON-LD
+Permet de lister les offres d'un site sans scraper ses pages HTML d'index,
+et de ne récupérer que les pages détail modifiées depuis le dernier passage.
+"""
+
+from email.utils import parsedate_to_datetime
+import json
+import logging
+from urllib.parse import urljoin
+import xml.etree.ElementTree as ET
+
+from bs4 import BeautifulSoup
+
+from .date_extraction import parse_date, CONFIANCE_HAUTE
+
+logger = logging.getLogger(__name__)
+
+FLUX_TYPES = (
+    'application/rss+xml',
+    'application/atom+xml',
+    'application/feed+json',
+    'application/xml',
+    'text/xml',
+)
+
+# Types schema.org pouvant décrire une opportunité (offre, avis, événement à date limite)
+JSON_LD_TYPES = {'JobPosting', 'Event', 'Offer', 'Demand', 'GovernmentService'}
+
+
+def _tag(el):
+    return el.tag.rsplit('}', 1)[-1].lower() if isinstance(el.tag, str) else ''
+
+
+def _enfant(el, *noms):
+    for c in el:
+        if _tag(c) in noms:
+            return c
+    return None
+
+
+def _texte(el):
+    if el is None:
+        return ''
+    return ''.join(el.itertext()).strip()
+
+
+def _nettoyer_html(fragment):
+    if not fragment:
+        return ''
+    if '<' not in fragment:
+        return ' '.join(fragment.split())
+    return BeautifulSoup(fragment, 'html.parser').get_text(' ', strip=True)
+
+
+def _date_iso(valeur):
+    """Normaliser une date de flux (RFC 822 ou ISO) en chaîne ISO comparable."""
+    valeur = (valeur or '').strip()
+    if not valeur:
+        return None
+    dt = None
+    try:
+        dt = parsedate_to_datetime(valeur)
+    except (TypeError, ValueError, IndexError):
+        dt = None
+    if dt is not None and dt.tzinfo is not None:
+        dt = parse_date(dt)
+    if dt is None:
+        dt = parse_date(valeur, dayfirst=False)
+    return dt.isoformat() if dt else valeur
+
+
+def decouvrir_flux(soup, base_url):
+    """Lister les flux/sitemaps annoncés dans le <head> d'une page.
+
+    Returns:
+        list: URLs absolues des flux (RSS/Atom) et sitemaps
+    """
+    if not soup:
+        return []
+    urls = []
+    for link in soup.find_all('link', href=True):
+        rel = [r.lower() for r in (link.get('rel') or [])]
+        typ = (link.get('type') or '').lower()
+        if ('alternate' in rel and typ in FLUX_TYPES) or 'sitemap' in rel:
+            u = urljoin(base_url, link['href'])
+            if u not in urls:
+                urls.append(u)
+    return urls
+
+
+def parser_flux(contenu, base_url='', max_entrees=200):
+    """Parser un flux RSS 2.0, Atom ou un sitemap (urlset / sitemapindex).
+
+    Returns:
+        tuple: (entrées, sous_sitemaps). Chaque entrée est un dict
+        {url, titre, description, lastmod, date_publication, origine}.
+    """
+    if not contenu:
+        return [], []
+    try:
+        root = ET.fromstring(contenu)
+    except ET.ParseError:
+        return [], []
+
+    racine = _tag(root)
+    entrees = []
+    sous_sitemaps = []
+
+    if racine == 'sitemapindex':
+        for sm in root:
+            loc = _texte(_enfant(sm, 'loc'))
+            if loc:
+                sous_sitemaps.append(urljoin(base_url, loc))
+        return [], sous_sitemaps
+
+    if racine == 'urlset':
+        for u in root:
+            loc = _texte(_enfant(u, 'loc'))
+            if not loc:
+                continue
+            entrees.append({
+                'url': urljoin(base_url, loc),
+                'titre': '',
+                'description': '',
+                'lastmod': _date_iso(_texte(_enfant(u, 'lastmod'))),
+                'date_publication': None,
+                'origine': 'sitemap',
+            })
+            if len(entrees) >= max_entrees:
+                break
+        return entrees, []
+
+    if racine == 'rss' or racine == 'rdf':
+        items = [el for el in root.iter() if _tag(el) == 'item']
+        for it in items[:max_entrees]:
+            link = _texte(_enfant(it, 'link')) or _texte(_enfant(it, 'guid'))
+            if not link:
+                continue
+            pub = _texte(_enfant(it, 'pubdate', 'date'))
+            maj = _texte(_enfant(it, 'updated', 'modified')) or pub
+            entrees.append({
+                'url': urljoin(base_url, link),
+                'titre': _nettoyer_html(_texte(_enfant(it, 'title'))),
+                'description': _nettoyer_html(_texte(_enfant(it, 'description', 'encoded'))),
+                'lastmod': _date_iso(maj),
+                'date_publication': _date_iso(pub),
+                'origine': 'rss',
+            })
+        return entrees, []
+
+    if racine == 'feed':
+        for en in [el for el in root if _tag(el) == 'entry'][:max_entrees]:
+            href = ''
+            for link in en:
+                if _tag(link) != 'link':
+                    continue
+                if (link.get('rel') or 'alternate') == 'alternate' and link.get('href'):
+                    href = link.get('href')
+                    break
+            if not href:
+                continue
+            pub = _texte(_enfant(en, 'published'))
+            entrees.append({
+                'url': urljoin(base_url, href),
+                'titre': _nettoyer_html(_texte(_enfant(en, 'title'))),
+                'description': _nettoyer_html(_texte(_enfant(en, 'summary', 'content'))),
+                'lastmod': _date_iso(_texte(_enfant(en, 'updated')) or pub),
+                'date_publication': _date_iso(pub),
+                'origine': 'atom',
+            })
+        return entrees, []
+
+    return [], []
+
+
+def _objets_json_ld(data):
+    if isinstance(data, list):
+        for d in data:
+            yield from _objets_json_ld(d)
+        return
+    if not isinstance(data, dict):
+        return
+    if '@graph' in data:
+        yield from _objets_json_ld(data['@graph'])
+    if 'itemListElement' in data:
+        yield from _objets_json_ld(data['itemListElement'])
+    if 'item' in data and isinstance(data['item'], dict):
+        yield from _objets_json_ld(data['item'])
+    yield data
+
+
+def extraire_json_ld(soup, base_url=''):
+    """Extraire les objets JSON-LD (schema.org) décrivant des opportunités.
+
+    Returns:
+        list: entrées {url, titre, description, lastmod, date_publication,
+        date_cloturation, date_cloturation_confiance, origine}
+    """
+    if not soup:
+        return []
+    entrees = []
+    vus = set()
+    for script in soup.find_all('script', attrs={'type': 'application/ld+json'}):
+        raw = script.string or script.get_text() or ''
+        try:
+            data = json.loads(raw, strict=False)
+        except ValueError:
+            continue
+        for obj in _objets_json_ld(data):
+            typ = obj.get('@type')
+            types = set(typ) if isinstance(typ, list) else {typ}
+            if not (types & JSON_LD_TYPES):
+                continue
+            url = obj.get('url') or obj.get('@id')
+            titre = obj.get('name') or obj.get('headline') or obj.get('title')
+            if not isinstance(url, str) or not url or not titre:
+                continue
+            url = urljoin(base_url, url)
+            if url in vus:
+                continue
+            vus.add(url)
+            clot = parse_date(obj.get('validThrough') or obj.get('endDate') or obj.get('expires'), dayfirst=False)
+            entrees.append({
+                'url': url,
+                'titre': _nettoyer_html(str(titre)),
+                'description': _nettoyer_html(str(obj.get('description') or '')),
+                'lastmod': _date_iso(str(obj.get('dateModified') or obj.get('datePosted') or obj.get('datePublished') or '')),
+                'date_publication': _date_iso(str(obj.get('datePosted') or obj.get('datePublished') or '')),
+                'date_cloturation': clot,
+                'date_cloturation_confiance': CONFIANCE_HAUTE if clot else None,
+                'origine': 'json-ld',
+            })
+    return entrees
+
+
+def date_limite_json_ld(soup):
+    """Date limite (validThrough/endDate) déclarée en JSON-LD sur une page détail, sinon None."""
+    for e in extraire_json_ld(soup):
+        if e.get('date_cloturation'):
+            return e['date_cloturation']
+    return None
@@ -0,0 +1,63 @@
+"""
+Forme canonique des URLs d'offres (clé de dédoublonnage)
+http/https, www./hôte nu, port par défaut, slash final, fragment, paramètres de suivi
+et ordre des paramètres ne distinguent pas deux offres.
+La forme canonique sert de clé; l'URL d'origine reste celle affichée et consultée.
+Elle est tronquée à la taille de la colonne `url_canonique`: stockage, recherche,
+pierres tombales de l'archive et remplissage des anciennes lignes partagent ainsi la même clé.
+"""
+
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Paramètres de suivi supprimés (exacts ou par préfixe)
+PARAMS_SUIVI = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    '_ga', '_gl', '_hsenc', '_hsmi', 'mkt_tok', 'spm', 'xtor',
+}
+PREFIXES_SUIVI = ('utm_', 'pk_', 'hsa_')
+
+# Taille des colonnes Offre.url_canonique / OffreArchive.url_canonique
+LONGUEUR_MAX = 500
+
+
+def _param_suivi(nom):
+    nom = nom.lower()
+    return nom in PARAMS_SUIVI or nom.startswith(PREFIXES_SUIVI)
+
+
+def canonicaliser_url(url):
+    """Forme canonique de `url` ('' si vide), tronquée à LONGUEUR_MAX.
+
+    Les URLs non HTTP(S) sont seulement nettoyées des espaces.
+    """
+    url = (url or '').strip()
+    if not url:
+        return ''
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url[:LONGUEUR_MAX]
+    schema = parts.scheme.lower()
+    if schema not in ('http', 'https') or not parts.netloc:
+        return url[:LONGUEUR_MAX]
+
+    hote = (parts.hostname or '').rstrip('.')
+    if hote.startswith('www.'):
+        hote = hote[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port not in (80, 443):
+        hote = f'{hote}:{port}'
+
+    chemin = parts.path or ''
+    while '//' in chemin:
+        chemin = chemin.replace('//', '/')
+    chemin = chemin.rstrip('/')
+
+    params = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _param_suivi(k)]
+    requete = urlencode(sorted(params))
+
+    # Schéma unifié: http et https désignent la même offre
+    return urlunsplit(('https', hote, chemin, requete, ''))[:LONGUEUR_MAX]
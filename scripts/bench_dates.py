@@ -0,0 +1,62 @@
+"""Parsing des dates (scraping.date_extraction) comparé à dateutil en mode flou.
+
+    python scripts/bench_dates.py
+    python scripts/bench_dates.py --repetitions 500
+
+Le corpus reprend les formats rencontrés sur les sites cibles (ISO, numériques,
+mois en toutes lettres en français et en anglais, texte libre). Le cache des
+résultats est vidé avant la mesure; le premier passage mesure donc le parsing.
+"""
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from dateutil import parser as date_parser
+
+from scraping.date_extraction import parse_date, vider_cache
+
+CORPUS = [
+    '2026-02-15', '2026-02-15T10:30:00Z', '2026-02-15T10:30:00+01:00',
+    '15/02/2026', '15-02-2026 à 10h00', '15.02.26', '2026/02/15',
+    '15 février 2026', '1er mars 2026 à 12h30', 'lundi 16 mars 2026', '15 Févr. 2026',
+    '31 août 2026', '15 December 2026', 'February 15, 2026',
+    'Monday, March 2nd 2026 at 17:00', 'avant le 15 février 2026',
+]
+
+
+def _mesurer(fonction, textes):
+    t0 = time.perf_counter()
+    for t in textes:
+        try:
+            fonction(t)
+        except Exception:
+            pass
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark du parsing des dates')
+    parser.add_argument('--repetitions', type=int, default=50)
+    args = parser.parse_args()
+
+    textes = CORPUS * args.repetitions
+    vider_cache()
+    duree_premier = _mesurer(parse_date, CORPUS)
+    duree_module = _mesurer(parse_date, textes)
+    duree_dateutil = _mesurer(lambda t: date_parser.parse(t, dayfirst=True, fuzzy=True), textes)
+
+    print(f"{len(textes)} dates ({len(CORPUS)} formats)")
+    print(f"date_extraction, premier passage: {duree_premier * 1000:.2f} ms")
+    print(f"date_extraction (avec cache):     {duree_module * 1000:.2f} ms")
+    print(f"dateutil fuzzy:                   {duree_dateutil * 1000:.2f} ms")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
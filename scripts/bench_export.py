@@ -0,0 +1,144 @@
+"""Export en flux des offres: débit, taille et mémoire par format sur un corpus synthétique.
+
+    python scripts/bench_export.py --offres 100000
+    python scripts/bench_export.py --offres 100000 --formats csv ndjson --rapport bench_export.json
+
+Une base fichier neuve est remplie de `--offres` offres; chaque format est exporté avec et
+sans gzip vers un fichier temporaire. Mesures: lignes, durée, lignes/s, octets écrits et, sur
+une passe séparée, pic mémoire Python (tracemalloc), qui doit rester indépendant du nombre d'offres.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from config import Config
+from database.export_offres import FORMATS, TAILLE_LOT, pyarrow_disponible
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+
+def _creer_app(chemin):
+    from app import create_app
+    from scraping.scheduler import scheduler
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{chemin}'
+        BASIC_AUTH_ENABLED = False
+        METRICS_ENABLED = False
+        SCHEDULER_AUTOSTART = False
+
+    app = create_app(BenchConfig)
+    scheduler.arreter()
+    return app
+
+
+def generer(nombre, graine=42):
+    rng = random.Random(graine)
+    mots = ['appui', 'filière', 'anacarde', 'cacao', 'étude', 'consultant', 'riz', 'semences',
+            'formation', 'coopératives', 'transformation', 'Korhogo', 'Bouaké', 'évaluation']
+    maintenant = datetime.utcnow()
+    for i in range(nombre):
+        yield {
+            'titre': ' '.join(rng.choice(mots) for _ in range(rng.randint(5, 12))),
+            'description': ' '.join(rng.choice(mots) for _ in range(rng.randint(40, 150))),
+            'source': f'SRC{i % 20}',
+            'partenaire': rng.choice(('GIZ', 'FAO', 'ENABEL', None)),
+            'url': f'https://exemple.ci/offre/{i}',
+            'date_publication': maintenant - timedelta(days=rng.randint(0, 60)),
+            'date_cloturation': maintenant + timedelta(days=rng.randint(1, 365)),
+            'date_scrape': maintenant,
+            'mots_cles': ', '.join(rng.sample(mots, 3)),
+            'actif': True,
+        }
+
+
+def _exporter_vers(chemin, format_export, compresser, taille_lot):
+    from database.export_offres import conditions_liste, exporter
+
+    t0 = time.perf_counter()
+    with open(chemin, 'wb') as fh:
+        for morceau in exporter(format_export, conditions_liste(), compresser=compresser, taille_lot=taille_lot):
+            fh.write(morceau)
+    return time.perf_counter() - t0
+
+
+def mesurer(args):
+    from database.export_offres import conditions_liste
+    from database.models import db, Offre
+
+    dossier = tempfile.mkdtemp(prefix='bench_export_')
+    try:
+        app = _creer_app(os.path.join(dossier, 'bench.db'))
+        resultats = []
+        with app.app_context():
+            lot = []
+            for offre in generer(args.offres):
+                lot.append(offre)
+                if len(lot) == 5000:
+                    db.session.execute(db.insert(Offre), lot)
+                    db.session.commit()
+                    lot = []
+            if lot:
+                db.session.execute(db.insert(Offre), lot)
+                db.session.commit()
+            lignes = db.session.scalar(db.select(db.func.count()).select_from(Offre).where(*conditions_liste()))
+
+            for format_export in args.formats:
+                if format_export == 'parquet' and not pyarrow_disponible():
+                    resultats.append({'format': 'parquet', 'erreur': 'pyarrow non installé'})
+                    continue
+                for compresser in (False, True):
+                    chemin = os.path.join(dossier, f'export.{format_export}' + ('.gz' if compresser else ''))
+                    duree = _exporter_vers(chemin, format_export, compresser, args.taille_lot)
+                    resultat = {
+                        'format': format_export,
+                        'gzip': compresser,
+                        'lignes': lignes,
+                        'duree_s': round(duree, 2),
+                        'lignes_par_s': round(lignes / duree),
+                        'octets': os.path.getsize(chemin),
+                    }
+                    if not compresser:
+                        # Passe séparée: tracemalloc ralentit nettement l'export
+                        tracemalloc.start()
+                        _exporter_vers(chemin, format_export, compresser, args.taille_lot)
+                        resultat['pic_memoire_mo'] = round(tracemalloc.get_traced_memory()[1] / 1e6, 1)
+                        tracemalloc.stop()
+                    resultats.append(resultat)
+        return resultats
+    finally:
+        shutil.rmtree(dossier, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export en flux des offres sur un corpus synthétique')
+    parser.add_argument('--offres', type=int, default=100000)
+    parser.add_argument('--formats', nargs='+', choices=list(FORMATS), default=list(FORMATS))
+    parser.add_argument('--taille-lot', type=int, default=TAILLE_LOT)
+    parser.add_argument('--rapport', help='Écrire le rapport JSON dans ce fichier')
+    args = parser.parse_args()
+
+    rapport = {'date': datetime.utcnow().isoformat(), 'parametres': vars(args), 'resultats': mesurer(args)}
+    print(json.dumps(rapport['resultats'], indent=2))
+
+    if args.rapport:
+        with open(args.rapport, 'w', encoding='utf-8') as fh:
+            json.dump(rapport, fh, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""Taille des réponses et latence de GET /api/offres selon la projection et l'encodeur JSON.
+
+    python scripts/bench_liste_offres.py --offres 20000
+    python scripts/bench_liste_offres.py --par-page 100 --requetes 300 --rapport bench_liste.json
+
+Une base fichier neuve est remplie de `--offres` offres à description longue (texte enrichi
+des PDF: ~4 000 caractères). Chaque variante (toutes les colonnes, `fields=liste`,
+`fields=liste&format=colonnes`) est mesurée avec l'encodeur JSON de Flask et avec celui
+de l'application (api.json_rapide): octets par page, latence p50/p95.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from config import Config
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+VARIANTES = {
+    'complet': '',
+    'liste': '&fields=liste',
+    'liste_colonnes': '&fields=liste&format=colonnes',
+}
+
+
+def _percentile(valeurs, p):
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, int(len(valeurs) * p / 100))]
+
+
+def _creer_app(chemin):
+    from app import create_app
+    from scraping.scheduler import scheduler
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{chemin}'
+        BASIC_AUTH_ENABLED = False
+        METRICS_ENABLED = False
+        SCHEDULER_AUTOSTART = False
+        SQL_PROFILER_ENABLED = False
+
+    app = create_app(BenchConfig)
+    scheduler.arreter()
+    return app
+
+
+def _remplir(nombre, graine=42):
+    from database.models import db, Offre
+
+    rng = random.Random(graine)
+    mots = ['appui', 'filière', 'anacarde', 'cacao', 'étude', 'consultant', 'riz', 'semences',
+            'formation', 'coopératives', 'transformation', 'Korhogo', 'Bouaké', 'évaluation']
+    maintenant = datetime.utcnow()
+    lot = []
+    for i in range(nombre):
+        lot.append({
+            'titre': ' '.join(rng.choice(mots) for _ in range(rng.randint(5, 12))),
+            'description': ' '.join(rng.choice(mots) for _ in range(rng.randint(400, 600))),
+            'source': f'SRC{i % 20}',
+            'partenaire': rng.choice(('GIZ', 'FAO', 'ENABEL', None)),
+            'url': f'https://exemple.ci/offre/{i}',
+            'date_publication': maintenant - timedelta(days=rng.randint(0, 60)),
+            'date_cloturation': maintenant + timedelta(days=rng.randint(1, 365)),
+            'date_scrape': maintenant - timedelta(seconds=i),
+            'mots_cles': ', '.join(rng.sample(mots, 3)),
+            'actif': True,
+        })
+        if len(lot) == 5000:
+            db.session.execute(db.insert(Offre), lot)
+            db.session.commit()
+            lot = []
+    if lot:
+        db.session.execute(db.insert(Offre), lot)
+        db.session.commit()
+
+
+def mesurer(args):
+    from flask.json.provider import DefaultJSONProvider
+    from api.json_rapide import FournisseurJSON, orjson
+
+    dossier = tempfile.mkdtemp(prefix='bench_liste_')
+    try:
+        app = _creer_app(os.path.join(dossier, 'bench.db'))
+        with app.app_context():
+            _remplir(args.offres)
+        client = app.test_client()
+        pages = max(1, args.offres // args.par_page)
+        rng = random.Random(7)
+        resultats = []
+        encodeurs = {'flask': DefaultJSONProvider(app), 'application': FournisseurJSON(app)}
+        for nom_encodeur, encodeur in encodeurs.items():
+            app.json = encodeur
+            for nom, suffixe in VARIANTES.items():
+                latences, tailles = [], []
+                for _ in range(args.requetes):
+                    url = f'/api/offres?par_page={args.par_page}&page={rng.randint(1, pages)}{suffixe}'
+                    t0 = time.perf_counter()
+                    r = client.get(url)
+                    donnees = r.get_data()
+                    latences.append(time.perf_counter() - t0)
+                    tailles.append(len(donnees))
+                resultats.append({
+                    'encodeur': nom_encodeur + (' (orjson)' if nom_encodeur == 'application' and orjson else ''),
+                    'variante': nom,
+                    'octets_par_page': round(sum(tailles) / len(tailles)),
+                    'p50_ms': round(_percentile(latences, 50) * 1000, 2),
+                    'p95_ms': round(_percentile(latences, 95) * 1000, 2),
+                })
+        return resultats
+    finally:
+        shutil.rmtree(dossier, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Taille et latence de GET /api/offres selon la projection')
+    parser.add_argument('--offres', type=int, default=20000)
+    parser.add_argument('--par-page', type=int, default=100)
+    parser.add_argument('--requetes', type=int, default=200, help='Requêtes par variante')
+    parser.add_argument('--rapport', help='Écrire le rapport JSON dans ce fichier')
+    args = parser.parse_args()
+
+    rapport = {'date': datetime.utcnow().isoformat(), 'parametres': vars(args), 'resultats': mesurer(args)}
+    print(json.dumps(rapport['resultats'], indent=2))
+
+    if args.rapport:
+        with open(args.rapport, 'w', encoding='utf-8') as fh:
+            json.dump(rapport, fh, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""Index de quasi-doublons (SimHash + bandes) sur un corpus synthétique.
+
+    python scripts/bench_quasi_doublons.py --offres 100000
+    python scripts/bench_quasi_doublons.py --offres 100000 --distance 5 --rapport bench_qd.json
+
+Une base fichier neuve est remplie de `--offres` offres, dont une part (`--part-doublons`)
+sont des republications légèrement modifiées d'une offre antérieure (casse, ponctuation,
+un mot de description ajouté ou remplacé, date limite décalée d'un jour au plus). Mesures:
+- indexation complète (`indexer_offres_manquantes`): durée, débit, rappel et faux groupes;
+- latence d'une recherche via les bandes indexées, comparée à un balayage de toutes les empreintes.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from config import Config
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+
+def _percentile(valeurs, p):
+    if not valeurs:
+        return None
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, int(len(valeurs) * p / 100))]
+
+
+def _creer_app(chemin):
+    from app import create_app
+    from scraping.scheduler import scheduler
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{chemin}'
+        BASIC_AUTH_ENABLED = False
+        METRICS_ENABLED = False
+        SCHEDULER_AUTOSTART = False
+
+    app = create_app(BenchConfig)
+    scheduler.arreter()
+    return app
+
+
+def _vocabulaire(rng, taille=4000):
+    syllabes = ['ka', 'ba', 'ti', 'ro', 'mu', 'se', 'lan', 'dou', 'fi', 'gor', 'ne', 'pa', 'vi', 'zo', 'che', 'tra']
+    mots = set()
+    while len(mots) < taille:
+        mots.add(''.join(rng.choice(syllabes) for _ in range(rng.randint(2, 4))))
+    return sorted(mots)
+
+
+def _variante(rng, offre, vocab):
+    """Republication: casse/ponctuation du titre, un mot de description ajouté ou remplacé, date ±1 jour."""
+    mots = offre['description'].split()
+    i = rng.randrange(len(mots))
+    if rng.random() < 0.5:
+        mots.insert(i, rng.choice(vocab))
+    else:
+        mots[i] = rng.choice(vocab)
+    titre = offre['titre'].upper() if rng.random() < 0.5 else offre['titre'] + ' !'
+    return {
+        'titre': titre,
+        'description': ' '.join(mots),
+        'date_cloturation': offre['date_cloturation'] + timedelta(days=rng.choice((-1, 0, 0, 1))),
+    }
+
+
+def generer(nombre, part_doublons, graine=42):
+    """Offres synthétiques et, pour chaque republication, l'indice de l'offre d'origine."""
+    rng = random.Random(graine)
+    vocab = _vocabulaire(rng)
+    base = datetime(2026, 1, 1)
+    offres, origines = [], {}
+    for i in range(nombre):
+        if offres and rng.random() < part_doublons:
+            j = rng.randrange(len(offres))
+            j = origines.get(j, j)
+            offre = _variante(rng, offres[j], vocab)
+            origines[i] = j
+        else:
+            offre = {
+                'titre': ' '.join(rng.choice(vocab) for _ in range(rng.randint(6, 12))),
+                'description': ' '.join(rng.choice(vocab) for _ in range(rng.randint(30, 120))),
+                'date_cloturation': base + timedelta(days=rng.randint(0, 365)),
+            }
+        offre.update({'source': f'SRC{i % 20}', 'url': f'https://exemple.ci/offre/{i}', 'actif': True})
+        offres.append(offre)
+    return offres, origines
+
+
+def mesurer(args):
+    from database.models import db, Offre, EmpreinteOffre
+    from scraping.quasi_doublons import IndexQuasiDoublons, depuis_signe, distance, empreinte, indexer_offres_manquantes
+
+    offres, origines = generer(args.offres, args.part_doublons)
+    dossier = tempfile.mkdtemp(prefix='bench_qd_')
+    try:
+        app = _creer_app(os.path.join(dossier, 'bench.db'))
+        with app.app_context():
+            for debut in range(0, len(offres), 5000):
+                db.session.execute(db.insert(Offre), offres[debut:debut + 5000])
+                db.session.commit()
+
+            t0 = time.perf_counter()
+            res = indexer_offres_manquantes(distance_max=args.distance)
+            duree_indexation = time.perf_counter() - t0
+
+            # Rappel / faux groupes (ids = indice + 1, base neuve)
+            groupes = dict(db.session.execute(db.select(Offre.id, Offre.groupe_id)).all())
+            canon = lambda i: groupes[i + 1] or (i + 1)
+            retrouves = sum(1 for i, j in origines.items() if canon(i) == canon(j))
+            faux = sum(1 for i in range(len(offres)) if groupes[i + 1] and i not in origines)
+
+            # Recherches: nouvelles variantes d'offres existantes et offres inédites
+            rng = random.Random(7)
+            vocab = _vocabulaire(random.Random(42))
+            requetes = []
+            for _ in range(args.requetes):
+                if rng.random() < 0.5:
+                    o = _variante(rng, offres[rng.randrange(len(offres))], vocab)
+                else:
+                    o = {'titre': ' '.join(rng.choice(vocab) for _ in range(8)),
+                         'description': ' '.join(rng.choice(vocab) for _ in range(60)),
+                         'date_cloturation': datetime(2026, 6, 1)}
+                requetes.append((empreinte(o['titre'], o['description']), o['date_cloturation']))
+
+            index = IndexQuasiDoublons(distance_max=args.distance)
+            latences_index = []
+            for h, d in requetes:
+                t0 = time.perf_counter()
+                index.chercher(h, d)
+                latences_index.append(time.perf_counter() - t0)
+
+            latences_scan = []
+            for h, d in requetes[:max(1, args.requetes // 10)]:
+                t0 = time.perf_counter()
+                jour = d.date()
+                for h2, jour2, groupe_id in db.session.execute(
+                    db.select(EmpreinteOffre.simhash, EmpreinteOffre.date_cloturation, EmpreinteOffre.groupe_id)
+                ):
+                    if distance(h, depuis_signe(h2)) <= args.distance and (jour2 is None or abs((jour - jour2).days) <= 1):
+                        break
+                latences_scan.append(time.perf_counter() - t0)
+
+        ms = lambda v: round(v * 1000, 3) if v is not None else None
+        return {
+            'offres': len(offres),
+            'republications': len(origines),
+            'indexation_s': round(duree_indexation, 2),
+            'indexation_offres_par_s': round(len(offres) / duree_indexation),
+            'groupees': res['groupees'],
+            'rappel': round(retrouves / len(origines), 4) if origines else None,
+            'faux_groupes': faux,
+            'recherche_index_p50_ms': ms(_percentile(latences_index, 50)),
+            'recherche_index_p95_ms': ms(_percentile(latences_index, 95)),
+            'recherche_balayage_p50_ms': ms(_percentile(latences_scan, 50)),
+            'recherche_balayage_p95_ms': ms(_percentile(latences_scan, 95)),
+        }
+    finally:
+        shutil.rmtree(dossier, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Index de quasi-doublons (SimHash) sur un corpus synthétique')
+    parser.add_argument('--offres', type=int, default=100000)
+    parser.add_argument('--part-doublons', type=float, default=0.1, help='Part de republications (0-1)')
+    parser.add_argument('--distance', type=int, default=Config.QUASI_DOUBLONS_DISTANCE, help='Distance de Hamming maximale')
+    parser.add_argument('--requetes', type=int, default=1000, help='Recherches chronométrées')
+    parser.add_argument('--rapport', help='Écrire le rapport JSON dans ce fichier')
+    args = parser.parse_args()
+
+    rapport = {'date': datetime.utcnow().isoformat(), 'parametres': vars(args), 'resultats': mesurer(args)}
+    print(json.dumps(rapport['resultats'], indent=2))
+
+    if args.rapport:
+        with open(args.rapport, 'w', encoding='utf-8') as fh:
+            json.dump(rapport, fh, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
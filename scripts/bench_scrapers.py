@@ -0,0 +1,140 @@
+"""Benchmarks déterministes des scrapers (enregistrement puis rejeu HTTP local).
+
+1) Enregistrer une fois les réponses réelles de chaque scraper (réseau requis):
+    python scripts/bench_scrapers.py record
+2) Rejouer via un serveur local et produire un rapport JSON:
+    python scripts/bench_scrapers.py replay --rapport bench.json
+3) Comparer à une référence (code de sortie 1 en cas de régression):
+    python scripts/bench_scrapers.py replay --comparer bench_ref.json --tolerance 0.25
+
+Mesures par scraper: temps total, temps réseau (local), temps de parsing, pages, octets, offres.
+Le rejeu mesure aussi `_sauvegarder_offres` (insertion puis mise à jour) sur une base SQLite en mémoire.
+"""
+import argparse
+from datetime import datetime
+import json
+import logging
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from config import TestingConfig
+from scraping.page_archive import ArchivePages, definir_archive
+from scraping.replay_harness import ServeurRejeu, mesurer_scraper, comparer_rapports
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+logger = logging.getLogger('bench')
+
+DEFAULT_FIXTURES = os.path.join(ROOT, 'tests', 'fixtures', 'http')
+
+
+def _creer_app():
+    from app import create_app
+    from scraping.scheduler import scheduler
+
+    app = create_app(TestingConfig)
+    scheduler.arreter()
+    app.config['SINDEV_PDF_ENABLED'] = False
+    scheduler.ai_filter.enabled = False
+    return app, scheduler
+
+
+def enregistrer(args):
+    os.makedirs(args.fixtures, exist_ok=True)
+    archive = ArchivePages(args.fixtures)
+    definir_archive(archive)
+    app, scheduler = _creer_app()
+    keys = args.scrapers or [k for k, v in scheduler.scrapers.items() if v is not None]
+    with app.app_context():
+        from scraping.keyword_manager import KeywordManager
+        mots_cles = KeywordManager.obtenir_tous_mots_cles()
+        for key in keys:
+            scraper = scheduler.scrapers.get(key)
+            if scraper is None:
+                continue
+            t0 = time.perf_counter()
+            try:
+                offres = scraper.scrape(mots_cles)
+            except Exception as e:
+                logger.error(f"[{key}] Erreur: {e}")
+                offres = []
+            print(f"{key:<12} enregistré: {len(offres)} offres en {time.perf_counter() - t0:.1f}s")
+    definir_archive(None)
+    print(json.dumps(archive.stats(), indent=2))
+    return 0
+
+
+def rejouer(args):
+    if not os.path.exists(os.path.join(args.fixtures, 'index.sqlite')):
+        print(f"Fixtures introuvables: {args.fixtures} (lancer d'abord: bench_scrapers.py record)")
+        return 1
+    archive = ArchivePages(args.fixtures)
+    app, scheduler = _creer_app()
+    keys = args.scrapers or [k for k, v in scheduler.scrapers.items() if v is not None]
+
+    rapport = {'date': datetime.utcnow().isoformat(), 'fixtures': args.fixtures, 'scrapers': {}}
+    toutes_offres = []
+    with app.app_context(), ServeurRejeu(archive) as serveur:
+        from scraping.keyword_manager import KeywordManager
+        mots_cles = KeywordManager.obtenir_tous_mots_cles()
+        for key in keys:
+            scraper = scheduler.scrapers.get(key)
+            if scraper is None:
+                continue
+            if hasattr(scraper, 'lastmod_connus'):
+                scraper.lastmod_connus = {}
+            mesures, offres = mesurer_scraper(scraper, serveur.base_url, mots_cles)
+            rapport['scrapers'][key] = mesures
+            toutes_offres.extend(offres)
+
+        # _sauvegarder_offres: premier passage (insertions) puis second (mises à jour)
+        t0 = time.perf_counter()
+        nouvelles = scheduler._sauvegarder_offres([dict(o) for o in toutes_offres])
+        t_insert = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        scheduler._sauvegarder_offres([dict(o) for o in toutes_offres])
+        t_update = time.perf_counter() - t0
+        rapport['sauvegarde'] = {
+            'offres': len(toutes_offres),
+            'nouvelles': nouvelles,
+            'temps_insertion': round(t_insert, 4),
+            'temps_mise_a_jour': round(t_update, 4),
+        }
+
+    if args.rapport:
+        with open(args.rapport, 'w', encoding='utf-8') as fh:
+            json.dump(rapport, fh, indent=2)
+    else:
+        print(json.dumps(rapport, indent=2))
+
+    if args.comparer:
+        with open(args.comparer, 'r', encoding='utf-8') as fh:
+            reference = json.load(fh)
+        regressions = comparer_rapports(rapport, reference, tolerance=args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r}")
+        if regressions:
+            return 1
+        print('Aucune régression')
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks des scrapers (enregistrement/rejeu)')
+    parser.add_argument('mode', choices=['record', 'replay'])
+    parser.add_argument('scrapers', nargs='*', help='Clés de scrapers (défaut: tous)')
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES, help='Dossier des réponses enregistrées')
+    parser.add_argument('--rapport', help='Écrire le rapport JSON dans ce fichier')
+    parser.add_argument('--comparer', help='Rapport JSON de référence')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Marge relative tolérée sur les temps')
+    args = parser.parse_args()
+    return enregistrer(args) if args.mode == 'record' else rejouer(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
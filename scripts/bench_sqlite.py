@@ -0,0 +1,179 @@
+"""Latence de lecture de l'API pendant un scraping concurrent, par profil SQLite.
+
+    python scripts/bench_sqlite.py --offres 20000 --duree 10
+    python scripts/bench_sqlite.py --profils defaut wal --rapport bench_sqlite.json
+
+Pour chaque profil, une base fichier neuve est créée et remplie, puis:
+- un thread « scraper » écrit en continu (lots d'insertions + mises à jour, via la file d'écritures);
+- des threads « API » appellent GET /api/offres et mesurent la latence.
+Profils: `defaut` (journal rollback, sans PRAGMA) et `wal` (profil SQLite de production).
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from config import Config
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+PROFILS = {
+    'defaut': {'SQLITE_TUNING_ENABLED': False},
+    'wal': {'SQLITE_TUNING_ENABLED': True},
+}
+
+
+def _percentile(valeurs, p):
+    if not valeurs:
+        return None
+    valeurs = sorted(valeurs)
+    return valeurs[min(len(valeurs) - 1, int(len(valeurs) * p / 100))]
+
+
+def _creer_app(chemin, options):
+    from app import create_app
+    from scraping.scheduler import scheduler
+
+    class BenchConfig(Config):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{chemin}'
+        BASIC_AUTH_ENABLED = False
+        METRICS_ENABLED = False
+        SCHEDULER_AUTOSTART = False
+
+    for cle, valeur in options.items():
+        setattr(BenchConfig, cle, valeur)
+    app = create_app(BenchConfig)
+    scheduler.arreter()
+    return app
+
+
+def _remplir(app, nombre):
+    from database.models import db, Offre
+
+    now = datetime.utcnow()
+    with app.app_context():
+        for debut in range(0, nombre, 5000):
+            db.session.execute(db.insert(Offre), [{
+                'titre': f'Appel d\'offres {i} - étude de faisabilité agricole',
+                'description': 'Description ' * 40,
+                'source': f'SRC{i % 20}',
+                'url': f'https://exemple.ci/offre/{i}',
+                'date_cloturation': now + timedelta(days=30),
+                'actif': True,
+            } for i in range(debut, min(debut + 5000, nombre))])
+            db.session.commit()
+
+
+def _ecrivain(app, arret, stats, taille_lot, pause, base):
+    from database.models import db, Offre
+    from database.sqlite_tuning import file_ecritures
+
+    n = 0
+    with app.app_context():
+        while not arret.is_set():
+            t0 = time.perf_counter()
+            try:
+                with file_ecritures.ecrire():
+                    db.session.execute(db.insert(Offre), [{
+                        'titre': f'Nouvelle offre {base + n + i}',
+                        'description': 'Texte ' * 40,
+                        'source': 'BENCH',
+                        'url': f'https://exemple.ci/nouvelle/{base + n + i}',
+                        'actif': True,
+                    } for i in range(taille_lot)])
+                    db.session.execute(
+                        db.update(Offre).where(Offre.id <= taille_lot * (stats['lots'] % 50 + 1))
+                        .values(date_scrape=datetime.utcnow())
+                    )
+                    db.session.commit()
+                stats['lots'] += 1
+                stats['temps_ecriture'].append(time.perf_counter() - t0)
+            except Exception as e:
+                db.session.rollback()
+                stats['erreurs_ecriture'] += 1
+                stats['derniere_erreur'] = str(e)[:200]
+            n += taille_lot
+            time.sleep(pause)
+
+
+def _lecteur(app, arret, latences, erreurs):
+    client = app.test_client()
+    i = 0
+    while not arret.is_set():
+        t0 = time.perf_counter()
+        r = client.get(f'/api/offres?par_page=20&page={i % 50 + 1}')
+        latences.append(time.perf_counter() - t0)
+        if r.status_code != 200:
+            erreurs.append(r.status_code)
+        i += 1
+
+
+def mesurer(profil, args):
+    dossier = tempfile.mkdtemp(prefix='bench_sqlite_')
+    try:
+        app = _creer_app(os.path.join(dossier, 'bench.db'), PROFILS[profil])
+        _remplir(app, args.offres)
+
+        arret = threading.Event()
+        stats = {'lots': 0, 'temps_ecriture': [], 'erreurs_ecriture': 0}
+        latences, erreurs = [], []
+        threads = [threading.Thread(target=_ecrivain, args=(app, arret, stats, args.lot, args.pause, args.offres))]
+        threads += [threading.Thread(target=_lecteur, args=(app, arret, latences, erreurs)) for _ in range(args.lecteurs)]
+        for t in threads:
+            t.start()
+        time.sleep(args.duree)
+        arret.set()
+        for t in threads:
+            t.join()
+
+        ms = lambda v: round(v * 1000, 2) if v is not None else None
+        return {
+            'lectures': len(latences),
+            'lecture_p50_ms': ms(_percentile(latences, 50)),
+            'lecture_p95_ms': ms(_percentile(latences, 95)),
+            'lecture_p99_ms': ms(_percentile(latences, 99)),
+            'lecture_max_ms': ms(max(latences) if latences else None),
+            'erreurs_lecture': len(erreurs),
+            'lots_ecrits': stats['lots'],
+            'ecriture_p95_ms': ms(_percentile(stats['temps_ecriture'], 95)),
+            'erreurs_ecriture': stats['erreurs_ecriture'],
+        }
+    finally:
+        shutil.rmtree(dossier, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Latence de lecture pendant un scraping concurrent (SQLite)')
+    parser.add_argument('--profils', nargs='*', default=list(PROFILS), choices=list(PROFILS))
+    parser.add_argument('--offres', type=int, default=20000, help='Offres initiales')
+    parser.add_argument('--duree', type=float, default=10.0, help='Durée de mesure par profil (s)')
+    parser.add_argument('--lecteurs', type=int, default=4, help='Threads de lecture API')
+    parser.add_argument('--lot', type=int, default=200, help="Offres par lot d'écriture")
+    parser.add_argument('--pause', type=float, default=0.05, help='Pause entre deux lots (s)')
+    parser.add_argument('--rapport', help='Écrire le rapport JSON dans ce fichier')
+    args = parser.parse_args()
+
+    rapport = {'date': datetime.utcnow().isoformat(), 'parametres': vars(args), 'profils': {}}
+    for profil in args.profils:
+        rapport['profils'][profil] = mesurer(profil, args)
+        print(f"{profil:<8} {json.dumps(rapport['profils'][profil])}")
+
+    if args.rapport:
+        with open(args.rapport, 'w', encoding='utf-8') as fh:
+            json.dump(rapport, fh, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
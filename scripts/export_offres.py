@@ -0,0 +1,75 @@
+"""Exporter les offres (mêmes filtres que GET /api/offres) en CSV, NDJSON ou Parquet, en flux.
+
+Usage:
+    python scripts/export_offres.py --format csv --sortie offres.csv
+    python scripts/export_offres.py --format ndjson --gzip --sortie offres.ndjson.gz --source GIZ
+    python scripts/export_offres.py --format parquet --include-expired --sortie offres.parquet
+    python scripts/export_offres.py --format ndjson | jq .titre     # sortie standard
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from database.export_offres import FORMATS, TAILLE_LOT
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Exporter les offres en flux (CSV, NDJSON, Parquet)')
+    parser.add_argument('--format', choices=list(FORMATS), default='csv')
+    parser.add_argument('--gzip', action='store_true', help='Compresser à la volée')
+    parser.add_argument('--sortie', help='Fichier de sortie (défaut: sortie standard)')
+    parser.add_argument('--source')
+    parser.add_argument('--partenaire')
+    parser.add_argument('--type-offre')
+    parser.add_argument('--mot-cle')
+    parser.add_argument('--include-expired', action='store_true', help='Inclure les offres expirées')
+    parser.add_argument('--sans-grouper', action='store_true', help='Garder tous les quasi-doublons')
+    parser.add_argument('--taille-lot', type=int, default=TAILLE_LOT, help='Lignes lues par lot')
+    args = parser.parse_args()
+
+    from app import create_app
+    from database.export_offres import conditions_liste, exporter
+    from scraping.scheduler import scheduler
+
+    app = create_app()
+    scheduler.arreter()
+
+    debut = time.perf_counter()
+    taille = 0
+    with app.app_context():
+        conditions = conditions_liste(
+            args.source, args.partenaire, args.type_offre, args.mot_cle,
+            include_expired=args.include_expired, grouper=not args.sans_grouper,
+        )
+        try:
+            morceaux = exporter(args.format, conditions, compresser=args.gzip, taille_lot=args.taille_lot)
+        except (ValueError, RuntimeError) as e:
+            print(e, file=sys.stderr)
+            return 1
+        sortie = open(args.sortie, 'wb') if args.sortie else sys.stdout.buffer
+        try:
+            for morceau in morceaux:
+                sortie.write(morceau)
+                taille += len(morceau)
+        finally:
+            if args.sortie:
+                sortie.close()
+            else:
+                sortie.flush()
+
+    if args.sortie:
+        print(f"{args.sortie}: {taille} octets en {time.perf_counter() - debut:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Précompresser les fichiers statiques textuels (variantes .br et .gz à côté de chaque fichier).
+
+Usage:
+    python scripts/precompresser_assets.py            # frontend/static
+    python scripts/precompresser_assets.py --verifier # liste les variantes absentes ou périmées, code 1 si besoin
+
+Les variantes sont compressées au niveau maximal (brotli 11, gzip 9) une fois pour toutes;
+frontend_bp les sert directement selon Accept-Encoding. À lancer au build (Dockerfile)
+ou après toute modification de frontend/static.
+"""
+import argparse
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from api.assets import EXTENSIONS_COMPRESSIBLES, SUFFIXES, compresser_fichier
+from api.compression import ENCODAGES
+
+
+def fichiers_textuels(dossier):
+    for racine, _, noms in os.walk(dossier):
+        for nom in sorted(noms):
+            if os.path.splitext(nom)[1].lower() in EXTENSIONS_COMPRESSIBLES:
+                yield os.path.join(racine, nom)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Précompresser les fichiers statiques (.br, .gz)')
+    parser.add_argument('--dossier', default=os.path.join(ROOT, 'frontend', 'static'))
+    parser.add_argument('--verifier', action='store_true', help="Ne rien écrire, signaler les variantes à refaire")
+    args = parser.parse_args()
+
+    a_refaire = 0
+    for chemin in fichiers_textuels(args.dossier):
+        with open(chemin, 'rb') as fh:
+            donnees = fh.read()
+        relatif = os.path.relpath(chemin, args.dossier)
+        tailles = []
+        for encodage in ENCODAGES:
+            cible = chemin + SUFFIXES[encodage]
+            if os.path.isfile(cible) and os.path.getmtime(cible) >= os.path.getmtime(chemin):
+                tailles.append(f'{encodage} {os.path.getsize(cible)}')
+                continue
+            a_refaire += 1
+            if args.verifier:
+                print(f'À refaire: {relatif}{SUFFIXES[encodage]}')
+                continue
+            compresse = compresser_fichier(donnees, encodage)
+            with open(cible, 'wb') as fh:
+                fh.write(compresse)
+            tailles.append(f'{encodage} {len(compresse)}')
+        if not args.verifier:
+            print(f"{relatif}: {len(donnees)} octets -> {', '.join(tailles)}")
+
+    if args.verifier:
+        return 1 if a_refaire else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Rejouer l'archive de pages à travers les scrapers et `_sauvegarder_offres`, sans réseau.
+
+Permet de ré-extraire l'historique après un changement de filtre (config.py) ou de parser,
+et sert de corpus de non-régression.
+
+Usage:
+    python scripts/replay_archive.py                          # tous les scrapers, dernière version des pages
+    python scripts/replay_archive.py structures pnud --jusqua 2026-09-30
+    python scripts/replay_archive.py --dry-run --json         # extraction seule, rien n'est écrit en base
+    python scripts/replay_archive.py --stats                  # contenu de l'archive
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+BACKEND_DIR = os.path.join(ROOT, 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from config import Config
+from scraping.date_extraction import parse_date
+from scraping.page_archive import ArchivePages, SessionArchive
+
+logging.basicConfig(level=logging.WARNING, format='%(message)s')
+logger = logging.getLogger('replay')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejouer l'archive de pages (hors ligne)")
+    parser.add_argument('scrapers', nargs='*', help='Clés de scrapers (défaut: tous)')
+    parser.add_argument('--archive', default=Config.ARCHIVE_PAGES_DIR, help="Dossier de l'archive")
+    parser.add_argument('--jusqua', help='Utiliser les pages archivées avant cette date (ISO)')
+    parser.add_argument('--dry-run', action='store_true', help="Extraire sans écrire en base")
+    parser.add_argument('--sans-ia', action='store_true', help="Désactiver le filtre IA local (Ollama)")
+    parser.add_argument('--json', action='store_true', help='Rapport JSON')
+    parser.add_argument('--stats', action='store_true', help="Afficher le contenu de l'archive et quitter")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.archive):
+        print(f"Archive introuvable: {args.archive}")
+        return 1
+    archive = ArchivePages(args.archive)
+    if args.stats:
+        print(json.dumps(archive.stats(), indent=2))
+        return 0
+
+    jusqua = parse_date(args.jusqua, dayfirst=False) if args.jusqua else None
+
+    from app import create_app
+    from scraping.keyword_manager import KeywordManager
+    from scraping.scheduler import scheduler
+
+    app = create_app()
+    # Pas de tâches planifiées (ni réseau) pendant le rejeu
+    scheduler.arreter()
+    app.config['SINDEV_PDF_ENABLED'] = False
+    if args.sans_ia:
+        scheduler.ai_filter.enabled = False
+
+    keys = args.scrapers or [k for k, v in scheduler.scrapers.items() if v is not None]
+    rapport = []
+    with app.app_context():
+        mots_cles = KeywordManager.obtenir_tous_mots_cles()
+        for key in keys:
+            scraper = scheduler.scrapers.get(key)
+            if scraper is None:
+                rapport.append({'scraper': key, 'statut': 'indisponible'})
+                continue
+
+            session_reseau = scraper.session
+            session = SessionArchive(archive, jusqua=jusqua)
+            scraper.session = session
+            if hasattr(scraper, 'lastmod_connus'):
+                scraper.lastmod_connus = {}
+            start = time.time()
+            try:
+                offres = scraper.scrape(mots_cles)
+                nouvelles = 0 if args.dry_run else scheduler._sauvegarder_offres(offres)
+                statut = 'succes'
+            except Exception as e:
+                logger.error(f"[{key}] Erreur: {e}")
+                offres, nouvelles, statut = [], 0, 'erreur'
+            finally:
+                scraper.session = session_reseau
+
+            rapport.append({
+                'scraper': key,
+                'statut': statut,
+                'offres_trouvees': len(offres),
+                'offres_nouvelles': nouvelles,
+                'pages_archive': session.trouvees,
+                'pages_manquantes': session.manquantes,
+                'temps_execution': round(time.time() - start, 3),
+            })
+
+    if args.json:
+        print(json.dumps({'dry_run': args.dry_run, 'jusqua': args.jusqua, 'resultats': rapport}, indent=2))
+    else:
+        for r in rapport:
+            if r['statut'] == 'indisponible':
+                print(f"{r['scraper']:<12} indisponible")
+                continue
+            print(
+                f"{r['scraper']:<12} {r['statut']:<7} offres={r['offres_trouvees']:<4} nouvelles={r['offres_nouvelles']:<4} "
+                f"pages={r['pages_archive']} manquantes={r['pages_manquantes']} {r['temps_execution']}s"
+            )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
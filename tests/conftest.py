@@ -0,0 +1,51 @@
+"""
+Fixtures partagées des tests: application de test (scheduler arrêté), client HTTP,
+en-têtes Basic Auth du compte démo et insertion groupée d'offres.
+"""
+
+import base64
+
+import pytest
+
+
+@pytest.fixture
+def auth_headers():
+    return {'Authorization': 'Basic ' + base64.b64encode(b'admin@veille.ci:admin123').decode()}
+
+
+@pytest.fixture
+def creer_app():
+    """Fabrique d'applications de test: `creer_app(Config)` pour une configuration dérivée de TestingConfig."""
+    def creer(config=None):
+        from app import create_app
+        from config import TestingConfig
+        from scraping.scheduler import scheduler
+
+        application = create_app(config or TestingConfig)
+        scheduler.arreter()
+        return application
+    return creer
+
+
+@pytest.fixture
+def app(creer_app):
+    return creer_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def inserer_offres(app):
+    """Remplacer les offres de la base de test par `lignes` (dicts de colonnes d'Offre, insertion groupée)."""
+    def inserer(lignes):
+        from database.models import db, Offre
+
+        with app.app_context():
+            Offre.query.delete()
+            if lignes:
+                db.session.execute(db.insert(Offre), lignes)
+            db.session.commit()
+    return inserer
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+
+
+def test_archivage_et_pierres_tombales(app, client, auth_headers):
+    from database.models import db, Offre, OffreArchive
+    from scraping.instrumentation import MesuresExecution, collecter
+    from scraping.scheduler import scheduler
+    from scraping.url_canonique import canonicaliser_url
+
+    app.config['OFFRES_ARCHIVAGE_JOURS'] = 30
+    app.config['PURGE_BATCH_SIZE'] = 3
+    now = datetime.utcnow()
+    vieux = now - timedelta(days=60)
+    with app.app_context():
+        Offre.query.delete()
+        OffreArchive.query.delete()
+        lignes = []
+        for i in range(10):
+            lignes.append({
+                'titre': f'Offre {i}', 'source': 'GIZ', 'url': f'https://exemple.ci/offre/{i}',
+                'url_canonique': canonicaliser_url(f'https://exemple.ci/offre/{i}'),
+                'date_scrape': now - timedelta(hours=i),
+                # 0-3: inactives depuis longtemps, 4-5: clôturées depuis longtemps, 6-9: ouvertes
+                'actif': i >= 4,
+                'date_modification': vieux if i < 4 else now,
+                'date_cloturation': vieux if i in (4, 5) else now + timedelta(days=10),
+            })
+        db.session.execute(db.insert(Offre), lignes)
+        db.session.commit()
+
+        res = scheduler.archiver_offres_inactives()
+        assert res == {'archived': 6}
+        assert Offre.query.count() == 4
+        assert OffreArchive.query.count() == 6
+        assert OffreArchive.query.filter_by(url='https://exemple.ci/offre/0').first().actif is False
+
+        data = client.get('/api/offres', headers=auth_headers).get_json()
+        assert data['total'] == 4
+        data = client.get('/api/offres?include_archived=1&par_page=5&page=2', headers=auth_headers).get_json()
+        assert (data['total'], data['pages']) == (10, 2)
+        assert [o['titre'] for o in data['offres']] == [f'Offre {i}' for i in range(5, 10)]
+        assert [o['archivee'] for o in data['offres']] == [True, False, False, False, False]
+        tout = client.get('/api/offres?include_archived=1&par_page=20', headers=auth_headers).get_json()['offres']
+        assert [o['titre'] for o in tout] == [f'Offre {i}' for i in range(10)]
+        assert [o['archivee'] for o in tout] == [i < 4 or i in (4, 5) for i in range(10)]
+
+        # Une offre archivée revue au scraping est ignorée (pas de recréation, pas d'enrichissement)
+        scheduler.ai_filter.enabled = False
+        mesures = MesuresExecution()
+        with collecter(mesures):
+            scheduler._sauvegarder_offres([{'titre': 'Offre 0', 'source': 'GIZ', 'url': 'http://www.exemple.ci/offre/0/?utm_source=x'}])
+        assert mesures.rejets['archivee'] == 1
+        assert Offre.query.filter_by(url='https://exemple.ci/offre/0').count() == 0
+
+        # Second passage: rien de plus à archiver
+        assert client.post('/api/admin/archiver-offres', headers=auth_headers).get_json()['result'] == {'archived': 0}
@@ -0,0 +1,67 @@
+from sqlalchemy import event
+
+
+def test_import_mots_cles_ensembliste(app, client, auth_headers):
+    from database.models import db, MotsCles
+
+    with app.app_context():
+        MotsCles.query.filter_by(mot='Cacao').first().actif = False
+        db.session.commit()
+        requetes = []
+        ecouteur = lambda *a: requetes.append(a[2])
+        event.listen(db.engine, 'before_cursor_execute', ecouteur)
+        try:
+            mots = [f'Mot {i}' for i in range(500)] + ['Cacao', 'Mot 1', ' ', 'Anacarde']
+            r = client.post('/api/mots-cles/import', json={'categorie': 'Import', 'mots': mots}, headers=auth_headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', ecouteur)
+        data = r.get_json()
+        assert r.status_code == 200
+        assert data['created'] == 500
+        assert data['reactivated'] == 1
+        # ' ' (vide) + 'Mot 1' (doublon)
+        assert data['skipped'] == 2
+        assert MotsCles.query.filter_by(mot='Cacao').first().actif is True
+        assert MotsCles.query.filter_by(mot='Anacarde').first().categorie == 'Import'
+        assert sum(1 for q in requetes if q.startswith('SELECT mots_cles')) == 1
+        assert len(requetes) < 15
+
+
+def test_sync_liens_et_empreinte(app, client, auth_headers):
+    from database.models import db, Source, ParametreSysteme
+    from scraping.scheduler import scheduler
+
+    app.config['TABLEAU_VEILLE_ACTEURS'] = [
+        {'structure': 'Acteur A', 'lien': 'https://a.example.ci/offres'},
+        {'structure': 'Acteur B', 'lien': 'pas-une-url'},
+    ]
+    app.config['STRUCTURES_SCRAPING_TARGETS'] = [
+        {'structure': 'Cible C', 'urls_a_scraper': ['https://c.example.ci/', 'https://c.example.ci/']},
+    ]
+    with app.app_context():
+        r = client.post('/api/sources/sync-links', headers=auth_headers)
+        data = r.get_json()
+        assert (data['created'], data['ignored'], data['total_links']) == (2, 1, 3)
+
+        source = Source.query.filter(Source.url_base == 'https://a.example.ci/offres').first()
+        source.actif = False
+        db.session.commit()
+        data = client.post('/api/sources/sync-links', headers=auth_headers).get_json()
+        assert (data['created'], data['updated'], data['activated']) == (0, 1, 1)
+
+        # Synchro planifiée: empreinte enregistrée puis synchro ignorée tant que la config ne change pas
+        scheduler._last_links_sync_at = None
+        scheduler._auto_sync_sources_links()
+        assert db.session.get(ParametreSysteme, 'links_sync_version') is not None
+
+        source.actif = False
+        db.session.commit()
+        scheduler._last_links_sync_at = None
+        scheduler._auto_sync_sources_links()
+        assert db.session.get(Source, source.id).actif is False
+
+        app.config['TABLEAU_VEILLE_ACTEURS'].append({'structure': 'Acteur D', 'lien': 'https://d.example.ci/'})
+        scheduler._last_links_sync_at = None
+        scheduler._auto_sync_sources_links()
+        assert db.session.get(Source, source.id).actif is True
+        assert Source.query.filter(Source.url_base == 'https://d.example.ci/').count() == 1
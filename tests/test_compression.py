@@ -0,0 +1,72 @@
+import gzip
+import os
+import re
+from datetime import datetime, timedelta
+
+
+def test_choisir_encodage():
+    from backend.api.compression import choisir_encodage
+
+    assert choisir_encodage('gzip, deflate', ('br', 'gzip')) == 'gzip'
+    assert choisir_encodage('gzip, deflate, br', ('br', 'gzip')) == 'br'
+    assert choisir_encodage('br;q=0.5, gzip;q=0.8', ('br', 'gzip')) == 'gzip'
+    assert choisir_encodage('*;q=0.1, br;q=0', ('br', 'gzip')) == 'gzip'
+    assert choisir_encodage('gzip;q=0', ('br', 'gzip')) is None
+    assert choisir_encodage('', ('br', 'gzip')) is None
+
+
+def test_compression_des_reponses_api(app, client, auth_headers):
+    from database.models import db, Offre
+
+    fin = datetime.utcnow() + timedelta(days=5)
+    with app.app_context():
+        db.session.add_all([
+            Offre(titre=f'Appui filière riz {i}', description='Description ' * 50, source='FAO',
+                  url=f'https://fao.org/c/{i}', date_cloturation=fin, actif=True)
+            for i in range(10)
+        ])
+        db.session.commit()
+
+    brut = client.get('/api/offres', headers=auth_headers)
+    assert 'Content-Encoding' not in brut.headers and 'Accept-Encoding' in brut.headers['Vary']
+
+    r = client.get('/api/offres', headers={**auth_headers, 'Accept-Encoding': 'gzip'})
+    assert r.headers['Content-Encoding'] == 'gzip'
+    assert int(r.headers['Content-Length']) == len(r.get_data()) < len(brut.get_data()) / 5
+    assert gzip.decompress(r.get_data()) == brut.get_data()
+
+    # Sous le seuil: pas de compression
+    r = client.get('/health', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in r.headers
+
+
+def test_fichiers_statiques_empreintes(client, auth_headers):
+    from api.frontend_routes import static_folder
+
+    page = client.get('/offres', headers=auth_headers).get_data(as_text=True)
+    url = re.search(r'href="(/static/css/style\.[0-9a-f]{10}\.css)"', page).group(1)
+    with open(os.path.join(static_folder, 'css', 'style.css'), 'rb') as fh:
+        original = fh.read()
+
+    r = client.get(url, headers={**auth_headers, 'Accept-Encoding': 'gzip'})
+    assert r.status_code == 200 and r.mimetype == 'text/css'
+    assert r.headers['Content-Encoding'] == 'gzip'
+    assert 'immutable' in r.headers['Cache-Control'] and 'max-age=31536000' in r.headers['Cache-Control']
+    assert gzip.decompress(r.get_data()) == original
+
+    r2 = client.get(url, headers={**auth_headers, 'Accept-Encoding': 'gzip', 'If-None-Match': r.headers['ETag']})
+    assert r2.status_code == 304
+
+    # URL sans empreinte (ou empreinte périmée): revalidation à chaque fois
+    for ancienne in ('/static/css/style.css', '/static/css/style.0123456789.css'):
+        r = client.get(ancienne, headers=auth_headers)
+        assert r.status_code == 200 and 'immutable' not in r.headers['Cache-Control']
+        assert 'no-cache' in r.headers['Cache-Control']
+        assert r.get_data() == original
+        r.close()
+
+    r = client.get('/static/img/sindev-logo.jpeg', headers=auth_headers)
+    assert r.status_code == 200 and 'Content-Encoding' not in r.headers
+    r.close()
+    assert client.get('/static/../backend/app.py', headers=auth_headers).status_code == 404
+    assert client.get('/static/css/absent.css', headers=auth_headers).status_code == 404
@@ -0,0 +1,49 @@
+import time
+from datetime import datetime, timedelta
+
+
+def test_dashboard_agrege_et_caches(monkeypatch, app, client, auth_headers):
+    from database.models import db, Offre
+    from scraping import ai_filter_local
+
+    sondages = []
+
+    def sonder():
+        sondages.append(1)
+        return {'enabled': True, 'available': len(sondages) > 1, 'model': 'test', 'ollama_url': 'http://ollama'}
+
+    monkeypatch.setattr(ai_filter_local, '_sonder_statut', sonder)
+    monkeypatch.setattr(ai_filter_local, '_statut', {'valeur': None, 'expire': 0.0, 'en_cours': False})
+
+    fin = datetime.utcnow() + timedelta(days=3)
+    with app.app_context():
+        Offre.query.delete()
+        db.session.add(Offre(titre='A', source='GIZ', url='https://giz.de/a', date_cloturation=fin, actif=True))
+        db.session.commit()
+
+    data = client.get('/api/dashboard', headers=auth_headers).get_json()
+    assert set(data) == {'stats', 'scheduler', 'ia', 'acteurs'}
+    assert data['stats']['total_offres'] == 1
+    assert 'jobs' in data['scheduler']
+    assert data['ia'] == {'enabled': True, 'available': False, 'model': 'test', 'ollama_url': 'http://ollama'}
+    assert data['acteurs']['total'] == len(app.config['TABLEAU_VEILLE_ACTEURS'])
+
+    with app.app_context():
+        db.session.add(Offre(titre='B', source='GIZ', url='https://giz.de/b', date_cloturation=fin, actif=True))
+        db.session.commit()
+    # Instantané des statistiques (30 s) et statut IA en cache; /api/stats reste à jour
+    data = client.get('/api/dashboard', headers=auth_headers).get_json()
+    assert data['stats']['total_offres'] == 1
+    assert client.get('/api/stats', headers=auth_headers).get_json()['total_offres'] == 2
+    assert client.get('/api/ai/status', headers=auth_headers).get_json()['available'] is False
+    assert len(sondages) == 1
+
+    # Statut IA périmé: renvoyé tel quel, rafraîchi en arrière-plan
+    ai_filter_local._statut['expire'] = 0.0
+    assert client.get('/api/ai/status', headers=auth_headers).get_json()['available'] is False
+    for _ in range(50):
+        if ai_filter_local._statut['valeur']['available']:
+            break
+        time.sleep(0.02)
+    assert len(sondages) == 2
+    assert client.get('/api/ai/status', headers=auth_headers).get_json()['available'] is True
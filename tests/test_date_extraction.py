@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import pytest
+from bs4 import BeautifulSoup
+
+from backend.scraping.date_extraction import (
+    CONFIANCE_HAUTE, CONFIANCE_MOYENNE, CONFIANCE_BASSE,
+    parse_date_confiance, coerce_datetime,
+    extraire_date_limite, extraire_date_limite_texte,
+)
+
+# Corpus représentatif des textes rencontrés sur les sites cibles
+CORPUS_DATES = [
+    ('2026-02-15', datetime(2026, 2, 15), CONFIANCE_HAUTE),
+    ('2026-02-15T10:30:00Z', datetime(2026, 2, 15, 10, 30), CONFIANCE_HAUTE),
+    ('2026-02-15T10:30:00+01:00', datetime(2026, 2, 15, 9, 30), CONFIANCE_HAUTE),
+    ('15/02/2026', datetime(2026, 2, 15), CONFIANCE_MOYENNE),
+    ('15-02-2026 à 10h00', datetime(2026, 2, 15, 10, 0), CONFIANCE_MOYENNE),
+    ('15.02.26', datetime(2026, 2, 15), CONFIANCE_MOYENNE),
+    ('2026/02/15', datetime(2026, 2, 15), CONFIANCE_MOYENNE),
+    ('15 février 2026', datetime(2026, 2, 15), CONFIANCE_MOYENNE),
+    ('1er mars 2026 à 12h30', datetime(2026, 3, 1, 12, 30), CONFIANCE_MOYENNE),
+    ('lundi 16 mars 2026', datetime(2026, 3, 16), CONFIANCE_MOYENNE),
+    ('15 Févr. 2026', datetime(2026, 2, 15), CONFIANCE_MOYENNE),
+    ('31 août 2026', datetime(2026, 8, 31), CONFIANCE_MOYENNE),
+    ('15 December 2026', datetime(2026, 12, 15), CONFIANCE_MOYENNE),
+    ('February 15, 2026', datetime(2026, 2, 15), CONFIANCE_MOYENNE),
+    ('Monday, March 2nd 2026 at 17:00', datetime(2026, 3, 2, 17, 0), CONFIANCE_MOYENNE),
+    ('avant le 15 février 2026', datetime(2026, 2, 15), CONFIANCE_BASSE),
+]
+
+CORPUS_TEXTES = [
+    ("Date limite de dépôt des offres : 15/02/2026 à 10h00", datetime(2026, 2, 15, 10, 0)),
+    ("Date de clôture: 28 février 2026", datetime(2026, 2, 28)),
+    ("Deadline: March 3, 2026", datetime(2026, 3, 3)),
+    ("Closing date - 2026-04-30", datetime(2026, 4, 30)),
+    ("Submission deadline 05.05.2026 at 17:00", datetime(2026, 5, 5, 17, 0)),
+    ("Publié le 01/01/2026. Clôture le 20 janvier 2026", datetime(2026, 1, 20)),
+    ("Aucune date ici", None),
+]
+
+
+@pytest.mark.parametrize('texte,attendu,confiance', CORPUS_DATES)
+def test_parse_date_corpus(texte, attendu, confiance):
+    dt, conf = parse_date_confiance(texte)
+    assert dt == attendu
+    assert conf == confiance
+
+
+@pytest.mark.parametrize('texte,attendu', CORPUS_TEXTES)
+def test_extraire_date_limite_texte(texte, attendu):
+    res = extraire_date_limite_texte(texte)
+    assert (res.date if res else None) == attendu
+
+
+def test_extraire_date_limite_soup():
+    soup = BeautifulSoup(
+        "<html><body><p>Date limite : 15 février 2026</p>"
+        "<time datetime='2026-03-01T12:00:00Z'>1 mars</time></body></html>",
+        'html.parser',
+    )
+    res = extraire_date_limite(soup)
+    assert res.date == datetime(2026, 3, 1, 12, 0)
+    assert res.confiance == CONFIANCE_HAUTE
+    assert res.origine == 'time'
+
+    soup = BeautifulSoup("<p>Date limite : 15 février 2026</p>", 'html.parser')
+    res = extraire_date_limite(soup)
+    assert res.date == datetime(2026, 2, 15)
+    assert res.confiance == CONFIANCE_MOYENNE
+
+
+def test_coerce_datetime_valeurs():
+    assert coerce_datetime(None) is None
+    assert coerce_datetime('') is None
+    assert coerce_datetime('pas une date') is None
+    assert coerce_datetime(datetime(2026, 1, 1)) == datetime(2026, 1, 1)
+    assert coerce_datetime('2026-01-01T12:00:00+00:00') == datetime(2026, 1, 1, 12, 0)
+    assert coerce_datetime('02/15/2026') == datetime(2026, 2, 15)
+    # Texte libre: pas de date devinée (le parsing flou inventerait une date limite)
+    for texte in ('Open until 2026', 'Rolling basis 15', 'Lot 3 - 12 mois', 'mai'):
+        assert coerce_datetime(texte) is None
+
@@ -0,0 +1,62 @@
+import csv
+import gzip
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+
+def _offres(nombre=25):
+    fin = datetime.utcnow() + timedelta(days=10)
+    lignes = [
+        {'titre': f'Offre {i}, "lot" {i}', 'description': 'ligne 1\nligne 2', 'source': 'GIZ' if i % 2 else 'FAO',
+         'url': f'https://exemple.ci/{i}', 'date_cloturation': fin, 'actif': True}
+        for i in range(nombre)
+    ]
+    lignes.append({'titre': 'Expirée', 'source': 'GIZ', 'url': 'https://exemple.ci/x',
+                   'date_cloturation': datetime.utcnow() - timedelta(days=1), 'actif': True})
+    return lignes
+
+
+def test_export_csv_et_ndjson_gzip(client, auth_headers, inserer_offres):
+    from database.export_offres import COLONNES
+
+    inserer_offres(_offres())
+
+    r = client.get('/api/offres/export?format=csv', headers=auth_headers)
+    assert r.status_code == 200 and r.mimetype == 'text/csv'
+    assert 'attachment; filename="offres-' in r.headers['Content-Disposition']
+    lignes = list(csv.DictReader(io.StringIO(r.get_data(as_text=True))))
+    assert len(lignes) == 25  # offre expirée exclue, comme /api/offres
+    assert tuple(lignes[0]) == COLONNES
+    assert lignes[3]['titre'] == 'Offre 3, "lot" 3' and lignes[3]['description'] == 'ligne 1\nligne 2'
+
+    r = client.get('/api/offres/export?format=ndjson&gzip=1&source=GIZ&include_expired=1', headers=auth_headers)
+    assert r.mimetype == 'application/gzip' and r.headers['Content-Disposition'].endswith('.ndjson.gz"')
+    offres = [json.loads(l) for l in gzip.decompress(r.get_data()).decode('utf-8').splitlines()]
+    assert len(offres) == 13 and {o['source'] for o in offres} == {'GIZ'}
+    assert [o['id'] for o in offres] == sorted(o['id'] for o in offres)
+
+    assert client.get('/api/offres/export?format=xlsx', headers=auth_headers).status_code == 400
+
+
+def test_export_par_lots(app, inserer_offres):
+    from database.export_offres import conditions_liste, exporter
+
+    inserer_offres(_offres(nombre=7))
+    with app.app_context():
+        morceaux = list(exporter('ndjson', conditions_liste(), taille_lot=3))
+    # Un morceau émis par lot lu: 3 + 3 + 1
+    assert [m.count(b'\n') for m in morceaux] == [3, 3, 1]
+
+
+def test_export_parquet(client, auth_headers, inserer_offres):
+    pq = pytest.importorskip('pyarrow.parquet')
+
+    inserer_offres(_offres())
+    r = client.get('/api/offres/export?format=parquet&source=FAO', headers=auth_headers)
+    assert r.status_code == 200
+    table = pq.read_table(io.BytesIO(r.get_data()))
+    assert table.num_rows == 13
+    assert set(table.column('source').to_pylist()) == {'FAO'}
@@ -0,0 +1,37 @@
+from backend.scraping.instrumentation import MesuresExecution, collecter, mesures_courantes
+from backend.scraping.page_archive import ArchivePages, SessionArchive
+from backend.scraping.scrapers.dgmp_scraper import DGMPScraper
+
+PAGE = b"<html><body><a href='/offre1'>Appel d'offres important</a></body></html>"
+
+
+def test_mesures_inactives_hors_collecte():
+    m = mesures_courantes()
+    with m.etape('fetch'):
+        pass
+    m.incrementer('pages')
+    m.rejeter('not_ci')
+    assert not isinstance(m, MesuresExecution)
+
+
+def test_collecte_scraper(tmp_path):
+    archive = ArchivePages(str(tmp_path))
+    for path in ('/', '/marches', '/appel-offres'):
+        archive.enregistrer(f'https://www.admin.sigomap.gouv.ci{path}', 200, {'Content-Type': 'text/html'}, PAGE)
+    scraper = DGMPScraper()
+    scraper.session = SessionArchive(archive)
+
+    with collecter() as mesures:
+        with mesures.etape('scrape'):
+            scraper.scrape()
+        mesures.rejeter('not_ci')
+        mesures.rejeter('not_ci')
+
+    d = mesures.to_dict()
+    assert d['compteurs']['pages'] == 3
+    assert d['compteurs']['octets'] == 3 * len(PAGE)
+    assert d['compteurs']['cache_hits'] == 3
+    assert d['rejets'] == {'not_ci': 2}
+    assert set(d['etapes']) >= {'scrape', 'fetch', 'parse_html'}
+    assert d['etapes']['scrape'] >= d['etapes']['fetch']
+    assert mesures_courantes() is not mesures
@@ -0,0 +1,55 @@
+import json
+import os
+import subprocess
+import sys
+
+BACKEND = os.path.join(os.path.dirname(__file__), '..', 'backend')
+
+LOURDS = ('pypdf', 'dateutil', 'bs4', 'scraping.scrapers.', 'scraping.giz_scraper', 'scraping.ai_filter_local')
+
+SCRIPT = '''
+import json, sys, time
+t0 = time.perf_counter()
+import app
+from config import TestingConfig
+TestingConfig.SCHEDULER_AUTOSTART = False
+application = app.create_app(TestingConfig)
+application.test_client().get('/health')
+t_web = time.perf_counter() - t0
+web = sorted(m for m in sys.modules if m.startswith(%(lourds)r))
+
+from scraping.scheduler import scheduler
+scheduler.scrapers.get('dgmp')
+un_scraper = sorted(m for m in sys.modules if m.startswith('scraping.scrapers.'))
+
+t0 = time.perf_counter()
+scheduler.scrapers.items()
+t_tous = time.perf_counter() - t0
+print(json.dumps({'t_web': t_web, 't_tous': t_tous, 'web': web, 'un_scraper': un_scraper,
+                  'disponibles': len([k for k, v in scheduler.scrapers.items() if v is not None])}))
+''' % {'lourds': LOURDS}
+
+
+def test_process_web_sans_code_de_scraping():
+    out = subprocess.run(
+        [sys.executable, '-c', SCRIPT], cwd=BACKEND, capture_output=True, text=True, timeout=120,
+        env={**os.environ, 'FLASK_ENV': 'testing'},
+    )
+    assert out.returncode == 0, out.stderr[-2000:]
+    res = json.loads(out.stdout.strip().splitlines()[-1])
+    print(f"\ncreate_app (web-only): {res['t_web'] * 1000:.0f} ms; chargement des scrapers: {res['t_tous'] * 1000:.0f} ms")
+
+    assert res['web'] == []
+    assert res['un_scraper'] == ['scraping.scrapers.base_scraper', 'scraping.scrapers.dgmp_scraper']
+    assert res['disponibles'] == 16
+
+
+def test_registre_cle_inconnue_et_surcharge():
+    from backend.scraping.registry import RegistreScrapers
+
+    r = RegistreScrapers({'x': 'module.inexistant:Classe'})
+    assert 'x' in r and 'y' not in r
+    assert r.get('x') is None
+    assert r.get('y', 'defaut') == 'defaut'
+    r['y'] = object()
+    assert set(r.keys()) == {'x', 'y'}
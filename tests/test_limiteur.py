@@ -0,0 +1,77 @@
+def test_fenetre_glissante_memoire_bornee():
+    from api.limiteur import LimiteurMemoire
+
+    limiteur = LimiteurMemoire(max_cles=100)
+    # 3 requêtes par fenêtre de 60 s
+    assert [limiteur.autoriser('login:a', 3, 60, maintenant=t)[0] for t in (0, 1, 2, 3)] == [True, True, True, False]
+    assert limiteur.autoriser('login:a', 3, 60, maintenant=3) == (False, 57)
+    # Fenêtre suivante: les 3 requêtes précédentes comptent encore au prorata (3 * 59/60 + 1 > 3)
+    assert limiteur.autoriser('login:a', 3, 60, maintenant=61)[0] is True
+    assert limiteur.autoriser('login:a', 3, 60, maintenant=61)[0] is False
+    assert limiteur.autoriser('login:a', 3, 60, maintenant=100)[0] is True
+    assert limiteur.autoriser('login:b', 3, 60, maintenant=3)[0] is True
+
+    # Credential stuffing: une IP différente par requête, la mémoire reste bornée (LRU)
+    for i in range(1000):
+        limiteur.autoriser(f'login:10.0.{i // 256}.{i % 256}', 3, 60, maintenant=200)
+    assert len(limiteur) == 100
+
+
+def test_sqlite_partage_entre_process(tmp_path):
+    from api.limiteur import LimiteurSQLite
+
+    chemin = str(tmp_path / 'limites.sqlite')
+    worker_1 = LimiteurSQLite(chemin, max_cles=50, purge_toutes=10)
+    worker_2 = LimiteurSQLite(chemin, max_cles=50, purge_toutes=10)
+    assert worker_1.autoriser('recherche:a', 2, 60, maintenant=0)[0] is True
+    assert worker_2.autoriser('recherche:a', 2, 60, maintenant=1)[0] is True
+    assert worker_1.autoriser('recherche:a', 2, 60, maintenant=2) == (False, 58)
+
+    for i in range(200):
+        worker_2.autoriser(f'recherche:{i}', 2, 60, maintenant=10)
+    assert len(worker_1) <= 60
+    # Clés expirées (plus de deux fenêtres) supprimées à la purge suivante
+    for i in range(10):
+        worker_1.autoriser(f'login:{i}', 2, 60, maintenant=1000)
+    assert len(worker_1) == 10
+
+
+def test_routes_limitees(creer_app, auth_headers):
+    from config import TestingConfig
+
+    class Config(TestingConfig):
+        LOGIN_RATE_LIMIT_MAX = 2
+        SEARCH_RATE_LIMIT_MAX = 1
+
+    client = creer_app(Config).test_client()
+
+    corps = {'email': 'admin@veille.ci', 'password': 'faux'}
+    assert [client.post('/auth/login', json=corps, headers=auth_headers).status_code for _ in range(3)] == [401, 401, 429]
+    r = client.post('/auth/login', json=corps, headers=auth_headers)
+    assert r.get_json() == {'erreur': 'Trop de tentatives, réessayez plus tard'} and int(r.headers['Retry-After']) > 0
+    # X-Forwarded-For choisi par le client: ignoré sans proxy de confiance, la limite tient
+    for i in range(5):
+        r = client.post('/auth/login', json=corps, headers={**auth_headers, 'X-Forwarded-For': f'203.0.113.{i}'})
+        assert r.status_code == 429
+
+    assert client.get('/api/offres/rechercher?q=riz', headers=auth_headers).status_code == 200
+    assert client.get('/api/offres/rechercher?q=riz', headers=auth_headers).status_code == 429
+
+
+def test_ip_client_derriere_proxy(creer_app, auth_headers):
+    from config import TestingConfig
+
+    class Config(TestingConfig):
+        LOGIN_RATE_LIMIT_MAX = 1
+        PROXY_FIX_HOPS = 1
+
+    client = creer_app(Config).test_client()
+    corps = {'email': 'admin@veille.ci', 'password': 'faux'}
+
+    def connexion(xff):
+        return client.post('/auth/login', json=corps, headers={**auth_headers, 'X-Forwarded-For': xff}).status_code
+
+    # Seule la dernière valeur (ajoutée par le proxy) compte; le préfixe fourni par le client est ignoré
+    assert connexion('1.1.1.1, 198.51.100.7') == 401
+    assert connexion('2.2.2.2, 198.51.100.7') == 429
+    assert connexion('198.51.100.8') == 401
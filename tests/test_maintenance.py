@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+
+def _offres():
+    now = datetime.utcnow()
+    return [
+        {
+            'titre': f'Offre {i}',
+            'description': 'Projet à Abidjan, Côte d\'Ivoire' if i % 2 else 'Mission au Sénégal',
+            'source': 'PNUD' if i % 3 == 0 else 'GIZ',
+            'url': f'https://exemple.org/{"blog" if i % 10 == 0 else "offre"}/{i}',
+            'date_cloturation': now - timedelta(days=1) if i < 30 else now + timedelta(days=10),
+            'actif': True,
+        }
+        for i in range(120)
+    ]
+
+
+def test_purge_par_tranches(app, inserer_offres):
+    from database.models import db, Offre
+    from scraping.scheduler import scheduler
+
+    inserer_offres(_offres())
+    app.config['PURGE_BATCH_SIZE'] = 50
+    with app.app_context():
+        requetes = []
+        ecouteur = lambda *a: requetes.append(a[2])
+        event.listen(db.engine, 'before_cursor_execute', ecouteur)
+        try:
+            res = scheduler.purger_offres_expirees()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', ecouteur)
+        assert res == {'disabled': 30, 'removed': 0}
+        assert Offre.query.filter_by(actif=True).count() == 90
+        # Aucun SELECT des lignes candidates: bornes d'id puis UPDATE ... WHERE par tranche
+        assert not any(q.startswith('SELECT offres.id AS offres_id, offres.titre') for q in requetes)
+        assert sum(1 for q in requetes if q.startswith('UPDATE offres')) == 1
+
+
+def test_nettoyages_admin(app, client, auth_headers, inserer_offres):
+    from database.models import Offre
+
+    inserer_offres(_offres())
+    with app.app_context():
+        r = client.post('/api/admin/nettoyer-offres-bruit', json={'dry_run': True, 'sources': ['PNUD']}, headers=auth_headers)
+        data = r.get_json()
+        assert (data['candidates'], data['to_disable']) == (40, 4)
+        assert data['ids'] == sorted(data['ids'])
+
+        data = client.post('/api/admin/nettoyer-offres-bruit', json={'sources': ['PNUD']}, headers=auth_headers).get_json()
+        assert data['disabled'] == 4
+        assert Offre.query.filter_by(actif=True).count() == 116
+
+        data = client.post('/api/admin/nettoyer-offres-non-ci', json={'sources': ['GIZ']}, headers=auth_headers).get_json()
+        assert data['candidates'] == 80
+        assert data['disabled'] == 40
+        assert Offre.query.filter(Offre.actif == True, Offre.source == 'GIZ').count() == 40
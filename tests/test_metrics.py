@@ -0,0 +1,33 @@
+from backend.metrics import Registre
+
+
+def test_exposition_format_texte():
+    r = Registre()
+    c = r.compteur('t_requetes_total', 'Requêtes', ('route', 'statut'))
+    h = r.histogramme('t_duree_seconds', 'Durée', ('route',), buckets=(0.1, 1.0))
+    c.inc(route='/api/offres', statut=200)
+    c.inc(route='/api/offres', statut=200)
+    h.observer(0.05, route='/api/offres')
+    h.observer(0.5, route='/api/offres')
+    h.observer(5, route='/api/offres')
+
+    texte = r.exposer()
+    assert '# TYPE t_requetes_total counter' in texte
+    assert 't_requetes_total{route="/api/offres",statut="200"} 2' in texte
+    assert 't_duree_seconds_bucket{route="/api/offres",le="0.1"} 1' in texte
+    assert 't_duree_seconds_bucket{route="/api/offres",le="1"} 2' in texte
+    assert 't_duree_seconds_bucket{route="/api/offres",le="+Inf"} 3' in texte
+    assert 't_duree_seconds_count{route="/api/offres"} 3' in texte
+    assert 't_duree_seconds_sum{route="/api/offres"} 5.55' in texte
+
+
+def test_endpoint_metrics(client, auth_headers):
+    assert client.get('/health').status_code == 200
+    client.get('/api/mots-cles', headers=auth_headers)
+
+    resp = client.get('/metrics', headers=auth_headers)
+    assert resp.status_code == 200
+    texte = resp.get_data(as_text=True)
+    assert 'veille_http_requests_total{route="/health",methode="GET",statut="200"}' in texte
+    assert 'veille_http_request_duration_seconds_bucket{route="/api/mots-cles",methode="GET",le="+Inf"}' in texte
+    assert 'veille_db_query_duration_seconds_count' in texte
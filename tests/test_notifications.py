@@ -0,0 +1,228 @@
+import email
+import email.policy
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import json
+import socketserver
+import threading
+
+
+class _SMTPLocal(socketserver.StreamRequestHandler):
+    """Serveur SMTP minimal: accepte tout et garde les messages reçus."""
+    messages = []
+
+    def _repondre(self, ligne):
+        self.wfile.write((ligne + '\r\n').encode())
+
+    def handle(self):
+        self._repondre('220 local')
+        donnees = None
+        while True:
+            ligne = self.rfile.readline().decode('utf-8', 'replace')
+            if not ligne:
+                return
+            if donnees is not None:
+                if ligne.rstrip('\r\n') == '.':
+                    self.messages.append(''.join(donnees))
+                    donnees = None
+                    self._repondre('250 OK')
+                else:
+                    donnees.append(ligne)
+                continue
+            commande = ligne[:4].upper()
+            if commande == 'EHLO':
+                self._repondre('250 local')
+            elif commande == 'DATA':
+                donnees = []
+                self._repondre('354 fin par .')
+            elif commande == 'QUIT':
+                self._repondre('221 bye')
+                return
+            else:
+                self._repondre('250 OK')
+
+
+class _WebhookLocal(BaseHTTPRequestHandler):
+    """Webhook local: échoue (503) tant que `echecs` > 0."""
+    recus = []
+    echecs = 0
+
+    def do_POST(self):
+        corps = self.rfile.read(int(self.headers['Content-Length']))
+        if _WebhookLocal.echecs > 0:
+            _WebhookLocal.echecs -= 1
+            self.send_response(503)
+        else:
+            _WebhookLocal.recus.append(json.loads(corps))
+            self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def _demarrer(serveur):
+    threading.Thread(target=serveur.serve_forever, daemon=True).start()
+    return serveur
+
+
+def test_digests_email_et_webhook_avec_reprises(creer_app, auth_headers):
+    from config import TestingConfig
+    from database.models import db, Offre, NotificationSortante
+    from notifications import generer_digests, livrer_notifications
+    from scraping.percolation import percoler
+
+    smtp = _demarrer(socketserver.ThreadingTCPServer(('127.0.0.1', 0), _SMTPLocal))
+    web = _demarrer(HTTPServer(('127.0.0.1', 0), _WebhookLocal))
+    _SMTPLocal.messages.clear()
+    _WebhookLocal.recus.clear()
+    _WebhookLocal.echecs = 1
+
+    class Cfg(TestingConfig):
+        SMTP_HOST = '127.0.0.1'
+        SMTP_PORT = smtp.server_address[1]
+        SMTP_STARTTLS = False
+        SMTP_FROM = 'veille@exemple.ci'
+        WEBHOOK_HOTES_AUTORISES = ['127.0.0.1']
+
+    app = creer_app(Cfg)
+    client = app.test_client()
+    fin = datetime.utcnow() + timedelta(days=10)
+    try:
+        with app.app_context():
+            Offre.query.delete()
+            db.session.commit()
+            client.post('/api/recherches', json={'texte': 'anacarde'}, headers=auth_headers)
+            assert client.post('/api/notifications/abonnements', json={'canal': 'sms'}, headers=auth_headers).status_code == 400
+            assert client.post('/api/notifications/abonnements', json={}, headers=auth_headers).status_code == 201
+            assert client.post('/api/notifications/abonnements', json={
+                'canal': 'webhook', 'adresse': 'http://169.254.169.254/latest/meta-data'
+            }, headers=auth_headers).get_json() == {'erreur': 'Hôte de webhook non autorisé'}
+            assert client.post('/api/notifications/abonnements', json={
+                'canal': 'webhook', 'adresse': f'http://127.0.0.1:{web.server_address[1]}/hook'
+            }, headers=auth_headers).status_code == 201
+
+            offres = [
+                Offre(titre=f'Filière anacarde lot {i}', source='GIZ', url=f'https://giz.de/{i}',
+                      date_cloturation=fin, actif=True)
+                for i in range(3)
+            ]
+            db.session.add_all(offres)
+            db.session.flush()
+            percoler(offres)
+            db.session.commit()
+
+            assert generer_digests() == {'correspondances': 3, 'utilisateurs': 1, 'notifications': 2}
+            assert generer_digests()['notifications'] == 0  # curseur avancé
+
+            maintenant = datetime.utcnow()
+            res = livrer_notifications(app.config, maintenant=maintenant)
+            assert res == {'envoyees': 1, 'reprises': 1, 'abandonnees': 0}
+            assert len(_SMTPLocal.messages) == 1
+            message = email.message_from_string(_SMTPLocal.messages[0], policy=email.policy.default)
+            assert message['Subject'] == 'Veille Stratégique: 3 nouvelles offres'
+            assert message['To'] == 'admin@veille.ci'
+            assert 'https://giz.de/2' in message.get_content()
+
+            webhook = NotificationSortante.query.filter_by(canal='webhook').one()
+            assert webhook.tentatives == 1 and '503' in webhook.derniere_erreur
+            assert webhook.prochaine_tentative == maintenant + timedelta(seconds=60)
+
+            # Pas encore due, puis reprise réussie
+            assert livrer_notifications(app.config, maintenant=maintenant)['envoyees'] == 0
+            assert livrer_notifications(app.config, maintenant=maintenant + timedelta(minutes=2))['envoyees'] == 1
+            assert _WebhookLocal.recus[0]['total'] == 3
+            assert {o['titre'] for o in _WebhookLocal.recus[0]['offres']} == {f'Filière anacarde lot {i}' for i in range(3)}
+
+            statuts = client.get('/api/admin/notifications', headers=auth_headers).get_json()['par_statut']
+            assert statuts == {'envoyee': 2}
+    finally:
+        smtp.shutdown()
+        smtp.server_close()
+        web.shutdown()
+        web.server_close()
+
+
+def test_abandon_apres_max_tentatives(creer_app):
+    from config import TestingConfig
+    from database.models import db, NotificationSortante
+    from notifications import livrer_notifications
+
+    class Cfg(TestingConfig):
+        SMTP_HOST = ''
+        NOTIFICATIONS_MAX_TENTATIVES = 2
+
+    app = creer_app(Cfg)
+    with app.app_context():
+        db.session.add(NotificationSortante(canal='email', adresse='a@exemple.ci', sujet='s', corps='c'))
+        db.session.commit()
+        t = datetime.utcnow() + timedelta(seconds=1)
+        assert livrer_notifications(app.config, maintenant=t)['reprises'] == 1
+        assert livrer_notifications(app.config, maintenant=t + timedelta(hours=1))['abandonnees'] == 1
+        n = NotificationSortante.query.one()
+        assert n.statut == 'echec' and 'SMTP non configuré' in n.derniere_erreur
+
+
+def test_webhook_hotes_publics_uniquement():
+    from notifications import verifier_webhook
+
+    for url in ('http://127.0.0.1:5000/hook', 'http://localhost:11434/api/generate', 'http://10.0.0.5/',
+                'http://169.254.169.254/latest/meta-data', 'https://[::1]/hook', 'http://[::ffff:192.168.1.1]/'):
+        assert verifier_webhook(url) is not None, url
+    assert verifier_webhook('ftp://93.184.216.34/') == 'URL de webhook invalide'
+    assert verifier_webhook('https://93.184.216.34/hook') is None
+    assert verifier_webhook('http://127.0.0.1:5000/hook', ['127.0.0.1']) is None
+    assert verifier_webhook('https://93.184.216.34/hook', ['hooks.exemple.ci']) == 'Hôte de webhook non autorisé'
+
+
+def test_passages_concurrents(app, client, auth_headers, monkeypatch):
+    import notifications
+    from database.models import db, Offre, ParametreSysteme, NotificationSortante
+    from scraping.percolation import percoler
+    from scraping.scheduler import scheduler
+
+    fin = datetime.utcnow() + timedelta(days=10)
+    with app.app_context():
+        Offre.query.delete()
+        db.session.commit()
+        client.post('/api/recherches', json={'texte': 'anacarde'}, headers=auth_headers)
+        client.post('/api/notifications/abonnements', json={}, headers=auth_headers)
+        offre = Offre(titre='Filière anacarde', source='GIZ', url='https://giz.de/1', date_cloturation=fin, actif=True)
+        db.session.add(offre)
+        db.session.flush()
+        percoler([offre])
+        db.session.commit()
+
+        # Curseur avancé par un autre passage entre la lecture et l'écriture: rien n'est déposé
+        rendre_email = notifications.rendre_email
+
+        def rendre_pendant_passage_concurrent(*args):
+            db.session.execute(db.update(ParametreSysteme).values(valeur='999'))
+            return rendre_email(*args)
+
+        db.session.add(ParametreSysteme(cle=notifications.CLE_CURSEUR, valeur='0'))
+        db.session.commit()
+        monkeypatch.setattr(notifications, 'rendre_email', rendre_pendant_passage_concurrent)
+        assert notifications.generer_digests()['notifications'] == 0
+        assert NotificationSortante.query.count() == 0
+        assert db.session.get(ParametreSysteme, notifications.CLE_CURSEUR).valeur == '0'
+        monkeypatch.setattr(notifications, 'rendre_email', rendre_email)
+        assert notifications.generer_digests()['notifications'] == 1
+
+        # Notification réservée par un autre passage: pas envoyée une seconde fois
+        maintenant = datetime.utcnow() + timedelta(seconds=1)
+        assert len(notifications._reserver(10, maintenant)) == 1
+        assert NotificationSortante.query.one().statut == 'en_cours'
+        assert notifications.livrer_notifications(app.config, maintenant=maintenant) == {
+            'envoyees': 0, 'reprises': 0, 'abandonnees': 0
+        }
+        # Réservation abandonnée (process arrêté): reprise après DUREE_RESERVATION
+        plus_tard = maintenant + timedelta(seconds=notifications.DUREE_RESERVATION)
+        assert notifications.livrer_notifications(app.config, maintenant=plus_tard)['reprises'] == 1
+        assert NotificationSortante.query.one().statut == 'en_attente'
+
+    # Un seul traitement à la fois (tâche planifiée, fin du scraping, route admin)
+    with scheduler._verrou_notifications:
+        r = client.post('/api/admin/notifications/traiter', headers=auth_headers)
+    assert r.status_code == 409
+    assert client.post('/api/admin/notifications/traiter', headers=auth_headers).status_code == 200
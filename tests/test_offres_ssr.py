@@ -0,0 +1,38 @@
+import json
+import re
+from datetime import datetime, timedelta
+
+
+def test_filtres_date_et_lieu():
+    from api.frontend_routes import date_fr, lieu_execution
+
+    assert date_fr('2026-03-05T00:00:00') == '5 mars 2026'
+    assert date_fr('2026-12-01T14:30:00') == '1 décembre 2026 à 14:30'
+    assert date_fr(None) == '-' and date_fr('pas une date') == '-'
+    assert lieu_execution({'titre': 'Étude à San Pedro', 'description': None}) == "San Pedro, Côte d'Ivoire"
+    assert lieu_execution({'titre': 'Étude', 'description': 'Sénégal'}) == "Côte d'Ivoire"
+
+
+def test_premiere_page_rendue_cote_serveur(app, client, auth_headers):
+    from database.models import db, Offre
+
+    fin = datetime.utcnow() + timedelta(days=5)
+    with app.app_context():
+        Offre.query.delete()
+        db.session.add_all([
+            Offre(titre=f'Appui <filière> {i}', description='x' * 300, source='FAO',
+                  url=f'https://fao.org/ssr/{i}', date_cloturation=fin, actif=True)
+            for i in range(25)
+        ])
+        db.session.commit()
+
+    page = client.get('/offres', headers=auth_headers).get_data(as_text=True)
+    assert 'Total: 25' in page
+    assert page.count('<div class="card"') == 20
+    assert 'Appui &lt;filière&gt; 24' in page and 'x' * 240 + '...' in page
+    meta = json.loads(re.search(r'id="offres-initiales">(.*?)</script>', page).group(1))
+    assert meta == {'page': 1, 'pages': 2, 'total': 25}
+
+    # Même page que l'API
+    api = client.get('/api/offres', headers=auth_headers).get_json()
+    assert [o['titre'] for o in api['offres']] == re.findall(r'<h3>([^$]*?)</h3>', page.replace('&lt;', '<').replace('&gt;', '>'))
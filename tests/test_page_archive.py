@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from backend.scraping.page_archive import ArchivePages, SessionArchive
+from backend.scraping.scrapers.dgmp_scraper import DGMPScraper
+
+PAGE = b"<html><body><a href='/offre1'>Appel d'offres important</a></body></html>"
+
+
+def test_archive_enregistrer_et_lire(tmp_path):
+    archive = ArchivePages(str(tmp_path))
+    archive.enregistrer('https://exemple.ci/a', 200, {'Content-Type': 'text/html'}, b'v1', date=datetime(2026, 1, 1))
+    archive.enregistrer('https://exemple.ci/a', 200, {'Content-Type': 'text/html'}, b'v2', date=datetime(2026, 2, 1))
+    archive.enregistrer('https://exemple.ci/b', 404, {}, b'absent', date=datetime(2026, 2, 1))
+
+    rec = archive.lire('https://exemple.ci/a')
+    assert rec['body'] == b'v2'
+    assert rec['headers']['content-type'] == 'text/html'
+    assert archive.lire('https://exemple.ci/a', jusqua=datetime(2026, 1, 15))['body'] == b'v1'
+    assert archive.lire('https://exemple.ci/b')['status'] == 404
+    assert archive.lire('https://exemple.ci/inconnue') is None
+    assert archive.stats()['records'] == 3
+
+
+def test_rejeu_scraper_sans_reseau(tmp_path):
+    archive = ArchivePages(str(tmp_path))
+    for path in ('/', '/marches', '/appel-offres'):
+        archive.enregistrer(f'https://www.admin.sigomap.gouv.ci{path}', 200, {'Content-Type': 'text/html'}, PAGE)
+
+    scraper = DGMPScraper()
+    session = SessionArchive(archive)
+    scraper.session = session
+
+    offres = scraper.scrape()
+    assert [o['url'] for o in offres] == ['https://www.admin.sigomap.gouv.ci/offre1']
+    assert session.trouvees == 3
+    assert session.manquantes == 0
@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+
+def _offre(**champs):
+    valeurs = {'titre': '', 'description': '', 'mots_cles': '', 'source': 'GIZ', 'partenaire': None, 'type_offre': None}
+    valeurs.update(champs)
+    return SimpleNamespace(**valeurs)
+
+
+def test_index_recherches():
+    from backend.scraping.percolation import IndexRecherches
+
+    r = lambda i, **c: SimpleNamespace(**{'id': i, 'texte': None, 'mot_cle': None, 'source': None,
+                                          'partenaire': None, 'type_offre': None, **c})
+    index = IndexRecherches([
+        r(1, texte='Filière anacarde'),
+        r(2, texte='cacao', source='ENABEL'),
+        r(3, mot_cle='Agroforesterie'),
+        r(4, partenaire='FAO'),
+        r(5, texte='ci'),
+    ])
+    assert len(index) == 5
+    # Sous-chaîne insensible à la casse et aux accents, comme /offres/rechercher
+    assert index.correspondances(_offre(titre='Étude de la FILIERE ANACARDE')) == {1}
+    assert index.correspondances(_offre(titre='Étude anacarde')) == set()
+    assert index.correspondances(_offre(description='Relance du cacao', source='ENABEL')) == {2}
+    assert index.correspondances(_offre(description='Relance du cacao')) == set()
+    assert index.correspondances(_offre(titre='Projet', mots_cles='Cacao, agroforesterie')) == {3}
+    assert index.correspondances(_offre(titre='Appui', partenaire='FAO')) == {4}
+    assert index.correspondances(_offre(titre='Appel CI 2026')) == {5}
+    # Le texte ne déborde pas d'un champ sur l'autre
+    assert index.correspondances(_offre(titre='filière', description='anacarde')) == set()
+
+
+def test_fil_des_nouveautes(app, client, auth_headers):
+    from database.models import db, Offre, CorrespondanceRecherche
+    from scraping.percolation import percoler
+
+    fin = datetime.utcnow() + timedelta(days=15)
+    with app.app_context():
+        Offre.query.delete()
+        db.session.commit()
+
+        assert client.post('/api/recherches', json={}, headers=auth_headers).status_code == 400
+        r1 = client.post('/api/recherches', json={'texte': 'anacarde'}, headers=auth_headers).get_json()['recherche']
+        r2 = client.post('/api/recherches', json={'nom': 'FAO', 'partenaire': 'FAO'}, headers=auth_headers).get_json()['recherche']
+        assert r1['nom'] == 'anacarde'
+
+        offres = [
+            Offre(titre='Étude filière anacarde', source='GIZ', url='https://giz.de/1', date_cloturation=fin, actif=True),
+            Offre(titre='Appui semencier', source='FAO', partenaire='FAO', url='https://fao.org/2', date_cloturation=fin, actif=True),
+            Offre(titre='Anacarde: transformation', source='FAO', partenaire='FAO', url='https://fao.org/3', date_cloturation=fin, actif=True),
+            Offre(titre='Anacarde expirée', source='GIZ', url='https://giz.de/4', date_cloturation=datetime.utcnow() - timedelta(days=1), actif=True),
+        ]
+        db.session.add_all(offres)
+        db.session.flush()
+        assert percoler(offres) == 4
+        assert percoler(offres) == 0  # correspondances déjà connues
+        db.session.commit()
+        assert CorrespondanceRecherche.query.count() == 4
+
+        recherches = client.get('/api/recherches', headers=auth_headers).get_json()['recherches']
+        assert [(r['id'], r['nouvelles']) for r in recherches] == [(r1['id'], 2), (r2['id'], 2)]
+
+        fil = client.get(f"/api/recherches/nouveautes?recherche_id={r1['id']}&marquer_vu=0", headers=auth_headers).get_json()
+        assert sorted(o['url'] for o in fil['offres']) == ['https://fao.org/3', 'https://giz.de/1']
+
+        fil = client.get('/api/recherches/nouveautes', headers=auth_headers).get_json()
+        assert fil['total'] == 3
+        communes = [o for o in fil['offres'] if o['url'] == 'https://fao.org/3'][0]
+        assert communes['recherches'] == sorted([r1['id'], r2['id']])
+
+        # Visite enregistrée: plus de nouveautés
+        assert client.get('/api/recherches/nouveautes', headers=auth_headers).get_json()['total'] == 0
+
+        assert client.delete(f"/api/recherches/{r2['id']}", headers=auth_headers).status_code == 200
+        assert client.delete(f"/api/recherches/{r2['id']}", headers=auth_headers).status_code == 404
+        assert CorrespondanceRecherche.query.count() == 2
+
+
+def test_echec_percolation_garde_les_offres(monkeypatch, app):
+    from database.models import db, Offre, CorrespondanceRecherche
+    from scraping import scheduler as module_scheduler
+    from scraping.quasi_doublons import indexer_offres_manquantes
+    from scraping.scheduler import scheduler
+
+    titre = "Recrutement d'un consultant pour l'étude de faisabilité de la filière anacarde à Korhogo"
+    description = "Appel à manifestation d'intérêt pour l'étude de la transformation de l'anacarde dans le Poro."
+
+    def percoler_en_echec(offres):
+        # Violation de contrainte au milieu de la percolation (transaction avortée sous PostgreSQL)
+        ligne = {'recherche_id': 1, 'offre_id': offres[0].id}
+        db.session.execute(db.insert(CorrespondanceRecherche), [ligne])
+        db.session.execute(db.insert(CorrespondanceRecherche), [ligne])
+
+    monkeypatch.setattr(module_scheduler, 'percoler', percoler_en_echec)
+    fin = datetime.utcnow() + timedelta(days=15)
+    with app.app_context():
+        Offre.query.delete()
+        db.session.add(Offre(titre=titre, description=description, source='PADFA', url='https://padfa.ci/ami/12',
+                             url_canonique='https://padfa.ci/ami/12', date_cloturation=fin, actif=True))
+        db.session.commit()
+        indexer_offres_manquantes()
+
+        # Quasi-doublon: enregistré sans passer par les filtres, donc percolé
+        scheduler._sauvegarder_offres([
+            {'titre': titre, 'description': description, 'source': 'AGREG',
+             'url': 'https://agreg.ci/offres/885', 'date_cloturation': fin},
+        ])
+        db.session.expire_all()
+        assert sorted(o.source for o in Offre.query) == ['AGREG', 'PADFA']
+        assert CorrespondanceRecherche.query.count() == 0
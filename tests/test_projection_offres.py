@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+
+def test_projection_et_format_colonnes(app, client, auth_headers):
+    from database.models import db, Offre
+
+    fin = datetime.utcnow() + timedelta(days=5)
+    with app.app_context():
+        Offre.query.delete()
+        db.session.add_all([
+            Offre(titre=f'Étude anacarde {i}', description='x' * 4000, source='GIZ', partenaire='GIZ',
+                  url=f'https://giz.de/{i}', date_cloturation=fin, actif=True)
+            for i in range(3)
+        ])
+        db.session.commit()
+
+    complet = client.get('/api/offres', headers=auth_headers)
+    assert len(complet.get_json()['offres'][0]['description']) == 4000
+    assert 'Étude'.encode() in complet.get_data()  # UTF-8, sans échappement \\u
+
+    data = client.get('/api/offres?fields=titre,source,titre', headers=auth_headers).get_json()
+    assert data['total'] == 3
+    assert set(data['offres'][0]) == {'id', 'titre', 'source', 'doublons'}
+
+    data = client.get('/api/offres?fields=liste', headers=auth_headers).get_json()
+    assert 'description' not in data['offres'][0]
+    assert data['offres'][0]['date_cloturation'] == fin.isoformat()
+
+    data = client.get('/api/offres?fields=titre,resume&format=colonnes', headers=auth_headers).get_json()
+    assert data['colonnes'] == ['id', 'titre', 'resume', 'doublons']
+    assert [len(o) for o in data['offres']] == [4, 4, 4]
+    assert len(data['offres'][0][2]) == 240
+
+    r = client.get('/api/offres?fields=titre,prix', headers=auth_headers)
+    assert r.status_code == 400 and 'prix' in r.get_json()['erreur']
+
+    data = client.get('/api/offres/rechercher?q=anacarde&fields=titre', headers=auth_headers).get_json()
+    assert data['total'] == 3 and set(data['offres'][0]) == {'id', 'titre'}
+
+    data = client.get('/api/offres?include_archived=1&fields=titre', headers=auth_headers).get_json()
+    assert set(data['offres'][0]) == {'id', 'titre', 'archivee', 'doublons'}
@@ -0,0 +1,125 @@
+from datetime import datetime, timedelta
+
+TITRE = "Recrutement d'un consultant pour l'étude de faisabilité de la filière anacarde à Korhogo"
+DESCRIPTION = (
+    "Le projet PADFA lance un appel à manifestation d'intérêt pour le recrutement d'un consultant "
+    "chargé de l'étude de faisabilité technique et économique de la transformation de l'anacarde "
+    "dans la région du Poro."
+)
+
+
+def test_empreinte_et_bandes():
+    from backend.scraping.quasi_doublons import (
+        NB_BANDES, bandes, depuis_signe, distance, empreinte, vers_signe,
+    )
+
+    h = empreinte(TITRE, DESCRIPTION)
+    # Casse, accents et ponctuation ne comptent pas
+    assert empreinte(TITRE.upper().replace('é', 'e') + ' !', DESCRIPTION + ' ;') == h
+    assert distance(h, empreinte('Travaux de construction du lycée moderne de Bouaké', DESCRIPTION[:60])) > 10
+    assert empreinte('Avis', '') is None  # trop peu de texte pour une empreinte fiable
+
+    assert depuis_signe(vers_signe(h)) == h
+    assert -(1 << 63) <= vers_signe(h) < (1 << 63)
+    b = bandes(h)
+    assert len(b) == NB_BANDES
+    # Un bit modifié ne change qu'une bande
+    assert sum(x != y for x, y in zip(b, bandes(h ^ (1 << 40)))) == 1
+
+
+def test_regroupement_au_scraping_et_liste_api(app, client, auth_headers):
+    from database.maintenance import archiver_offres
+    from database.models import db, Offre, EmpreinteOffre
+    from scraping.quasi_doublons import indexer_offres_manquantes
+    from scraping.scheduler import scheduler
+
+    fin = datetime.utcnow() + timedelta(days=20)
+    with app.app_context():
+        Offre.query.delete()
+        db.session.add(Offre(titre=TITRE, description=DESCRIPTION, source='PADFA', url='https://padfa.ci/ami/12',
+                             url_canonique='https://padfa.ci/ami/12', date_cloturation=fin, actif=True))
+        db.session.commit()
+        assert indexer_offres_manquantes() == {'indexees': 1, 'groupees': 0}
+        canonique_id = Offre.query.one().id
+
+        class FiltreCompteur:
+            enabled = True
+            appels = 0
+
+            def evaluate(self, offre):
+                FiltreCompteur.appels += 1
+                return {'keep': False, 'used_ai': True}
+
+        precedent = scheduler.ai_filter
+        scheduler.ai_filter = FiltreCompteur()
+        try:
+            # Republication sur deux agrégateurs (date limite à un jour près): ni PDF ni IA
+            scheduler._sauvegarder_offres([
+                {'titre': TITRE.upper(), 'description': DESCRIPTION, 'source': 'AGREG',
+                 'url': 'https://agreg.ci/offres/885', 'date_cloturation': fin + timedelta(days=1)},
+                {'titre': TITRE, 'description': DESCRIPTION + ' ', 'source': 'AUTRE',
+                 'url': 'https://autre.ci/a/1', 'date_cloturation': fin},
+            ])
+        finally:
+            scheduler.ai_filter = precedent
+        assert FiltreCompteur.appels == 0
+
+        membres = Offre.query.filter(Offre.id != canonique_id).all()
+        assert len(membres) == 2
+        assert {m.groupe_id for m in membres} == {canonique_id}
+        assert EmpreinteOffre.query.count() == 3
+        assert {e.groupe_id for e in EmpreinteOffre.query} == {canonique_id}
+
+        data = client.get('/api/offres', headers=auth_headers).get_json()
+        assert [o['id'] for o in data['offres']] == [canonique_id]
+        assert data['offres'][0]['doublons'] == 2
+        assert client.get('/api/offres?grouper=0', headers=auth_headers).get_json()['total'] == 3
+        # Filtre excluant l'offre canonique: un membre du groupe la remplace
+        data = client.get('/api/offres?source=AGREG', headers=auth_headers).get_json()
+        assert [o['source'] for o in data['offres']] == ['AGREG']
+
+        # Offre canonique archivée: le plus ancien membre devient canonique
+        archiver_offres(Offre.id == canonique_id)
+        db.session.expire_all()
+        nouveau, autre = sorted(Offre.query.all(), key=lambda o: o.id)
+        assert nouveau.groupe_id is None and autre.groupe_id == nouveau.id
+        assert db.session.get(EmpreinteOffre, canonique_id) is None
+        assert {e.groupe_id for e in EmpreinteOffre.query} == {nouveau.id}
+
+
+def test_quasi_doublon_d_une_offre_desactivee(app, client, auth_headers):
+    from database.models import db, Offre, EmpreinteOffre
+    from scraping.instrumentation import MesuresExecution, collecter
+    from scraping.quasi_doublons import indexer_offres_manquantes
+    from scraping.scheduler import scheduler
+
+    fin = datetime.utcnow() + timedelta(days=20)
+    with app.app_context():
+        Offre.query.delete()
+        db.session.add(Offre(titre=TITRE, description=DESCRIPTION, source='PADFA', url='https://padfa.ci/ami/12',
+                             url_canonique='https://padfa.ci/ami/12', date_cloturation=fin, actif=True))
+        db.session.commit()
+        indexer_offres_manquantes()
+        # Offre canonique désactivée après coup (rejet IA, nettoyage bruit / hors CI...)
+        Offre.query.update({'actif': False})
+        db.session.commit()
+
+        mesures = MesuresExecution()
+        with collecter(mesures):
+            scheduler._sauvegarder_offres([
+                {'titre': TITRE, 'description': DESCRIPTION, 'source': 'AGREG',
+                 'url': 'https://agreg.ci/offres/885', 'date_cloturation': fin},
+            ])
+        assert mesures.rejets == {'quasi_doublon_inactif': 1}
+        assert [(o.source, o.actif) for o in Offre.query.order_by(Offre.id)] == [('PADFA', False)]
+        data = client.get('/api/offres', headers=auth_headers).get_json()
+        assert data['offres'] == []
+
+        # Indexation a posteriori: une copie active ne rejoint pas le groupe désactivé
+        db.session.add(Offre(titre=TITRE, description=DESCRIPTION, source='AUTRE', url='https://autre.ci/a/1',
+                             url_canonique='https://autre.ci/a/1', date_cloturation=fin, actif=True))
+        db.session.commit()
+        assert indexer_offres_manquantes() == {'indexees': 1, 'groupees': 0}
+        copie = Offre.query.filter_by(source='AUTRE').one()
+        assert copie.groupe_id is None
+        assert db.session.get(EmpreinteOffre, copie.id).groupe_id == copie.id
@@ -0,0 +1,34 @@
+from backend.scraping.page_archive import ArchivePages
+from backend.scraping.replay_harness import ServeurRejeu, mesurer_scraper, comparer_rapports
+from backend.scraping.scrapers.dgmp_scraper import DGMPScraper
+
+PAGE = b"<html><body><a href='/offre1'>Appel d'offres important</a></body></html>"
+
+
+def test_rejeu_via_serveur_local(tmp_path):
+    archive = ArchivePages(str(tmp_path))
+    for path in ('/', '/marches', '/appel-offres'):
+        archive.enregistrer(f'https://www.admin.sigomap.gouv.ci{path}', 200, {'Content-Type': 'text/html'}, PAGE)
+
+    with ServeurRejeu(archive) as serveur:
+        mesures, offres = mesurer_scraper(DGMPScraper(), serveur.base_url)
+
+    assert [o['url'] for o in offres] == ['https://www.admin.sigomap.gouv.ci/offre1']
+    assert mesures['statut'] == 'succes'
+    assert mesures['pages'] == 3
+    assert mesures['pages_absentes'] == 0
+    assert mesures['octets'] == 3 * len(PAGE)
+    assert mesures['offres'] == 1
+    assert serveur.servies == 3
+
+
+def test_comparer_rapports():
+    reference = {'scrapers': {'dgmp': {'temps_total': 1.0, 'pages': 3, 'offres': 1}},
+                 'sauvegarde': {'temps_insertion': 0.5, 'temps_mise_a_jour': 0.2}}
+    assert comparer_rapports(reference, reference) == []
+
+    rapport = {'scrapers': {'dgmp': {'temps_total': 1.5, 'pages': 4, 'offres': 1}},
+               'sauvegarde': {'temps_insertion': 0.52, 'temps_mise_a_jour': 0.9}}
+    regressions = comparer_rapports(rapport, reference, tolerance=0.25)
+    assert len(regressions) == 3
+    assert any('temps_mise_a_jour' in r for r in regressions)
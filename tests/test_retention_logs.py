@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import inspect
+
+
+def test_percentile():
+    from database.retention_logs import percentile
+
+    assert percentile([], 50) is None
+    assert percentile([1.0], 95) == 1.0
+    valeurs = [float(i) for i in range(1, 21)]
+    assert percentile(valeurs, 50) == 10.0
+    assert percentile(valeurs, 95) == 19.0
+
+
+def test_consolidation_et_retention(app, client, auth_headers):
+    from database.models import db, LogScraping, LogScrapingJournalier
+    from scraping.scheduler import scheduler
+
+    app.config['LOGS_SCRAPING_RETENTION_JOURS'] = 3
+    aujourd_hui = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    with app.app_context():
+        index = {i['name'] for i in inspect(db.engine).get_indexes('logs_scraping')}
+        assert 'ix_logs_scraping_source_date' in index
+
+        LogScraping.query.delete()
+        LogScrapingJournalier.query.delete()
+        lignes = []
+        for jours in range(0, 6):
+            for h in range(10):
+                lignes.append({
+                    'source': 'GIZ',
+                    'date_execution': aujourd_hui - timedelta(days=jours) + timedelta(hours=h, minutes=5),
+                    'statut': 'succes' if h < 8 else 'erreur',
+                    'nombre_offres_trouvees': 3,
+                    'nombre_offres_nouvelles': 1,
+                    'temps_execution': float(h + 1),
+                })
+        db.session.execute(db.insert(LogScraping), lignes)
+        db.session.commit()
+
+        res = scheduler.consolider_logs_scraping()
+        # 5 journées complètes agrégées; les logs bruts de plus de 3 jours supprimés
+        assert res == {'jours_agreges': 5, 'lignes_supprimees': 20}
+        assert LogScraping.query.count() == 40
+        hier = LogScrapingJournalier.query.filter_by(jour=datetime.utcnow().date() - timedelta(days=1)).one()
+        assert (hier.executions, hier.succes, hier.offres_trouvees, hier.offres_nouvelles) == (10, 8, 30, 10)
+        assert (hier.duree_p50, hier.duree_p95) == (5.0, 10.0)
+
+        # Second passage le même jour: rien de nouveau
+        assert scheduler.consolider_logs_scraping() == {'jours_agreges': 0, 'lignes_supprimees': 0}
+
+        data = client.get('/api/logs-scraping/agregats?jours=3', headers=auth_headers).get_json()
+        jours = [(a['jour'], a.get('partiel', False)) for a in data['agregats']]
+        assert jours == [
+            ((datetime.utcnow().date() - timedelta(days=2)).isoformat(), False),
+            ((datetime.utcnow().date() - timedelta(days=1)).isoformat(), False),
+            (datetime.utcnow().date().isoformat(), True),
+        ]
@@ -0,0 +1,37 @@
+import os
+import time
+
+from backend.scraping.sampling_profiler import lister_profils, profiler_echantillons
+
+
+def _travail_cpu(duree=0.15):
+    fin = time.perf_counter() + duree
+    n = 0
+    while time.perf_counter() < fin:
+        n += 1
+    return n
+
+
+def test_profil_collapsed_et_rotation(tmp_path):
+    dossier = str(tmp_path)
+    with profiler_echantillons('source-test', True, dossier, intervalle=0.002, max_fichiers=2) as profil:
+        _travail_cpu()
+    assert profil['echantillons'] > 0
+    contenu = open(os.path.join(dossier, profil['fichier']), encoding='utf-8').read()
+    ligne = contenu.splitlines()[0]
+    pile, n = ligne.rsplit(' ', 1)
+    assert int(n) > 0
+    assert '_travail_cpu (test_sampling_profiler.py:' in contenu
+    assert ';' in pile
+
+    for i in range(3):
+        with profiler_echantillons(f'job-{i}', True, dossier, intervalle=0.002, max_fichiers=2):
+            time.sleep(0.01)
+    assert [p['fichier'].split('-', 1)[1] for p in lister_profils(dossier)] == ['job-2.folded', 'job-1.folded']
+
+
+def test_profil_inactif(tmp_path):
+    with profiler_echantillons('rien', False, str(tmp_path)) as profil:
+        pass
+    assert profil == {}
+    assert lister_profils(str(tmp_path)) == []
@@ -0,0 +1,28 @@
+from sqlalchemy import event
+
+
+def test_seed_groupe_et_marqueur(app):
+    from database.database import _initialiser_donnees_par_defaut, get_default_mots_cles_data, get_default_sources_data
+    from database.models import db, MotsCles, Source, ParametreSysteme
+
+    with app.app_context():
+        assert MotsCles.query.count() == len(get_default_mots_cles_data())
+        assert Source.query.count() == len(get_default_sources_data())
+        assert MotsCles.query.filter_by(mot='Anacarde').first().categorie == 'Chaîne de valeur'
+
+        requetes = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: requetes.append(a[2]))
+
+        # Marqueur à jour: une seule requête (lecture du marqueur)
+        _initialiser_donnees_par_defaut()
+        assert len(requetes) == 1
+
+        # Marqueur obsolète: les lignes manquantes sont réinsérées en une requête groupée
+        MotsCles.query.filter_by(mot='Cacao').delete()
+        db.session.get(ParametreSysteme, 'seed_version').valeur = 'ancienne'
+        db.session.commit()
+        requetes.clear()
+        _initialiser_donnees_par_defaut()
+        assert MotsCles.query.filter_by(mot='Cacao').count() == 1
+        assert sum(1 for r in requetes if r.startswith('INSERT INTO mots_cles')) == 1
+        assert len(requetes) < 10
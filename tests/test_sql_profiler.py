@@ -0,0 +1,35 @@
+from backend.database.sql_profiler import forme_requete
+
+
+def test_forme_requete():
+    a = forme_requete("SELECT * FROM offres WHERE url = 'https://x.ci/1' LIMIT 1")
+    b = forme_requete("SELECT *   FROM offres\n WHERE url = 'https://x.ci/2' LIMIT 5")
+    assert a == b == 'SELECT * FROM offres WHERE url = ? LIMIT ?'
+    assert forme_requete('SELECT id FROM sources WHERE id IN (?, ?, ?)') == 'SELECT id FROM sources WHERE id IN (?...)'
+    assert forme_requete('SELECT * FROM mots_cles WHERE mot = :mot_1') == 'SELECT * FROM mots_cles WHERE mot = ?'
+
+
+def test_profil_par_entete_admin(app, auth_headers, caplog):
+    from database.models import MotsCles
+
+    app.config['SQL_PROFILER_REPEAT_THRESHOLD'] = 3
+
+    @app.route('/test-n-plus-un')
+    def n_plus_un():
+        for mot in ('a', 'b', 'c', 'd'):
+            MotsCles.query.filter_by(mot=mot).first()
+        return {'ok': True}
+
+    client = app.test_client()
+    resp = client.get('/test-n-plus-un', headers=auth_headers)
+    assert 'X-SQL-Requetes' not in resp.headers
+
+    with caplog.at_level('WARNING', logger='database.sql_profiler'):
+        resp = client.get('/test-n-plus-un', headers={**auth_headers, 'X-Profil-SQL': '1'})
+    assert int(resp.headers['X-SQL-Requetes']) >= 4
+    assert int(resp.headers['X-SQL-Repetitions']) >= 4
+    assert any('N+1 suspect' in r.message for r in caplog.records)
+
+    # En-tête ignoré sans authentification admin
+    resp = client.get('/health', headers={'X-Profil-SQL': '1'})
+    assert 'X-SQL-Requetes' not in resp.headers
@@ -0,0 +1,49 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+
+
+def test_pragmas_appliques_a_la_connexion(tmp_path):
+    from database.sqlite_tuning import installer_profil_sqlite
+
+    engine = create_engine(f"sqlite:///{tmp_path / 't.db'}")
+    appliques = installer_profil_sqlite(engine, {'SQLITE_BUSY_TIMEOUT': 5, 'SQLITE_CACHE_SIZE': -2000})
+    assert [n for n, _ in appliques] == ['busy_timeout', 'journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'temp_store']
+    with engine.connect() as conn:
+        assert conn.execute(text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert conn.execute(text('PRAGMA synchronous')).scalar() == 1  # NORMAL
+        assert conn.execute(text('PRAGMA busy_timeout')).scalar() == 5000
+        assert conn.execute(text('PRAGMA cache_size')).scalar() == -2000
+        assert conn.execute(text('PRAGMA temp_store')).scalar() == 2  # MEMORY
+
+    assert installer_profil_sqlite(create_engine('sqlite://'), {'SQLITE_TUNING_ENABLED': False}) == []
+    with pytest.raises(ValueError):
+        installer_profil_sqlite(create_engine('sqlite://'), {'SQLITE_JOURNAL_MODE': 'wal; DROP TABLE x'})
+
+
+def test_file_ecritures_fifo_et_reentrante():
+    from database.sqlite_tuning import FileEcritures
+
+    file = FileEcritures()
+    ordre = []
+    en_cours = []
+
+    def ecrire(i):
+        with file.ecrire():
+            en_cours.append(i)
+            assert len(en_cours) == 1
+            with file.ecrire():  # réentrant dans le même thread
+                ordre.append(i)
+            time.sleep(0.01)
+            en_cours.remove(i)
+
+    threads = [threading.Thread(target=ecrire, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+        time.sleep(0.002)
+    for t in threads:
+        t.join()
+    assert sorted(ordre) == list(range(8))
+    assert file.ecritures == 8
@@ -0,0 +1,133 @@
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+
+from backend.scraping.structured_sources import decouvrir_flux, parser_flux, extraire_json_ld
+from backend.scraping.scrapers.structure_links_scraper import StructuresLinksScraper
+
+RSS = b'''<?xml version="1.0"?>
+<rss version="2.0"><channel><title>Appels</title>
+<item><title>Appel d'offres: etude socio-economique Cote d'Ivoire</title>
+<link>https://exemple.ci/appels/etude-1</link>
+<description>&lt;p&gt;Etude de marche&lt;/p&gt;</description>
+<pubDate>Mon, 02 Feb 2026 10:00:00 GMT</pubDate></item>
+<item><title>Avis: enquete Abidjan</title>
+<link>https://exemple.ci/appels/enquete-2</link>
+<pubDate>Tue, 03 Feb 2026 10:00:00 GMT</pubDate></item>
+</channel></rss>'''
+
+ATOM = b'''<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>Tenders</title>
+<entry><title>Tender notice</title><link href="https://exemple.ci/tender/1"/>
+<updated>2026-02-01T08:00:00Z</updated><summary>Survey</summary></entry>
+</feed>'''
+
+SITEMAP_INDEX = b'''<?xml version="1.0"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<sitemap><loc>https://exemple.ci/sitemap-appels.xml</loc></sitemap></sitemapindex>'''
+
+SITEMAP = b'''<?xml version="1.0"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+<url><loc>https://exemple.ci/appels/etude-1</loc><lastmod>2026-02-02</lastmod></url>
+</urlset>'''
+
+DETAIL = '''<html><head><meta name="description" content="Etude socio-economique en Cote d'Ivoire"></head>
+<body><h1>Appel d'offres etude</h1><p>Date limite : 15/03/2026</p></body></html>'''
+
+
+def test_parser_flux_rss_atom_sitemap():
+    entrees, _ = parser_flux(RSS)
+    assert [e['url'] for e in entrees] == ['https://exemple.ci/appels/etude-1', 'https://exemple.ci/appels/enquete-2']
+    assert entrees[0]['description'] == 'Etude de marche'
+    assert entrees[0]['lastmod'] == '2026-02-02T10:00:00'
+
+    entrees, _ = parser_flux(ATOM)
+    assert entrees[0]['url'] == 'https://exemple.ci/tender/1'
+    assert entrees[0]['lastmod'] == '2026-02-01T08:00:00'
+
+    entrees, sous = parser_flux(SITEMAP_INDEX)
+    assert entrees == [] and sous == ['https://exemple.ci/sitemap-appels.xml']
+
+    entrees, _ = parser_flux(SITEMAP)
+    assert entrees[0]['lastmod'] == '2026-02-02T00:00:00'
+
+    assert parser_flux(b'<html>pas du xml') == ([], [])
+
+
+def test_decouvrir_flux_et_json_ld():
+    soup = BeautifulSoup('''<html><head>
+        <link rel="alternate" type="application/rss+xml" href="/feed/">
+        <link rel="stylesheet" href="/style.css">
+        <script type="application/ld+json">{"@context": "https://schema.org", "@graph": [
+            {"@type": "JobPosting", "title": "Consultant M&E", "url": "/appels/consultant",
+             "description": "Suivi-evaluation", "validThrough": "2026-04-01T23:59:00Z"}]}</script>
+        </head><body></body></html>''', 'html.parser')
+    assert decouvrir_flux(soup, 'https://exemple.ci/appels/') == ['https://exemple.ci/feed/']
+
+    entrees = extraire_json_ld(soup, 'https://exemple.ci/')
+    assert entrees[0]['url'] == 'https://exemple.ci/appels/consultant'
+    assert entrees[0]['date_cloturation'] == datetime(2026, 4, 1, 23, 59)
+
+
+def test_mode_flux_ignore_les_pages_inchangees(monkeypatch):
+    s = StructuresLinksScraper()
+    s.sindev_ci_only = False
+    s.targets = [{'structure': 'EXEMPLE', 'urls_a_scraper': ['https://exemple.ci/appels/'],
+                  'flux': ['https://exemple.ci/feed/']}]
+    pages = []
+
+    def fake_page(url):
+        pages.append(url)
+        return BeautifulSoup(DETAIL, 'html.parser')
+
+    monkeypatch.setattr(s, 'recuperer_page', fake_page)
+    monkeypatch.setattr(s, 'recuperer_contenu', lambda url, **kw: RSS)
+
+    offres = s.scrape(['enquete'])
+    assert {o['url'] for o in offres} == {'https://exemple.ci/appels/etude-1', 'https://exemple.ci/appels/enquete-2'}
+    assert offres[0]['date_cloturation'] == datetime(2026, 3, 15)
+    # Pas de page d'index HTML: seulement les pages détail
+    assert 'https://exemple.ci/appels/' not in pages
+    assert len(pages) == 2
+
+    # Second passage: lastmod inchangés => aucune page détail récupérée
+    s.lastmod_connus = dict(s.lastmod_vus)
+    pages.clear()
+    assert s.scrape(['enquete']) == []
+    assert pages == []
+    assert s.stats_flux['inchangees'] == 2
+
+
+def test_mode_flux_complete_les_liens_de_la_page(monkeypatch):
+    # Page d'index WordPress: bloc Yoast (WebPage/WebSite) décrivant la page elle-même et flux du site
+    index = '''<html><head>
+        <link rel="alternate" type="application/rss+xml" href="/feed/">
+        <script type="application/ld+json">{"@context": "https://schema.org", "@graph": [
+            {"@type": "WebPage", "@id": "https://exemple.ci/appels/", "url": "https://exemple.ci/appels/",
+             "name": "Appels d'offres - Exemple"},
+            {"@type": "WebSite", "@id": "https://exemple.ci/#website", "url": "https://exemple.ci/", "name": "Exemple"}]}</script>
+        </head><body>
+        <a href="/appels/etude-1">Appel d'offres: etude socio-economique</a>
+        <a href="/appels/etude-3">Appel d'offres: etude de referencement</a>
+        </body></html>'''
+    s = StructuresLinksScraper()
+    s.sindev_ci_only = False
+    s.targets = [{'structure': 'EXEMPLE', 'urls_a_scraper': ['https://exemple.ci/appels/']}]
+    pages = []
+
+    def fake_page(url):
+        pages.append(url)
+        return BeautifulSoup(index if url == 'https://exemple.ci/appels/' else DETAIL, 'html.parser')
+
+    monkeypatch.setattr(s, 'recuperer_page', fake_page)
+    monkeypatch.setattr(s, 'recuperer_contenu', lambda url, **kw: RSS)
+
+    urls = sorted(o['url'] for o in s.scrape(['etude', 'enquete']))
+    assert urls == [
+        'https://exemple.ci/appels/enquete-2',
+        'https://exemple.ci/appels/etude-1',
+        'https://exemple.ci/appels/etude-3',
+    ]
+    # etude-1 (flux et lien <a>) n'est récupérée qu'une fois; la page d'index n'est pas une offre
+    assert pages.count('https://exemple.ci/appels/etude-1') == 1
+    assert 'https://exemple.ci/appels/' not in urls
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+
+
+class _FiltreIA:
+    """Filtre IA factice: décision `keep` fixée par le test."""
+    enabled = True
+
+    def __init__(self, keep=False):
+        self.keep = keep
+
+    def evaluate(self, offre):
+        return {'keep': self.keep, 'used_ai': True}
+
+
+def test_canonicaliser_url():
+    from backend.scraping.url_canonique import canonicaliser_url
+
+    attendu = 'https://afdb.org/fr/projets/avis?id=12&lang=fr'
+    for variante in (
+        'https://www.afdb.org/fr/projets/avis?lang=fr&id=12',
+        'http://afdb.org/fr/projets/avis/?id=12&lang=fr#section',
+        'HTTPS://WWW.AFDB.ORG:443/fr//projets/avis?utm_source=x&id=12&fbclid=abc&lang=fr',
+    ):
+        assert canonicaliser_url(variante) == attendu
+    # Le chemin reste sensible à la casse; un port non standard est conservé
+    assert canonicaliser_url('https://exemple.ci:8080/Doc.PDF') == 'https://exemple.ci:8080/Doc.PDF'
+    assert canonicaliser_url('https://exemple.ci/') == 'https://exemple.ci'
+    assert canonicaliser_url('  ') == ''
+    assert canonicaliser_url('mailto:contact@exemple.ci') == 'mailto:contact@exemple.ci'
+
+
+def test_doublons_scraper():
+    from backend.scraping.scrapers.base_scraper import BaseScraper
+
+    class Scraper(BaseScraper):
+        def scrape(self, mots_cles=None):
+            return []
+
+    s = Scraper('Test', 'https://exemple.ci')
+    offres = [
+        s.creer_offre('A', 'Test', 'https://exemple.ci/offre/1'),
+        s.creer_offre('A bis', 'Test', 'http://www.exemple.ci/offre/1/?utm_campaign=z'),
+        s.creer_offre('B', 'Test', 'https://exemple.ci/offre/2'),
+    ]
+    assert offres[1]['url_canonique'] == 'https://exemple.ci/offre/1'
+    assert [o['titre'] for o in s.nettoyer_offres_doublons(offres)] == ['A', 'B']
+
+
+def test_remplissage_et_recherche_par_url_canonique(app):
+    from database.database import _remplir_urls_canoniques
+    from database.models import db, Offre
+    from scraping.scheduler import scheduler
+
+    fin = datetime.utcnow() + timedelta(days=10)
+    with app.app_context():
+        Offre.query.delete()
+        db.session.execute(db.insert(Offre), [
+            {'titre': 'A', 'source': 'BAD', 'url': 'https://www.afdb.org/avis/1', 'actif': True, 'date_cloturation': fin},
+            {'titre': 'A', 'source': 'BAD', 'url': 'http://afdb.org/avis/1/', 'actif': True, 'date_cloturation': fin},
+            {'titre': 'B', 'source': 'BAD', 'url': 'https://afdb.org/avis/2', 'actif': True, 'date_cloturation': fin},
+        ])
+        db.session.commit()
+
+        _remplir_urls_canoniques()
+        lignes = Offre.query.order_by(Offre.id).all()
+        assert [o.url_canonique for o in lignes] == ['https://afdb.org/avis/1'] * 2 + ['https://afdb.org/avis/2']
+        assert [o.actif for o in lignes] == [True, False, True]
+
+        # Variante d'URL rejetée au filtrage: c'est l'offre existante (même URL canonique) qui est désactivée
+        scheduler._sauvegarder_offres([
+            {'titre': 'B', 'source': 'BAD', 'url': 'https://afdb.org/avis/2?utm_medium=mail', 'date_cloturation': fin},
+        ])
+        assert db.session.get(Offre, lignes[2].id).actif is False
+        assert Offre.query.count() == 3
+
+
+def test_compteurs_decision_ia(app):
+    from database.models import Offre
+    from scraping.instrumentation import collecter
+    from scraping.scheduler import scheduler
+
+    fin = datetime.utcnow() + timedelta(days=10)
+    offre = {'titre': "Avis d'appel d'offres", 'description': 'Abidjan, Côte d’Ivoire', 'source': 'BAD',
+             'url': 'https://afdb.org/avis/9', 'date_cloturation': fin}
+    precedent = scheduler.ai_filter
+    scheduler.ai_filter = filtre = _FiltreIA()
+    try:
+        with app.app_context():
+            Offre.query.delete()
+            # keep=False: seul chemin compté comme rejet IA
+            with collecter() as mesures:
+                scheduler._sauvegarder_offres([dict(offre)])
+            assert mesures.rejets == {'ia': 1} and mesures.compteurs['appels_ia'] == 1
+
+            # keep=True: l'offre est écartée (REJECT_AI) et comptée à part
+            filtre.keep = True
+            with collecter() as mesures:
+                scheduler._sauvegarder_offres([dict(offre)])
+            assert mesures.rejets == {} and mesures.compteurs['ecartees_apres_ia'] == 1
+    finally:
+        scheduler.ai_filter = precedent
+
+
+def test_url_longue_meme_cle_au_stockage_et_a_la_recherche(app):
+    from database.database import _remplir_urls_canoniques
+    from database.maintenance import urls_archivees
+    from database.models import db, Offre, OffreArchive
+    from scraping.scheduler import scheduler
+    from scraping.url_canonique import LONGUEUR_MAX, canonicaliser_url
+
+    url = 'https://exemple.ci/avis?ref=' + 'x' * 600
+    cle = canonicaliser_url(url)
+    assert len(cle) == LONGUEUR_MAX and canonicaliser_url(url + '&utm_source=y') == cle
+
+    fin = datetime.utcnow() + timedelta(days=10)
+    offre = {'titre': "Avis d'appel d'offres", 'description': 'Abidjan, Côte d’Ivoire', 'source': 'BAD',
+             'url': url, 'date_cloturation': fin}
+    precedent = scheduler.ai_filter
+    scheduler.ai_filter = _FiltreIA()
+    try:
+        with app.app_context():
+            Offre.query.delete()
+            db.session.commit()
+            scheduler._sauvegarder_offres([dict(offre)])
+            # Second passage: l'offre est retrouvée par sa clé tronquée, pas réinsérée (contrainte unique sur url)
+            scheduler._sauvegarder_offres([dict(offre, titre="Avis d'appel d'offres (rectificatif)")])
+            lignes = Offre.query.all()
+            assert [(o.url_canonique, o.titre) for o in lignes] == [(cle, "Avis d'appel d'offres (rectificatif)")]
+    finally:
+        scheduler.ai_filter = precedent
+
+    # Pierre tombale remplie a posteriori: même clé que celle calculée au scraping
+    with app.app_context():
+        db.session.add(OffreArchive(titre='t', source='BAD', url=url))
+        db.session.commit()
+        _remplir_urls_canoniques()
+        assert urls_archivees([canonicaliser_url(url)]) == {cle}